@@ -65,7 +65,9 @@ class ApiReplayCli(object):
             logfile=args.logfile,
             max_retry=args.max_retry,
             cert_file=args.cert_file,
-            ignore_errors=args.ignore_errors)
+            ignore_errors=args.ignore_errors,
+            max_workers=args.max_workers,
+            checkpoint_file=args.checkpoint_file)
 
     def _setup_argparse(self):
         parser = argparse.ArgumentParser()
@@ -213,6 +215,15 @@ class ApiReplayCli(object):
             action='store_true',
             default=False,
             help="Continuing executing API replay even upon errors")
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=1,
+            help="Maximum number of networks to migrate concurrently.")
+        parser.add_argument(
+            "--checkpoint-file",
+            help="Path to a file keeping the migration progress. If it "
+                 "exists, an interrupted migration is resumed from it.")
 
         # NOTE: this will return an error message if any of the
         # require options are missing.
@@ -13,10 +13,12 @@
 import copy
 from datetime import datetime
 import logging
+import os
 import socket
 import sys
 
 from barbicanclient.v1 import client as barbican
+import eventlet
 from keystoneauth1 import identity
 from keystoneauth1 import session
 from neutronclient.common import exceptions as n_exc
@@ -43,6 +45,68 @@ LOG.setLevel(logging.INFO)
 use_old_keystone_on_dest = False
 
 
+class MigrationCheckpoint(object):
+    """Keeps the progress of the migration in a local file
+
+    So that an interrupted migration can be resumed: completed phases are
+    skipped, using their stored results, and so are completed networks.
+    A phase or a network with failed items is not completed, and the
+    failures of each phase are kept until it runs again.
+    Without a file name the progress is kept in memory only.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.resuming = bool(filename and os.path.exists(filename))
+        if self.resuming:
+            with open(filename, 'r') as myfile:
+                data = myfile.read()
+            self.data = jsonutils.loads(data)
+            LOG.info("Resuming the migration from checkpoint file %s",
+                     filename)
+        else:
+            self.data = {'phases': {}, 'networks': [], 'failures': {}}
+        self._networks = set(self.data['networks'])
+
+    def _save(self):
+        if not self.filename:
+            return
+        # Replace the file at once so that an interruption will not leave
+        # it corrupted
+        tmp_filename = '%s.tmp' % self.filename
+        with open(tmp_filename, 'w') as myfile:
+            myfile.write(jsonutils.dumps(self.data))
+        os.rename(tmp_filename, self.filename)
+
+    def is_phase_done(self, phase):
+        return phase in self.data['phases']
+
+    def get_phase_result(self, phase):
+        return self.data['phases'][phase]
+
+    def phase_started(self, phase):
+        self.data['failures'].pop(phase, None)
+
+    def phase_failed(self, phase, msg):
+        self.data['failures'].setdefault(phase, []).append(msg)
+        self._save()
+
+    def get_phase_failures(self, phase):
+        return self.data['failures'].get(phase, [])
+
+    def phase_done(self, phase, result=None):
+        self.data['phases'][phase] = result
+        self._save()
+
+    def is_network_done(self, network_id):
+        return network_id in self._networks
+
+    def network_done(self, network_id):
+        self._networks.add(network_id)
+        self.data['networks'].append(network_id)
+        self._save()
+
+
 class ApiReplayClient(utils.PrepareObjectForMigration):
 
     def __init__(self,
@@ -58,7 +122,8 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
                  octavia_os_tenant_name, octavia_os_tenant_domain_id,
                  octavia_os_password, octavia_os_auth_url,
                  neutron_conf, ext_net_map, net_vni_map, int_vni_map,
-                 vif_ids_map, logfile, max_retry, cert_file, ignore_errors):
+                 vif_ids_map, logfile, max_retry, cert_file, ignore_errors,
+                 max_workers=1, checkpoint_file=None):
 
         # Init config and logging
         if neutron_conf:
@@ -72,6 +137,7 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
             LOG.addHandler(f_handler)
 
         self.max_retry = max_retry
+        self.max_workers = max_workers
 
         # connect to both clients
         if use_old_keystone:
@@ -169,21 +235,29 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
         self.n_errors = 0
         self.errors = []
         self.ignore_errors = ignore_errors
+        self.checkpoint = MigrationCheckpoint(checkpoint_file)
+        self.phase = None
 
         LOG.info("Starting NSX migration to %s.", self.dest_plugin)
         # Migrate all the objects
-        self.migrate_quotas()
-        self.migrate_security_groups()
-        self.migrate_qos_policies()
-        routers_routes, routers_gw_info = self.migrate_routers()
+        self._migrate_phase('quotas', self.migrate_quotas)
+        self._migrate_phase('security_groups', self.migrate_security_groups)
+        # The QoS support of the destination is used by the following phases
+        self.dest_qos_support = self._migrate_phase(
+            'qos_policies', self.migrate_qos_policies)
+        routers_routes, routers_gw_info = self._migrate_phase(
+            'routers', self.migrate_routers)
         source_networks = self.source_neutron.list_networks()['networks']
-        self.migrate_networks_subnets_ports(routers_gw_info, source_networks)
-        self.migrate_floatingips()
-        self.migrate_routers_routes(routers_routes)
-        self.migrate_fwaas()
+        self._migrate_phase('networks', self.migrate_networks_subnets_ports,
+                            routers_gw_info, source_networks)
+        self._migrate_phase('floatingips', self.migrate_floatingips)
+        self._migrate_phase('routers_routes', self.migrate_routers_routes,
+                            routers_routes)
+        self._migrate_phase('fwaas', self.migrate_fwaas)
         if self.octavia:
-            self.migrate_octavia(source_networks)
-        self.migrate_rbac()
+            self._migrate_phase('octavia', self.migrate_octavia,
+                                source_networks)
+        self._migrate_phase('rbac', self.migrate_rbac)
 
         if self.n_errors:
             LOG.error("NSX migration is Done with %s errors:", self.n_errors)
@@ -193,6 +267,29 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
         else:
             LOG.info("NSX migration is Done with no errors")
 
+    def _migrate_phase(self, phase, migrate_func, *args):
+        """Run a migration phase unless it was completed by a former run
+
+        Return the result of the phase, which is kept in the checkpoint
+        once all the items of the phase were migrated
+        """
+        if self.checkpoint.is_phase_done(phase):
+            LOG.info("Skip migration phase %s: Already completed", phase)
+            return self.checkpoint.get_phase_result(phase)
+        self.phase = phase
+        self.checkpoint.phase_started(phase)
+        result = migrate_func(*args)
+        failures = self.checkpoint.get_phase_failures(phase)
+        if failures:
+            # The phase will run again when resuming, and retry the items
+            # which failed
+            LOG.warning("Migration phase %(phase)s has %(num)s failures",
+                        {'phase': phase, 'num': len(failures)})
+        else:
+            self.checkpoint.phase_done(phase, result)
+        self.phase = None
+        return result
+
     def _log_elapsed(self, start_ts, text, debug=True):
         if debug:
             func = LOG.debug
@@ -257,26 +354,23 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
         )
         return client_br
 
-    def find_subnet_by_id(self, subnet_id, subnets):
-        for subnet in subnets:
-            if subnet['id'] == subnet_id:
-                return subnet
+    def index_by_id(self, objects, key='id'):
+        """Return a dictionary of the objects by their id"""
+        return dict((obj[key], obj) for obj in objects)
 
-    def get_ports_on_network(self, network_id, ports):
-        """Returns all the ports on a given network_id."""
-        ports_on_network = []
+    def index_ports_by_network(self, ports):
+        """Return a dictionary of the list of ports on each network"""
+        ports_by_network = {}
         for port in ports:
-            if port['network_id'] == network_id:
-                ports_on_network.append(port)
-        return ports_on_network
+            ports_by_network.setdefault(port['network_id'], []).append(port)
+        return ports_by_network
 
     def have_id(self, id, groups):
-        """If the sg_id is in groups return true else false."""
-        for group in groups:
-            if id == group['id']:
-                return group
+        """Return the object with this id from an id indexed dictionary
 
-        return False
+        or False if it is not there
+        """
+        return groups.get(id, False)
 
     def add_error(self, msg):
         LOG.error(msg)
@@ -285,11 +379,14 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
             sys.exit(1)
         self.n_errors = self.n_errors + 1
         self.errors.append(msg)
+        if self.phase:
+            self.checkpoint.phase_failed(self.phase, msg)
 
     def migrate_quotas(self):
         outer_start = datetime.now()
         source_quotas = self.source_neutron.list_quotas()['quotas']
-        dest_quotas = self.dest_neutron.list_quotas()['quotas']
+        dest_quotas = self.index_by_id(
+            self.dest_neutron.list_quotas()['quotas'], key='project_id')
 
         total_num = len(source_quotas)
         LOG.info("Migrating %s neutron quotas", total_num)
@@ -386,24 +483,26 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
                                                'e': e})
 
     def migrate_qos_policies(self):
-        """Migrates QoS policies from source to dest neutron."""
+        """Migrates QoS policies from source to dest neutron.
+
+        Return True if the destination supports QoS
+        """
         # first fetch the QoS policies from both the
         # source and destination neutron server
         start = datetime.now()
         try:
-            dest_qos_pols = self.dest_neutron.list_qos_policies()['policies']
+            dest_qos_pols = self.index_by_id(
+                self.dest_neutron.list_qos_policies()['policies'])
         except n_exc.NotFound:
             # QoS disabled on dest
             LOG.info("QoS is disabled on destination: ignoring QoS policies")
-            self.dest_qos_support = False
-            return
-        self.dest_qos_support = True
+            return False
         try:
             source_qos_pols = self.source_neutron.list_qos_policies()[
                 'policies']
         except n_exc.NotFound:
             # QoS disabled on source
-            return
+            return True
 
         for pol in source_qos_pols:
             inner_start = datetime.now()
@@ -435,6 +534,7 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
                         self.migrate_qos_rule(new_pol['policy'], qos_rule)
             self._log_elapsed(inner_start, "Migrate QoS policy %s" % pol['id'])
         self._log_elapsed(start, "Migrate QoS policies", debug=False)
+        return True
 
     def migrate_security_groups(self):
         """Migrates security groups from source to dest neutron."""
@@ -445,7 +545,8 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
         dest_sec_groups = self.dest_neutron.list_security_groups()
 
         source_sec_groups = source_sec_groups['security_groups']
-        dest_sec_groups = dest_sec_groups['security_groups']
+        dest_sec_groups = self.index_by_id(
+            dest_sec_groups['security_groups'])
 
         total_num = len(source_sec_groups)
         LOG.info("Migrating %s security groups", total_num)
@@ -457,10 +558,10 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
             if dest_sec_group:
                 # make sure all the security group rules are there and
                 # create them if not
+                dest_sg_rules = self.index_by_id(
+                    dest_sec_group['security_group_rules'])
                 for sg_rule in sg['security_group_rules']:
-                    if(self.have_id(sg_rule['id'],
-                                    dest_sec_group['security_group_rules'])
-                       is False):
+                    if self.have_id(sg_rule['id'], dest_sg_rules) is False:
                         try:
                             rule_start = datetime.now()
                             body = self.prepare_security_group_rule(sg_rule)
@@ -571,7 +672,8 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
             # L3 might be disabled in the source
             source_routers = []
 
-        dest_routers = self.dest_neutron.list_routers()['routers']
+        dest_routers = self.index_by_id(
+            self.dest_neutron.list_routers()['routers'])
         dest_azs = self.get_dest_availablity_zones('router')
         update_routes = {}
         gw_info = {}
@@ -693,7 +795,12 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
 
     def migrate_networks_subnets_ports(self, routers_gw_info,
                                        source_networks=None):
-        """Migrates networks/ports/router-uplinks from src to dest neutron."""
+        """Migrates networks/ports/router-uplinks from src to dest neutron.
+
+        The external networks are migrated first, and then the internal
+        ones. Within each of those tiers up to max_workers networks are
+        migrated concurrently, each with its own subnets and ports.
+        """
         start = datetime.now()
         source_ports = self.source_neutron.list_ports()['ports']
         source_subnets = self.source_neutron.list_subnets()['subnets']
@@ -728,33 +835,76 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
                 external.append(network)
             else:
                 internal.append(network)
-        source_networks = external + internal
 
         LOG.info("Migrating %(nets)s networks, %(subnets)s subnets and "
                  "%(ports)s ports",
                  {'nets': total_num, 'subnets': len(source_subnets),
                   'ports': len(source_ports)})
-        for count, network in enumerate(source_networks, 1):
-            start_net = datetime.now()
-            external_net = network.get('router:external')
-            body = self.prepare_network(
-                network, remove_qos=remove_qos,
-                dest_default_public_net=dest_default_public_net,
-                dest_azs=dest_azs, ext_net_map=self.ext_net_map,
-                net_vni_map=self.net_vni_map)
-
-            # only create network if the dest server doesn't have it
-            if self.have_id(network['id'], dest_networks):
+        migration_data = {
+            'routers_gw_info': routers_gw_info,
+            'remove_qos': remove_qos,
+            'dest_default_public_net': dest_default_public_net,
+            'dest_azs': dest_azs,
+            'subnetpools_map': subnetpools_map,
+            'source_subnets': self.index_by_id(source_subnets),
+            'source_ports': self.index_ports_by_network(source_ports),
+            'dest_networks': self.index_by_id(dest_networks),
+            'dest_subnets': self.index_by_id(dest_subnets),
+            'dest_ports': self.index_by_id(dest_ports)}
+        count = 0
+        for networks_tier in (external, internal):
+            pool = eventlet.GreenPool(self.max_workers)
+            for network in networks_tier:
+                count += 1
+                pool.spawn_n(self._migrate_network, network, count, total_num,
+                             **migration_data)
+            pool.waitall()
+        self._log_elapsed(start, "Migrate Networks, Subnets and Ports",
+                          debug=False)
+
+    def _migrate_network(self, network, count, total_num, routers_gw_info,
+                         remove_qos, dest_default_public_net, dest_azs,
+                         subnetpools_map, source_subnets, source_ports,
+                         dest_networks, dest_subnets, dest_ports):
+        """Migrates a network with its subnets, ports and router-uplinks.
+
+        The network is completed in the checkpoint only if all of them were
+        migrated.
+        """
+        if self.checkpoint.is_network_done(network['id']):
+            LOG.info("Skip network %s: Already migrated", network['id'])
+            return
+
+        failures = []
+
+        def add_error(msg):
+            failures.append(msg)
+            self.add_error(msg)
+
+        start_net = datetime.now()
+        external_net = network.get('router:external')
+        body = self.prepare_network(
+            network, remove_qos=remove_qos,
+            dest_default_public_net=dest_default_public_net,
+            dest_azs=dest_azs, ext_net_map=self.ext_net_map,
+            net_vni_map=self.net_vni_map)
+
+        # only create network if the dest server doesn't have it
+        if self.have_id(network['id'], dest_networks):
+            if not self.checkpoint.resuming:
                 LOG.info("Skip network %s: Already exists on the destination",
                          network['id'])
-                continue
-
+                return
+            # The migration of this network was interrupted. Complete its
+            # missing subnets and ports
+            LOG.info("Resuming the migration of network %s", network['id'])
+        else:
             # Ignore internal NSXV objects
             # TODO(asarfaty) - temporarily migrate those as well
             # if network['project_id'] == nsxv_constants.INTERNAL_TENANT_ID:
             #     LOG.info("Skip network %s: Internal NSX-V network",
             #              network['id'])
-            #     continue
+            #     return
 
             try:
                 created_net = self.dest_neutron.create_network(
@@ -766,221 +916,247 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
                          {'count': count, 'total': total_num,
                           'net': created_net})
             except Exception as e:
-                self.add_error("Failed to create network: %s : %s" % (body, e))
+                add_error("Failed to create network: %s : %s" % (body, e))
+                return
+
+        subnets_map = {}
+        dhcp_subnets = []
+        count_dhcp_subnet = 0
+        for subnet_id in network['subnets']:
+            start_subnet = datetime.now()
+            subnet = self.have_id(subnet_id, source_subnets)
+            body = self.prepare_subnet(subnet)
+
+            # specify the network_id that we just created above
+            body['network_id'] = network['id']
+            # translate the old subnetpool id to the new one
+            if body.get('subnetpool_id'):
+                body['subnetpool_id'] = subnetpools_map.get(
+                    body['subnetpool_id'])
+
+            # Handle DHCP enabled subnets
+            enable_dhcp = False
+            sub_host_routes = None
+            if body['enable_dhcp']:
+                count_dhcp_subnet = count_dhcp_subnet + 1
+                # disable dhcp on subnet: we will enable it after creating
+                # all the ports to avoid ip collisions
+                body['enable_dhcp'] = False
+                if count_dhcp_subnet > 1:
+                    # Do not allow dhcp on the subnet if there is already
+                    # another subnet with DHCP as the v3 plugins supports
+                    # only one
+                    LOG.warning("Disabling DHCP for subnet on net %s: "
+                                "The plugin doesn't support multiple "
+                                "subnets with DHCP", network['id'])
+                    enable_dhcp = False
+                elif external_net:
+                    # Do not allow dhcp on the external subnet
+                    LOG.warning("Disabling DHCP for subnet on net %s: "
+                                "The plugin doesn't support dhcp on "
+                                "external networks", network['id'])
+                    enable_dhcp = False
+                else:
+                    enable_dhcp = True
+                    if body.get('host_routes'):
+                        # Should be added when dhcp is enabled
+                        sub_host_routes = body.pop('host_routes')
+
+            # only create subnet if the dest server doesn't have it
+            dest_subnet = self.have_id(subnet_id, dest_subnets)
+            if dest_subnet:
+                LOG.info("Skip subnet %s: Already exists on the "
+                         "destination", subnet_id)
+                subnets_map[subnet_id] = dest_subnet['id']
+                if enable_dhcp and not dest_subnet.get('enable_dhcp'):
+                    dhcp_subnets.append({'id': dest_subnet['id'],
+                                         'host_routes': sub_host_routes})
                 continue
 
-            subnets_map = {}
-            dhcp_subnets = []
-            count_dhcp_subnet = 0
-            for subnet_id in network['subnets']:
-                start_subnet = datetime.now()
-                # only create subnet if the dest server doesn't have it
-                if self.have_id(subnet_id, dest_subnets):
-                    LOG.info("Skip network %s: Already exists on the "
-                             "destination", network['id'])
-                    continue
-                subnet = self.find_subnet_by_id(subnet_id, source_subnets)
-                body = self.prepare_subnet(subnet)
-
-                # specify the network_id that we just created above
-                body['network_id'] = network['id']
-                # translate the old subnetpool id to the new one
-                if body.get('subnetpool_id'):
-                    body['subnetpool_id'] = subnetpools_map.get(
-                        body['subnetpool_id'])
-
-                # Handle DHCP enabled subnets
-                enable_dhcp = False
-                sub_host_routes = None
-                if body['enable_dhcp']:
-                    count_dhcp_subnet = count_dhcp_subnet + 1
-                    # disable dhcp on subnet: we will enable it after creating
-                    # all the ports to avoid ip collisions
-                    body['enable_dhcp'] = False
-                    if count_dhcp_subnet > 1:
-                        # Do not allow dhcp on the subnet if there is already
-                        # another subnet with DHCP as the v3 plugins supports
-                        # only one
-                        LOG.warning("Disabling DHCP for subnet on net %s: "
-                                    "The plugin doesn't support multiple "
-                                    "subnets with DHCP", network['id'])
-                        enable_dhcp = False
-                    elif external_net:
-                        # Do not allow dhcp on the external subnet
-                        LOG.warning("Disabling DHCP for subnet on net %s: "
-                                    "The plugin doesn't support dhcp on "
-                                    "external networks", network['id'])
-                        enable_dhcp = False
-                    else:
-                        enable_dhcp = True
-                        if body.get('host_routes'):
-                            # Should be added when dhcp is enabled
-                            sub_host_routes = body.pop('host_routes')
+            try:
+                created_subnet = self.dest_neutron.create_subnet(
+                    {'subnet': body})['subnet']
+                self.check_and_apply_tags(
+                    self.dest_neutron, 'subnets',
+                    subnet['id'], subnet)
+                LOG.info("Created subnet: %s", created_subnet['id'])
+                subnets_map[subnet_id] = created_subnet['id']
+                if enable_dhcp:
+                    dhcp_subnets.append({'id': created_subnet['id'],
+                                         'host_routes': sub_host_routes})
+            except n_exc.BadRequest as e:
+                add_error("Failed to create subnet: %(subnet)s: "
+                          "%(e)s" % {'subnet': subnet, 'e': e})
+            self._log_elapsed(start_subnet,
+                              "Migrate Subnet %s" % subnet['id'])
+
+        # create the ports on the network
+        self._log_elapsed(start_net, "Migrate Network %s" % network['id'])
+        ports = source_ports.get(network['id'], [])
+        for port in ports:
+            start_port = datetime.now()
+            # Ignore internal NSXV objects
+            if port['project_id'] == nsxv_constants.INTERNAL_TENANT_ID:
+                LOG.info("Skip port %s: Internal NSX-V port",
+                         port['id'])
+                continue
+
+            body = self.prepare_port(port, remove_qos=remove_qos,
+                                     vif_ids_map=self.vif_ids_map)
+
+            # specify the network_id that we just created above
+            port['network_id'] = network['id']
+
+            subnet_id = None
+            if port.get('fixed_ips'):
+                old_subnet_id = port['fixed_ips'][0]['subnet_id']
+                subnet_id = subnets_map.get(old_subnet_id)
+            # remove the old subnet id field from fixed_ips dict
+            for fixed_ips in body['fixed_ips']:
+                del fixed_ips['subnet_id']
+
+            # only create port if the dest server doesn't have it
+            dest_port = self.have_id(port['id'], dest_ports)
+            if (dest_port and
+                    port['device_owner'] == 'network:router_interface' and
+                    not dest_port.get('device_id')):
+                # The migration was interrupted after creating the router
+                # interface port, and before attaching it to the router
                 try:
-                    created_subnet = self.dest_neutron.create_subnet(
-                        {'subnet': body})['subnet']
-                    self.check_and_apply_tags(
-                        self.dest_neutron, 'subnets',
-                        subnet['id'], subnet)
-                    LOG.info("Created subnet: %s", created_subnet['id'])
-                    subnets_map[subnet_id] = created_subnet['id']
-                    if enable_dhcp:
-                        dhcp_subnets.append({'id': created_subnet['id'],
-                                             'host_routes': sub_host_routes})
-                except n_exc.BadRequest as e:
-                    self.add_error("Failed to create subnet: %(subnet)s: "
-                                   "%(e)s" % {'subnet': subnet, 'e': e})
-                self._log_elapsed(start_subnet,
-                                  "Migrate Subnet %s" % subnet['id'])
-
-            # create the ports on the network
-            self._log_elapsed(start_net, "Migrate Network %s" % network['id'])
-            ports = self.get_ports_on_network(network['id'], source_ports)
-            for port in ports:
-                start_port = datetime.now()
-                # Ignore internal NSXV objects
-                if port['project_id'] == nsxv_constants.INTERNAL_TENANT_ID:
-                    LOG.info("Skip port %s: Internal NSX-V port",
-                             port['id'])
-                    continue
+                    self._add_router_interface(
+                        port['device_id'], dest_port['id'], network['id'])
+                except Exception as e:
+                    add_error("Failed to add router interface port "
+                              "(%(port)s): %(e)s" % {'port': port, 'e': e})
+                continue
 
-                body = self.prepare_port(port, remove_qos=remove_qos,
-                                         vif_ids_map=self.vif_ids_map)
+            if dest_port is False:
+                if port['device_owner'] == 'network:router_gateway':
+                    router_id = port['device_id']
+                    enable_snat = True
+                    if router_id in routers_gw_info:
+                        # keep the original snat status of the router
+                        enable_snat = routers_gw_info[router_id].get(
+                            'enable_snat', True)
+                    rtr_body = {
+                        "external_gateway_info":
+                            {"network_id": port['network_id'],
+                             "enable_snat": enable_snat,
+                             # keep the original GW IP
+                             "external_fixed_ips": port.get('fixed_ips')}}
+                    try:
+                        self.dest_neutron.update_router(
+                            router_id, {'router': rtr_body})
+                        LOG.info("Uplinked router %(rtr)s to external "
+                                 "network %(net)s",
+                                 {'rtr': router_id,
+                                  'net': port['network_id']})
 
-                # specify the network_id that we just created above
-                port['network_id'] = network['id']
+                    except Exception as e:
+                        add_error("Failed to add router gateway with "
+                                  "port (%(port)s): %(e)s" %
+                                  {'port': port, 'e': e})
+                    continue
 
-                subnet_id = None
-                if port.get('fixed_ips'):
-                    old_subnet_id = port['fixed_ips'][0]['subnet_id']
-                    subnet_id = subnets_map.get(old_subnet_id)
-                # remove the old subnet id field from fixed_ips dict
-                for fixed_ips in body['fixed_ips']:
-                    del fixed_ips['subnet_id']
+                # Skip ports specific to NSX-V LB implementation
+                if port['device_owner'] == 'neutron:LB':
+                    LOG.debug("Skipping port %s as it has neutron:LB "
+                              "device owner", port['id'])
+                    continue
+                # Let the neutron dhcp-agent recreate this on its own
+                if port['device_owner'] == 'network:dhcp':
+                    continue
 
-                # only create port if the dest server doesn't have it
-                if self.have_id(port['id'], dest_ports) is False:
-                    if port['device_owner'] == 'network:router_gateway':
-                        router_id = port['device_id']
-                        enable_snat = True
-                        if router_id in routers_gw_info:
-                            # keep the original snat status of the router
-                            enable_snat = routers_gw_info[router_id].get(
-                                'enable_snat', True)
-                        rtr_body = {
-                            "external_gateway_info":
-                                {"network_id": port['network_id'],
-                                 "enable_snat": enable_snat,
-                                 # keep the original GW IP
-                                 "external_fixed_ips": port.get('fixed_ips')}}
-                        try:
-                            self.dest_neutron.update_router(
-                                router_id, {'router': rtr_body})
-                            LOG.info("Uplinked router %(rtr)s to external "
-                                     "network %(net)s",
-                                     {'rtr': router_id,
-                                      'net': port['network_id']})
-
-                        except Exception as e:
-                            self.add_error("Failed to add router gateway with "
-                                           "port (%(port)s): %(e)s" %
-                                           {'port': port, 'e': e})
-                        continue
-
-                    # Skip ports specific to NSX-V LB implementation
-                    if port['device_owner'] == 'neutron:LB':
-                        LOG.debug("Skipping port %s as it has neutron:LB "
-                                  "device owner", port['id'])
-                        continue
-                    # Let the neutron dhcp-agent recreate this on its own
-                    if port['device_owner'] == 'network:dhcp':
-                        continue
-
-                    # ignore these as we create them ourselves later
-                    if port['device_owner'] == 'network:floatingip':
-                        continue
-
-                    if (port['device_owner'] == 'network:router_interface' and
-                        subnet_id):
-                        try:
-                            # uplink router_interface ports by creating the
-                            # port, and attaching it to the router
-                            router_id = port['device_id']
-                            del body['device_owner']
-                            del body['device_id']
-                            created_port = self.dest_neutron.create_port(
-                                {'port': body})['port']
-                            self.check_and_apply_tags(
-                                self.dest_neutron, 'ports',
-                                port['id'], port)
-                            LOG.info("Created interface port %(port)s (subnet "
-                                     "%(subnet)s, ip %(ip)s, mac %(mac)s)",
-                                     {'port': created_port['id'],
-                                      'subnet': subnet_id,
-                                      'ip': created_port['fixed_ips'][0][
-                                            'ip_address'],
-                                      'mac': created_port['mac_address']})
-                            self.dest_neutron.add_interface_router(
-                                router_id,
-                                {'port_id': created_port['id']})
-                            LOG.info("Uplinked router %(rtr)s to network "
-                                     "%(net)s",
-                                     {'rtr': router_id, 'net': network['id']})
-                        except Exception as e:
-                            # NOTE(arosen): this occurs here if you run the
-                            # script multiple times as we don't track this.
-                            # Note(asarfaty): also if the same network in
-                            # source is attached to 2 routers, which the v3
-                            # plugins does not support.
-                            self.add_error("Failed to add router interface "
-                                           "port (%(port)s): %(e)s" %
-                                           {'port': port, 'e': e})
-                        continue
+                # ignore these as we create them ourselves later
+                if port['device_owner'] == 'network:floatingip':
+                    continue
 
+                if (port['device_owner'] == 'network:router_interface' and
+                    subnet_id):
                     try:
+                        # uplink router_interface ports by creating the
+                        # port, and attaching it to the router
+                        router_id = port['device_id']
+                        del body['device_owner']
+                        del body['device_id']
                         created_port = self.dest_neutron.create_port(
                             {'port': body})['port']
                         self.check_and_apply_tags(
                             self.dest_neutron, 'ports',
                             port['id'], port)
-                    except Exception as e:
-                        # NOTE(arosen): this occurs here if you run the
-                        # script multiple times as we don't track this.
-                        self.add_error("Failed to create port (%(port)s) : "
-                                       "%(e)s" % {'port': port, 'e': e})
-                    else:
-                        ip_addr = None
-                        if created_port.get('fixed_ips'):
-                            ip_addr = created_port['fixed_ips'][0].get(
-                                'ip_address')
-                        LOG.info("Created port %(port)s (subnet "
+                        LOG.info("Created interface port %(port)s (subnet "
                                  "%(subnet)s, ip %(ip)s, mac %(mac)s)",
                                  {'port': created_port['id'],
                                   'subnet': subnet_id,
-                                  'ip': ip_addr,
+                                  'ip': created_port['fixed_ips'][0][
+                                        'ip_address'],
                                   'mac': created_port['mac_address']})
-                self._log_elapsed(
-                    start_port,
-                    "Migrate port %s" % port['id'])
+                        self._add_router_interface(
+                            router_id, created_port['id'], network['id'])
+                    except Exception as e:
+                        # NOTE(arosen): this occurs here if you run the
+                        # script multiple times as we don't track this.
+                        # Note(asarfaty): also if the same network in
+                        # source is attached to 2 routers, which the v3
+                        # plugins does not support.
+                        add_error("Failed to add router interface "
+                                  "port (%(port)s): %(e)s" %
+                                  {'port': port, 'e': e})
+                    continue
 
-            # Enable dhcp on the relevant subnets, and re-add host routes:
-            for subnet in dhcp_subnets:
-                start_subnet_dhcp = datetime.now()
                 try:
-                    data = {'enable_dhcp': True}
-                    if subnet['host_routes']:
-                        data['host_routes'] = subnet['host_routes']
-                    self.dest_neutron.update_subnet(subnet['id'],
-                                                    {'subnet': data})
+                    created_port = self.dest_neutron.create_port(
+                        {'port': body})['port']
+                    self.check_and_apply_tags(
+                        self.dest_neutron, 'ports',
+                        port['id'], port)
                 except Exception as e:
-                    self.add_error("Failed to enable DHCP on subnet "
-                                   "%(subnet)s: %(e)s" %
-                                   {'subnet': subnet['id'], 'e': e})
-                self._log_elapsed(
-                    start_subnet_dhcp,
-                    "Enabling DHCP on Subnet %s" % subnet['id'])
-        self._log_elapsed(start, "Migrate Networks, Subnets and Ports",
-                          debug=False)
+                    # NOTE(arosen): this occurs here if you run the
+                    # script multiple times as we don't track this.
+                    add_error("Failed to create port (%(port)s) : "
+                              "%(e)s" % {'port': port, 'e': e})
+                else:
+                    ip_addr = None
+                    if created_port.get('fixed_ips'):
+                        ip_addr = created_port['fixed_ips'][0].get(
+                            'ip_address')
+                    LOG.info("Created port %(port)s (subnet "
+                             "%(subnet)s, ip %(ip)s, mac %(mac)s)",
+                             {'port': created_port['id'],
+                              'subnet': subnet_id,
+                              'ip': ip_addr,
+                              'mac': created_port['mac_address']})
+            self._log_elapsed(
+                start_port,
+                "Migrate port %s" % port['id'])
+
+        # Enable dhcp on the relevant subnets, and re-add host routes:
+        for subnet in dhcp_subnets:
+            start_subnet_dhcp = datetime.now()
+            try:
+                data = {'enable_dhcp': True}
+                if subnet['host_routes']:
+                    data['host_routes'] = subnet['host_routes']
+                self.dest_neutron.update_subnet(subnet['id'],
+                                                {'subnet': data})
+            except Exception as e:
+                add_error("Failed to enable DHCP on subnet "
+                          "%(subnet)s: %(e)s" %
+                          {'subnet': subnet['id'], 'e': e})
+            self._log_elapsed(
+                start_subnet_dhcp,
+                "Enabling DHCP on Subnet %s" % subnet['id'])
+        if failures:
+            LOG.warning("Network %(net)s was not completely migrated: "
+                        "%(num)s failures",
+                        {'net': network['id'], 'num': len(failures)})
+            return
+        self.checkpoint.network_done(network['id'])
+
+    def _add_router_interface(self, router_id, port_id, network_id):
+        self.dest_neutron.add_interface_router(router_id, {'port_id': port_id})
+        LOG.info("Uplinked router %(rtr)s to network %(net)s",
+                 {'rtr': router_id, 'net': network_id})
 
     def migrate_floatingips(self):
         """Migrates floatingips from source to dest neutron."""
@@ -1077,6 +1253,10 @@ class ApiReplayClient(utils.PrepareObjectForMigration):
                         "on the destination server: %s", e)
             return
 
+        dest_groups = self.index_by_id(dest_groups)
+        dest_polices = self.index_by_id(dest_polices)
+        dest_rules = self.index_by_id(dest_rules)
+
         # Migrate all FWaaS objects:
         start_rules = datetime.now()
         self._migrate_fwaas_resource(
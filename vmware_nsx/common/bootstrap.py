@@ -0,0 +1,157 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Startup bootstrap results shared between the neutron workers
+
+The plugins resolve and validate many backend objects during init. When
+neutron starts with many API & RPC workers, all of them issue the same
+backend calls at the same time.
+run_once lets a single worker run the bootstrap code under a lock, and save
+its results in a local cache file together with a fingerprint of the
+relevant configuration. The other workers (and restarts within the cache ttl)
+reuse those results instead of calling the backend again.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+
+import eventlet
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_serialization import jsonutils
+
+from vmware_nsx.common import locking
+
+LOG = logging.getLogger(__name__)
+
+MAX_BOOTSTRAP_THREADS = 5
+CACHE_FILE_PREFIX = 'nsx-bootstrap-'
+
+
+def config_groups_data(*groups):
+    """Return the values of the given configuration groups as a dictionary
+
+    Groups which are not registered are skipped.
+    """
+    data = {}
+    for group in groups:
+        if group in cfg.CONF:
+            data[group] = dict(cfg.CONF[group])
+    return data
+
+
+def config_fingerprint(name, config_data):
+    """Return a stable hash of the bootstrap name and its configuration"""
+    payload = jsonutils.dumps({'name': name, 'config': config_data},
+                              sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _get_cache_dir():
+    if cfg.CONF.bootstrap_cache_dir:
+        return cfg.CONF.bootstrap_cache_dir
+    return getattr(cfg.CONF, 'state_path', None) or tempfile.gettempdir()
+
+
+def _get_cache_file(name):
+    return os.path.join(_get_cache_dir(), CACHE_FILE_PREFIX + name + '.json')
+
+
+def _read_cached_result(name, fingerprint):
+    """Return a tuple of (found, result) from the bootstrap cache file"""
+    try:
+        with open(_get_cache_file(name)) as f:
+            cached = jsonutils.loads(f.read())
+    except (IOError, OSError, ValueError):
+        return False, None
+    if cached.get('fingerprint') != fingerprint:
+        LOG.debug("Bootstrap %s configuration changed since it was cached",
+                  name)
+        return False, None
+    if time.time() - cached.get('timestamp', 0) > cfg.CONF.bootstrap_cache_ttl:
+        LOG.debug("Bootstrap %s cached results expired", name)
+        return False, None
+    return True, cached.get('result')
+
+
+def _write_cached_result(name, fingerprint, result):
+    cache_file = _get_cache_file(name)
+    data = jsonutils.dumps({'fingerprint': fingerprint,
+                            'timestamp': time.time(),
+                            'result': result})
+    try:
+        # Write to a temporary file first, so that other workers will never
+        # read a partial file
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(cache_file),
+                                        prefix=CACHE_FILE_PREFIX)
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+        os.rename(tmp_file, cache_file)
+    except (IOError, OSError) as e:
+        LOG.warning("Failed to save bootstrap %s results in %s: %s",
+                    name, cache_file, e)
+
+
+def invalidate(name):
+    """Remove the cached results of a bootstrap"""
+    try:
+        os.remove(_get_cache_file(name))
+    except OSError:
+        pass
+
+
+def run_once(name, config_data, bootstrap_func):
+    """Run a bootstrap function once for all the workers
+
+    bootstrap_func should return a json serializable result, which will be
+    returned to all the workers using the same configuration until the cache
+    ttl expires. Exceptions are not cached, so a failed bootstrap will be
+    retried by the next worker.
+    """
+    if not cfg.CONF.bootstrap_cache_ttl:
+        return bootstrap_func()
+
+    fingerprint = config_fingerprint(name, config_data)
+    found, result = _read_cached_result(name, fingerprint)
+    if found:
+        LOG.debug("Using cached results of bootstrap %s", name)
+        return result
+
+    with locking.LockManager.get_lock('nsx-bootstrap-%s' % name):
+        # Another worker may have completed the bootstrap while this one
+        # was waiting for the lock
+        found, result = _read_cached_result(name, fingerprint)
+        if found:
+            LOG.debug("Using cached results of bootstrap %s", name)
+            return result
+
+        LOG.info("Running bootstrap %s", name)
+        result = bootstrap_func()
+        _write_cached_result(name, fingerprint, result)
+        return result
+
+
+def run_concurrently(funcs):
+    """Run independent bootstrap functions concurrently
+
+    Return the list of their results, in the same order. If one of the
+    functions fails, its exception is raised to the caller.
+    """
+    if not funcs:
+        return []
+    pool = eventlet.GreenPool(min(MAX_BOOTSTRAP_THREADS, len(funcs)))
+    return list(pool.imap(lambda func: func(), funcs))
@@ -194,6 +194,27 @@ nsx_common_opts = [
                       "parameter to tooz coordinator. By default, value is "
                       "None and oslo_concurrency is used for single-node "
                       "lock management.")),
+    cfg.BoolOpt('locking_trace',
+                default=False,
+                help=_("(Optional) Log the call stack of every lock "
+                       "acquisition when debug logging is enabled. This is "
+                       "expensive, and should be used only for debugging "
+                       "locking issues.")),
+    cfg.IntOpt('vpn_status_refresh_interval',
+               default=60,
+               help=_("(Optional) Number of seconds between refreshes of the "
+                      "VPNaaS connections status from the NSX by a "
+                      "background task. The stored status is returned by the "
+                      "API, unless it was not refreshed for twice this "
+                      "interval. If 0, the status is refreshed from the NSX "
+                      "on each API request.")),
+    cfg.IntOpt('topology_cache_ttl',
+               default=3600,
+               help=_("(Optional) Number of seconds NSX-T backend topology "
+                      "attributes, like transport zone types and Tier-0 "
+                      "routers HA mode and edge cluster, are cached in the "
+                      "neutron DB. If 0, they are read from the NSX on each "
+                      "use.")),
     cfg.BoolOpt('api_replay_mode',
                 default=False,
                 help=_("If true, the server then allows the caller to "
@@ -219,6 +240,25 @@ nsx_common_opts = [
                default=10,
                help=_("Interval in seconds for Octavia statistics reporting. "
                       "0 means no reporting")),
+    cfg.FloatOpt('octavia_status_coalesce_window',
+                 default=0,
+                 min=0,
+                 help=_("(Optional) Number of seconds the Octavia statuses "
+                        "of the completed loadbalancer operations are "
+                        "collected before being sent to Octavia together. "
+                        "Error statuses are sent immediately. 0 means every "
+                        "status is sent on its own")),
+    cfg.IntOpt('bootstrap_cache_ttl',
+               default=300,
+               help=_("(Optional) Number of seconds the results of the "
+                      "plugin startup backend validations are shared between "
+                      "the neutron workers, as long as the relevant "
+                      "configuration did not change. 0 means every worker "
+                      "validates the backend configuration on its own")),
+    cfg.StrOpt('bootstrap_cache_dir',
+               help=_("(Optional) Directory for the shared startup "
+                      "validations cache files. Defaults to the neutron "
+                      "state_path")),
 ]
 
 nsx_v3_and_p = [
@@ -514,6 +554,21 @@ nsx_p_opts = nsx_v3_and_p + [
                 help=_("If True, edge firewall rules will match internal "
                        "addresses. Else they will match the external "
                        "addresses")),
+    cfg.IntOpt('vpn_status_cache_interval',
+               default=30,
+               help=_("(Optional) Number of seconds the NSX status of VPN "
+                      "connections is kept before querying the backend "
+                      "again. The status of all the connections of a router "
+                      "is refreshed together")),
+    cfg.BoolOpt('async_port_programming',
+                default=False,
+                help=_("(Optional) If True, ports are created and updated on "
+                       "the NSX backend asynchronously. A new port is DOWN "
+                       "until it is realized, and moves to ACTIVE, or to "
+                       "ERROR if its backend programming failed. The ports "
+                       "of each network are programmed by order of their "
+                       "changes. Pending and failed changes are replayed "
+                       "on start")),
 ]
 
 
@@ -607,6 +662,37 @@ nsxv_opts = [
                        "and distributed edge with compact size as following: "
                        "service:compact:4:10,vdr:compact:"
                        "4:10")),
+    cfg.IntOpt('backup_edge_pool_check_interval',
+               default=60,
+               help=_("(Optional) Interval in seconds in which the backup "
+                      "edge pools are replenished and recycled in the "
+                      "background according to the observed edge "
+                      "consumption. 0 disables the background pool "
+                      "manager")),
+    cfg.IntOpt('backup_edge_pool_demand_window',
+               default=900,
+               help=_("(Optional) Time window in seconds of edge consumption "
+                      "used to size the backup edge pools. Pools are "
+                      "pre-warmed above their minimum by the number of edges "
+                      "consumed in this window, and surplus edges are "
+                      "recycled when no edges were consumed in it")),
+    cfg.IntOpt('edge_update_coalescing_window',
+               default=0,
+               min=0,
+               help=_("(Optional) Time window in milliseconds in which "
+                      "floating IP updates of the same exclusive router are "
+                      "applied together to its edge. By default coalescing "
+                      "is disabled, and the edge is updated for each "
+                      "request")),
+    cfg.IntOpt('edge_config_fingerprint_ttl',
+               default=300,
+               min=0,
+               help=_("(Optional) Time in seconds in which a NAT, routes, "
+                      "firewall or DHCP configuration of an edge identical "
+                      "to the one last written to it is not written again. "
+                      "The configuration is written again after this time, "
+                      "restoring the changes made to the edge by other "
+                      "means. 0 writes the configuration on every update")),
     cfg.IntOpt('retries',
                default=20,
                help=_('Maximum number of API retries on endpoint.')),
@@ -738,6 +824,14 @@ nsxv_opts = [
                 help=_("(Optional) If set to True, the plugin will create "
                        "a redirect rule to send all the traffic to the "
                        "security partner")),
+    cfg.FloatOpt('service_insertion_batch_window',
+                 default=0,
+                 min=0,
+                 help=_("(Optional) Number of seconds the flow classifier "
+                        "changes are collected before being applied "
+                        "together by a single update of the redirect "
+                        "firewall section. 0 means every change updates its "
+                        "own redirect rule")),
     cfg.BoolOpt('use_nsx_policies', default=False,
                 help=_("If set to True, the plugin will use NSX policies "
                        "in the neutron security groups.")),
@@ -804,6 +898,24 @@ nsxv_opts = [
                 default=False,
                 help=_("Use subnet's exclusive router as a platform for "
                        "LBaaS")),
+    cfg.IntOpt('lbaas_fw_section_shards',
+               default=1,
+               min=1,
+               help=_("Number of distributed firewall sections the LBaaS "
+                      "pools rules are spread across, when using routers as "
+                      "LBaaS platform. Each section is updated under its own "
+                      "lock. After changing this value, use the admin "
+                      "utility to move the existing rules to their "
+                      "sections.")),
+    cfg.IntOpt('lbaas_fw_section_previous_shards',
+               default=0,
+               min=0,
+               help=_("The previous value of lbaas_fw_section_shards, to be "
+                      "set after changing it until the admin utility moved "
+                      "the existing LBaaS pools rules to their sections. "
+                      "Meanwhile, a pool rule missing from its section is "
+                      "looked up and removed from its previous section. 0 "
+                      "means that no move is in progress.")),
     cfg.BoolOpt('allow_multiple_ip_addresses',
                 default=False,
                 help=_("Allow associating multiple IPs to VMs "
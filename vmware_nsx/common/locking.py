@@ -13,7 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import logging
 import os
+import re
+import time
 import traceback
 
 from oslo_concurrency import lockutils
@@ -21,8 +24,148 @@ from oslo_config import cfg
 from oslo_log import log
 from tooz import coordination
 
+from vmware_nsx.common import worker_stats
+
 LOG = log.getLogger(__name__)
 
+LOCK_STATS_FILE_PREFIX = 'nsx-lock-stats-'
+LOCK_STATS_SAVE_INTERVAL = 60
+# Lock names usually contain the id of the locked resource. The statistics
+# are collected per lock name with those ids masked, so that their number
+# stays bounded
+_LOCK_ID_RE = re.compile(
+    r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+',
+    re.IGNORECASE)
+
+
+def get_lock_stats_name(name):
+    return _LOCK_ID_RE.sub('*', name)
+
+
+class LockStats(object):
+    """Per lock name wait time, hold time and contention statistics
+
+    A lock acquisition is counted as contended if another thread of this
+    worker held or waited for a lock with the same name, or if it took
+    longer than contention_threshold seconds to acquire it (which means it
+    was held by another worker).
+    """
+    _stats = {}
+    _active = {}
+    _pid = None
+    _last_save = 0
+    contention_threshold = 0.01
+
+    @classmethod
+    def _check_pid(cls):
+        # The statistics of the parent process are not relevant for the
+        # spawned API workers
+        if cls._pid != os.getpid():
+            cls._pid = os.getpid()
+            cls._stats = {}
+            cls._active = {}
+            cls._last_save = time.time()
+
+    @classmethod
+    def start_acquire(cls, name):
+        """Mark the start of a lock acquisition
+
+        Return True if another thread of this worker is using this lock.
+        """
+        cls._check_pid()
+        active = cls._active.get(name, 0)
+        cls._active[name] = active + 1
+        return active > 0
+
+    @classmethod
+    def record(cls, name, wait_time, hold_time, contended):
+        cls._check_pid()
+        cls._active[name] = max(cls._active.get(name, 1) - 1, 0)
+        stats = cls._stats.get(name)
+        if not stats:
+            stats = cls._stats[name] = {
+                'acquired': 0, 'contended': 0,
+                'wait_total': 0.0, 'wait_max': 0.0,
+                'hold_total': 0.0, 'hold_max': 0.0}
+        stats['acquired'] += 1
+        if contended or wait_time > cls.contention_threshold:
+            stats['contended'] += 1
+        stats['wait_total'] += wait_time
+        stats['wait_max'] = max(stats['wait_max'], wait_time)
+        stats['hold_total'] += hold_time
+        stats['hold_max'] = max(stats['hold_max'], hold_time)
+
+        if time.time() - cls._last_save > LOCK_STATS_SAVE_INTERVAL:
+            cls.save()
+
+    @classmethod
+    def get_stats(cls):
+        cls._check_pid()
+        return dict((name, dict(stats))
+                    for name, stats in cls._stats.items())
+
+    @classmethod
+    def save(cls):
+        """Save the statistics of this worker for the admin utility"""
+        cls._last_save = time.time()
+        worker_stats.save(LOCK_STATS_FILE_PREFIX, cls.get_stats())
+
+    @classmethod
+    def reset(cls):
+        cls._pid = None
+        cls._check_pid()
+
+
+def get_all_workers_lock_stats(max_age=None):
+    """Aggregate the saved lock statistics of all the workers"""
+    results = {}
+    for worker_locks in worker_stats.load_all(LOCK_STATS_FILE_PREFIX,
+                                              max_age=max_age):
+        for name, stats in worker_locks.items():
+            total = results.setdefault(name, {
+                'acquired': 0, 'contended': 0,
+                'wait_total': 0.0, 'wait_max': 0.0,
+                'hold_total': 0.0, 'hold_max': 0.0})
+            for counter in ('acquired', 'contended', 'wait_total',
+                            'hold_total'):
+                total[counter] += stats.get(counter, 0)
+            for counter in ('wait_max', 'hold_max'):
+                total[counter] = max(total[counter], stats.get(counter, 0))
+    return results
+
+
+class InstrumentedLock(object):
+    """Context manager wrapping a lock to collect its usage statistics"""
+
+    def __init__(self, name, lock):
+        self._name = name
+        self._lock = lock
+        self._stats_name = get_lock_stats_name(name)
+        self._contended = False
+        self._wait_time = 0
+        self._acquired_at = None
+
+    def __enter__(self):
+        self._contended = LockStats.start_acquire(self._stats_name)
+        start = time.time()
+        try:
+            result = self._lock.__enter__()
+        except Exception:
+            LockStats.record(self._stats_name, time.time() - start, 0,
+                             self._contended)
+            raise
+        self._acquired_at = time.time()
+        self._wait_time = self._acquired_at - start
+        return result
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        try:
+            return self._lock.__exit__(exc_type, exc_value, exc_tb)
+        finally:
+            LockStats.record(self._stats_name, self._wait_time,
+                             time.time() - self._acquired_at,
+                             self._contended)
+
 
 class LockManager(object):
     _coordinator = None
@@ -36,15 +179,15 @@ class LockManager(object):
     def get_lock(name, **kwargs):
         if cfg.CONF.locking_coordinator_url:
             lck = LockManager._get_lock_distributed(name)
+        else:
+            # Ensure that external=True
+            kwargs['external'] = True
+            lck = LockManager._get_lock_local(name, **kwargs)
+        # Walking the stack is expensive, and locks are taken very often
+        if cfg.CONF.locking_trace and LOG.isEnabledFor(logging.DEBUG):
             LOG.debug('Lock %s taken with stack trace %s', name,
                       traceback.extract_stack(limit=5))
-            return lck
-        # Ensure that external=True
-        kwargs['external'] = True
-        lck = LockManager._get_lock_local(name, **kwargs)
-        LOG.debug('Lock %s taken with stack trace %s', name,
-                  traceback.extract_stack(limit=5))
-        return lck
+        return InstrumentedLock(name, lck)
 
     @staticmethod
     def _get_lock_local(name, **kwargs):
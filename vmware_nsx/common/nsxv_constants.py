@@ -76,3 +76,19 @@ PFS_MAP = {
 TRANSFORM_PROTOCOL_ALLOWED = ('esp',)
 
 ENCAPSULATION_MODE_ALLOWED = ('tunnel',)
+
+# NSX-V backend capabilities, resolved by backend version
+SUPPORTED_VERSION = 'supported_version'
+NSX_POLICIES = 'nsx_policies'
+PROVIDER_SECURITY_GROUPS = 'provider_security_groups'
+VLAN_TRANSPARENT = 'vlan_transparent'
+INVENTORY_VALIDATION = 'inventory_validation'
+PER_EDGE_RP_FILTER = 'per_edge_rp_filter'
+EDGE_RESERVATIONS = 'edge_reservations'
+EDGE_UPDATE_ALL_KEYS = 'edge_update_all_keys'
+NAT_RULES_ALL_VNICS = 'nat_rules_all_vnics'
+DHCP_EDGE_RAW_ICMP_RULE = 'dhcp_edge_raw_icmp_rule'
+EXCLUDE_LIST_AUTO_SYNC = 'exclude_list_auto_sync'
+DHCP_BINDING_API = 'dhcp_binding_api'
+AZ_CONNECTIVITY_VALIDATION = 'az_connectivity_validation'
+V2T_MIGRATION = 'v2t_migration'
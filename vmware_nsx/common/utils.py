@@ -36,6 +36,8 @@ from oslo_log import log
 
 from vmware_nsxlib.v3 import nsx_constants as v3_const
 
+from vmware_nsx.common import nsxv_constants
+
 LOG = log.getLogger(__name__)
 
 MAX_DISPLAY_NAME_LEN = 40
@@ -73,73 +75,127 @@ class NsxV3NetworkTypes(object):
     NSX_NETWORK = 'nsx-net'
 
 
-def is_nsx_version_1_1_0(nsx_version):
+@functools.lru_cache(maxsize=None)
+def _is_version_at_least(nsx_version, min_version):
+    # The version gates run on hot paths, with a handful of distinct versions
     return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion(v3_const.NSX_VERSION_1_1_0))
+            version.LooseVersion(min_version))
+
+
+def is_nsx_version_1_1_0(nsx_version):
+    return _is_version_at_least(nsx_version, v3_const.NSX_VERSION_1_1_0)
 
 
 def is_nsx_version_2_0_0(nsx_version):
-    return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion(v3_const.NSX_VERSION_2_0_0))
+    return _is_version_at_least(nsx_version, v3_const.NSX_VERSION_2_0_0)
 
 
 def is_nsx_version_2_1_0(nsx_version):
-    return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion(v3_const.NSX_VERSION_2_1_0))
+    return _is_version_at_least(nsx_version, v3_const.NSX_VERSION_2_1_0)
 
 
 def is_nsx_version_2_4_0(nsx_version):
-    return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion(v3_const.NSX_VERSION_2_4_0))
+    return _is_version_at_least(nsx_version, v3_const.NSX_VERSION_2_4_0)
 
 
 def is_nsx_version_2_5_0(nsx_version):
-    return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion(v3_const.NSX_VERSION_2_5_0))
+    return _is_version_at_least(nsx_version, v3_const.NSX_VERSION_2_5_0)
 
 
 def is_nsx_version_3_0_0(nsx_version):
-    return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion(v3_const.NSX_VERSION_3_0_0))
+    return _is_version_at_least(nsx_version, v3_const.NSX_VERSION_3_0_0)
 
 
 def is_nsx_version_3_1_0(nsx_version):
-    return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion(v3_const.NSX_VERSION_3_1_0))
+    return _is_version_at_least(nsx_version, v3_const.NSX_VERSION_3_1_0)
 
 
 def is_nsx_version_3_2_0(nsx_version):
-    return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion(v3_const.NSX_VERSION_3_2_0))
+    return _is_version_at_least(nsx_version, v3_const.NSX_VERSION_3_2_0)
 
 
 def is_nsxv_version_6_2(nsx_version):
-    return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion('6.2'))
+    return _is_version_at_least(nsx_version, '6.2')
 
 
 def is_nsxv_version_6_3(nsx_version):
-    return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion('6.3'))
+    return _is_version_at_least(nsx_version, '6.3')
 
 
 def is_nsxv_version_6_4_6(nsx_version):
-    return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion('6.4.6'))
+    return _is_version_at_least(nsx_version, '6.4.6')
 
 
 def is_nsxv_version_6_4_9(nsx_version):
-    return (version.LooseVersion(nsx_version) >=
-            version.LooseVersion('6.4.9'))
+    return _is_version_at_least(nsx_version, '6.4.9')
 
 
 def is_nsxv_dhcp_binding_supported(nsx_version):
-    return ((version.LooseVersion(nsx_version) >=
-             version.LooseVersion('6.3.3')) or
-            (version.LooseVersion(nsx_version) >=
-             version.LooseVersion('6.2.8') and
-             version.LooseVersion(nsx_version) <
-             version.LooseVersion('6.3')))
+    return (_is_version_at_least(nsx_version, '6.3.3') or
+            (_is_version_at_least(nsx_version, '6.2.8') and
+             not _is_version_at_least(nsx_version, '6.3')))
+
+
+class VersionCapabilities(object):
+    """Backend capabilities, resolved once per backend version
+
+    Each capability is given by the predicate of the backend version
+    enabling it. The capabilities of a version are resolved to boolean
+    flags the first time the version is seen, so checking a capability is a
+    dictionary lookup.
+    """
+
+    def __init__(self, predicates):
+        self._predicates = predicates
+        self._flags = {}
+
+    def get(self, nsx_version):
+        """Return the capability flags of a backend version"""
+        flags = self._flags.get(nsx_version)
+        if flags is None:
+            flags = dict((capability, bool(predicate(nsx_version)))
+                         for capability, predicate in
+                         self._predicates.items())
+            self._flags[nsx_version] = flags
+            LOG.info("NSX version %(ver)s capabilities: %(caps)s",
+                     {'ver': nsx_version,
+                      'caps': sorted(capability for capability, enabled
+                                     in flags.items() if enabled)})
+        return flags
+
+    def supports(self, nsx_version, capability):
+        return self.get(nsx_version)[capability]
+
+
+def _nsxv_version_predicate(min_version):
+    return lambda nsx_version: _is_version_at_least(nsx_version, min_version)
+
+
+NSXV_CAPABILITIES = VersionCapabilities({
+    nsxv_constants.SUPPORTED_VERSION: _nsxv_version_predicate('6.2.3'),
+    nsxv_constants.NSX_POLICIES: is_nsxv_version_6_2,
+    nsxv_constants.PROVIDER_SECURITY_GROUPS: is_nsxv_version_6_2,
+    nsxv_constants.VLAN_TRANSPARENT: is_nsxv_version_6_3,
+    nsxv_constants.INVENTORY_VALIDATION: _nsxv_version_predicate('6.2.0'),
+    nsxv_constants.PER_EDGE_RP_FILTER: _nsxv_version_predicate('6.2.0'),
+    nsxv_constants.EDGE_RESERVATIONS: _nsxv_version_predicate('6.2.3'),
+    # Older versions fail edge updates with some of the edge keys
+    nsxv_constants.EDGE_UPDATE_ALL_KEYS: _nsxv_version_predicate('6.2.3'),
+    # A NAT rule without a vnic is bound to all the interfaces
+    nsxv_constants.NAT_RULES_ALL_VNICS: _nsxv_version_predicate('6.2.4'),
+    # Older versions drop raw icmp rules due to a backend bug
+    nsxv_constants.DHCP_EDGE_RAW_ICMP_RULE: _nsxv_version_predicate('6.3.2'),
+    # Older versions require a firewall sync after an exclude list change
+    nsxv_constants.EXCLUDE_LIST_AUTO_SYNC: _nsxv_version_predicate('6.3.3'),
+    nsxv_constants.DHCP_BINDING_API: is_nsxv_dhcp_binding_supported,
+    nsxv_constants.AZ_CONNECTIVITY_VALIDATION: is_nsxv_version_6_4_6,
+    nsxv_constants.V2T_MIGRATION: is_nsxv_version_6_4_9,
+})
+
+
+def nsxv_supports(nsx_version, capability):
+    """Return True if the NSX-V backend version has the capability"""
+    return NSXV_CAPABILITIES.supports(nsx_version, capability)
 
 
 def get_tags(**kwargs):
@@ -0,0 +1,75 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Statistics files of the neutron workers
+
+Each worker saves its in-memory statistics to a local file under the neutron
+state_path, so that the admin utility can aggregate them.
+"""
+
+import glob
+import os
+import tempfile
+import time
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_serialization import jsonutils
+
+LOG = logging.getLogger(__name__)
+
+
+def _get_stats_dir():
+    return getattr(cfg.CONF, 'state_path', None) or tempfile.gettempdir()
+
+
+def save(prefix, stats):
+    """Save the statistics of the current worker"""
+    stats_file = os.path.join(_get_stats_dir(), '%s%s.json' % (
+        prefix, os.getpid()))
+    data = jsonutils.dumps({'timestamp': time.time(),
+                            'pid': os.getpid(),
+                            'stats': stats})
+    try:
+        # Write to a temporary file first, so that the admin utility will
+        # never read a partial file
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(stats_file),
+                                        prefix='tmp-' + prefix)
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+        os.rename(tmp_file, stats_file)
+    except (IOError, OSError) as e:
+        LOG.debug("Failed to save statistics to %s: %s", stats_file, e)
+
+
+def load_all(prefix, max_age=None):
+    """Return the saved statistics of all the workers
+
+    Statistics which were not updated in the last max_age seconds belong to
+    workers which no longer run, and are skipped.
+    """
+    results = []
+    now = time.time()
+    for stats_file in glob.glob(os.path.join(_get_stats_dir(),
+                                             prefix + '*.json')):
+        try:
+            with open(stats_file) as f:
+                worker_stats = jsonutils.loads(f.read())
+        except (IOError, OSError, ValueError):
+            continue
+        if max_age and now - worker_stats.get('timestamp', 0) > max_age:
+            continue
+        results.append(worker_stats.get('stats', {}))
+    return results
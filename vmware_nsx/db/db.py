@@ -20,6 +20,7 @@ from neutron_lib.db import api as db_api
 from oslo_db import exception as db_exc
 from oslo_log import log as logging
 from oslo_utils import excutils
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 
 from vmware_nsx.common import exceptions as nsx_exc
@@ -745,6 +746,123 @@ def get_nsx_vpn_connection_mapping(session, neutron_id):
         return
 
 
+def get_nsx_vpn_connection_mappings(session, neutron_ids):
+    return (session.query(nsx_models.NsxVpnConnectionMapping).
+            filter(nsx_models.NsxVpnConnectionMapping.neutron_id.in_(
+                neutron_ids)).all())
+
+
 def delete_nsx_vpn_connection_mapping(session, neutron_id):
     return (session.query(nsx_models.NsxVpnConnectionMapping).
             filter_by(neutron_id=neutron_id).delete())
+
+
+def get_nsx_vpn_status_refresh_time(session, provider):
+    refresh = (session.query(nsx_models.NsxVpnStatusRefresh).
+               filter_by(provider=provider).first())
+    if refresh:
+        return refresh.refreshed_at
+
+
+def set_nsx_vpn_status_refresh_time(session, provider, refreshed_at):
+    with session.begin(subtransactions=True):
+        refresh = (session.query(nsx_models.NsxVpnStatusRefresh).
+                   filter_by(provider=provider).first())
+        if refresh:
+            refresh.refreshed_at = refreshed_at
+        else:
+            session.add(nsx_models.NsxVpnStatusRefresh(
+                provider=provider, refreshed_at=refreshed_at))
+
+
+def get_nsx_topology_attribute(session, resource_id, attribute):
+    return (session.query(nsx_models.NsxTopologyAttribute).
+            filter_by(resource_id=resource_id, attribute=attribute).first())
+
+
+def set_nsx_topology_attribute(session, resource_id, attribute, value,
+                               version, updated_at):
+    with session.begin(subtransactions=True):
+        entry = (session.query(nsx_models.NsxTopologyAttribute).
+                 filter_by(resource_id=resource_id,
+                           attribute=attribute).first())
+        if entry:
+            entry.value = value
+            entry.version = version
+            entry.updated_at = updated_at
+        else:
+            session.add(nsx_models.NsxTopologyAttribute(
+                resource_id=resource_id, attribute=attribute, value=value,
+                version=version, updated_at=updated_at))
+
+
+def get_nsx_port_realization(session, port_id):
+    return (session.query(nsx_models.NsxPortRealization).
+            filter_by(port_id=port_id).first())
+
+
+def get_pending_nsx_port_realizations(session):
+    return (session.query(nsx_models.NsxPortRealization).
+            filter_by(status='pending').
+            order_by(nsx_models.NsxPortRealization.updated_at).all())
+
+
+def retry_failed_nsx_port_realizations(session):
+    """Set the failed port realizations as pending again"""
+    with session.begin(subtransactions=True):
+        (session.query(nsx_models.NsxPortRealization).
+         filter_by(status='error').
+         update({'status': 'pending'}, synchronize_session=False))
+
+
+def queue_nsx_port_realization(session, port_id, network_id, operation,
+                               port_security, qos_policy_id, project_name):
+    """Record a pending backend programming of a port
+
+    A port with a pending or failed creation is still created on the backend
+    by a later update.
+    """
+    with session.begin(subtransactions=True):
+        entry = (session.query(nsx_models.NsxPortRealization).
+                 filter_by(port_id=port_id).first())
+        if entry:
+            if entry.operation != 'create':
+                entry.operation = operation
+            entry.generation += 1
+            entry.port_security = port_security
+            entry.qos_policy_id = qos_policy_id
+            entry.project_name = project_name
+            entry.status = 'pending'
+            entry.reason = None
+            entry.updated_at = timeutils.utcnow()
+        else:
+            session.add(nsx_models.NsxPortRealization(
+                port_id=port_id, network_id=network_id, operation=operation,
+                generation=1, port_security=port_security,
+                qos_policy_id=qos_policy_id, project_name=project_name,
+                status='pending', updated_at=timeutils.utcnow()))
+
+
+def finish_nsx_port_realization(session, port_id, generation, reason=None):
+    """Record the result of the backend programming of a port generation
+
+    The entry is removed on success, and keeps the failure reason otherwise.
+    Return False if the port was changed again since, as the result is
+    superseded by the pending programming of the new generation.
+    """
+    with session.begin(subtransactions=True):
+        entry = (session.query(nsx_models.NsxPortRealization).
+                 filter_by(port_id=port_id).first())
+        if not entry:
+            return False
+        if entry.generation != generation:
+            if not reason:
+                entry.operation = 'update'
+            return False
+        if reason:
+            entry.status = 'error'
+            entry.reason = reason[:255]
+            entry.updated_at = timeutils.utcnow()
+        else:
+            session.delete(entry)
+        return True
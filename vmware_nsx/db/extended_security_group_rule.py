@@ -112,3 +112,14 @@ class ExtendedSecurityGroupRuleMixin(object):
             except exc.NoResultFound:
                 return False
         return prop[ext_local_ip.LOCAL_IP_PREFIX]
+
+    def _count_security_group_rules_with_ip_prefix(self, context, ip_prefix):
+        """Count the rules using an IP prefix as their remote or local IP"""
+        with db_api.CONTEXT_READER.using(context):
+            remote_count = context.session.query(
+                securitygroup.SecurityGroupRule).filter_by(
+                remote_ip_prefix=ip_prefix).count()
+            local_count = context.session.query(
+                NsxExtendedSecurityGroupRuleProperties).filter_by(
+                local_ip_prefix=ip_prefix).count()
+        return remote_count + local_count
@@ -0,0 +1,51 @@
+# Copyright 2026 VMware, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""nsx_port_realization
+
+Revision ID: 3d5b8e1f0a62
+Revises: 8f2a6c1e4b73
+Create Date: 2026-10-18 23:41:17.302958
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3d5b8e1f0a62'
+down_revision = '8f2a6c1e4b73'
+
+
+def upgrade():
+    op.create_table(
+        'neutron_nsx_port_realization',
+        sa.Column('port_id', sa.String(36), nullable=False),
+        sa.Column('network_id', sa.String(36), nullable=False),
+        sa.Column('operation',
+                  sa.Enum('create', 'update',
+                          name='nsx_port_realization_operation'),
+                  nullable=False),
+        sa.Column('generation', sa.Integer(), nullable=False),
+        sa.Column('port_security', sa.Boolean(), nullable=False),
+        sa.Column('qos_policy_id', sa.String(36), nullable=True),
+        sa.Column('project_name', sa.String(255), nullable=True),
+        sa.Column('status',
+                  sa.Enum('pending', 'error',
+                          name='nsx_port_realization_status'),
+                  nullable=False),
+        sa.Column('reason', sa.String(255), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['port_id'], ['ports.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('port_id'))
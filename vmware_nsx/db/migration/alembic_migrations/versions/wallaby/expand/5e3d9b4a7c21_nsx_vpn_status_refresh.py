@@ -0,0 +1,35 @@
+# Copyright 2026 VMware, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""nsx_vpn_status_refresh
+
+Revision ID: 5e3d9b4a7c21
+Revises: c2e9ed6c2d1f
+Create Date: 2026-10-18 14:26:05.481390
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5e3d9b4a7c21'
+down_revision = 'c2e9ed6c2d1f'
+
+
+def upgrade():
+    op.create_table(
+        'neutron_nsx_vpn_status_refresh',
+        sa.Column('provider', sa.String(255), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('provider'))
@@ -0,0 +1,38 @@
+# Copyright 2026 VMware, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""nsx_topology_attributes
+
+Revision ID: 8f2a6c1e4b73
+Revises: 5e3d9b4a7c21
+Create Date: 2026-10-18 15:02:41.129574
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8f2a6c1e4b73'
+down_revision = '5e3d9b4a7c21'
+
+
+def upgrade():
+    op.create_table(
+        'neutron_nsx_topology_attributes',
+        sa.Column('resource_id', sa.String(36), nullable=False),
+        sa.Column('attribute', sa.String(64), nullable=False),
+        sa.Column('value', sa.String(255), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('resource_id', 'attribute'))
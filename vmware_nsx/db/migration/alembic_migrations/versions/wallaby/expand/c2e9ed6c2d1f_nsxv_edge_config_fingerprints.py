@@ -0,0 +1,38 @@
+# Copyright 2026 VMware, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""nsxv_edge_config_fingerprints
+
+Revision ID: c2e9ed6c2d1f
+Revises: 99bfcb6003c6
+Create Date: 2026-10-18 10:12:31.114527
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c2e9ed6c2d1f'
+down_revision = '99bfcb6003c6'
+
+
+def upgrade():
+    op.create_table(
+        'nsxv_edge_config_fingerprints',
+        sa.Column('edge_id', sa.String(36), nullable=False),
+        sa.Column('service', sa.String(32), nullable=False),
+        sa.Column('fingerprint', sa.String(64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('edge_id', 'service'))
@@ -436,3 +436,41 @@ class NsxVpnConnectionMapping(model_base.BASEV2, models.TimestampMixin):
     ike_profile_id = sa.Column(sa.String(36), nullable=False)
     ipsec_profile_id = sa.Column(sa.String(36), nullable=False)
     peer_ep_id = sa.Column(sa.String(36), nullable=False)
+
+
+class NsxVpnStatusRefresh(model_base.BASEV2):
+    """Stores the last refresh time of the VPNaaS connections status"""
+    __tablename__ = 'neutron_nsx_vpn_status_refresh'
+    provider = sa.Column(sa.String(255), primary_key=True)
+    refreshed_at = sa.Column(sa.DateTime, nullable=False)
+
+
+class NsxTopologyAttribute(model_base.BASEV2):
+    """Caches rarely changing attributes of NSX backend resources"""
+    __tablename__ = 'neutron_nsx_topology_attributes'
+    resource_id = sa.Column(sa.String(36), primary_key=True)
+    attribute = sa.Column(sa.String(64), primary_key=True)
+    value = sa.Column(sa.String(255), nullable=False)
+    version = sa.Column(sa.Integer, nullable=False)
+    updated_at = sa.Column(sa.DateTime, nullable=False)
+
+
+class NsxPortRealization(model_base.BASEV2):
+    """Stores the pending backend programming of NSX-P ports"""
+    __tablename__ = 'neutron_nsx_port_realization'
+    port_id = sa.Column(sa.String(36),
+                        sa.ForeignKey('ports.id', ondelete='CASCADE'),
+                        primary_key=True)
+    network_id = sa.Column(sa.String(36), nullable=False)
+    operation = sa.Column(sa.Enum('create', 'update',
+                                  name='nsx_port_realization_operation'),
+                          nullable=False)
+    generation = sa.Column(sa.Integer, nullable=False)
+    port_security = sa.Column(sa.Boolean, nullable=False)
+    qos_policy_id = sa.Column(sa.String(36), nullable=True)
+    project_name = sa.Column(sa.String(255), nullable=True)
+    status = sa.Column(sa.Enum('pending', 'error',
+                               name='nsx_port_realization_status'),
+                       nullable=False)
+    reason = sa.Column(sa.String(255), nullable=True)
+    updated_at = sa.Column(sa.DateTime, nullable=False)
@@ -21,6 +21,7 @@ from neutron_lib.db import api as db_api
 from oslo_db import exception as db_exc
 from oslo_log import log as logging
 from oslo_utils import excutils
+from oslo_utils import timeutils
 from sqlalchemy import func
 from sqlalchemy.orm import exc
 from sqlalchemy.sql import expression as expr
@@ -108,6 +109,35 @@ def get_nsxv_router_bindings(session, filters=None,
                                           filters, like_filters).all()
 
 
+def get_nsxv_consumed_edges_count(session, since):
+    """Count the edges which were taken into use since a given time
+
+    An edge is considered taken into use when its first non backup binding
+    was created. Shared edges are counted once.
+    Return a list of (availability_zone, edge_type, appliance_size, count)
+    """
+    session = db_api.get_reader_session()
+    model = nsxv_models.NsxvRouterBinding
+    first_bindings = session.query(
+        model.edge_id,
+        model.availability_zone,
+        model.edge_type,
+        model.appliance_size,
+        func.min(model.created_at).label('first_created')).filter(
+        model.edge_id.isnot(None),
+        ~model.router_id.like(constants.BACKUP_ROUTER_PREFIX + '%')).group_by(
+        model.edge_id, model.availability_zone, model.edge_type,
+        model.appliance_size).subquery()
+    return session.query(
+        first_bindings.c.availability_zone,
+        first_bindings.c.edge_type,
+        first_bindings.c.appliance_size,
+        func.count(first_bindings.c.edge_id)).filter(
+        first_bindings.c.first_created >= since).group_by(
+        first_bindings.c.availability_zone, first_bindings.c.edge_type,
+        first_bindings.c.appliance_size).all()
+
+
 def update_nsxv_router_binding(session, router_id, **kwargs):
     with session.begin(subtransactions=True):
         binding = (session.query(nsxv_models.NsxvRouterBinding).
@@ -650,6 +680,73 @@ def cleanup_nsxv_edge_firewallrule_binding(session, edge_id):
                 edge_id=edge_id).delete()
 
 
+def sync_nsxv_edge_firewallrule_bindings(session, edge_id, rule_mapping):
+    """Update the firewall rule bindings of an edge in a single transaction
+
+    rule_mapping is a dictionary of the neutron rule id to the edge rule id.
+    Only the bindings which changed are deleted, updated or added.
+    """
+    model = nsxv_models.NsxvEdgeFirewallRuleBinding
+    with session.begin(subtransactions=True):
+        bindings = session.query(model).filter_by(edge_id=edge_id).all()
+        stale_rule_ids = []
+        for binding in bindings:
+            rule_vseid = rule_mapping.get(binding.rule_id)
+            if rule_vseid is None:
+                stale_rule_ids.append(binding.rule_id)
+            elif binding.rule_vse_id != str(rule_vseid):
+                binding.rule_vse_id = str(rule_vseid)
+        if stale_rule_ids:
+            session.query(model).filter(
+                model.edge_id == edge_id,
+                model.rule_id.in_(stale_rule_ids)).delete(
+                synchronize_session=False)
+        existing_rule_ids = set(binding.rule_id for binding in bindings)
+        session.add_all([
+            model(rule_id=rule_id, rule_vse_id=str(rule_vseid),
+                  edge_id=edge_id)
+            for rule_id, rule_vseid in rule_mapping.items()
+            if rule_id not in existing_rule_ids])
+
+
+def get_nsxv_edge_config_fingerprint(session, edge_id, service,
+                                     recorded_since=None):
+    """Return the fingerprint of an edge service, if recorded since then"""
+    query = session.query(nsxv_models.NsxvEdgeConfigFingerprint).filter_by(
+        edge_id=edge_id, service=service)
+    if recorded_since:
+        query = query.filter(
+            nsxv_models.NsxvEdgeConfigFingerprint.updated_at >=
+            recorded_since)
+    binding = query.first()
+    if binding:
+        return binding.fingerprint
+
+
+def set_nsxv_edge_config_fingerprint(session, edge_id, service, fingerprint):
+    with session.begin(subtransactions=True):
+        binding = (session.query(nsxv_models.NsxvEdgeConfigFingerprint).
+                   filter_by(edge_id=edge_id, service=service).first())
+        # The time is set for an unchanged fingerprint too, as it starts
+        # the validity period of the fingerprint
+        if binding:
+            binding.fingerprint = fingerprint
+            binding.updated_at = timeutils.utcnow()
+        else:
+            session.add(nsxv_models.NsxvEdgeConfigFingerprint(
+                edge_id=edge_id, service=service, fingerprint=fingerprint,
+                updated_at=timeutils.utcnow()))
+
+
+def delete_nsxv_edge_config_fingerprints(session, edge_id, service=None):
+    with session.begin(subtransactions=True):
+        query = session.query(nsxv_models.NsxvEdgeConfigFingerprint).filter_by(
+            edge_id=edge_id)
+        if service:
+            query = query.filter_by(service=service)
+        query.delete(synchronize_session=False)
+
+
 def map_spoofguard_policy_for_network(session, network_id, policy_id):
     with session.begin(subtransactions=True):
         mapping = nsxv_models.NsxvSpoofGuardPolicyNetworkMapping(
@@ -234,6 +234,16 @@ class NsxvEdgeFirewallRuleBinding(model_base.BASEV2, models.TimestampMixin):
     rule_vse_id = sa.Column(sa.String(36))
 
 
+class NsxvEdgeConfigFingerprint(model_base.BASEV2, models.TimestampMixin):
+    """Hash of the configuration last applied to an edge service."""
+
+    __tablename__ = 'nsxv_edge_config_fingerprints'
+
+    edge_id = sa.Column(sa.String(36), primary_key=True)
+    service = sa.Column(sa.String(32), primary_key=True)
+    fingerprint = sa.Column(sa.String(64), nullable=False)
+
+
 class NsxvSpoofGuardPolicyNetworkMapping(model_base.BASEV2,
                                          models.TimestampMixin):
     """Mapping between SpoofGuard and neutron networks"""
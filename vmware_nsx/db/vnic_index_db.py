@@ -48,6 +48,20 @@ class VnicIndexDbMixin(object):
         except exc.NoResultFound:
             LOG.debug("No record in DB for vnic-index of port %s", port_id)
 
+    def _get_ports_vnic_indexes(self, context, port_ids=None):
+        """Returns the (port id, device id, vnic index) of attached ports
+
+        Of the given ports, or of all the ports if None, in a single query
+        """
+        query = context.session.query(
+            nsxv_models.NsxvPortIndexMapping.port_id,
+            nsxv_models.NsxvPortIndexMapping.device_id,
+            nsxv_models.NsxvPortIndexMapping.index)
+        if port_ids is not None:
+            query = query.filter(
+                nsxv_models.NsxvPortIndexMapping.port_id.in_(port_ids))
+        return query.all()
+
     def _get_mappings_for_device_id(self, context, device_id):
         session = context.session
         mappings = (session.query(nsxv_models.NsxvPortIndexMapping).
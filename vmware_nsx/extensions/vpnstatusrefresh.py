@@ -0,0 +1,59 @@
+# Copyright 2026 VMware, Inc.  All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from neutron_lib.api import extensions
+
+ALIAS = 'nsx-vpn-status-refresh'
+STATUS_REFRESHED_AT = 'status_refreshed_at'
+
+RESOURCE_ATTRIBUTE_MAP = {
+    'ipsec_site_connections': {
+        STATUS_REFRESHED_AT: {
+            'allow_post': False,
+            'allow_put': False,
+            'is_visible': True,
+            'default': None,
+        }
+    }
+}
+
+
+class Vpnstatusrefresh(extensions.ExtensionDescriptor):
+    """Extension class exposing the time the VPN status was refreshed."""
+
+    @classmethod
+    def get_name(cls):
+        return "VPN connection status refresh time"
+
+    @classmethod
+    def get_alias(cls):
+        return ALIAS
+
+    @classmethod
+    def get_description(cls):
+        return ("Adding a read only attribute 'status_refreshed_at' to "
+                "IPsec site connections, with the time their status was "
+                "last read from the NSX.")
+
+    @classmethod
+    def get_updated(cls):
+        return "2026-10-18T00:00:00-00:00"
+
+    def get_required_extensions(self):
+        return ["vpnaas"]
+
+    def get_extended_resources(self, version):
+        if version == "2.0":
+            return RESOURCE_ATTRIBUTE_MAP
+        return {}
@@ -17,6 +17,7 @@ import ipaddress
 from unittest import mock
 
 import decorator
+import eventlet
 import netaddr
 from oslo_config import cfg
 from oslo_db import exception as db_exc
@@ -96,6 +97,11 @@ from vmware_nsxlib.v3 import nsx_constants as nsxlib_consts
 from vmware_nsxlib.v3 import utils as nsxlib_utils
 
 LOG = logging.getLogger(__name__)
+# Maximal number of concurrent DHCP static bindings updates on the backend
+DHCP_BINDINGS_UPDATE_POOL_SIZE = 10
+DHCP_BINDING_UPDATE_ATTEMPTS = 3
+# Log the progress of a DHCP static bindings rewrite every this many bindings
+DHCP_BINDINGS_PROGRESS_INTERVAL = 100
 
 
 @decorator.decorator
@@ -143,6 +149,8 @@ class NsxPluginV3Base(agentschedulers_db.AZDhcpAgentSchedulerDbMixin,
             self._get_conf_attr('network_vlan_ranges'))
         self._native_dhcp_enabled = False
         self.start_rpc_listeners_called = False
+        # The running DHCP static bindings rewrite job of each DHCP server
+        self._dhcp_bindings_jobs = {}
 
     def _init_native_dhcp(self):
         if not self.nsxlib:
@@ -2533,19 +2541,10 @@ class NsxPluginV3Base(agentschedulers_db.AZDhcpAgentSchedulerDbMixin,
                     if 'options' in kwargs:
                         # Need to update the static binding of every VM in
                         # this logical DHCP server.
-                        bindings = nsx_db.get_nsx_dhcp_bindings_by_service(
-                            context.session, dhcp_service['nsx_service_id'])
-                        for binding in bindings:
-                            port = self._get_port(context, binding['port_id'])
-                            dhcp_opts = port.get(ext_edo.EXTRADHCPOPTS)
-                            self._update_dhcp_binding_on_server(
-                                context, binding, port['mac_address'],
-                                binding['ip_address'],
-                                port['network_id'],
-                                gateway_ip=kwargs.get('gateway_ip', False),
-                                dhcp_opts=dhcp_opts,
-                                options=kwargs.get('options'),
-                                subnet=updated_subnet)
+                        self._rewrite_dhcp_bindings(
+                            context, dhcp_service['nsx_service_id'],
+                            orig_subnet['network_id'], updated_subnet,
+                            gateway_ip=kwargs.get('gateway_ip', False))
 
         return updated_subnet
 
@@ -2625,9 +2624,10 @@ class NsxPluginV3Base(agentschedulers_db.AZDhcpAgentSchedulerDbMixin,
         return static_routes, gateway_ip
 
     def _get_dhcp_options(self, context, ip, extra_dhcp_opts, net_id,
-                          subnet):
+                          subnet, net_az=None):
         # Always add option121.
-        net_az = self.get_network_az_by_net_id(context, net_id)
+        if not net_az:
+            net_az = self.get_network_az_by_net_id(context, net_id)
         static_routes = []
         options = {'option121': {'static_routes': static_routes}}
         if net_az.windows_metadata_route:
@@ -2664,6 +2664,101 @@ class NsxPluginV3Base(agentschedulers_db.AZDhcpAgentSchedulerDbMixin,
                 options['others'] = other_opts
         return options
 
+    def _rewrite_dhcp_bindings(self, context, dhcp_server_id, net_id, subnet,
+                               gateway_ip=False):
+        """Rewrite all the static bindings of a logical DHCP server
+
+        The bindings data is built from the DB within the request, and pushed
+        to the backend by a background job, so that the API call does not
+        wait for the bindings of all the ports of the network.
+        """
+        bindings = nsx_db.get_nsx_dhcp_bindings_by_service(
+            context.session, dhcp_server_id)
+        if not bindings:
+            return
+        # Read all the ports of the network at once instead of one per
+        # binding, without the plugin per port extensions
+        ports = dict((port['id'], port) for port in super(
+            NsxPluginV3Base, self).get_ports(
+            context, filters={'network_id': [net_id]},
+            fields=['id', 'mac_address', ext_edo.EXTRADHCPOPTS]))
+        net_az = self.get_network_az_by_net_id(context, net_id)
+        updates = []
+        for binding in bindings:
+            port = ports.get(binding['port_id'])
+            if not port:
+                continue
+            ip = binding['ip_address']
+            data = {'mac_address': port['mac_address'],
+                    'ip_address': ip,
+                    'options': self._get_dhcp_options(
+                        context, ip, port.get(ext_edo.EXTRADHCPOPTS), net_id,
+                        subnet, net_az=net_az)}
+            if gateway_ip is not False:
+                # Note that None is valid for gateway_ip, means deleting it.
+                data['gateway_ip'] = gateway_ip
+            updates.append((binding, data))
+
+        # A newer rewrite of the same DHCP server supersedes this one
+        job = object()
+        self._dhcp_bindings_jobs[dhcp_server_id] = job
+        LOG.info("Rewriting %(num)s static bindings of logical DHCP server "
+                 "%(server)s for network %(net)s",
+                 {'num': len(updates), 'server': dhcp_server_id,
+                  'net': net_id})
+        eventlet.spawn_n(self._push_dhcp_bindings, dhcp_server_id, job,
+                         updates)
+
+    def _push_dhcp_bindings(self, dhcp_server_id, job, updates):
+        @utils.retry_upon_exception(
+            (nsx_lib_exc.ServiceUnavailable, nsx_lib_exc.TooManyRequests,
+             nsx_lib_exc.StaleRevision),
+            delay=0.5, max_delay=4, max_attempts=DHCP_BINDING_UPDATE_ATTEMPTS)
+        def _update_binding(binding, data):
+            self.nsxlib.dhcp_server.update_binding(
+                dhcp_server_id, binding['nsx_binding_id'], **data)
+
+        def _update(binding, data):
+            if self._dhcp_bindings_jobs.get(dhcp_server_id) is not job:
+                return False
+            try:
+                _update_binding(binding, data)
+            except Exception as e:
+                LOG.error("Unable to update static binding (mac: %(mac)s, "
+                          "ip: %(ip)s) for port %(port)s on logical DHCP "
+                          "server %(server)s: %(err)s",
+                          {'mac': data['mac_address'],
+                           'ip': data['ip_address'],
+                           'port': binding['port_id'],
+                           'server': dhcp_server_id, 'err': e})
+                return e
+            return True
+
+        pool = eventlet.GreenPool(
+            min(DHCP_BINDINGS_UPDATE_POOL_SIZE, len(updates)) or 1)
+        done = failed = skipped = 0
+        for result in pool.starmap(_update, updates):
+            if result is True:
+                done += 1
+            elif result is False:
+                skipped += 1
+            else:
+                failed += 1
+            total = done + failed + skipped
+            if not total % DHCP_BINDINGS_PROGRESS_INTERVAL:
+                LOG.info("Rewrote %(total)s/%(num)s static bindings of "
+                         "logical DHCP server %(server)s",
+                         {'total': total, 'num': len(updates),
+                          'server': dhcp_server_id})
+
+        if self._dhcp_bindings_jobs.get(dhcp_server_id) is job:
+            del self._dhcp_bindings_jobs[dhcp_server_id]
+        log = LOG.error if failed else LOG.info
+        log("Rewrote the static bindings of logical DHCP server %(server)s: "
+            "%(done)s updated, %(failed)s failed, %(skipped)s superseded",
+            {'server': dhcp_server_id, 'done': done, 'failed': failed,
+             'skipped': skipped})
+
     def _update_dhcp_binding_on_server(self, context, binding, mac, ip,
                                        net_id, gateway_ip=False,
                                        dhcp_opts=None, options=None,
@@ -0,0 +1,77 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from neutron_lib import context as n_context
+from neutron_lib.db import api as db_api
+from oslo_config import cfg
+from oslo_db import exception as db_exc
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+from vmware_nsx.db import db as nsx_db
+
+LOG = logging.getLogger(__name__)
+
+# Version of the cached values. Should be increased when the way an attribute
+# is calculated changes, so that entries cached by older code are ignored
+CACHE_VERSION = 1
+
+# The cached attributes
+TRANSPORT_TYPE = 'transport_type'
+HA_MODE = 'ha_mode'
+EDGE_CLUSTER = 'edge_cluster'
+
+
+def get_attribute(context, resource_id, attribute, fetch_func,
+                  refresh=False):
+    """Return an attribute of a backend resource
+
+    The value is taken from the DB if it was cached by the current version
+    less than topology_cache_ttl seconds ago, unless refresh is set.
+    Otherwise fetch_func is called to read it from the backend, and the
+    result is cached unless it is None. The result is cached in a separate
+    transaction, so the caller's transaction does not write to the cache
+    table, and a failure to cache it does not affect the caller.
+    """
+    ttl = cfg.CONF.topology_cache_ttl
+    if ttl <= 0:
+        return fetch_func()
+
+    entry = nsx_db.get_nsx_topology_attribute(
+        context.session, resource_id, attribute)
+    if (not refresh and entry and entry.version == CACHE_VERSION and
+            (timeutils.utcnow() - entry.updated_at).total_seconds() < ttl):
+        return entry.value
+
+    value = fetch_func()
+    if value is not None:
+        _set_attribute(resource_id, attribute, value)
+    return value
+
+
+def _set_attribute(resource_id, attribute, value):
+    admin_context = n_context.get_admin_context()
+    try:
+        with db_api.CONTEXT_WRITER.using(admin_context):
+            nsx_db.set_nsx_topology_attribute(
+                admin_context.session, resource_id, attribute, value,
+                CACHE_VERSION, timeutils.utcnow())
+    except db_exc.DBDuplicateEntry:
+        # Cached at the same time by another worker
+        LOG.debug("%(attr)s of %(id)s was already cached",
+                  {'attr': attribute, 'id': resource_id})
+    except db_exc.DBError as e:
+        LOG.warning("Failed to cache %(attr)s of %(id)s: %(e)s",
+                    {'attr': attribute, 'id': resource_id, 'e': e})
@@ -29,6 +29,18 @@ LOG = log.getLogger(__name__)
 
 DEFAULT_NAME = common_az.DEFAULT_NAME + 'p'
 
+# Attributes initialized from the backend by
+# translate_configured_names_to_uuids
+BACKEND_RESOURCES_ATTRS = ('_default_overlay_tz_uuid',
+                           '_default_vlan_tz_uuid',
+                           '_default_tier0_router',
+                           '_edge_cluster_uuid',
+                           'use_policy_dhcp',
+                           '_policy_dhcp_server_config',
+                           '_native_dhcp_profile_uuid',
+                           'use_policy_md',
+                           '_native_md_proxy_uuid')
+
 
 class NsxPAvailabilityZone(v3_az.NsxV3AvailabilityZone):
 
@@ -197,6 +209,17 @@ class NsxPAvailabilityZone(v3_az.NsxV3AvailabilityZone):
             else:
                 self._native_md_proxy_uuid = None
 
+    def get_backend_resources(self):
+        """Return the backend resources translated for this AZ"""
+        return dict((attr, getattr(self, attr, None))
+                    for attr in BACKEND_RESOURCES_ATTRS)
+
+    def set_backend_resources(self, resources):
+        """Set the backend resources of this AZ from a previous translation
+        """
+        for attr in BACKEND_RESOURCES_ATTRS:
+            setattr(self, attr, resources.get(attr))
+
     def _validate_tz(self, nsxpolicy, nsxlib, obj_type, obj_id, ec_uuid):
         try:
             obj_tzs = utils.get_edge_cluster_tzs(nsxpolicy, nsxlib, ec_uuid)
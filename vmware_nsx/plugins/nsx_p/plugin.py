@@ -13,8 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
 import re
 import time
+import uuid
 
 import netaddr
 
@@ -63,6 +65,7 @@ from neutron_lib.plugins import directory
 from neutron_lib.services.qos import constants as qos_consts
 
 from vmware_nsx._i18n import _
+from vmware_nsx.common import bootstrap
 from vmware_nsx.common import config  # noqa
 from vmware_nsx.common import exceptions as nsx_exc
 from vmware_nsx.common import l3_rpc_agent_api
@@ -80,6 +83,7 @@ from vmware_nsx.extensions import securitygrouplogging as sg_logging
 from vmware_nsx.plugins.common_v3 import plugin as nsx_plugin_common
 from vmware_nsx.plugins.common_v3 import utils as v3_utils
 from vmware_nsx.plugins.nsx_p import availability_zones as nsxp_az
+from vmware_nsx.plugins.nsx_p import port_queue
 from vmware_nsx.plugins.nsx_p import utils as plugin_utils
 from vmware_nsx.services.fwaas.common import utils as fwaas_utils
 from vmware_nsx.services.fwaas.nsx_p import fwaas_callbacks_v2
@@ -122,6 +126,11 @@ NSX_P_PROVIDER_SECTION_CATEGORY = policy_constants.CATEGORY_INFRASTRUCTURE
 NSX_P_PORT_RESOURCE_TYPE = 'os-neutron-port-id'
 NSX_P_EXCLUDE_LIST_GROUP = 'neutron_excluded_ports_group'
 NSX_P_EXCLUDE_LIST_TAG = 'Exclude-Port'
+# Rules with the same remote or local IP prefix share a group, with an id
+# derived from the prefix in this namespace
+NSX_P_IP_PREFIX_GROUP_NAMESPACE = uuid.UUID(
+    'a5c3cd4e-5e59-4b7e-9d0a-6ad3e2bb1a7f')
+NSX_P_IP_PREFIX_GROUP_TAG = 'os-ip-prefix'
 
 SPOOFGUARD_PROFILE_ID = 'neutron-spoofguard-profile'
 NO_SPOOFGUARD_PROFILE_ID = policy_defs.SpoofguardProfileDef.DEFAULT_PROFILE
@@ -197,6 +206,8 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
         self._is_sub_plugin = False
         self.octavia_listener = None
         self.octavia_stats_collector = None
+        self._ports_queue = port_queue.SegmentPortsQueue(
+            self._program_queued_port)
         nsxlib_utils.set_is_attr_callback(validators.is_attr_set)
         self._extend_fault_map()
         extension_drivers = cfg.CONF.nsx_extension_drivers
@@ -254,6 +265,22 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
                            resources.PROCESS,
                            events.AFTER_INIT)
 
+    def _init_azs_backend_resources(self, search_scope):
+        """Translate & validate the backend resources of all the AZs
+
+        Return a dictionary with the backend resources of each AZ
+        """
+        def _init_az(az):
+            az.translate_configured_names_to_uuids(
+                self.nsxpolicy, nsxlib=self.nsxlib, search_scope=search_scope)
+            az.validate_availability_zone(self.nsxpolicy, nsxlib=self.nsxlib)
+            return az.get_backend_resources()
+
+        azs = self.get_azs_list()
+        results = bootstrap.run_concurrently(
+            [functools.partial(_init_az, az) for az in azs])
+        return dict((az.name, res) for az, res in zip(azs, results))
+
     def _validate_config(self):
         if cfg.CONF.ipam_driver != 'internal':
             msg = _("External IPAM drivers not supported with nsxp plugin")
@@ -295,10 +322,13 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
         # Init AZ resources
         search_scope = (cfg.CONF.nsx_p.search_objects_scope
                         if cfg.CONF.nsx_p.init_objects_by_tags else None)
+        az_groups = ['az:%s' % az for az in cfg.CONF.nsx_p.availability_zones]
+        azs_resources = bootstrap.run_once(
+            'nsxp-availability-zones',
+            bootstrap.config_groups_data('nsx_p', *az_groups),
+            functools.partial(self._init_azs_backend_resources, search_scope))
         for az in self.get_azs_list():
-            az.translate_configured_names_to_uuids(
-                self.nsxpolicy, nsxlib=self.nsxlib, search_scope=search_scope)
-            az.validate_availability_zone(self.nsxpolicy, nsxlib=self.nsxlib)
+            az.set_backend_resources(azs_resources[az.name])
 
         # WAF is currently not supported by the NSX
         self._waf_profile_uuid = None
@@ -360,90 +390,74 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
                      "(current version %(ver)s)") % {'ver': self._nsx_version})
             raise nsx_exc.NsxPluginException(err_msg=msg)
 
-    def _init_profiles(self):
-        """Find/Create segment profiles this plugin will use"""
-        # Spoofguard profile (find it or create)
+    def _ensure_profile(self, resource_api, profile_id, **kwargs):
+        """Find a segment profile, or create it if it does not exist"""
         try:
-            self.nsxpolicy.spoofguard_profile.get(SPOOFGUARD_PROFILE_ID,
-                                                  silent=True)
+            resource_api.get(profile_id, silent=True)
         except nsx_lib_exc.ResourceNotFound:
             try:
-                self.nsxpolicy.spoofguard_profile.create_or_overwrite(
-                    SPOOFGUARD_PROFILE_ID,
-                    profile_id=SPOOFGUARD_PROFILE_ID,
-                    address_binding_whitelist=True,
-                    tags=self.nsxpolicy.build_v3_api_version_tag())
+                resource_api.create_or_overwrite(
+                    profile_id,
+                    profile_id=profile_id,
+                    tags=self.nsxpolicy.build_v3_api_version_tag(),
+                    **kwargs)
             except nsx_lib_exc.StaleRevision as e:
                 # This means that another controller is also creating this
-                LOG.info("Failed to configure spoofguard_profile: %s", e)
+                LOG.info("Failed to configure profile %s: %s", profile_id, e)
 
-        # No Port security spoofguard profile
-        # (default NSX profile. just verify it exists)
+    def _verify_default_profile(self, resource_api, profile_id,
+                                profile_desc):
+        """Verify a default NSX segment profile exists"""
         try:
-            self.nsxpolicy.spoofguard_profile.get(NO_SPOOFGUARD_PROFILE_ID,
-                                                  silent=True)
+            resource_api.get(profile_id, silent=True)
         except nsx_lib_exc.ResourceNotFound:
-            msg = (_("Cannot find spoofguard profile %s") %
-                   NO_SPOOFGUARD_PROFILE_ID)
+            msg = (_("Cannot find %(desc)s %(id)s") %
+                   {'desc': profile_desc, 'id': profile_id})
             raise nsx_exc.NsxPluginException(err_msg=msg)
 
-        # Mac discovery profile (find it or create)
-        try:
-            self.nsxpolicy.mac_discovery_profile.get(
-                MAC_DISCOVERY_PROFILE_ID, silent=True)
-        except nsx_lib_exc.ResourceNotFound:
-            try:
-                self.nsxpolicy.mac_discovery_profile.create_or_overwrite(
-                    MAC_DISCOVERY_PROFILE_ID,
-                    profile_id=MAC_DISCOVERY_PROFILE_ID,
-                    mac_change_enabled=True,
-                    mac_learning_enabled=True,
-                    tags=self.nsxpolicy.build_v3_api_version_tag())
-            except nsx_lib_exc.StaleRevision as e:
-                # This means that another controller is also creating this
-                LOG.info("Failed to configure mac_discovery_profile: %s", e)
-
-        # No Mac discovery profile profile
-        # (default NSX profile. just verify it exists)
-        try:
-            self.nsxpolicy.mac_discovery_profile.get(
-                NO_MAC_DISCOVERY_PROFILE_ID, silent=True)
-        except nsx_lib_exc.ResourceNotFound:
-            msg = (_("Cannot find MAC discovery profile %s") %
-                   NO_MAC_DISCOVERY_PROFILE_ID)
-            raise nsx_exc.NsxPluginException(err_msg=msg)
-
-        # No Port security segment-security profile (find it or create)
-        try:
-            self.nsxpolicy.segment_security_profile.get(
-                NO_SEG_SECURITY_PROFILE_ID, silent=True)
-        except nsx_lib_exc.ResourceNotFound:
-            try:
-                self.nsxpolicy.segment_security_profile.create_or_overwrite(
-                    NO_SEG_SECURITY_PROFILE_ID,
-                    profile_id=NO_SEG_SECURITY_PROFILE_ID,
-                    bpdu_filter_enable=False,
-                    dhcp_client_block_enabled=False,
-                    dhcp_client_block_v6_enabled=False,
-                    dhcp_server_block_enabled=False,
-                    dhcp_server_block_v6_enabled=False,
-                    non_ip_traffic_block_enabled=False,
-                    ra_guard_enabled=False,
-                    rate_limits_enabled=False,
-                    tags=self.nsxpolicy.build_v3_api_version_tag())
-            except nsx_lib_exc.StaleRevision as e:
-                # This means that another controller is also creating this
-                LOG.info("Failed to configure segment_security_profile: %s", e)
-
-        # Port security segment-security profile
-        # (default NSX profile. just verify it exists)
-        try:
-            self.nsxpolicy.segment_security_profile.get(
-                SEG_SECURITY_PROFILE_ID, silent=True)
-        except nsx_lib_exc.ResourceNotFound:
-            msg = (_("Cannot find segment security profile %s") %
-                   SEG_SECURITY_PROFILE_ID)
-            raise nsx_exc.NsxPluginException(err_msg=msg)
+    def _init_backend_profiles(self):
+        checks = [
+            # Spoofguard profile (find it or create)
+            functools.partial(
+                self._ensure_profile, self.nsxpolicy.spoofguard_profile,
+                SPOOFGUARD_PROFILE_ID, address_binding_whitelist=True),
+            # No Port security spoofguard profile
+            # (default NSX profile. just verify it exists)
+            functools.partial(
+                self._verify_default_profile,
+                self.nsxpolicy.spoofguard_profile, NO_SPOOFGUARD_PROFILE_ID,
+                'spoofguard profile'),
+            # Mac discovery profile (find it or create)
+            functools.partial(
+                self._ensure_profile, self.nsxpolicy.mac_discovery_profile,
+                MAC_DISCOVERY_PROFILE_ID, mac_change_enabled=True,
+                mac_learning_enabled=True),
+            # No Mac discovery profile profile
+            # (default NSX profile. just verify it exists)
+            functools.partial(
+                self._verify_default_profile,
+                self.nsxpolicy.mac_discovery_profile,
+                NO_MAC_DISCOVERY_PROFILE_ID, 'MAC discovery profile'),
+            # No Port security segment-security profile (find it or create)
+            functools.partial(
+                self._ensure_profile,
+                self.nsxpolicy.segment_security_profile,
+                NO_SEG_SECURITY_PROFILE_ID,
+                bpdu_filter_enable=False,
+                dhcp_client_block_enabled=False,
+                dhcp_client_block_v6_enabled=False,
+                dhcp_server_block_enabled=False,
+                dhcp_server_block_v6_enabled=False,
+                non_ip_traffic_block_enabled=False,
+                ra_guard_enabled=False,
+                rate_limits_enabled=False),
+            # Port security segment-security profile
+            # (default NSX profile. just verify it exists)
+            functools.partial(
+                self._verify_default_profile,
+                self.nsxpolicy.segment_security_profile,
+                SEG_SECURITY_PROFILE_ID, 'segment security profile'),
+            self._init_lb_profiles_with_error]
 
         # Find or create all neutron NDRA profiles
         ndra_profiles = {
@@ -453,31 +467,22 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
             STATEFUL_DHCP_NDRA_PROFILE_ID: policy_constants.IPV6_RA_MODE_DHCP,
             NO_SLAAC_NDRA_PROFILE_ID: policy_constants.IPV6_RA_MODE_DISABLED
         }
-
         for profile_key, profile_value in ndra_profiles.items():
-            try:
-                self.nsxpolicy.ipv6_ndra_profile.get(profile_key, silent=True)
-            except nsx_lib_exc.ResourceNotFound:
-                try:
-                    self.nsxpolicy.ipv6_ndra_profile.create_or_overwrite(
-                        profile_key,
-                        profile_id=profile_key,
-                        ra_mode=profile_value,
-                        tags=self.nsxpolicy.build_v3_api_version_tag())
-                except nsx_lib_exc.StaleRevision as e:
-                    # This means that another controller is also creating this
-                    LOG.info("Failed to configure ipv6_ndra_profile %s: %s",
-                             profile_key, e)
+            checks.append(functools.partial(
+                self._ensure_profile, self.nsxpolicy.ipv6_ndra_profile,
+                profile_key, ra_mode=profile_value))
 
-        self.client_ssl_profile = None
+        # All the profiles are independent, and can be handled concurrently
+        bootstrap.run_concurrently(checks)
 
-        LOG.debug("Initializing NSX-P Load Balancer default profiles")
-        try:
-            self._init_lb_profiles()
-        except Exception as e:
-            msg = (_("Unable to initialize NSX-P lb profiles: "
-                     "Reason: %(reason)s") % {'reason': str(e)})
-            raise nsx_exc.NsxPluginException(err_msg=msg)
+    def _init_profiles(self):
+        """Find/Create segment profiles this plugin will use"""
+        # This is done by a single worker, and shared with the rest as long
+        # as the configuration did not change
+        bootstrap.run_once('nsxp-profiles',
+                           bootstrap.config_groups_data('nsx_p'),
+                           self._init_backend_profiles)
+        self.client_ssl_profile = NSX_P_CLIENT_SSL_PROFILE
 
     @staticmethod
     def plugin_type():
@@ -519,12 +524,23 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
                     # This means that another controller is also creating this
                     LOG.info("Failed to configure LB client_ssl_profile: %s",
                              e)
-            self.client_ssl_profile = NSX_P_CLIENT_SSL_PROFILE
+
+    def _init_lb_profiles_with_error(self):
+        LOG.debug("Initializing NSX-P Load Balancer default profiles")
+        try:
+            self._init_lb_profiles()
+        except Exception as e:
+            msg = (_("Unable to initialize NSX-P lb profiles: "
+                     "Reason: %(reason)s") % {'reason': str(e)})
+            raise nsx_exc.NsxPluginException(err_msg=msg)
 
     def spawn_complete(self, resource, event, trigger, payload=None):
         # Init the FWaaS support with RPC listeners for the original process
         self._init_fwaas(with_rpc=True)
 
+        if self._async_port_programming():
+            self._replay_queued_ports()
+
         self._init_octavia()
         self.octavia_stats_collector = (
             octavia_listener.NSXOctaviaStatisticsCollector(
@@ -1796,7 +1812,8 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
                 qos_profile_id=qos_policy_id)
 
     def _create_or_update_port_on_backend(self, context, port_data, is_psec_on,
-                                          qos_policy_id, original_port=None):
+                                          qos_policy_id, original_port=None,
+                                          force_admin_state=False):
         is_create = original_port is None
         is_update = not is_create
 
@@ -1896,13 +1913,92 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
             cfg.CONF.nsx_p.allow_passthrough and
             'admin_state_up' in port_data):
             new_state = port_data['admin_state_up']
-            if ((is_create and new_state is False) or
+            if (force_admin_state or
+                (is_create and new_state is False) or
                 (is_update and
                  original_port.get('admin_state_up') != new_state)):
                 # This api uses the passthrough api
                 self.nsxpolicy.segment_port.set_admin_state(
                     segment_id, port_data['id'], new_state)
 
+    def _async_port_programming(self):
+        return (cfg.CONF.nsx_p.async_port_programming and
+                not cfg.CONF.api_replay_mode)
+
+    def _queue_port_on_backend(self, context, port_data, is_psec_on,
+                               qos_policy_id, is_create=False):
+        """Record the port change to be programmed on the backend
+
+        Called in the transaction of the port change, so a committed change
+        is always programmed, even if the server stops first. The port is
+        programmed by _program_queued_port once it is enqueued, after the
+        commit.
+        """
+        nsx_db.queue_nsx_port_realization(
+            context.session, port_data['id'], port_data['network_id'],
+            'create' if is_create else 'update', is_psec_on, qos_policy_id,
+            context.tenant_name)
+
+    def _set_port_status(self, context, port_id, status):
+        with db_api.CONTEXT_WRITER.using(context):
+            try:
+                port_model = self._get_port(context, port_id)
+            except n_exc.PortNotFound:
+                return
+            port_model.status = status
+
+    def _program_queued_port(self, port_id):
+        """Program the latest state of a queued port on the backend
+
+        The port moves to ACTIVE when it is realized, or to ERROR keeping the
+        failure reason in the DB.
+        """
+        context = n_context.get_admin_context()
+        # The lock prevents recreating a port that is being deleted
+        with locking.LockManager.get_lock('nsx-port-%s' % port_id):
+            entry = nsx_db.get_nsx_port_realization(context.session, port_id)
+            if not entry or entry.status != 'pending':
+                return
+            generation = entry.generation
+            try:
+                port_data = self.get_port(context, port_id)
+            except n_exc.PortNotFound:
+                return
+            context.tenant_name = entry.project_name
+            original_port = None if entry.operation == 'create' else port_data
+            reason = None
+            try:
+                self._create_or_update_port_on_backend(
+                    context, port_data, entry.port_security,
+                    entry.qos_policy_id, original_port=original_port,
+                    force_admin_state=original_port is not None)
+            except Exception as e:
+                reason = str(e) or e.__class__.__name__
+                LOG.error("Failed to program port %(id)s on NSX backend: "
+                          "%(e)s", {'id': port_id, 'e': reason})
+            if not nsx_db.finish_nsx_port_realization(
+                    context.session, port_id, generation, reason=reason):
+                # The port was changed during the programming
+                LOG.debug("Programming of port %s was superseded", port_id)
+                return
+        self._set_port_status(
+            context, port_id,
+            const.PORT_STATUS_ERROR if reason else const.PORT_STATUS_ACTIVE)
+
+    def _replay_queued_ports(self):
+        """Queue the ports changes which were not programmed yet
+
+        The ports which failed to be programmed are retried as well.
+        """
+        context = n_context.get_admin_context()
+        nsx_db.retry_failed_nsx_port_realizations(context.session)
+        entries = nsx_db.get_pending_nsx_port_realizations(context.session)
+        if entries:
+            LOG.info("Replaying the backend programming of %s ports",
+                     len(entries))
+        for entry in entries:
+            self._ports_queue.enqueue(entry.network_id, entry.port_id)
+
     def base_create_port(self, context, port):
         neutron_db = super(NsxPolicyPlugin, self).create_port(context, port)
         self._extension_manager.process_create_port(
@@ -2200,6 +2296,12 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
             self._ensure_default_security_group(context,
                                                 port_data['tenant_id'])
 
+        async_backend = (self._async_port_programming() and
+                         self._is_backend_port(context, port_data))
+        if async_backend:
+            # The port is DOWN until it is realized on the backend
+            port_data['status'] = const.PORT_STATUS_DOWN
+
         with db_api.CONTEXT_WRITER.using(context):
             neutron_db = self.base_create_port(context, port)
             port["port"].update(neutron_db)
@@ -2243,10 +2345,16 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
                 # ATTR_NOT_SPECIFIED
                 port_data.pop(mac_ext.MAC_LEARNING)
 
-        qos_policy_id = self._get_port_qos_policy_id(
-            context, None, port_data)
+            qos_policy_id = self._get_port_qos_policy_id(
+                context, None, port_data)
+            if async_backend:
+                self._queue_port_on_backend(context, port_data, is_psec_on,
+                                            qos_policy_id, is_create=True)
 
-        if self._is_backend_port(context, port_data):
+        if async_backend:
+            self._ports_queue.enqueue(port_data['network_id'],
+                                      port_data['id'])
+        elif self._is_backend_port(context, port_data):
             # router interface port is created automatically by policy
             try:
                 self._create_or_update_port_on_backend(
@@ -2371,7 +2479,8 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
         # Delete the backend port last to prevent recreation by another process
         if self._is_backend_port(context, port_data, delete=True):
             try:
-                self._delete_port_on_backend(context, net_id, port_id)
+                with locking.LockManager.get_lock('nsx-port-%s' % port_id):
+                    self._delete_port_on_backend(context, net_id, port_id)
             except nsx_lib_exc.ResourceNotFound:
                 # If the resource was not found on the backend do not worry
                 # about it. The conditions has already been logged, so there
@@ -2462,15 +2571,23 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
                                                 mac_learning_state)
             self._remove_provider_security_groups_from_list(updated_port)
 
+            qos_policy_id = self._get_port_qos_policy_id(
+                context, original_port, updated_port)
+            async_backend = (self._async_port_programming() and
+                             self._is_backend_port(context, updated_port))
+            if async_backend:
+                self._queue_port_on_backend(context, updated_port,
+                                            port_security, qos_policy_id)
+
         # Update the QoS policy
-        qos_policy_id = self._get_port_qos_policy_id(
-            context, original_port, updated_port)
         qos_com_utils.update_port_policy_binding(context, port_id,
                                                  qos_policy_id)
 
         # update the port in the backend, only if it exists in the DB
         # (i.e not external net) and is not router interface
-        if self._is_backend_port(context, updated_port):
+        if async_backend:
+            self._ports_queue.enqueue(updated_port['network_id'], port_id)
+        elif self._is_backend_port(context, updated_port):
             try:
                 self._update_port_on_backend(context, port_id,
                                              original_port, updated_port,
@@ -3818,10 +3935,11 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
             self._add_exclude_list_group()
 
     def _create_security_group_backend_resources(self, context, secgroup,
-                                                 entries):
+                                                 entries, ip_prefixes=None):
         """Create communication map (=section) and group (=NS group)
 
         Both will have the security group id as their NSX id.
+        The shared groups of the rules IP prefixes are created as well.
         """
         sg_id = secgroup['id']
         tags = self.nsxpolicy.build_v3_tags_payload(
@@ -3848,6 +3966,9 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
                     description=secgroup.get('description'),
                     conditions=[condition], tags=tags)
 
+                if ip_prefixes:
+                    self._create_ip_prefix_groups(ip_prefixes)
+
                 # create the communication map (=section) and entries (=rules)
                 self.nsxpolicy.comm_map.create_or_overwrite_map_only(
                     nsx_name, NSX_P_GLOBAL_DOMAIN_ID, map_id=sg_id,
@@ -3920,20 +4041,76 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
         return srv_id
 
     def _get_sg_rule_remote_ip_group_id(self, sg_rule):
+        # Dedicated rule group, used by older versions
         return '%s_remote_group' % sg_rule['id']
 
     def _get_sg_rule_local_ip_group_id(self, sg_rule):
+        # Dedicated rule group, used by older versions
         return '%s_local_group' % sg_rule['id']
 
+    def _get_ip_prefix_group_id(self, ip_prefix):
+        return 'os_ip_prefix_%s' % uuid.uuid5(
+            NSX_P_IP_PREFIX_GROUP_NAMESPACE, ip_prefix)
+
+    def _get_sg_rule_ip_prefixes(self, sg_rule):
+        """Return the IP prefixes of a rule which require a group"""
+        rule_ips = {'remote_ip_prefix': sg_rule.get('remote_ip_prefix'),
+                    sg_prefix.LOCAL_IP_PREFIX: sg_rule.get(
+                        sg_prefix.LOCAL_IP_PREFIX)}
+        self._fix_sg_rule_dict_ips(rule_ips)
+        return set(ip_prefix for ip_prefix in rule_ips.values()
+                   if ip_prefix and validators.is_attr_set(ip_prefix))
+
+    def _create_ip_prefix_groups(self, ip_prefixes):
+        """Create or update the shared groups of IP prefixes"""
+        for ip_prefix in ip_prefixes:
+            group_id = self._get_ip_prefix_group_id(ip_prefix)
+            expr = self.nsxpolicy.group.build_ip_address_expression(
+                [ip_prefix])
+            tags = self.nsxpolicy.build_v3_api_version_tag()
+            tags.append({'scope': NSX_P_IP_PREFIX_GROUP_TAG,
+                         'tag': ip_prefix})
+            self.nsxpolicy.group.create_or_overwrite_with_conditions(
+                'IP prefix %s' % ip_prefix, NSX_P_GLOBAL_DOMAIN_ID,
+                group_id=group_id,
+                description='%s for OS rules' % ip_prefix,
+                conditions=[expr], tags=tags)
+
+    def _delete_unused_ip_prefix_groups(self, context, ip_prefixes):
+        """Delete the shared groups of IP prefixes no rule uses anymore
+
+        Should be called after the rules were deleted from the neutron DB.
+        """
+        for ip_prefix in ip_prefixes:
+            if self._count_security_group_rules_with_ip_prefix(
+                    context, ip_prefix):
+                continue
+            group_id = self._get_ip_prefix_group_id(ip_prefix)
+            try:
+                self.nsxpolicy.group.delete(NSX_P_GLOBAL_DOMAIN_ID, group_id)
+            except nsx_lib_exc.ResourceNotFound:
+                pass
+            except nsx_lib_exc.ManagerError as e:
+                # The NSX does not allow deleting a group which is used by
+                # rules, so a rule created meanwhile by another worker keeps
+                # its group
+                LOG.warning("Failed to delete group %(group)s of IP prefix "
+                            "%(prefix)s: %(e)s",
+                            {'group': group_id, 'prefix': ip_prefix, 'e': e})
+
     def _create_security_group_backend_rule(self, context, map_id,
                                             sg_rule, secgroup_logging,
                                             is_provider_sg=False,
-                                            create_related_resource=True):
+                                            create_related_resource=True,
+                                            ip_prefixes=None):
         """Create backend resources for a DFW rule
 
         All rule resources (service, groups) will be created
         The rule itself will be created if create_rule=True.
         Else this method will return the rule entry structure for future use.
+        If ip_prefixes set is given, the IP prefixes of the rule are added to
+        it instead of creating their groups, so that the caller can create
+        each shared group once, together with the rules.
         """
         # The id of the map and group is the same as the security group id
         this_group_id = map_id
@@ -3954,33 +4131,18 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
             # so it should be known to the policy manager
             source = sg_rule.get('remote_group_id')
         elif sg_rule.get('remote_ip_prefix'):
-            # Create a group for the remote IPs
-            remote_ip = sg_rule['remote_ip_prefix']
-            remote_group_id = self._get_sg_rule_remote_ip_group_id(sg_rule)
-            if create_related_resource:
-                expr = self.nsxpolicy.group.build_ip_address_expression(
-                    [remote_ip])
-                self.nsxpolicy.group.create_or_overwrite_with_conditions(
-                    remote_group_id, NSX_P_GLOBAL_DOMAIN_ID,
-                    group_id=remote_group_id,
-                    description='%s for OS rule %s' % (remote_ip,
-                                                       sg_rule['id']),
-                    conditions=[expr], tags=tags)
-            source = remote_group_id
+            # Use the shared group of the remote IPs
+            source = self._get_ip_prefix_group_id(sg_rule['remote_ip_prefix'])
         if sg_rule.get(sg_prefix.LOCAL_IP_PREFIX):
-            # Create a group for the local ips
-            local_ip = sg_rule[sg_prefix.LOCAL_IP_PREFIX]
-            local_group_id = self._get_sg_rule_local_ip_group_id(sg_rule)
-            if create_related_resource:
-                expr = self.nsxpolicy.group.build_ip_address_expression(
-                    [local_ip])
-                self.nsxpolicy.group.create_or_overwrite_with_conditions(
-                    local_group_id, NSX_P_GLOBAL_DOMAIN_ID,
-                    group_id=local_group_id,
-                    description='%s for OS rule %s' % (local_ip,
-                                                       sg_rule['id']),
-                    conditions=[expr], tags=tags)
-            destination = local_group_id
+            # Use the shared group of the local IPs
+            destination = self._get_ip_prefix_group_id(
+                sg_rule[sg_prefix.LOCAL_IP_PREFIX])
+        if create_related_resource:
+            rule_ip_prefixes = self._get_sg_rule_ip_prefixes(sg_rule)
+            if ip_prefixes is None:
+                self._create_ip_prefix_groups(rule_ip_prefixes)
+            else:
+                ip_prefixes.update(rule_ip_prefixes)
 
         if direction == nsxlib_consts.OUT:
             # Swap source and destination
@@ -4048,15 +4210,16 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
             sg_rules = secgroup_db['security_group_rules']
             secgroup_logging = secgroup.get(sg_logging.LOGGING, False)
             backend_rules = []
+            ip_prefixes = set()
             # Create all the rules resources in a single transaction
             for sg_rule in sg_rules:
                 rule_entry = self._create_security_group_backend_rule(
                     context, secgroup_db['id'], sg_rule,
-                    secgroup_logging)
+                    secgroup_logging, ip_prefixes=ip_prefixes)
                 backend_rules.append(rule_entry)
             # Create Group & communication map on the NSX
             self._create_security_group_backend_resources(
-                context, secgroup, backend_rules)
+                context, secgroup, backend_rules, ip_prefixes=ip_prefixes)
 
         except Exception as e:
             with excutils.save_and_reraise_exception():
@@ -4119,12 +4282,16 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
         super(NsxPolicyPlugin, self).delete_security_group(context, sg_id)
 
         domain_id = NSX_P_GLOBAL_DOMAIN_ID
+        ip_prefixes = set()
         try:
             self.nsxpolicy.comm_map.delete(domain_id, sg_id)
             self.nsxpolicy.group.delete(domain_id, sg_id)
             for rule in sg['security_group_rules']:
                 self._delete_security_group_rule_backend_resources(
-                    context, rule)
+                    context, rule,
+                    local_ip_prefix=rule.get(sg_prefix.LOCAL_IP_PREFIX))
+                ip_prefixes.update(self._get_sg_rule_ip_prefixes(rule))
+            self._delete_unused_ip_prefix_groups(context, ip_prefixes)
         except nsx_lib_exc.ResourceNotFound:
             # If the resource was not found on the backend do not worry about
             # it. The conditions has already been logged, so there is no need
@@ -4169,6 +4336,7 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
         is_provider_sg = sg.get(provider_sg.PROVIDER)
         secgroup_logging = self._is_security_group_logged(context, sg_id)
         # Create the NSX backend rules in a single transaction
+        ip_prefixes = set()
 
         def _do_update_rules():
             # Build new rules and relevant objects
@@ -4176,8 +4344,9 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
             for rule_data in rules_db:
                 rule_entry = self._create_security_group_backend_rule(
                     context, sg_id, rule_data, secgroup_logging,
-                    is_provider_sg=is_provider_sg)
+                    is_provider_sg=is_provider_sg, ip_prefixes=ip_prefixes)
                 backend_rules.append(rule_entry)
+            self._create_ip_prefix_groups(ip_prefixes)
             # Update the policy with the new rules only
             self.nsxpolicy.comm_map.patch_entries(
                 NSX_P_GLOBAL_DOMAIN_ID, sg_id, entries=backend_rules)
@@ -4195,11 +4364,14 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
                     rule_ids.append(rule_data['id'])
                 LOG.info("Security group rules %s removed from Neutron DB "
                          "due to failed NSX transaction", ",".join(rule_ids))
+                # The shared groups of the IP prefixes may have been created
+                # without the rules using them
+                self._delete_unused_ip_prefix_groups(context, ip_prefixes)
 
         return rules_db
 
     def _delete_security_group_rule_backend_resources(
-        self, context, rule_db):
+        self, context, rule_db, local_ip_prefix=None):
         rule_id = rule_db['id']
         # try to delete the service of this rule, if exists
         if rule_db['protocol']:
@@ -4208,7 +4380,8 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
             except nsx_lib_exc.ResourceNotFound:
                 pass
 
-        # Try to delete the remote ip prefix group, if exists
+        # Try to delete the dedicated remote ip prefix group created by older
+        # versions, if exists. Shared groups are deleted separately.
         if rule_db['remote_ip_prefix']:
             try:
                 remote_group_id = self._get_sg_rule_remote_ip_group_id(rule_db)
@@ -4217,8 +4390,8 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
             except nsx_lib_exc.ResourceNotFound:
                 pass
 
-        # Try to delete the local ip prefix group, if exists
-        if self._get_security_group_rule_local_ip(context, rule_id):
+        # Try to delete the dedicated local ip prefix group, if exists
+        if local_ip_prefix:
             try:
                 local_group_id = self._get_sg_rule_local_ip_group_id(rule_db)
                 self.nsxpolicy.group.delete(NSX_P_GLOBAL_DOMAIN_ID,
@@ -4230,13 +4403,18 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
         rule_db = self._get_security_group_rule(context, rule_id)
         sg_id = rule_db['security_group_id']
         self._prevent_non_admin_edit_provider_sg(context, sg_id)
+        local_ip_prefix = self._get_security_group_rule_local_ip(
+            context, rule_id)
+        ip_prefixes = self._get_sg_rule_ip_prefixes(
+            {'remote_ip_prefix': rule_db['remote_ip_prefix'],
+             sg_prefix.LOCAL_IP_PREFIX: local_ip_prefix})
 
         # Delete the rule itself
         try:
             self.nsxpolicy.comm_map.delete_entry(
                 policy_constants.DEFAULT_DOMAIN, sg_id, rule_id)
             self._delete_security_group_rule_backend_resources(
-                context, rule_db)
+                context, rule_db, local_ip_prefix=local_ip_prefix)
         except nsx_lib_exc.ResourceNotFound:
             # Go on with the deletion anyway
             pass
@@ -4247,6 +4425,7 @@ class NsxPolicyPlugin(nsx_plugin_common.NsxPluginV3Base):
 
         super(NsxPolicyPlugin, self).delete_security_group_rule(
             context, rule_id)
+        self._delete_unused_ip_prefix_groups(context, ip_prefixes)
 
     def _is_overlay_network(self, context, network_id):
         """Return True if this is an overlay network
@@ -0,0 +1,63 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+import eventlet
+from eventlet import semaphore
+from oslo_log import log as logging
+
+LOG = logging.getLogger(__name__)
+
+# Maximal number of ports programmed on the backend concurrently
+MAX_CONCURRENT_PORTS = 10
+
+
+class SegmentPortsQueue(object):
+    """Program the ports of each network segment asynchronously
+
+    The ports of a network are programmed one at a time, by order of their
+    changes, by a green thread of the network. A port changed again before
+    it was programmed keeps its place in the queue, and its latest state is
+    programmed once.
+    """
+
+    def __init__(self, program_port_func,
+                 max_concurrent=MAX_CONCURRENT_PORTS):
+        self._program_port = program_port_func
+        self._semaphore = semaphore.Semaphore(max_concurrent)
+        # The ports waiting to be programmed, by network
+        self._queues = {}
+
+    def enqueue(self, network_id, port_id):
+        queue = self._queues.get(network_id)
+        if queue is not None:
+            queue.setdefault(port_id)
+            return
+        self._queues[network_id] = collections.OrderedDict([(port_id, None)])
+        eventlet.spawn_n(self._run, network_id)
+
+    def _run(self, network_id):
+        queue = self._queues[network_id]
+        while queue:
+            port_id, _ = queue.popitem(last=False)
+            with self._semaphore:
+                try:
+                    self._program_port(port_id)
+                except Exception as e:
+                    LOG.error("Failed to program port %(port)s of network "
+                              "%(net)s: %(err)s",
+                              {'port': port_id, 'net': network_id, 'err': e})
+        del self._queues[network_id]
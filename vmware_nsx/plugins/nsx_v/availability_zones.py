@@ -20,6 +20,7 @@ from vmware_nsx._i18n import _
 from vmware_nsx.common import availability_zones as common_az
 from vmware_nsx.common import config
 from vmware_nsx.common import exceptions as nsx_exc
+from vmware_nsx.common import nsxv_constants
 from vmware_nsx.common import utils as c_utils
 
 DEFAULT_NAME = common_az.DEFAULT_NAME
@@ -388,7 +389,9 @@ class NsxVAvailabilityZones(common_az.ConfiguredAvailabilityZones):
         return self.get_unique_non_default_param("dvs_id")
 
     def validate_connectivity(self, vcns):
-        if (not c_utils.is_nsxv_version_6_4_6(vcns.get_version()) or
+        if (not c_utils.nsxv_supports(
+                vcns.get_version(),
+                nsxv_constants.AZ_CONNECTIVITY_VALIDATION) or
             not cfg.CONF.nsxv.cluster_moid):
             return
 
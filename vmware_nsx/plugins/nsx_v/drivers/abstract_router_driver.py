@@ -63,7 +63,12 @@ class RouterAbstractDriver(object, metaclass=abc.ABCMeta):
         pass
 
     @abc.abstractmethod
-    def _update_edge_router(self, context, router_id):
+    def _update_edge_router(self, context, router_id, parts=None):
+        """Update the edge configuration of the router floating IPs
+
+        parts are the edge_update_coalescer parts of the configuration which
+        were changed, or None to update all of them.
+        """
         pass
 
 
@@ -329,7 +329,7 @@ class RouterDistributedDriver(router_driver.RouterBaseDriver):
 
             return info
 
-    def _update_edge_router(self, context, router_id):
+    def _update_edge_router(self, context, router_id, parts=None):
         router = self.plugin._get_router(context.elevated(), router_id)
         plr_id = self.edge_manager.get_plr_by_tlr_id(context, router_id)
         self.plugin._update_external_interface(
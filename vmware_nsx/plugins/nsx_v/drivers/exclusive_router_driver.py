@@ -16,6 +16,7 @@ from oslo_config import cfg
 from oslo_log import log as logging
 
 from neutron_lib import constants as n_consts
+from neutron_lib import context as n_context
 from neutron_lib.db import api as db_api
 
 from vmware_nsx._i18n import _
@@ -25,6 +26,7 @@ from vmware_nsx.db import nsxv_db
 from vmware_nsx.plugins.nsx_v.drivers import (
     abstract_router_driver as router_driver)
 from vmware_nsx.plugins.nsx_v import plugin as nsx_v
+from vmware_nsx.plugins.nsx_v.vshield import edge_update_coalescer
 from vmware_nsx.plugins.nsx_v.vshield import edge_utils
 from vmware_nsx.services.lbaas.octavia import constants as oct_const
 
@@ -33,6 +35,13 @@ LOG = logging.getLogger(__name__)
 
 class RouterExclusiveDriver(router_driver.RouterBaseDriver):
 
+    def __init__(self, plugin):
+        super(RouterExclusiveDriver, self).__init__(plugin)
+        self._edge_update_coalescer = (
+            edge_update_coalescer.EdgeUpdateCoalescer(
+                self._update_edge_router_parts,
+                cfg.CONF.nsxv.edge_update_coalescing_window / 1000.0))
+
     def get_type(self):
         return "exclusive"
 
@@ -310,13 +319,26 @@ class RouterExclusiveDriver(router_driver.RouterBaseDriver):
             context.session, edge_id)
         return (len(ports) >= 1) and lb_binding
 
-    def _update_edge_router(self, context, router_id):
-        router = self.plugin._get_router(context.elevated(), router_id)
+    def _update_edge_router(self, context, router_id, parts=None):
+        # Floating IPs churn triggers many updates of the same edge, so those
+        # are coalesced
+        self._edge_update_coalescer.update(
+            router_id, parts or edge_update_coalescer.ALL_PARTS)
+
+    def _update_edge_router_parts(self, router_id, parts):
+        # The updates of several requests may be applied together, so the
+        # latest configuration is read using an admin context
+        context = n_context.get_admin_context()
+        router = self.plugin._get_router(context, router_id)
         with locking.LockManager.get_lock(
                 self._get_router_edge_id(context, router_id)):
-            self.plugin._update_external_interface(context, router)
-            self.plugin._update_nat_rules(context, router)
-            self.plugin._update_subnets_and_dnat_firewall(context, router)
+            if edge_update_coalescer.INTERFACE in parts:
+                self.plugin._update_external_interface(context, router)
+            if edge_update_coalescer.NAT in parts:
+                self.plugin._update_nat_rules(context, router)
+            if edge_update_coalescer.FIREWALL in parts:
+                self.plugin._update_subnets_and_dnat_firewall(context,
+                                                              router)
 
     def _get_router_edge_id(self, context, router_id):
         binding = nsxv_db.get_nsxv_router_binding(context.session, router_id)
@@ -948,7 +948,7 @@ class RouterSharedDriver(router_driver.RouterBaseDriver):
                                                          address_groups)
         return info
 
-    def _update_edge_router(self, context, router_id):
+    def _update_edge_router(self, context, router_id, parts=None):
         edge_id = edge_utils.get_router_edge_id(context, router_id)
         with locking.LockManager.get_lock(str(edge_id)):
             router_ids = self.edge_manager.get_routers_on_same_edge(
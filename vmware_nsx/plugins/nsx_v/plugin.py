@@ -13,7 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from distutils import version
+import functools
 import xml.etree.ElementTree as et
 
 import netaddr
@@ -100,6 +100,7 @@ from vmware_nsx.services.qos.nsx_v import utils as qos_utils
 import vmware_nsx
 from vmware_nsx._i18n import _
 from vmware_nsx.common import availability_zones as nsx_com_az
+from vmware_nsx.common import bootstrap
 from vmware_nsx.common import config  # noqa
 from vmware_nsx.common import exceptions as nsx_exc
 from vmware_nsx.common import l3_rpc_agent_api
@@ -145,6 +146,7 @@ from vmware_nsx.plugins.nsx_v.vshield.common import (
 from vmware_nsx.plugins.nsx_v.vshield.common import (
     exceptions as vsh_exc)
 from vmware_nsx.plugins.nsx_v.vshield import edge_firewall_driver
+from vmware_nsx.plugins.nsx_v.vshield import edge_update_coalescer
 from vmware_nsx.plugins.nsx_v.vshield import edge_utils
 from vmware_nsx.plugins.nsx_v.vshield import securitygroup_utils
 from vmware_nsx.plugins.nsx_v.vshield import vcns_driver
@@ -308,7 +310,8 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
 
         self._use_nsx_policies = False
         if cfg.CONF.nsxv.use_nsx_policies:
-            if not c_utils.is_nsxv_version_6_2(self.nsx_v.vcns.get_version()):
+            if not c_utils.nsxv_supports(self.nsx_v.vcns.get_version(),
+                                         nsxv_constants.NSX_POLICIES):
                 error = (_("NSX policies are not supported for version "
                            "%(ver)s.") %
                          {'ver': self.nsx_v.vcns.get_version()})
@@ -324,7 +327,8 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
         # supported if the global configuration flag vlan_transparent is
         # True
         if cfg.CONF.vlan_transparent:
-            if c_utils.is_nsxv_version_6_3(self.nsx_v.vcns.get_version()):
+            if c_utils.nsxv_supports(self.nsx_v.vcns.get_version(),
+                                     nsxv_constants.VLAN_TRANSPARENT):
                 self.supported_extension_aliases.append(vlan_apidef.ALIAS)
             else:
                 LOG.warning("Transparent support only from "
@@ -350,7 +354,8 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
             self.on_subnetpool_address_scope_updated,
             resources.SUBNETPOOL_ADDRESS_SCOPE, events.AFTER_UPDATE)
 
-        if c_utils.is_nsxv_version_6_2(self.nsx_v.vcns.get_version()):
+        if c_utils.nsxv_supports(self.nsx_v.vcns.get_version(),
+                                 nsxv_constants.PROVIDER_SECURITY_GROUPS):
             self.supported_extension_aliases.append(provider_sg.ALIAS)
 
         # Bind QoS notifications
@@ -420,6 +425,9 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
                 hk_readonly=cfg.CONF.nsxv.housekeeping_readonly,
                 hk_readonly_jobs=cfg.CONF.nsxv.housekeeping_readonly_jobs)
 
+            # Replenish & recycle the backup edge pools in the background
+            self.edge_manager.pool_manager.start()
+
             # Init octavia listener and endpoints
             if not self._is_sub_plugin:
                 octavia_objects = self._get_octavia_objects()
@@ -452,7 +460,7 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
 
     def _validate_nsx_version(self):
         ver = self.nsx_v.vcns.get_version()
-        if version.LooseVersion(ver) < version.LooseVersion('6.2.3'):
+        if not c_utils.nsxv_supports(ver, nsxv_constants.SUPPORTED_VERSION):
             error = _("Plugin version doesn't support NSX version %s.") % ver
             raise nsx_exc.NsxPluginException(err_msg=error)
 
@@ -1495,6 +1503,11 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
         qos_data = qos_utils.NsxVQosRule(
             context=context, qos_policy_id=qos_policy_id)
 
+        port_groups = self._get_qos_backend_port_groups(context, net_id)
+        self._update_qos_on_backend_port_groups(net_id, port_groups, qos_data)
+
+    def _get_qos_backend_port_groups(self, context, net_id):
+        """Return the (dvs id, port group moref) list of a network"""
         # default dvs for this network
         az = self.get_network_az_by_net_id(context, net_id)
         az_dvs_id = az.dvs_id
@@ -1502,11 +1515,17 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
         # get the network moref/s from the db
         net_mappings = nsx_db.get_nsx_network_mappings(
             context.session, net_id)
-        for mapping in net_mappings:
+        return [(mapping.dvs_id or az_dvs_id, mapping.nsx_id)
+                for mapping in net_mappings]
+
+    def _update_qos_on_backend_port_groups(self, net_id, port_groups,
+                                           qos_data):
+        # Does not access the DB, so it can run concurrently for several
+        # networks
+        for dvs_id, moref in port_groups:
             # update the qos restrictions of the network
             self._vcm.update_port_groups_config(
-                mapping.dvs_id or az_dvs_id,
-                net_id, mapping.nsx_id,
+                dvs_id, net_id, moref,
                 self._vcm.update_port_group_spec_qos, qos_data)
 
     def _cleanup_dhcp_edge_before_deletion(self, context, net_id):
@@ -2281,8 +2300,9 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
                 LOG.info("Add VM %(dev)s to exclude list on behalf of "
                          "port %(port)s: VM already in list",
                          {"dev": device_id, "port": port_id})
-                loose_ver = version.LooseVersion(self.nsx_v.vcns.get_version())
-                if loose_ver < version.LooseVersion('6.3.3'):
+                if not c_utils.nsxv_supports(
+                        self.nsx_v.vcns.get_version(),
+                        nsxv_constants.EXCLUDE_LIST_AUTO_SYNC):
                     LOG.info("Syncing firewall")
                     self.nsx_v.vcns.sync_firewall()
 
@@ -3272,8 +3292,8 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
 
     def setup_dhcp_edge_fw_rules(self, context, plugin, router_id):
         rules = []
-        loose_ver = version.LooseVersion(self.nsx_v.vcns.get_version())
-        if loose_ver < version.LooseVersion('6.3.2'):
+        if not c_utils.nsxv_supports(self.nsx_v.vcns.get_version(),
+                                     nsxv_constants.DHCP_EDGE_RAW_ICMP_RULE):
             # For these versions the raw icmp rule will not work due to
             # backend bug. Workaround: use applications, but since
             # application ids can change, we look them up by application name
@@ -4186,9 +4206,9 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
             floatingip_db['status'] = status
             self.update_floatingip_status(context, floatingip_db['id'], status)
 
-    def _update_edge_router(self, context, router_id):
+    def _update_edge_router(self, context, router_id, parts=None):
         router_driver = self._find_router_driver(context, router_id)
-        router_driver._update_edge_router(context, router_id)
+        router_driver._update_edge_router(context, router_id, parts=parts)
 
     def create_floatingip(self, context, floatingip):
         fip_db = super(NsxVPluginV2, self).create_floatingip(
@@ -4213,12 +4233,20 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
             context, id, floatingip)
         router_id = fip_db.get('router_id')
         try:
-            # Update old router's nat rules if old_router_id is not None.
-            if old_router_id:
-                self._update_edge_router(context, old_router_id)
-            # Update current router's nat rules if router_id is not None.
-            if router_id:
-                self._update_edge_router(context, router_id)
+            if old_router_id and old_router_id == router_id:
+                # The floating IP address stays on the router uplink, only
+                # its NAT and firewall rules may change
+                self._update_edge_router(
+                    context, router_id,
+                    parts=(edge_update_coalescer.NAT,
+                           edge_update_coalescer.FIREWALL))
+            else:
+                # Update old router's nat rules if old_router_id is not None.
+                if old_router_id:
+                    self._update_edge_router(context, old_router_id)
+                # Update current router's nat rules if router_id is not None.
+                if router_id:
+                    self._update_edge_router(context, router_id)
         except Exception:
             with excutils.save_and_reraise_exception():
                 LOG.exception("Failed to update edge router")
@@ -4622,7 +4650,6 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
         nsx_sg_id = nsx_db.get_nsx_security_group_id(context.session, id,
                                                      moref=True)
         section_uri = self._get_section_uri(context.session, id)
-        section_needs_update = False
 
         sg_data = super(NsxVPluginV2, self).update_security_group(
             context, id, security_group)
@@ -4650,26 +4677,23 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
         with locking.LockManager.get_lock('rule-update-%s' % id):
             # Get the backend section matching this security group
             h, c = self.nsx_v.vcns.get_section(section_uri)
-            section = self.nsx_sg_utils.parse_section(c)
 
             # dfw section name needs to be updated if the sg name was modified
-            if 'name' in s.keys():
-                section.attrib['name'] = section_name
-                section_needs_update = True
+            new_section_name = section_name if 'name' in s.keys() else None
 
             # Update the dfw section if security-group logging option has
             # changed.
             log_all_rules = cfg.CONF.nsxv.log_security_groups_allowed_traffic
             self._process_security_group_properties_update(context, sg_data, s)
+            logged = None
             if not log_all_rules and context.is_admin:
-                section_needs_update |= (
-                    self.nsx_sg_utils.set_rules_logged_option(
-                        section, sg_data[sg_logging.LOGGING]))
+                logged = sg_data[sg_logging.LOGGING]
 
-            if section_needs_update:
+            section_xml = self.nsx_sg_utils.update_section_attributes(
+                c, name=new_section_name, logged=logged)
+            if section_xml:
                 # update the section with all the modifications
-                self.nsx_v.vcns.update_section(
-                    section_uri, self.nsx_sg_utils.to_xml_string(section), h)
+                self.nsx_v.vcns.update_section(section_uri, section_xml, h)
 
         return sg_data
 
@@ -4855,12 +4879,10 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
                 )
 
             _h, _c = self.nsx_v.vcns.get_section(section_uri)
-            section = self.nsx_sg_utils.parse_section(_c)
-            self.nsx_sg_utils.fix_existing_section_rules(section)
-            self.nsx_sg_utils.extend_section_with_rules(section, nsx_rules)
             try:
                 h, c = self.nsx_v.vcns.update_section(
-                    section_uri, self.nsx_sg_utils.to_xml_string(section), _h)
+                    section_uri,
+                    self.nsx_sg_utils.extend_section(_c, nsx_rules), _h)
             except vsh_exc.RequestBad as e:
                 # Raise the original reason of the failure
                 details = et.fromstring(e.response).find('details')
@@ -4987,7 +5009,7 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
 
     def _configure_reservations(self):
         ver = self.nsx_v.vcns.get_version()
-        if version.LooseVersion(ver) < version.LooseVersion('6.2.3'):
+        if not c_utils.nsxv_supports(ver, nsxv_constants.EDGE_RESERVATIONS):
             LOG.debug("Skipping reservation configuration. "
                       "Not supported by version - %s.", ver)
             return
@@ -4997,26 +5019,36 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
             LOG.info("Unable to configure edge reservations")
 
     def _validate_config(self):
-        self.existing_dvs = self.nsx_v.vcns.get_dvs_list()
+        # The backend validations are done by a single worker, and shared
+        # with the rest as long as the configuration did not change
+        az_groups = ['az:%s' % az for az in cfg.CONF.nsxv.availability_zones]
+        config_data = bootstrap.config_groups_data('nsxv', *az_groups)
+        self.existing_dvs = bootstrap.run_once(
+            'nsxv-validate-config', config_data,
+            self._validate_backend_config)
+
+    def _validate_dvs_config(self, existing_dvs):
         if (cfg.CONF.nsxv.dvs_id and
             not self.nsx_v.vcns.validate_dvs(cfg.CONF.nsxv.dvs_id,
-                                             dvs_list=self.existing_dvs)):
+                                             dvs_list=existing_dvs)):
             raise nsx_exc.NsxResourceNotFound(
                                 res_name='dvs_id',
                                 res_id=cfg.CONF.nsxv.dvs_id)
         for dvs_id in self._availability_zones_data.get_additional_dvs_ids():
             if not self.nsx_v.vcns.validate_dvs(dvs_id,
-                                                dvs_list=self.existing_dvs):
+                                                dvs_list=existing_dvs):
                 raise nsx_exc.NsxAZResourceNotFound(
                     res_name='dvs_id', res_id=dvs_id)
 
         # validate network-vlan dvs ID's
         for dvs_id in self._network_vlans:
             if not self.nsx_v.vcns.validate_dvs(dvs_id,
-                                                dvs_list=self.existing_dvs):
+                                                dvs_list=existing_dvs):
                 raise nsx_exc.NsxResourceNotFound(res_name='dvs_id',
                                                   res_id=dvs_id)
 
+    def _validate_scoping_objects_config(self):
+        # All those validations use the same cached backend scoping objects
         # Validate the global & per-AZ validate_datacenter_moid
         if not self.nsx_v.vcns.validate_datacenter_moid(
                 cfg.CONF.nsxv.datacenter_moid,
@@ -5043,6 +5075,20 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
                 raise nsx_exc.NsxAZResourceNotFound(
                     res_name='external_network', res_id=ext_net)
 
+        # Validate the global & per-AZ mgt_net_moid
+        if (cfg.CONF.nsxv.mgt_net_moid and
+            not self.nsx_v.vcns.validate_network(
+                cfg.CONF.nsxv.mgt_net_moid, during_init=True)):
+            raise nsx_exc.NsxResourceNotFound(
+                                res_name='mgt_net_moid',
+                                res_id=cfg.CONF.nsxv.mgt_net_moid)
+        for mgmt_net in self._availability_zones_data.get_additional_mgt_net():
+            if not self.nsx_v.vcns.validate_network(mgmt_net,
+                                                    during_init=True):
+                raise nsx_exc.NsxAZResourceNotFound(
+                    res_name='mgt_net_moid', res_id=mgmt_net)
+
+    def _validate_vdn_scope_config(self):
         # Validate the global & per-AZ vdn_scope_id
         if not self.nsx_v.vcns.validate_vdn_scope(cfg.CONF.nsxv.vdn_scope_id):
             raise nsx_exc.NsxResourceNotFound(
@@ -5053,42 +5099,49 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
                 raise nsx_exc.NsxAZResourceNotFound(
                     res_name='vdn_scope_id', res_id=vdns)
 
-        # Validate the global & per-AZ mgt_net_moid
-        if (cfg.CONF.nsxv.mgt_net_moid and
-            not self.nsx_v.vcns.validate_network(
-                cfg.CONF.nsxv.mgt_net_moid)):
-            raise nsx_exc.NsxResourceNotFound(
-                                res_name='mgt_net_moid',
-                                res_id=cfg.CONF.nsxv.mgt_net_moid)
-        for mgmt_net in self._availability_zones_data.get_additional_mgt_net():
-            if not self.nsx_v.vcns.validate_network(mgmt_net):
-                raise nsx_exc.NsxAZResourceNotFound(
-                    res_name='mgt_net_moid', res_id=mgmt_net)
+    def _validate_host_groups_config(self):
+        # Validate the host_groups for each AZ
+        if not cfg.CONF.nsxv.use_dvs_features:
+            return
+        azs = self.get_azs_list()
+        for az in azs:
+            if az.edge_host_groups and az.edge_ha:
+                if len(az.edge_host_groups) < 2:
+                    error = _("edge_host_groups must have at least 2 "
+                              "names")
+                    raise nsx_exc.NsxPluginException(err_msg=error)
+                if (not az.ha_placement_random and
+                    len(az.edge_host_groups) > 2):
+                    LOG.warning("Availability zone %(az)s has %(count)s "
+                                "hostgroups. only the first 2 will be "
+                                "used until ha_placement_random is "
+                                "enabled",
+                                {'az': az.name,
+                                 'count': len(az.edge_host_groups)})
+                self._vcm.validate_host_groups(az.resource_pool,
+                                               az.edge_host_groups)
+
+    def _validate_inventory_config(self, moref, field):
+        if moref and not self.nsx_v.vcns.validate_inventory(moref):
+            error = _("Configured %s not found") % field
+            raise nsx_exc.NsxPluginException(err_msg=error)
+
+    def _validate_backend_config(self):
+        """Validate the configured backend objects
+
+        Independent validations run concurrently.
+        Return the list of existing DVS ids.
+        """
+        existing_dvs = self.nsx_v.vcns.get_dvs_list()
+        self._validate_dvs_config(existing_dvs)
+        bootstrap.run_concurrently([self._validate_scoping_objects_config,
+                                    self._validate_vdn_scope_config])
 
         ver = self.nsx_v.vcns.get_version()
-        if version.LooseVersion(ver) < version.LooseVersion('6.2.0'):
+        if not c_utils.nsxv_supports(ver,
+                                     nsxv_constants.INVENTORY_VALIDATION):
             LOG.warning("Skipping validations. Not supported by version.")
-            return
-
-        # Validate the host_groups for each AZ
-        if cfg.CONF.nsxv.use_dvs_features:
-            azs = self.get_azs_list()
-            for az in azs:
-                if az.edge_host_groups and az.edge_ha:
-                    if len(az.edge_host_groups) < 2:
-                        error = _("edge_host_groups must have at least 2 "
-                                  "names")
-                        raise nsx_exc.NsxPluginException(err_msg=error)
-                    if (not az.ha_placement_random and
-                        len(az.edge_host_groups) > 2):
-                        LOG.warning("Availability zone %(az)s has %(count)s "
-                                    "hostgroups. only the first 2 will be "
-                                    "used until ha_placement_random is "
-                                    "enabled",
-                                    {'az': az.name,
-                                     'count': len(az.edge_host_groups)})
-                    self._vcm.validate_host_groups(az.resource_pool,
-                                                   az.edge_host_groups)
+            return existing_dvs
 
         # Validations below only supported by 6.2.0 and above
         inventory = [(cfg.CONF.nsxv.resource_pool_id,
@@ -5115,10 +5168,11 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
             inventory.append((cfg.CONF.nsxv.default_policy_id,
                               'default_policy_id'))
 
+        checks = [self._validate_host_groups_config]
         for moref, field in inventory:
-            if moref and not self.nsx_v.vcns.validate_inventory(moref):
-                error = _("Configured %s not found") % field
-                raise nsx_exc.NsxPluginException(err_msg=error)
+            checks.append(functools.partial(self._validate_inventory_config,
+                                            moref, field))
+        bootstrap.run_concurrently(checks)
 
         if cfg.CONF.nsxv.vdr_transit_network:
             edge_utils.validate_vdr_transit_network()
@@ -5126,6 +5180,7 @@ class NsxVPluginV2(addr_pair_db.AllowedAddressPairsMixin,
         # Validate configuration connectivity per AZ
         self._availability_zones_data.validate_connectivity(
             self.nsx_v.vcns)
+        return existing_dvs
 
     def _nsx_policy_is_hidden(self, policy):
         for attrib in policy.get('extendedAttributes', []):
@@ -23,7 +23,7 @@ import requests
 from vmware_nsx.plugins.nsx_v.vshield.common import exceptions
 
 
-def _xmldump(obj):
+def _xmldump(obj, parts):
     """Sort of improved xml creation method.
 
     This converts the dict to xml with following assumptions:
@@ -32,40 +32,40 @@ def _xmldump(obj):
     Keys starting with __(double underscore) are to be skipped and its
     value is processed.
     The keys are not part of any xml schema.
+    The xml content is appended to parts, to be joined once, and the
+    attributes of obj are returned.
     """
 
-    config = ""
-    attr = ""
+    attr = []
     if isinstance(obj, dict):
         for key, value in obj.items():
-            if key.startswith('__'):
+            if key.startswith('__') or key.startswith('@'):
                 # Skip the key and evaluate it's value.
-                a, x = _xmldump(value)
-                config += x
+                _xmldump(value, parts)
             elif key.startswith('_'):
-                attr += ' %s="%s"' % (key[1:], value)
+                attr.append(' %s="%s"' % (key[1:], value))
             else:
-                a, x = _xmldump(value)
-                if key.startswith('@'):
-                    cfg = "%s" % (x)
-                else:
-                    cfg = "<%s%s>%s</%s>" % (key, a, x, key)
-
-                config += cfg
+                # The start tag is set once the value attributes are known
+                index = len(parts)
+                parts.append(None)
+                a = _xmldump(value, parts)
+                parts[index] = "<%s%s>" % (key, a)
+                parts.append("</%s>" % key)
     elif isinstance(obj, list):
         for value in obj:
-            a, x = _xmldump(value)
-            attr += a
-            config += x
+            attr.append(_xmldump(value, parts))
     else:
-        config = obj
+        parts.append("%s" % (obj,))
 
-    return attr, config
+    return ''.join(attr)
 
 
 def xmldumps(obj):
-    attr, xml = _xmldump(obj)
-    return xml
+    if not isinstance(obj, (dict, list)):
+        return obj
+    parts = []
+    _xmldump(obj, parts)
+    return ''.join(parts)
 
 
 class VcnsApiHelper(object):
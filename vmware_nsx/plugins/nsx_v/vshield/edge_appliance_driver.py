@@ -12,7 +12,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from distutils import version
 import random
 import time
 
@@ -31,6 +30,7 @@ from vmware_nsx.common import utils
 from vmware_nsx.db import nsxv_db
 from vmware_nsx.plugins.nsx_v.vshield.common import constants
 from vmware_nsx.plugins.nsx_v.vshield.common import exceptions
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
 from vmware_nsx.plugins.nsx_v.vshield import edge_utils
 from vmware_nsx.plugins.nsx_v.vshield.tasks import (
     constants as task_constants)
@@ -519,7 +519,8 @@ class EdgeApplianceDriver(object):
                               edge_id, size)
                     return
             ver = self.vcns.get_version()
-            if version.LooseVersion(ver) < version.LooseVersion('6.2.3'):
+            if not utils.nsxv_supports(
+                    ver, nsxv_constants.EDGE_UPDATE_ALL_KEYS):
                 # remove some data that will make the update fail
                 edge_utils.remove_irrelevant_keys_from_edge_request(edge)
 
@@ -544,6 +545,7 @@ class EdgeApplianceDriver(object):
             LOG.warning("Router Binding for %s not found", router_id)
 
         if edge_id:
+            edge_fingerprints.invalidate(context, edge_id)
             try:
                 self.vcns.delete_edge(edge_id)
                 return True
@@ -645,13 +647,23 @@ class EdgeApplianceDriver(object):
             }
         }
 
+        context = q_context.get_admin_context()
+        fingerprint = edge_fingerprints.get_fingerprint(nat)
+        if edge_fingerprints.is_applied(context, edge_id,
+                                        edge_fingerprints.NAT, fingerprint):
+            return True
+
         try:
             self.vcns.update_nat_config(edge_id, nat)
-            return True
         except exceptions.VcnsApiException as e:
             LOG.exception("VCNS: Failed to create snat rule:\n%s",
                           e.response)
+            edge_fingerprints.invalidate(context, edge_id,
+                                         service=edge_fingerprints.NAT)
             return False
+        edge_fingerprints.record(context, edge_id, edge_fingerprints.NAT,
+                                 fingerprint)
+        return True
 
     def update_routes(self, edge_id, gateway, routes):
         if gateway:
@@ -683,13 +695,24 @@ class EdgeApplianceDriver(object):
                 "description": "default-gateway",
                 "gatewayAddress": gateway
             }
+        context = q_context.get_admin_context()
+        fingerprint = edge_fingerprints.get_fingerprint(request)
+        if edge_fingerprints.is_applied(context, edge_id,
+                                        edge_fingerprints.ROUTES,
+                                        fingerprint):
+            return True
+
         try:
             self.vcns.update_routes(edge_id, request)
-            return True
         except exceptions.VcnsApiException as e:
             LOG.exception("VCNS: Failed to update routes:\n%s",
                           e.response)
+            edge_fingerprints.invalidate(context, edge_id,
+                                         service=edge_fingerprints.ROUTES)
             return False
+        edge_fingerprints.record(context, edge_id, edge_fingerprints.ROUTES,
+                                 fingerprint)
+        return True
 
     def create_lswitch(self, name, tz_config, tags=None,
                        port_isolation=False, replication_mode="service"):
@@ -0,0 +1,97 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Fingerprints of the configuration last applied to each edge service
+
+A configuration is written to an edge service only if its fingerprint is not
+the one recorded for the edge service by the last successful write. The
+fingerprint is invalidated when a write fails, and when the service
+configuration is changed by other means. It expires after the nsxv
+edge_config_fingerprint_ttl, so the changes made on the NSX directly are
+eventually overwritten, as every write used to.
+"""
+
+import collections
+import datetime
+import hashlib
+
+from neutron_lib import context as n_context
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+
+from vmware_nsx.db import nsxv_db
+
+LOG = logging.getLogger(__name__)
+
+# The edge services with configuration fingerprints
+NAT = 'nat'
+ROUTES = 'routes'
+FIREWALL = 'firewall'
+DHCP = 'dhcp'
+LOADBALANCER = 'loadbalancer'
+
+# Log the skip rate of a service every this many writes
+STATS_REPORT_INTERVAL = 100
+
+# The number of skipped and issued writes, by service
+_stats = collections.defaultdict(lambda: {'skipped': 0, 'written': 0})
+
+
+def get_fingerprint(payload):
+    return hashlib.sha256(jsonutils.dumps(
+        payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def count_write(service, skipped=False):
+    stats = _stats[service]
+    stats['skipped' if skipped else 'written'] += 1
+    total = stats['skipped'] + stats['written']
+    if not total % STATS_REPORT_INTERVAL:
+        LOG.info("Skipped %(skipped)s of %(total)s edge %(service)s "
+                 "configuration writes",
+                 {'skipped': stats['skipped'], 'total': total,
+                  'service': service})
+
+
+def is_applied(context, edge_id, service, fingerprint):
+    """Return True if the configuration was already applied to the edge"""
+    ttl = cfg.CONF.nsxv.edge_config_fingerprint_ttl
+    if not ttl:
+        count_write(service)
+        return False
+    context = context or n_context.get_admin_context()
+    applied = fingerprint == nsxv_db.get_nsxv_edge_config_fingerprint(
+        context.session, edge_id, service,
+        recorded_since=timeutils.utcnow() - datetime.timedelta(seconds=ttl))
+    count_write(service, skipped=applied)
+    if applied:
+        LOG.debug("Edge %(edge)s %(service)s configuration is up to date",
+                  {'edge': edge_id, 'service': service})
+    return applied
+
+
+def record(context, edge_id, service, fingerprint):
+    context = context or n_context.get_admin_context()
+    nsxv_db.set_nsxv_edge_config_fingerprint(
+        context.session, edge_id, service, fingerprint)
+
+
+def invalidate(context, edge_id, service=None):
+    """Invalidate the fingerprints of an edge service, or of all of them"""
+    context = context or n_context.get_admin_context()
+    nsxv_db.delete_nsxv_edge_config_fingerprints(
+        context.session, edge_id, service=service)
@@ -20,6 +20,7 @@ from vmware_nsx.common import exceptions as nsx_exc
 from vmware_nsx.db import nsxv_db
 from vmware_nsx.plugins.nsx_v.vshield.common import (
     exceptions as vcns_exc)
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
 
 LOG = logging.getLogger(__name__)
 
@@ -271,12 +272,14 @@ class EdgeFirewallDriver(object):
             raise e
         nsxv_db.cleanup_nsxv_edge_firewallrule_binding(
             context.session, edge_id)
+        self._invalidate_firewall_fingerprint(context, edge_id)
 
     def update_firewall_rule(self, context, id, edge_id, firewall_rule):
         rule_map = nsxv_db.get_nsxv_edge_firewallrule_binding(
             context.session, id, edge_id)
         vcns_rule_id = rule_map.rule_vseid
         fwr_req = self._convert_firewall_rule(firewall_rule)
+        self._invalidate_firewall_fingerprint(context, edge_id)
         try:
             self.vcns.update_firewall_rule(edge_id, vcns_rule_id, fwr_req)
         except vcns_exc.VcnsApiException:
@@ -286,11 +289,14 @@ class EdgeFirewallDriver(object):
                               "with edge_id: %(edge_id)s",
                               {'rule_id': id,
                                'edge_id': edge_id})
+        finally:
+            self._invalidate_firewall_fingerprint(context, edge_id)
 
     def delete_firewall_rule(self, context, id, edge_id):
         rule_map = nsxv_db.get_nsxv_edge_firewallrule_binding(
             context.session, id, edge_id)
         vcns_rule_id = rule_map.rule_vseid
+        self._invalidate_firewall_fingerprint(context, edge_id)
         try:
             self.vcns.delete_firewall_rule(edge_id, vcns_rule_id)
         except vcns_exc.VcnsApiException:
@@ -300,6 +306,8 @@ class EdgeFirewallDriver(object):
                               "with edge_id: %(edge_id)s",
                               {'rule_id': id,
                                'edge_id': edge_id})
+        finally:
+            self._invalidate_firewall_fingerprint(context, edge_id)
         nsxv_db.delete_nsxv_edge_firewallrule_binding(
             context.session, id)
 
@@ -308,6 +316,7 @@ class EdgeFirewallDriver(object):
             context.session, ref_rule_id, edge_id)
         ref_vcns_rule_id = rule_map.rule_vseid
         fwr_req = self._convert_firewall_rule(firewall_rule)
+        self._invalidate_firewall_fingerprint(context, edge_id)
         try:
             header = self.vcns.add_firewall_rule_above(
                 edge_id, ref_vcns_rule_id, fwr_req)[0]
@@ -317,6 +326,8 @@ class EdgeFirewallDriver(object):
                               "%(rule_id)s with edge_id: %(edge_id)s",
                               {'rule_id': ref_vcns_rule_id,
                                'edge_id': edge_id})
+        finally:
+            self._invalidate_firewall_fingerprint(context, edge_id)
 
         objuri = header['location']
         fwr_vseid = objuri[objuri.rfind("/") + 1:]
@@ -334,6 +345,7 @@ class EdgeFirewallDriver(object):
         fwr_vse_next = self._get_firewall_rule_next(
             context, edge_id, ref_vcns_rule_id)
         fwr_req = self._convert_firewall_rule(firewall_rule)
+        self._invalidate_firewall_fingerprint(context, edge_id)
         if fwr_vse_next:
             ref_vcns_rule_id = fwr_vse_next['ruleId']
             try:
@@ -345,6 +357,8 @@ class EdgeFirewallDriver(object):
                                   "%(rule_id)s with edge_id: %(edge_id)s",
                                   {'rule_id': ref_vcns_rule_id,
                                    'edge_id': edge_id})
+            finally:
+                self._invalidate_firewall_fingerprint(context, edge_id)
         else:
             # append the rule at the bottom
             try:
@@ -354,6 +368,8 @@ class EdgeFirewallDriver(object):
                 with excutils.save_and_reraise_exception():
                     LOG.exception("Failed to append a firewall rule"
                                   "with edge_id: %s", edge_id)
+            finally:
+                self._invalidate_firewall_fingerprint(context, edge_id)
 
         objuri = header['location']
         fwr_vseid = objuri[objuri.rfind("/") + 1:]
@@ -377,9 +393,27 @@ class EdgeFirewallDriver(object):
                     "without reference rule_id")
             raise vcns_exc.VcnsBadRequest(resource='firewall_rule', msg=msg)
 
+    def _get_firewall_fingerprint(self, config, firewall):
+        # The neutron rule ids are not a part of the edge configuration, but
+        # the rule bindings depend on them
+        rule_ids = [rule.get('id') for rule in firewall['firewall_rule_list']]
+        return edge_fingerprints.get_fingerprint([config, rule_ids])
+
+    def _invalidate_firewall_fingerprint(self, context, edge_id):
+        # Partial rule updates invalidate the fingerprint both before and
+        # after the edge call, so that a concurrent update of the whole
+        # firewall cannot record it over the partial change
+        edge_fingerprints.invalidate(context, edge_id,
+                                     service=edge_fingerprints.FIREWALL)
+
     def update_firewall(self, edge_id, firewall, context, allow_external=True):
         config = self._convert_firewall(firewall,
                                         allow_external=allow_external)
+        fingerprint = self._get_firewall_fingerprint(config, firewall)
+        if edge_fingerprints.is_applied(context, edge_id,
+                                        edge_fingerprints.FIREWALL,
+                                        fingerprint):
+            return
 
         try:
             self.vcns.update_firewall(edge_id, config)
@@ -387,31 +421,33 @@ class EdgeFirewallDriver(object):
             with excutils.save_and_reraise_exception():
                 LOG.exception("Failed to update firewall "
                               "with edge_id: %s", edge_id)
-        vcns_fw_config = self._get_firewall(edge_id)
-        nsxv_db.cleanup_nsxv_edge_firewallrule_binding(
-            context.session, edge_id)
-
-        self._create_rule_id_mapping(
-            context, edge_id, firewall, vcns_fw_config)
-
-    def _create_rule_id_mapping(
-            self, context, edge_id, firewall, vcns_fw):
+                self._invalidate_firewall_fingerprint(context, edge_id)
+
+        # The edge rule ids are needed only for rules with bindings
+        rule_mapping = {}
+        if any(rule.get('id') for rule in firewall['firewall_rule_list']):
+            vcns_fw_config = self._get_firewall(edge_id)
+            rule_mapping = self._create_rule_id_mapping(
+                firewall, vcns_fw_config)
+        with context.session.begin(subtransactions=True):
+            nsxv_db.sync_nsxv_edge_firewallrule_bindings(
+                context.session, edge_id, rule_mapping)
+            edge_fingerprints.record(context, edge_id,
+                                     edge_fingerprints.FIREWALL, fingerprint)
+
+    def _create_rule_id_mapping(self, firewall, vcns_fw):
+        """Map the neutron rule ids to the edge rule ids"""
+        rule_mapping = {}
         for rule in vcns_fw['firewallRules']['firewallRules']:
             if rule.get('ruleTag'):
                 index = rule['ruleTag'] - 1
                 # TODO(linb):a simple filter of the retrieved rules which may
                 # be created by other operations unintentionally
                 if index < len(firewall['firewall_rule_list']):
-                    rule_vseid = rule['ruleId']
                     rule_id = firewall['firewall_rule_list'][index].get('id')
                     if rule_id:
-                        map_info = {
-                            'rule_id': rule_id,
-                            'rule_vseid': rule_vseid,
-                            'edge_id': edge_id
-                        }
-                        nsxv_db.add_nsxv_edge_firewallrule_binding(
-                            context.session, map_info)
+                        rule_mapping[rule_id] = rule['ruleId']
+        return rule_mapping
 
     def get_icmp_echo_application_ids(self):
         # check cached list first
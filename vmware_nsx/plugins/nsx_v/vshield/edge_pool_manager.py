@@ -0,0 +1,174 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import random
+
+from neutron_lib import context as q_context
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_service import loopingcall
+
+from vmware_nsx.common import locking
+from vmware_nsx.common import worker_stats
+from vmware_nsx.db import nsxv_db
+
+LOG = logging.getLogger(__name__)
+
+STATS_FILE_PREFIX = 'nsxv-edge-pool-stats-'
+STATS_COUNTERS = ('hits', 'misses', 'refills', 'refill_failures',
+                  'recycled')
+
+
+def get_pool_key(availability_zone_name, edge_type, appliance_size):
+    return '%s:%s:%s' % (availability_zone_name, edge_type, appliance_size)
+
+
+def get_pool_stats(max_age=None):
+    """Aggregate the backup edge pool statistics of all the workers
+
+    Return a dictionary of pool key to the summed counters, refill latency
+    and the current pre-warm target of the pool.
+    """
+    pools = {}
+    for worker_pools in worker_stats.load_all(STATS_FILE_PREFIX,
+                                              max_age=max_age):
+        for key, stats in worker_pools.items():
+            pool = pools.setdefault(key, dict(
+                [(counter, 0) for counter in STATS_COUNTERS],
+                refill_latency_total=0.0, refill_latency_max=0.0,
+                target=None))
+            for counter in STATS_COUNTERS:
+                pool[counter] += stats.get(counter, 0)
+            pool['refill_latency_total'] += stats.get(
+                'refill_latency_total', 0.0)
+            pool['refill_latency_max'] = max(
+                pool['refill_latency_max'],
+                stats.get('refill_latency_max', 0.0))
+            if stats.get('target') is not None:
+                pool['target'] = max(pool['target'] or 0, stats['target'])
+    return pools
+
+
+class EdgePoolManager(object):
+    """Background manager of the NSX-V backup edge pools
+
+    Tracks the edge consumption per availability zone, edge type and size.
+    The pools are replenished asynchronously up to a target which is the
+    configured minimum plus the edges consumed in the recent demand window,
+    so that bursts of router & DHCP creations are served from the pool.
+    Surplus edges above the minimum are recycled once the demand stops.
+    """
+
+    def __init__(self, edge_manager):
+        self._edge_manager = edge_manager
+        self._stats = {}
+        self._targets = {}
+        self._loop = None
+
+    def _get_stats(self, key):
+        if key not in self._stats:
+            self._stats[key] = dict(
+                [(counter, 0) for counter in STATS_COUNTERS],
+                refill_latency_total=0.0, refill_latency_max=0.0)
+        return self._stats[key]
+
+    def record_allocation(self, key, hit):
+        self._get_stats(key)['hits' if hit else 'misses'] += 1
+
+    def record_refill(self, key, latency, success):
+        stats = self._get_stats(key)
+        if not success:
+            stats['refill_failures'] += 1
+            return
+        stats['refills'] += 1
+        stats['refill_latency_total'] += latency
+        stats['refill_latency_max'] = max(stats['refill_latency_max'],
+                                          latency)
+
+    def get_target(self, key, minimum_pooled_edges):
+        """Return the number of backup edges the pool should hold"""
+        return max(self._targets.get(key, 0), minimum_pooled_edges)
+
+    def start(self):
+        interval = cfg.CONF.nsxv.backup_edge_pool_check_interval
+        if not interval or self._loop:
+            return
+        self._loop = loopingcall.FixedIntervalLoopingCall(self._check_pools)
+        # Spread the checks of the different workers over the interval
+        self._loop.start(interval, initial_delay=random.randint(1, interval))
+
+    def stop(self):
+        if self._loop:
+            self._loop.stop()
+            self._loop = None
+
+    def _get_consumption(self):
+        window = cfg.CONF.nsxv.backup_edge_pool_demand_window
+        since = (datetime.datetime.utcnow() -
+                 datetime.timedelta(seconds=window))
+        consumption = {}
+        for az_name, edge_type, appliance_size, count in (
+                nsxv_db.get_nsxv_consumed_edges_count(None, since)):
+            consumption[get_pool_key(az_name, edge_type,
+                                     appliance_size)] = count
+        return consumption
+
+    def _check_pools(self):
+        try:
+            self.check_pools()
+        except Exception:
+            LOG.exception("Failed to check the backup edge pools")
+        self._save_stats()
+
+    def check_pools(self):
+        """Resize the backup edge pools according to the recent demand"""
+        context = q_context.get_admin_context()
+        consumption = self._get_consumption()
+        edge_manager = self._edge_manager
+        azs = edge_manager._availability_zones
+        for az in azs.list_availability_zones_objects():
+            with locking.LockManager.get_lock('nsx-edge-backup-pool'):
+                edge_manager._clean_all_error_edge_bindings(context, az)
+            for edge_type, sizes in edge_manager._get_az_pool(
+                    az.name).items():
+                for appliance_size, edge_pool_range in sizes.items():
+                    key = get_pool_key(az.name, edge_type, appliance_size)
+                    minimum = edge_pool_range['minimum_pooled_edges']
+                    maximum = edge_pool_range['maximum_pooled_edges']
+                    demand = consumption.get(key, 0)
+                    target = min(minimum + demand, maximum)
+                    self._targets[key] = target
+                    # Keep released edges in the pool while there is demand
+                    # for them, and recycle them down to the minimum
+                    # once it stops
+                    upper = maximum if demand else target
+                    with locking.LockManager.get_lock('nsx-edge-backup-pool'):
+                        delta = edge_manager._check_backup_edge_pool(
+                            target, upper, appliance_size=appliance_size,
+                            edge_type=edge_type, availability_zone=az)
+                    if delta < 0:
+                        self._get_stats(key)['recycled'] -= delta
+                    if delta:
+                        LOG.info("Backup edge pool %(key)s resized by "
+                                 "%(delta)s edges, target %(target)s",
+                                 {'key': key, 'delta': delta,
+                                  'target': target})
+
+    def _save_stats(self):
+        pools = {}
+        for key, stats in self._stats.items():
+            pools[key] = dict(stats, target=self._targets.get(key))
+        worker_stats.save(STATS_FILE_PREFIX, pools)
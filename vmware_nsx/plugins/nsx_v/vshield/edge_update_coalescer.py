@@ -0,0 +1,79 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+from eventlet import event
+from oslo_log import log as logging
+
+LOG = logging.getLogger(__name__)
+
+# The parts of the edge configuration which can be updated
+INTERFACE = 'interface'
+NAT = 'nat'
+FIREWALL = 'firewall'
+ALL_PARTS = (INTERFACE, NAT, FIREWALL)
+
+
+class _PendingUpdate(object):
+    def __init__(self):
+        self.parts = set()
+        self.waiters = 0
+        self.done = event.Event()
+
+
+class EdgeUpdateCoalescer(object):
+    """Coalesce the configuration updates of an edge
+
+    Callers mark the parts of the router edge configuration which should be
+    updated. All the requests received for the same router within the
+    coalescing window are applied together by a single call to flush_func,
+    which should calculate the latest configuration of those parts from the
+    DB and apply it to the backend.
+    Each caller waits for the flush which covers its request, and gets its
+    exception if it failed.
+    """
+
+    def __init__(self, flush_func, window):
+        self._flush_func = flush_func
+        self._window = window
+        self._pending = {}
+
+    def update(self, router_id, parts=ALL_PARTS):
+        if not self._window:
+            self._flush_func(router_id, set(parts))
+            return
+
+        pending = self._pending.get(router_id)
+        if not pending:
+            pending = self._pending[router_id] = _PendingUpdate()
+            eventlet.spawn_after(self._window, self._flush, router_id)
+        pending.parts.update(parts)
+        pending.waiters += 1
+        pending.done.wait()
+
+    def _flush(self, router_id):
+        # Requests received from now on will be applied by the next flush,
+        # since this one may already be reading their data from the DB
+        pending = self._pending.pop(router_id)
+        LOG.debug("Updating %(parts)s of router %(router)s edge for "
+                  "%(num)s requests",
+                  {'parts': sorted(pending.parts), 'router': router_id,
+                   'num': pending.waiters})
+        try:
+            self._flush_func(router_id, pending.parts)
+        except Exception as e:
+            pending.done.send_exception(e)
+        else:
+            pending.done.send()
@@ -13,7 +13,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from distutils import version
 import os
 import random
 import time
@@ -50,6 +49,8 @@ from vmware_nsx.plugins.nsx_v import availability_zones as nsx_az
 from vmware_nsx.plugins.nsx_v.vshield.common import (
     constants as vcns_const)
 from vmware_nsx.plugins.nsx_v.vshield.common import exceptions as nsxapi_exc
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
+from vmware_nsx.plugins.nsx_v.vshield import edge_pool_manager
 from vmware_nsx.plugins.nsx_v.vshield import vcns
 
 WORKER_POOL_SIZE = 8
@@ -202,6 +203,7 @@ class EdgeManager(object):
         self.nsxv_plugin = nsxv_manager.callbacks.plugin
         self.plugin = plugin
         self.per_interface_rp_filter = self._get_per_edge_rp_filter_state()
+        self.pool_manager = edge_pool_manager.EdgePoolManager(self)
         self._check_backup_edge_pools()
         self._service_edge_size_dict = parse_service_edge_size()
 
@@ -226,10 +228,8 @@ class EdgeManager(object):
         return self._worker_pool
 
     def _get_per_edge_rp_filter_state(self):
-        ver = self.nsxv_manager.vcns.get_version()
-        if version.LooseVersion(ver) < version.LooseVersion('6.2.0'):
-            return False
-        return True
+        return c_utils.nsxv_supports(self.nsxv_manager.vcns.get_version(),
+                                     nsxv_constants.PER_EDGE_RP_FILTER)
 
     def _mark_router_bindings_status_error(self, context, edge_id,
                                            error_reason="backend error"):
@@ -293,10 +293,27 @@ class EdgeManager(object):
                 'id': router_id,
                 'name': router_id}
             self._get_worker_pool().spawn_n(
-                self._deploy_edge, None, fake_router,
+                self._deploy_backup_edge, fake_router,
                 appliance_size=appliance_size, edge_type=edge_type,
                 availability_zone=availability_zone)
 
+    def _deploy_backup_edge(self, lrouter, appliance_size, edge_type,
+                            availability_zone):
+        key = edge_pool_manager.get_pool_key(
+            availability_zone.name, edge_type, appliance_size)
+        start = time.time()
+        try:
+            edge_id = self._deploy_edge(None, lrouter,
+                                        appliance_size=appliance_size,
+                                        edge_type=edge_type,
+                                        availability_zone=availability_zone)
+        except Exception:
+            self.pool_manager.record_refill(key, time.time() - start, False)
+            raise
+        self.pool_manager.record_refill(key, time.time() - start,
+                                        bool(edge_id))
+        return edge_id
+
     def _delete_edge(self, context, router_binding):
         if router_binding['status'] == constants.ERROR:
             LOG.warning("Start deleting %(router_id)s  corresponding "
@@ -412,7 +429,11 @@ class EdgeManager(object):
                                 appliance_size=nsxv_constants.COMPACT,
                                 edge_type=nsxv_constants.SERVICE_EDGE,
                                 availability_zone=None):
-        """Check edge pool's status and return one available edge for use."""
+        """Resize the edge pool to be within the given bounds
+
+        Return the number of backup edges added to the pool, or a negative
+        number of the edges removed from it.
+        """
         admin_ctx = q_context.get_admin_context()
         backup_router_bindings = self._get_backup_edge_bindings(
             admin_ctx, appliance_size=appliance_size, edge_type=edge_type,
@@ -440,6 +461,7 @@ class EdgeManager(object):
             self._delete_backup_edges_at_backend(
                 admin_ctx,
                 backup_router_bindings[:backup_num - maximum_pooled_edges])
+            return maximum_pooled_edges - backup_num
         elif backup_num < minimum_pooled_edges:
             self._deploy_backup_edges_at_backend(
                 admin_ctx,
@@ -447,6 +469,8 @@ class EdgeManager(object):
                 appliance_size=appliance_size,
                 edge_type=edge_type,
                 availability_zone=availability_zone)
+            return len(router_ids)
+        return 0
 
     def check_edge_active_at_backend(self, edge_id):
         try:
@@ -715,6 +739,10 @@ class EdgeManager(object):
                 nsxv_db.update_nsxv_router_binding(
                     context.session, available_router_binding['router_id'],
                     status=constants.PENDING_UPDATE)
+        pool_key = edge_pool_manager.get_pool_key(
+            availability_zone.name, edge_type, appliance_size)
+        self.pool_manager.record_allocation(
+            pool_key, bool(available_router_binding))
         # Synchronously deploy an edge if no available edge in pool.
         if not available_router_binding:
             # store router-edge mapping binding
@@ -764,8 +792,12 @@ class EdgeManager(object):
         backup_num = len(self._get_backup_edge_bindings(
             context, appliance_size=appliance_size, edge_type=edge_type,
             db_update_lock=True, availability_zone=availability_zone))
+        # Replenish the pool up to its pre-warm target, which accounts for
+        # the recently observed edge consumption
+        pool_target = self.pool_manager.get_target(
+            pool_key, edge_pool_range['minimum_pooled_edges'])
         router_ids = self._deploy_backup_edges_on_db(
-            context, edge_pool_range['minimum_pooled_edges'] - backup_num,
+            context, pool_target - backup_num,
             appliance_size=appliance_size, edge_type=edge_type,
             availability_zone=availability_zone)
         self._deploy_backup_edges_at_backend(
@@ -839,6 +871,8 @@ class EdgeManager(object):
 
                 # Clean all edge vnic bindings
                 nsxv_db.clean_edge_vnic_binding(context.session, edge_id)
+                # The edge configuration will be rebuilt for its next user
+                edge_fingerprints.invalidate(context, edge_id)
                 # Refresh edge_vnic_bindings for centralized router
                 if not dist and edge_id:
                     nsxv_db.init_edge_vnic_binding(context.session, edge_id)
@@ -1147,8 +1181,17 @@ class EdgeManager(object):
             'featureType': "dhcp_4.0",
             'enabled': True,
             'staticBindings': {'staticBindings': static_bindings}}
-        self.nsxv_manager.vcns.reconfigure_dhcp_service(
-            edge_id, dhcp_request)
+        fingerprint = edge_fingerprints.get_fingerprint(dhcp_request)
+        if edge_fingerprints.is_applied(context, edge_id,
+                                        edge_fingerprints.DHCP, fingerprint):
+            return
+        try:
+            self.nsxv_manager.vcns.reconfigure_dhcp_service(
+                edge_id, dhcp_request)
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                edge_fingerprints.invalidate(context, edge_id,
+                                             service=edge_fingerprints.DHCP)
         bindings_get = get_dhcp_binding_mappings(self.nsxv_manager, edge_id)
         # Refresh edge_dhcp_static_bindings attached to edge
         nsxv_db.clean_edge_dhcp_static_bindings_by_edge(
@@ -1156,6 +1199,8 @@ class EdgeManager(object):
         for mac_address, binding_id in bindings_get.items():
             nsxv_db.create_edge_dhcp_static_binding(context.session, edge_id,
                                                     mac_address, binding_id)
+        edge_fingerprints.record(context, edge_id, edge_fingerprints.DHCP,
+                                 fingerprint)
 
     def _get_random_available_edge(self, available_edge_ids):
         while available_edge_ids:
@@ -1856,6 +1901,8 @@ class EdgeManager(object):
             dhcp_binding = nsxv_db.get_edge_dhcp_static_binding(
                 context.session, edge_id, mac_address)
             if dhcp_binding:
+                edge_fingerprints.invalidate(context, edge_id,
+                                             service=edge_fingerprints.DHCP)
                 with locking.LockManager.get_lock(str(edge_id)):
                     # We need to read the binding from the NSX to check that
                     # we are not deleting a updated entry. This may be the
@@ -1866,8 +1913,13 @@ class EdgeManager(object):
                     # The hostname is the port_id so we have a unique
                     # identifier
                     if binding and binding['hostname'] == port_id:
-                        self.nsxv_manager.vcns.delete_dhcp_binding(
-                            edge_id, dhcp_binding.binding_id)
+                        try:
+                            self.nsxv_manager.vcns.delete_dhcp_binding(
+                                edge_id, dhcp_binding.binding_id)
+                        finally:
+                            edge_fingerprints.invalidate(
+                                context, edge_id,
+                                service=edge_fingerprints.DHCP)
                     else:
                         LOG.warning("Failed to find binding on edge "
                                     "%(edge_id)s for port "
@@ -1947,12 +1999,19 @@ class EdgeManager(object):
                      'edge_id': edge_id})
                 return
 
+            edge_fingerprints.invalidate(context, edge_id,
+                                         service=edge_fingerprints.DHCP)
             configured_bindings = []
             try:
                 for binding in bindings:
                     with locking.LockManager.get_lock(str(edge_id)):
-                        binding_id = self._create_dhcp_binding(
-                            context, edge_id, binding)
+                        try:
+                            binding_id = self._create_dhcp_binding(
+                                context, edge_id, binding)
+                        finally:
+                            edge_fingerprints.invalidate(
+                                context, edge_id,
+                                service=edge_fingerprints.DHCP)
                     configured_bindings.append((binding_id,
                                                 binding['macAddress']))
             except nsxapi_exc.VcnsApiException:
@@ -1961,6 +2020,9 @@ class EdgeManager(object):
                         with locking.LockManager.get_lock(str(edge_id)):
                             self.nsxv_manager.vcns.delete_dhcp_binding(
                                 edge_id, binding_id)
+                            edge_fingerprints.invalidate(
+                                context, edge_id,
+                                service=edge_fingerprints.DHCP)
                             nsxv_db.delete_edge_dhcp_static_binding(
                                 context.session, edge_id, mac_address)
         else:
@@ -2172,8 +2234,8 @@ def _get_dhcp_binding(nsxv_manager, edge_id, binding_id):
 
 def get_dhcp_binding_for_binding_id(nsxv_manager, edge_id, binding_id):
     # API for specific binding is supported in NSX 6.2.8 and 6.3.3 onwards
-    ver = nsxv_manager.vcns.get_version()
-    if c_utils.is_nsxv_dhcp_binding_supported(ver):
+    if c_utils.nsxv_supports(nsxv_manager.vcns.get_version(),
+                             nsxv_constants.DHCP_BINDING_API):
         return _get_dhcp_binding(nsxv_manager, edge_id, binding_id)
     return _get_dhcp_binding_for_binding_id(nsxv_manager, edge_id, binding_id)
 
@@ -2428,7 +2490,8 @@ def update_nat_rules(nsxv_manager, context, router_id, snat, dnat, az=None):
             # from 6.2.4 onwards, unspecified vnic will result
             # in binding the rule to all interfaces
             ver = nsxv_manager.vcns.get_version()
-            if version.LooseVersion(ver) < version.LooseVersion('6.2.4'):
+            if not c_utils.nsxv_supports(
+                    ver, nsxv_constants.NAT_RULES_ALL_VNICS):
                 LOG.debug("NSX version %s requires explicit nat rule "
                           "for each interface", ver)
                 edge_id = binding['edge_id']
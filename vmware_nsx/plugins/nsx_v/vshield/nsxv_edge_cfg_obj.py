@@ -14,16 +14,27 @@
 #    under the License.
 
 import abc
+import hashlib
 
+from oslo_log import log as logging
 from oslo_serialization import jsonutils
 
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
 from vmware_nsx.plugins.nsx_v.vshield import vcns
 
+LOG = logging.getLogger(__name__)
+
+
+def _get_fingerprint(payload):
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
 
 class NsxvEdgeCfgObj(object, metaclass=abc.ABCMeta):
 
     def __init__(self):
-        return
+        # The edge and the payload fingerprint of an object read from the
+        # backend
+        self._loaded_from = None
 
     @abc.abstractmethod
     def get_service_name(self):
@@ -46,17 +57,41 @@ class NsxvEdgeCfgObj(object, metaclass=abc.ABCMeta):
 
         return v
 
+    def _get_payload(self):
+        return jsonutils.dumps(self.serializable_payload(), sort_keys=True)
+
+    def mark_loaded(self, edge_id):
+        """Record that the object holds the current configuration of the edge
+
+        Submitting it unchanged to the same edge is skipped.
+        """
+        self._loaded_from = (edge_id, _get_fingerprint(self._get_payload()))
+
     def submit_to_backend(self, vcns_obj, edge_id):
         uri = "%s/%s/%s/config" % (vcns.URI_PREFIX,
                                    edge_id,
                                    self.get_service_name())
 
-        payload = jsonutils.dumps(self.serializable_payload(), sort_keys=True)
+        payload = self._get_payload()
+        fingerprint = _get_fingerprint(payload)
+        # The configuration is read from the edge before it is changed, so
+        # comparing it with the read configuration also covers the changes
+        # made by other means
+        skipped = self._loaded_from == (edge_id, fingerprint)
+        edge_fingerprints.count_write(self.get_service_name(),
+                                      skipped=skipped)
+        if skipped:
+            LOG.debug("Skipping the update of unchanged %(service)s "
+                      "configuration of edge %(edge)s",
+                      {'service': self.get_service_name(), 'edge': edge_id})
+            return
 
         if payload:
-            return vcns_obj.do_request(
+            result = vcns_obj.do_request(
                 vcns.HTTP_PUT,
                 uri,
                 payload,
                 format='json',
                 encode=False)
+            self._loaded_from = (edge_id, fingerprint)
+            return result
@@ -224,6 +224,7 @@ class NsxvLoadbalancer(nsxv_edge_cfg_obj.NsxvEdgeCfgObj):
 
             lb_obj.add_virtual_server(v_s)
 
+        lb_obj.mark_loaded(edge_id)
         return lb_obj
 
 
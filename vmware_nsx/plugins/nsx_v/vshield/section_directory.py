@@ -0,0 +1,124 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import xml.etree.ElementTree as et
+
+from oslo_log import log as logging
+
+from vmware_nsx.plugins.nsx_v.vshield import xml_codec
+
+LOG = logging.getLogger(__name__)
+
+L3_SECTIONS_TAG = 'layer3Sections'
+
+
+def get_section_id_from_uri(section_uri):
+    return section_uri.split('?')[0].rstrip('/').split('/')[-1]
+
+
+def get_section_attrib(section_xml):
+    """Return the attributes of the section element of a section response
+
+    Only the start tag of the section element is parsed, as it precedes the
+    section rules.
+    """
+    try:
+        return xml_codec.get_root_attrib(section_xml, tag='section')
+    except et.ParseError:
+        return {}
+
+
+class SectionDirectory(object):
+    """Directory of the known DFW sections
+
+    Keeps the id of the sections by name, and the latest known ETag of each
+    section, as learned from the sections responses. This spares fetching the
+    whole DFW configuration to look a section up, and fetching a section only
+    to read its ETag before updating it.
+    Entries are dropped when the backend reports them as stale.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._etags = {}
+        self.default_l3_id = None
+
+    def get_id(self, name):
+        return self._ids.get(name)
+
+    def get_etag(self, section_id):
+        return self._etags.get(section_id)
+
+    def learn(self, section_id, name=None, etag=None):
+        if not section_id:
+            return
+        if name and self._ids.get(name) != section_id:
+            # Drop the previous name of a renamed section
+            for known_name, known_id in list(self._ids.items()):
+                if known_id == section_id:
+                    del self._ids[known_name]
+            # Keep the existing section of a duplicate name, as the lookups
+            # return the first section of each name
+            self._ids.setdefault(name, section_id)
+        if etag:
+            self._etags[section_id] = etag
+        else:
+            self._etags.pop(section_id, None)
+
+    def learn_response(self, section_uri, headers, content=None):
+        """Learn a section from the headers and content of its response"""
+        if section_uri is None and headers:
+            section_uri = headers.get('location')
+        if not section_uri:
+            return
+        attrib = get_section_attrib(content)
+        self.learn(attrib.get('id') or get_section_id_from_uri(section_uri),
+                   name=attrib.get('name'),
+                   etag=headers.get('etag') if headers else None)
+
+    def drop_etag(self, section_id):
+        self._etags.pop(section_id, None)
+
+    def forget(self, section_id):
+        self._etags.pop(section_id, None)
+        for name, known_id in list(self._ids.items()):
+            if known_id == section_id:
+                del self._ids[name]
+        if self.default_l3_id == section_id:
+            self.default_l3_id = None
+
+    def load(self, firewall_config):
+        """Learn all the sections of a DFW configuration payload
+
+        Only the start tags of the sections are parsed.
+        """
+        ids = {}
+        l3_section_id = None
+        for sec in xml_codec.iter_spans(firewall_config, 'section'):
+            # Keep the first section of each name, as the lookups always did
+            ids.setdefault(sec.attrib.get('name'), sec.attrib['id'])
+            if sec.depth == 2 and sec.parent == L3_SECTIONS_TAG:
+                l3_section_id = sec.attrib['id']
+        ids.pop(None, None)
+        self._ids = ids
+        if l3_section_id:
+            self.default_l3_id = l3_section_id
+        LOG.debug("Loaded %s DFW sections to the sections directory",
+                  len(ids))
+
+    def clear(self):
+        self._ids = {}
+        self._etags = {}
+        self.default_l3_id = None
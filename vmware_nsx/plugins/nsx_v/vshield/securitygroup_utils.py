@@ -19,6 +19,7 @@ from oslo_config import cfg
 from oslo_log import log as logging
 
 from vmware_nsx.common import utils
+from vmware_nsx.plugins.nsx_v.vshield import xml_codec
 
 WAIT_INTERVAL = 2000
 MAX_ATTEMPTS = 5
@@ -146,9 +147,8 @@ class NsxSecurityGroupUtils(object):
         return ruleTag
 
     def get_rule_id_pair_from_section(self, resp):
-        root = et.fromstring(resp)
         pairs = []
-        for rule in root.findall('rule'):
+        for rule in xml_codec.iter_elements(resp, ('rule',)):
             pair = {'nsx_id': rule.attrib.get('id'),
                     'neutron_id': rule.find('name').text}
             pairs.append(pair)
@@ -158,20 +158,74 @@ class NsxSecurityGroupUtils(object):
         # fix section existing rules before extending it with new rules
         # TODO(asarfaty): Validate if this is needed for all NSX versions
         for rule in section.iter('rule'):
-            services = rule.find('services')
-            if services:
-                for service in services:
-                    subProt = service.find('subProtocolName')
-                    icmpCode = service.find('icmpCode')
-                    if (icmpCode is not None and icmpCode.text == '0' and
-                        subProt is not None and
-                        subProt.text in ('echo-request', 'echo-reply')):
-                        # ICMP code should not exist in the payload
-                        service.remove(icmpCode)
+            self._fix_existing_rule(rule)
+
+    def _fix_existing_rule(self, rule):
+        fixed = False
+        services = rule.find('services')
+        if services:
+            for service in services:
+                subProt = service.find('subProtocolName')
+                icmpCode = service.find('icmpCode')
+                if (icmpCode is not None and icmpCode.text == '0' and
+                    subProt is not None and
+                    subProt.text in ('echo-request', 'echo-reply')):
+                    # ICMP code should not exist in the payload
+                    service.remove(icmpCode)
+                    fixed = True
+        return fixed
 
     def extend_section_with_rules(self, section, nsx_rules):
         section.extend(nsx_rules)
 
+    def extend_section(self, section_xml, nsx_rules):
+        """Return the section payload with the new rules appended to it
+
+        Only the existing rules which need to be fixed are parsed and
+        serialized again.
+        """
+        data = xml_codec.to_bytes(section_xml)
+        new_rules = b''.join(self.to_xml_string(rule) for rule in nsx_rules)
+        if b'<icmpCode' not in data:
+            return xml_codec.splice(section_xml, [xml_codec.append(
+                xml_codec.get_root_span(data), new_rules)])
+        changes = []
+        for span in xml_codec.iter_spans(data, ('rule',), with_root=True):
+            if span.depth == 0:
+                changes.append(xml_codec.append(span, new_rules))
+            elif b'<icmpCode' in data[span.start:span.end]:
+                rule = xml_codec.get_element(data, span)
+                if self._fix_existing_rule(rule):
+                    changes.append(xml_codec.replace(
+                        span, self.to_xml_string(rule)))
+        return xml_codec.splice(section_xml, changes)
+
+    def update_section_attributes(self, section_xml, name=None, logged=None):
+        """Update the section name and its rules logging option
+
+        Only the start tags of the changed section and rules are rewritten.
+        Return the updated section payload, or None if nothing changed.
+        """
+        if logged is None:
+            # Only the section start tag is parsed
+            spans = [xml_codec.get_root_span(section_xml)]
+            value = None
+        else:
+            spans = xml_codec.iter_spans(section_xml, ('rule',),
+                                         with_root=True)
+            value = 'true' if logged else 'false'
+        changes = []
+        for span in spans:
+            if span.depth == 0:
+                if name is not None and span.attrib.get('name') != name:
+                    changes.append(xml_codec.set_attrib(
+                        span, dict(span.attrib, name=name)))
+            elif span.attrib.get('logged') != value:
+                changes.append(xml_codec.set_attrib(
+                    span, dict(span.attrib, logged=value)))
+        if changes:
+            return xml_codec.splice(section_xml, changes)
+
     def parse_section(self, xml_string):
         return et.fromstring(xml_string)
 
@@ -188,8 +242,7 @@ class NsxSecurityGroupUtils(object):
         return 'SG Section: %s' % self.get_nsx_sg_name(sg_data)
 
     def parse_and_get_section_id(self, section_xml):
-        section = et.fromstring(section_xml)
-        return section.attrib['id']
+        return xml_codec.get_root_attrib(section_xml)['id']
 
     def is_section_logged(self, section):
         # Determine if this section rules are being logged by the first rule
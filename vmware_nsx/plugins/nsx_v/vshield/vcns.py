@@ -25,6 +25,7 @@ from vmware_nsx.common import utils
 from vmware_nsx.plugins.nsx_v.vshield.common import constants
 from vmware_nsx.plugins.nsx_v.vshield.common import exceptions
 from vmware_nsx.plugins.nsx_v.vshield.common import VcnsApiClient
+from vmware_nsx.plugins.nsx_v.vshield import section_directory
 
 LOG = logging.getLogger(__name__)
 
@@ -32,6 +33,8 @@ HTTP_GET = "GET"
 HTTP_POST = "POST"
 HTTP_DELETE = "DELETE"
 HTTP_PUT = "PUT"
+# The status of a conditional request with a stale ETag
+HTTP_PRECONDITION_FAILED = 412
 URI_PREFIX = "/api/4.0/edges"
 
 #FwaaS constants
@@ -63,6 +66,7 @@ APP_RULE_RESOURCE = "applicationrules"
 
 # IPsec VPNaaS Constants
 IPSEC_VPN_SERVICE = 'ipsec/config'
+IPSEC_VPN_STATISTICS = 'ipsec/statistics'
 
 # Dhcp constants
 DHCP_SERVICE = "dhcp/config"
@@ -122,6 +126,7 @@ class Vcns(object):
         self._nsx_version = None
         self._normalized_scoping_objects = None
         self._normalized_global_objects = None
+        self._sections = section_directory.SectionDirectory()
 
     @retry_upon_exception(exceptions.ServiceConflict)
     @retry_upon_exception(exceptions.ResourceConnectionError)
@@ -506,6 +511,10 @@ class Vcns(object):
         uri = self._build_uri_path(edge_id, IPSEC_VPN_SERVICE)
         return self.do_request(HTTP_GET, uri)
 
+    def get_ipsec_statistics(self, edge_id):
+        uri = self._build_uri_path(edge_id, IPSEC_VPN_STATISTICS)
+        return self.do_request(HTTP_GET, uri)
+
     @retry_upon_exception(exceptions.RequestBad)
     def create_virtual_wire(self, vdn_scope_id, request):
         """Creates a VXLAN virtual wire
@@ -658,8 +667,10 @@ class Vcns(object):
         sec_type = FIREWALL_REDIRECT_SEC_TYPE
         uri = '%s/%s?autoSaveDraft=false' % (FIREWALL_PREFIX, sec_type)
         uri += '&operation=insert_before&anchorId=1002'
-        return self.do_request(HTTP_POST, uri, request, format='xml',
+        h, c = self.do_request(HTTP_POST, uri, request, format='xml',
                                decode=False, encode=False)
+        self._sections.learn_response(None, h, c)
+        return h, c
 
     def create_section(self, type, request,
                        insert_top=False, insert_before=None):
@@ -681,34 +692,47 @@ class Vcns(object):
             uri += '&operation=insert_before&anchorId=%s' % insert_before
         else:
             uri += '&operation=insert_before&anchorId=1003'
-        return self.do_request(HTTP_POST, uri, request, format='xml',
+        h, c = self.do_request(HTTP_POST, uri, request, format='xml',
                                decode=False, encode=False)
+        self._sections.learn_response(None, h, c)
+        return h, c
 
     def update_section(self, section_uri, request, h):
         """Replaces a section in nsx rule table."""
         uri = '%s?autoSaveDraft=false' % section_uri
-        headers = self._get_section_header(section_uri, h)
-        return self.do_request(HTTP_PUT, uri, request, format='xml',
-                               decode=False, encode=False, headers=headers)
+        h, c = self._section_request(HTTP_PUT, section_uri, uri, h,
+                                     params=request, format='xml',
+                                     decode=False, encode=False)
+        self._sections.learn_response(section_uri, h, c)
+        return h, c
 
     def delete_section(self, section_uri):
         """Deletes a section in nsx rule table."""
         uri = '%s?autoSaveDraft=false' % section_uri
+        self._sections.forget(
+            section_directory.get_section_id_from_uri(section_uri))
         return self.do_request(HTTP_DELETE, uri, format='xml', decode=False)
 
     def get_section(self, section_uri):
-        return self.do_request(HTTP_GET, section_uri, format='xml',
-                               decode=False)
+        try:
+            h, c = self.do_request(HTTP_GET, section_uri, format='xml',
+                                   decode=False)
+        except exceptions.ResourceNotFound:
+            self._sections.forget(
+                section_directory.get_section_id_from_uri(section_uri))
+            raise
+        self._sections.learn_response(section_uri, h, c)
+        return h, c
+
+    def _load_section_directory(self):
+        h, firewall_config = self.get_dfw_config()
+        self._sections.load(firewall_config)
 
     def get_default_l3_id(self):
         """Retrieve the id of the default l3 section."""
-        h, firewall_config = self.get_dfw_config()
-        root = utils.normalize_xml(firewall_config)
-        for child in root:
-            if str(child.tag) == 'layer3Sections':
-                sections = list(child.iter('section'))
-                default = sections[-1]
-                return default.attrib['id']
+        if not self._sections.default_l3_id:
+            self._load_section_directory()
+        return self._sections.default_l3_id
 
     def get_dfw_config(self):
         uri = FIREWALL_PREFIX
@@ -717,16 +741,18 @@ class Vcns(object):
     def update_dfw_config(self, request, h):
         uri = FIREWALL_PREFIX
         headers = self._get_section_header(None, h)
+        # The whole configuration is replaced
+        self._sections.clear()
         return self.do_request(HTTP_PUT, uri, request, format='xml',
                                decode=False, encode=False, headers=headers)
 
     def get_section_id(self, section_name):
         """Retrieve the id of a section from nsx."""
-        h, firewall_config = self.get_dfw_config()
-        root = utils.normalize_xml(firewall_config)
-        for sec in root.iter('section'):
-            if sec.attrib['name'] == section_name:
-                return sec.attrib['id']
+        section_id = self._sections.get_id(section_name)
+        if not section_id:
+            self._load_section_directory()
+            section_id = self._sections.get_id(section_name)
+        return section_id
 
     def update_section_by_id(self, id, type, request):
         """Update a section while building its uri from the id."""
@@ -738,26 +764,72 @@ class Vcns(object):
         self.update_section(section_uri, request, h=None)
 
     def _get_section_header(self, section_uri, h=None):
+        if h is None and section_uri:
+            etag = self._sections.get_etag(
+                section_directory.get_section_id_from_uri(section_uri))
+            if etag:
+                h = {'etag': etag}
         if h is None:
-            h, c = self.do_request(HTTP_GET, section_uri, format='xml',
-                                   decode=False)
+            h, c = self.get_section(section_uri)
         etag = h['etag']
         # remove extra "" from the etag
         etag = etag.replace('"', '')
         headers = {'If-Match': etag}
         return headers
 
-    def remove_rule_from_section(self, section_uri, rule_id):
+    def _section_request(self, method, section_uri, uri, h=None, **kwargs):
+        """Issue a conditional request on a section, or on its rules
+
+        The ETag of the section is taken from the given headers, the sections
+        directory, or a section GET, in this order. A stale ETag from the
+        directory means that the section was changed by another client, and
+        the request is retried once with the current ETag.
+        """
+        section_id = section_directory.get_section_id_from_uri(section_uri)
+        cached = h is None and bool(self._sections.get_etag(section_id))
+        headers = self._get_section_header(section_uri, h)
+        try:
+            h, c = self.do_request(method, uri, headers=headers, **kwargs)
+        except exceptions.VcnsApiException as e:
+            if (isinstance(e, exceptions.ResourceNotFound) and
+                    uri.split('?')[0] == section_uri):
+                self._sections.forget(section_id)
+            else:
+                self._sections.drop_etag(section_id)
+            if not cached or e.status != HTTP_PRECONDITION_FAILED:
+                raise
+            LOG.debug("Section %s was changed by another client, retrying "
+                      "with its current ETag", section_id)
+            headers = self._get_section_header(section_uri)
+            h, c = self.do_request(method, uri, headers=headers, **kwargs)
+        # The section generation changes with every update of the section or
+        # of its rules
+        self._sections.learn(section_id, etag=h.get('etag') if h else None)
+        return h, c
+
+    def add_rule_to_section(self, section_uri, request, h=None):
+        """Appends a rule to a section in nsx rule table."""
+        uri = '%s/rules?autoSaveDraft=false' % section_uri
+        return self._section_request(HTTP_POST, section_uri, uri, h,
+                                     params=request, format='xml',
+                                     decode=False, encode=False)
+
+    def update_rule_in_section(self, section_uri, rule_id, request, h=None):
+        """Replaces a rule of a section in nsx rule table."""
+        uri = '%s/rules/%s?autoSaveDraft=false' % (section_uri, rule_id)
+        return self._section_request(HTTP_PUT, section_uri, uri, h,
+                                     params=request, format='xml',
+                                     decode=False, encode=False)
+
+    def remove_rule_from_section(self, section_uri, rule_id, h=None):
         """Deletes a rule from nsx section table."""
         uri = '%s/rules/%s?autoSaveDraft=false' % (section_uri, rule_id)
-        headers = self._get_section_header(section_uri)
-        return self.do_request(HTTP_DELETE, uri, format='xml',
-                               headers=headers)
+        return self._section_request(HTTP_DELETE, section_uri, uri, h,
+                                     format='xml')
 
     def get_section_rules(self, section_uri):
-        headers = self._get_section_header(section_uri)
-        h, c = self.do_request(HTTP_GET, section_uri,
-                               headers=headers, decode=True)
+        h, c = self._section_request(HTTP_GET, section_uri, section_uri,
+                                     decode=True)
         return c['rules']
 
     @retry_upon_exception(exceptions.RequestBad)
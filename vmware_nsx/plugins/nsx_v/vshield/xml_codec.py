@@ -0,0 +1,262 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Streaming codec of the NSX-V XML payloads
+
+The DFW sections and configuration may hold tens of thousands of rules.
+Instead of loading a whole payload into an ElementTree, the payload is parsed
+incrementally, keeping one element of interest at a time, or scanned for the
+byte spans of the elements of interest. Changes are spliced into the original
+payload at those spans, so only the changed elements are serialized again.
+"""
+
+import re
+from xml.parsers import expat
+from xml.sax import saxutils
+import xml.etree.ElementTree as et
+
+# Size of the chunks fed to the parser
+PARSE_CHUNK_SIZE = 65536
+
+# Any path element of an elements path
+ANY = '*'
+
+_START_TAG_RE = re.compile(
+    br'<[^\s/>]+(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*\s*/?>')
+
+
+class _StopScan(Exception):
+    pass
+
+
+class Span(object):
+    """The byte span of an element in a payload"""
+
+    __slots__ = ('tag', 'attrib', 'parent', 'depth', 'start',
+                 'start_tag_end', 'empty', 'end_tag_start', 'end')
+
+    def __init__(self, data, tag, attrib, parent, depth, start):
+        self.tag = tag
+        self.attrib = attrib
+        self.parent = parent
+        self.depth = depth
+        self.start = start
+        self.start_tag_end = _START_TAG_RE.match(data, start).end()
+        self.empty = data[self.start_tag_end - 2:self.start_tag_end] == b'/>'
+        if self.empty:
+            self.end_tag_start = self.end = self.start_tag_end
+        else:
+            self.end_tag_start = self.end = None
+
+
+def to_bytes(xml):
+    return xml.encode('utf-8') if isinstance(xml, str) else xml
+
+
+def _like(data, xml):
+    return data.decode('utf-8') if isinstance(xml, str) else data
+
+
+def _match_path(path, tags, tag):
+    # tags are the ancestors of the element, starting with the root
+    if not isinstance(path, tuple):
+        return bool(tags) and path == tag
+    if len(tags) != len(path) or (path[-1] != ANY and path[-1] != tag):
+        return False
+    for expected, actual in zip(path[:-1], tags[1:]):
+        if expected != ANY and expected != actual:
+            return False
+    return True
+
+
+def _parse(parser, data):
+    try:
+        for offset in range(0, len(data), PARSE_CHUNK_SIZE):
+            parser.Parse(data[offset:offset + PARSE_CHUNK_SIZE], False)
+            yield
+        parser.Parse(b'', True)
+    except _StopScan:
+        pass
+    except expat.ExpatError as e:
+        raise et.ParseError(str(e))
+
+
+def iter_spans(xml, path, with_root=False):
+    """Yield the spans of the elements at a path below the root element
+
+    The path is a tuple of tags, which may be ANY, or a tag to match the
+    elements of at any depth below the root element. The spans are yielded in
+    the document order of their end, and the span of the root element is
+    yielded last if requested.
+    """
+    data = to_bytes(xml)
+    if not data:
+        return
+    parser = expat.ParserCreate()
+    # The elements below the path are not tracked
+    max_depth = len(path) if isinstance(path, tuple) else None
+    tags = []
+    open_spans = []
+    spans = []
+
+    def start(tag, attrib):
+        depth = len(tags)
+        if max_depth is None or depth <= max_depth:
+            open_spans.append(Span(data, tag, attrib,
+                                   tags[-1] if tags else None, depth,
+                                   parser.CurrentByteIndex))
+        tags.append(tag)
+
+    def end(tag):
+        tags.pop()
+        if max_depth is not None and len(tags) > max_depth:
+            return
+        span = open_spans.pop()
+        if not span.empty:
+            span.end_tag_start = parser.CurrentByteIndex
+            span.end = data.index(b'>', span.end_tag_start) + 1
+        if _match_path(path, tags, tag) or (with_root and not tags):
+            spans.append(span)
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    for _chunk in _parse(parser, data):
+        while spans:
+            yield spans.pop(0)
+    for span in spans:
+        yield span
+
+
+def get_root_span(xml):
+    """Return the span of the root element, parsing only its start tag
+
+    The end of the root element is the last end tag of the payload.
+    """
+    data = to_bytes(xml)
+    if not data:
+        return None
+    parser = expat.ParserCreate()
+    root = []
+
+    def start(tag, attrib):
+        root.append(Span(data, tag, attrib, None, 0, parser.CurrentByteIndex))
+        raise _StopScan()
+
+    parser.StartElementHandler = start
+    for _chunk in _parse(parser, data):
+        pass
+    if not root:
+        return None
+    span = root[0]
+    if not span.empty:
+        span.end_tag_start = data.rindex(b'</' + span.tag.encode('utf-8'))
+        span.end = data.index(b'>', span.end_tag_start) + 1
+    return span
+
+
+def get_element(xml, span):
+    """Parse the element of a span"""
+    return et.fromstring(to_bytes(xml)[span.start:span.end])
+
+
+def iter_elements(xml, path):
+    """Yield the parsed elements at a path below the root element
+
+    Each element is dropped from the parsed tree once yielded, as well as
+    the other children of the root element once parsed, so only one of them
+    is kept at a time.
+    """
+    data = to_bytes(xml)
+    if not data:
+        return
+    parser = et.XMLPullParser(events=('start', 'end'))
+    elements = []
+    tags = []
+    for offset in range(0, len(data), PARSE_CHUNK_SIZE):
+        parser.feed(data[offset:offset + PARSE_CHUNK_SIZE])
+        for event, element in parser.read_events():
+            if event == 'start':
+                elements.append(element)
+                tags.append(element.tag)
+                continue
+            elements.pop()
+            tags.pop()
+            if _match_path(path, tags, element.tag):
+                yield element
+                elements[-1].remove(element)
+            elif len(elements) == 1:
+                elements[0].remove(element)
+    parser.close()
+
+
+def get_root_attrib(xml, tag=None):
+    """Return the attributes of the root element
+
+    Only the start tag of the root element is parsed. An empty dict is
+    returned if the root element is not of the given tag.
+    """
+    span = get_root_span(xml)
+    if span is None or (tag is not None and span.tag != tag):
+        return {}
+    return span.attrib
+
+
+def format_start_tag(tag, attrib, empty=False):
+    return '<%s%s%s>' % (
+        tag,
+        ''.join(' %s=%s' % (key, saxutils.quoteattr(value))
+                for key, value in attrib.items()),
+        '/' if empty else '')
+
+
+def set_attrib(span, attrib):
+    """Return the change replacing the attributes of the element of a span"""
+    start_tag = format_start_tag(span.tag, attrib, empty=span.empty)
+    return span.start, span.start_tag_end, start_tag
+
+
+def replace(span, content):
+    """Return the change replacing the element of a span"""
+    return span.start, span.end, content
+
+
+def remove(span):
+    return span.start, span.end, b''
+
+
+def append(span, content):
+    """Return the change appending content to the element of a span"""
+    if span.empty:
+        return (span.start, span.end, b''.join([
+            to_bytes(format_start_tag(span.tag, span.attrib)),
+            to_bytes(content),
+            to_bytes('</%s>' % span.tag)]))
+    return span.end_tag_start, span.end_tag_start, content
+
+
+def splice(xml, changes):
+    """Return the payload with the (start, end, content) changes applied
+
+    The payload is returned with the type it was given with.
+    """
+    data = to_bytes(xml)
+    parts = []
+    offset = 0
+    for start, end, content in sorted(changes, key=lambda c: c[:2]):
+        parts.append(data[offset:start])
+        parts.append(to_bytes(content))
+        offset = end
+    parts.append(data[offset:])
+    return _like(b''.join(parts), xml)
@@ -87,6 +87,7 @@ from vmware_nsx.extensions import secgroup_rule_local_ip_prefix
 from vmware_nsx.extensions import securitygrouplogging as sg_logging
 from vmware_nsx.plugins.common.housekeeper import housekeeper
 from vmware_nsx.plugins.common_v3 import plugin as nsx_plugin_common
+from vmware_nsx.plugins.common_v3 import topology_cache
 from vmware_nsx.plugins.common_v3 import utils as common_utils
 from vmware_nsx.plugins.nsx import utils as tvd_utils
 from vmware_nsx.plugins.nsx_v3 import availability_zones as nsx_az
@@ -774,10 +775,15 @@ class NsxV3Plugin(nsx_plugin_common.NsxPluginV3Base,
             dhcp_rpc_agent_api.DhcpAgentNotifyAPI()
         )
 
-    def _get_edge_cluster(self, tier0_uuid, router):
+    def _get_edge_cluster(self, context, tier0_uuid, router):
         az = self._get_router_az_obj(router)
         if az and az._edge_cluster_uuid:
             return az._edge_cluster_uuid
+        return topology_cache.get_attribute(
+            context, tier0_uuid, topology_cache.EDGE_CLUSTER,
+            lambda: self._get_tier0_edge_cluster(tier0_uuid))
+
+    def _get_tier0_edge_cluster(self, tier0_uuid):
         if (not self.tier0_groups_dict.get(tier0_uuid) or not self.
                 tier0_groups_dict[tier0_uuid].get('edge_cluster_uuid')):
             self.nsxlib.router.validate_tier0(self.tier0_groups_dict,
@@ -853,18 +859,22 @@ class NsxV3Plugin(nsx_plugin_common.NsxPluginV3Base,
         if binding.binding_type == utils.NsxV3NetworkTypes.GENEVE:
             return True
         if binding.binding_type == utils.NsxV3NetworkTypes.NSX_NETWORK:
-            # check the backend network
-            # TODO(asarfaty): Keep TZ type in DB to avoid going to the backend
-            ls = self.nsxlib.logical_switch.get(binding.phy_uuid)
-            tz = ls.get('transport_zone_id')
-            if tz:
-                # This call is cached on the nsxlib side
-                backend_type = self.nsxlib.transport_zone.get_transport_type(
-                    tz)
-                return (backend_type ==
-                        self.nsxlib.transport_zone.TRANSPORT_TYPE_OVERLAY)
+            # check the backend network TZ type, which is cached in the DB
+            backend_type = topology_cache.get_attribute(
+                context, binding.phy_uuid, topology_cache.TRANSPORT_TYPE,
+                lambda: self._get_logical_switch_transport_type(
+                    binding.phy_uuid))
+            return (backend_type ==
+                    self.nsxlib.transport_zone.TRANSPORT_TYPE_OVERLAY)
         return False
 
+    def _get_logical_switch_transport_type(self, ls_id):
+        ls = self.nsxlib.logical_switch.get(ls_id)
+        tz = ls.get('transport_zone_id')
+        if tz:
+            # This call is cached on the nsxlib side
+            return self.nsxlib.transport_zone.get_transport_type(tz)
+
     def _tier0_validator(self, tier0_uuid):
         self.nsxlib.router.validate_tier0(self.tier0_groups_dict, tier0_uuid)
 
@@ -1979,7 +1989,8 @@ class NsxV3Plugin(nsx_plugin_common.NsxPluginV3Base,
                          "gateway") % router_id)
             raise n_exc.InvalidInput(error_message=err_msg)
 
-        edge_cluster_uuid = self._get_edge_cluster(tier0_uuid, router)
+        edge_cluster_uuid = self._get_edge_cluster(context, tier0_uuid,
+                                                   router)
         nsx_router_id = nsx_db.get_nsx_router_id(context.session,
                                                  router_id)
         self.nsxlib.logical_router.update(
@@ -3239,39 +3250,52 @@ class NsxV3Plugin(nsx_plugin_common.NsxPluginV3Base,
         if not router['external_gateway_info']:
             return
 
-        LOG.info("Recalculating snat rules for router %s", router['id'])
         fips = router['external_gateway_info']['external_fixed_ips']
         ext_addrs = [fip['ip_address'] for fip in fips]
         gw_address_scope = self._get_network_address_scope(
             context, router['external_gateway_info']['network_id'])
+        if not gw_address_scope:
+            return
 
-        # TODO(annak): improve amount of backend calls by rebuilding all
-        # snat rules when API is available
+        LOG.info("Recalculating snat rules for router %s", router['id'])
+        # Calculate the snat rules required for those subnets: only subnets
+        # which are not under the same address scope with the GW need them
+        required_rules = set()
         for subnet in subnets:
-            if gw_address_scope:
-                subnet_address_scope = self._get_subnetpool_address_scope(
-                    context, subnet['subnetpool_id'])
-                LOG.info("Deleting SNAT rule for %(router)s "
-                         "and subnet %(subnet)s",
-                         {'router': router['id'],
-                          'subnet': subnet['id']})
-
-                # Delete rule for this router/subnet pair if it exists
+            subnet_address_scope = self._get_subnetpool_address_scope(
+                context, subnet['subnetpool_id'])
+            if gw_address_scope != subnet_address_scope:
                 for ext_addr in ext_addrs:
-                    self.nsxlib.router.delete_gw_snat_rule_by_source(
-                        nsx_router_id, ext_addr, subnet['cidr'],
-                        skip_not_found=True)
-
-                    if (gw_address_scope != subnet_address_scope):
-                        # subnet is no longer under same address scope with GW
-                        LOG.info("Adding SNAT rule for %(router)s "
-                                 "and subnet %(subnet)s",
-                                 {'router': router['id'],
-                                  'subnet': subnet['id']})
-                        self.nsxlib.router.add_gw_snat_rule(
-                            nsx_router_id, ext_addr,
-                            source_net=subnet['cidr'],
-                            bypass_firewall=False)
+                    required_rules.add((ext_addr, subnet['cidr']))
+
+        # Read the router nat rules once, and delete the snat rules of
+        # those subnets which are no longer required, or duplicated
+        subnets_cidrs = set(subnet['cidr'] for subnet in subnets)
+        nat_rules = self.nsxlib.logical_router.list_nat_rules(
+            nsx_router_id)['results']
+        existing_rules = set()
+        for rule in nat_rules:
+            if (rule.get('action') != 'SNAT' or
+                rule.get('translated_network') not in ext_addrs or
+                rule.get('match_source_network') not in subnets_cidrs):
+                continue
+            rule_key = (rule['translated_network'],
+                        rule['match_source_network'])
+            if rule_key in required_rules and rule_key not in existing_rules:
+                existing_rules.add(rule_key)
+                continue
+            LOG.info("Deleting SNAT rule for %(router)s and cidr %(cidr)s",
+                     {'router': router['id'], 'cidr': rule_key[1]})
+            self.nsxlib.logical_router.delete_nat_rule(
+                nsx_router_id, rule['id'])
+
+        # Add the missing snat rules
+        for ext_addr, cidr in sorted(required_rules - existing_rules):
+            LOG.info("Adding SNAT rule for %(router)s and cidr %(cidr)s",
+                     {'router': router['id'], 'cidr': cidr})
+            self.nsxlib.router.add_gw_snat_rule(
+                nsx_router_id, ext_addr, source_net=cidr,
+                bypass_firewall=False)
 
     def _get_tier0_uplink_cidrs(self, tier0_id):
         # return a list of tier0 uplink ip/prefix addresses
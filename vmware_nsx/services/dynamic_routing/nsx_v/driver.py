@@ -13,8 +13,10 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import eventlet
 import netaddr
 
+from neutron.db.models import l3 as l3_db_models
 from neutron_dynamic_routing.extensions import bgp as bgp_ext
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -35,6 +37,7 @@ from vmware_nsx.extensions import projectpluginmap
 from vmware_nsx.plugins.nsx_v.vshield.common import exceptions as vcns_exc
 
 LOG = logging.getLogger(__name__)
+MAX_EDGE_UPDATE_THREADS = 10
 
 
 def ip_prefix(name, ip_address):
@@ -127,15 +130,40 @@ class NSXvBgpDriver(object):
             self._get_dynamic_routing_edge_list(context,
                                                 bgp_speaker['networks'][0],
                                                 bgp_speaker_id))
+        edge_subnets = self._query_edges_tenant_subnets(context,
+                                                        edge_router_dict)
         for edge_id, edge_router_config in edge_router_dict.items():
             bgp_identifier = edge_router_config['bgp_identifier']
-            subnets = self._query_tenant_subnets(
-                context, edge_router_config['no_snat_routers'])
+            subnets = edge_subnets[edge_id]
             routes.extend([(subnet['cidr'], bgp_identifier)
                            for subnet in subnets])
         routes = self._plugin._make_advertised_routes_list(routes)
         return self._plugin._make_advertised_routes_dict(routes)
 
+    def _get_routers_edge_info(self, context, router_ids):
+        """Return the edge info of several routers using bulk queries
+
+        Return a dictionary of router id: (edge id, advertise static routes)
+        for the routers which are bound to an edge.
+        """
+        if not router_ids:
+            return {}
+        edge_bindings = nsxv_db.get_nsxv_router_bindings(
+            context.session, filters={'router_id': router_ids})
+        edges_info = {}
+        for edge_binding in edge_bindings:
+            router_id = edge_binding['router_id']
+            if edge_binding['edge_type'] != nsxv_constants.SERVICE_EDGE:
+                # Distributed router, the PLR edge should be used
+                edge_id, advertise_static_routes = (
+                    self._get_router_edge_info(context, router_id))
+            else:
+                edge_id = edge_binding['edge_id']
+                advertise_static_routes = False
+            if edge_id:
+                edges_info[router_id] = (edge_id, advertise_static_routes)
+        return edges_info
+
     def _get_dynamic_routing_edge_list(self, context,
                                        gateway_network_id, bgp_speaker_id):
         # Filter the routers attached this network as gateway interface
@@ -144,21 +172,29 @@ class NSXvBgpDriver(object):
         fields = ['device_id', 'fixed_ips']
         gateway_ports = self._core_plugin.get_ports(context, filters=filters,
                                                     fields=fields)
+        router_ids = [port['device_id'] for port in gateway_ports]
 
         bgp_bindings = nsxv_db.get_nsxv_bgp_speaker_bindings(
             context.session, bgp_speaker_id)
         binding_info = {bgp_binding['edge_id']: bgp_binding['bgp_identifier']
                         for bgp_binding in bgp_bindings}
 
+        # Load all the routers and their edges with a few bulk queries
+        snat_routers = {}
+        if router_ids:
+            router_qry = context.session.query(l3_db_models.Router).filter(
+                l3_db_models.Router.id.in_(router_ids))
+            snat_routers = {router.id: router.enable_snat
+                            for router in router_qry}
+        edges_info = self._get_routers_edge_info(context, router_ids)
+
         edge_router_dict = {}
         for port in gateway_ports:
             router_id = port['device_id']
-            router = self._core_plugin._get_router(context, router_id)
-            edge_id, advertise_static_routes = (
-                self._get_router_edge_info(context, router_id))
-            if not edge_id:
+            if router_id not in edges_info or router_id not in snat_routers:
                 # Shared router is not attached on any edge
                 continue
+            edge_id, advertise_static_routes = edges_info[router_id]
 
             if edge_id not in edge_router_dict:
                 bgp_identifier = binding_info.get(
@@ -168,7 +204,7 @@ class NSXvBgpDriver(object):
                                              bgp_identifier,
                                              'advertise_static_routes':
                                              advertise_static_routes}
-            if not router.enable_snat:
+            if not snat_routers[router_id]:
                 edge_router_dict[edge_id]['no_snat_routers'].append(router_id)
         return edge_router_dict
 
@@ -182,27 +218,92 @@ class NSXvBgpDriver(object):
                 az_name)
         return md_proxy
 
+    def _get_md_proxies_for_routers(self, context, router_ids):
+        bindings = nsxv_db.get_nsxv_router_bindings(
+            context.session, filters={'router_id': router_ids})
+        return {binding['router_id']:
+                self._core_plugin.get_metadata_proxy_handler(
+                    binding['availability_zone'])
+                for binding in bindings}
+
+    def _query_tenant_subnets_by_router(self, context, router_ids):
+        """Query the subnets attached to a set of routers in bulk
+
+        Return a dictionary of router id: list of subnets with id and cidr
+        """
+        router_subnets = {router_id: [] for router_id in router_ids}
+        if not router_ids:
+            return router_subnets
+        filters = {'device_id': list(router_ids),
+                   'device_owner': [n_const.DEVICE_OWNER_ROUTER_INTF]}
+        int_ports = self._core_plugin.get_ports(
+            context, filters=filters, fields=['device_id', 'fixed_ips'])
+        # We need to skip metadata subnets
+        md_proxies = self._get_md_proxies_for_routers(context, router_ids)
+        router_subnet_ids = []
+        for p in int_ports:
+            router_id = p['device_id']
+            subnet_id = p['fixed_ips'][0]['subnet_id']
+            md_proxy = md_proxies.get(router_id)
+            if md_proxy and md_proxy.is_md_subnet(subnet_id):
+                continue
+            router_subnet_ids.append((router_id, subnet_id))
+
+        subnet_ids = list(set(subnet_id for _r, subnet_id in
+                              router_subnet_ids))
+        subnets_cidr = {}
+        if subnet_ids:
+            subnets = self._core_plugin.get_subnets(
+                context, filters={'id': subnet_ids}, fields=['id', 'cidr'])
+            subnets_cidr = {subnet['id']: subnet['cidr']
+                            for subnet in subnets}
+        for router_id, subnet_id in router_subnet_ids:
+            if subnet_id in subnets_cidr:
+                router_subnets[router_id].append(
+                    {'id': subnet_id, 'cidr': subnets_cidr[subnet_id]})
+        return router_subnets
+
     def _query_tenant_subnets(self, context, router_ids):
         # Query subnets attached to all of routers attached to same edge
+        router_subnets = self._query_tenant_subnets_by_router(
+            context, router_ids)
         subnets = []
         for router_id in router_ids:
-            filters = {'device_id': [router_id],
-                       'device_owner': [n_const.DEVICE_OWNER_ROUTER_INTF]}
-            int_ports = self._core_plugin.get_ports(context,
-                                                    filters=filters,
-                                                    fields=['fixed_ips'])
-            # We need to skip metadata subnets
-            md_proxy = self._get_md_proxy_for_router(context, router_id)
-            for p in int_ports:
-                subnet_id = p['fixed_ips'][0]['subnet_id']
-                if md_proxy and md_proxy.is_md_subnet(subnet_id):
-                    continue
-                subnet = self._core_plugin.get_subnet(context, subnet_id)
-                subnets.append({'id': subnet_id,
-                                'cidr': subnet['cidr']})
+            subnets.extend(router_subnets[router_id])
         LOG.debug("Got related subnets %s", subnets)
         return subnets
 
+    def _query_edges_tenant_subnets(self, context, edge_router_dict):
+        """Query the subnets of all the edges of a speaker together
+
+        Return a dictionary of edge id: list of subnets
+        """
+        all_router_ids = []
+        for edge_router_config in edge_router_dict.values():
+            all_router_ids.extend(edge_router_config['no_snat_routers'])
+        router_subnets = self._query_tenant_subnets_by_router(
+            context, all_router_ids)
+        edge_subnets = {}
+        for edge_id, edge_router_config in edge_router_dict.items():
+            edge_subnets[edge_id] = []
+            for router_id in edge_router_config['no_snat_routers']:
+                edge_subnets[edge_id].extend(router_subnets[router_id])
+        return edge_subnets
+
+    def _update_edges(self, edge_ids, update_func):
+        """Run a backend update on several edges concurrently
+
+        update_func gets an edge id, and should return True on success.
+        Return the list of edges which were updated successfully.
+        """
+        if not edge_ids:
+            return []
+        pool = eventlet.GreenPool(min(MAX_EDGE_UPDATE_THREADS,
+                                      len(edge_ids)))
+        results = pool.imap(update_func, edge_ids)
+        return [edge_id for edge_id, result in zip(edge_ids, results)
+                if result]
+
     def _get_bgp_speakers_by_bgp_peer(self, context, bgp_peer_id):
         fields = ['id', 'peers']
         bgp_speakers = self._plugin.get_bgp_speakers(context, fields=fields)
@@ -244,12 +345,17 @@ class NSXvBgpDriver(object):
         edge_ids = [bgp_binding['edge_id'] for bgp_binding in bgp_bindings]
         action = 'Enabling' if new_enabled_state else 'Disabling'
         LOG.info("%s BGP route redistribution on edges: %s.", action, edge_ids)
-        for edge_id in edge_ids:
+
+        def _update_edge(edge_id):
             try:
                 self._nsxv.update_routing_redistribution(edge_id,
                                                          new_enabled_state)
             except vcns_exc.VcnsApiException:
                 LOG.warning("Failed to update BGP on edge '%s'.", edge_id)
+                return False
+            return True
+
+        self._update_edges(edge_ids, _update_edge)
 
     def delete_bgp_speaker(self, context, bgp_speaker_id):
         bgp_bindings = nsxv_db.get_nsxv_bgp_speaker_bindings(
@@ -302,6 +408,19 @@ class NSXvBgpDriver(object):
         # Update the password for the old bgp peer and update NSX
         old_bgp_peer['password'] = password
         neighbour = bgp_neighbour_from_peer(old_bgp_peer)
+
+        def _update_edge(edge_id):
+            try:
+                # Neighbours are identified by their ip address
+                self._nsxv.update_bgp_neighbours(edge_id,
+                                                 [neighbour],
+                                                 [neighbour])
+            except vcns_exc.VcnsApiException:
+                LOG.error("Failed to update BGP neighbor '%s' on "
+                          "edge '%s'", old_bgp_peer['peer_ip'], edge_id)
+                return False
+            return True
+
         for bgp_speaker_id in bgp_speaker_ids:
             with locking.LockManager.get_lock(bgp_speaker_id):
                 peers = self._plugin.get_bgp_peers_by_bgp_speaker(
@@ -310,16 +429,9 @@ class NSXvBgpDriver(object):
                     continue
                 bgp_bindings = nsxv_db.get_nsxv_bgp_speaker_bindings(
                     context.session, bgp_speaker_id)
-                for binding in bgp_bindings:
-                    try:
-                        # Neighbours are identified by their ip address
-                        self._nsxv.update_bgp_neighbours(binding['edge_id'],
-                                                         [neighbour],
-                                                         [neighbour])
-                    except vcns_exc.VcnsApiException:
-                        LOG.error("Failed to update BGP neighbor '%s' on "
-                                  "edge '%s'", old_bgp_peer['peer_ip'],
-                                  binding['edge_id'])
+                self._update_edges(
+                    [binding['edge_id'] for binding in bgp_bindings],
+                    _update_edge)
 
     def _validate_bgp_peer(self, context, bgp_speaker_id, new_peer_id):
         new_peer = self._plugin._get_bgp_peer(context, new_peer_id)
@@ -338,22 +450,27 @@ class NSXvBgpDriver(object):
         self._validate_bgp_peer(context, bgp_speaker_id, bgp_peer_obj['id'])
 
         speaker = self._plugin.get_bgp_speaker(context, bgp_speaker_id)
-        # list of tenant edge routers to be removed as bgp-neighbours to this
-        # peer if it's associated with specific ESG.
-        neighbours = []
-        for binding in bgp_bindings:
+
+        def _add_neighbour(edge_id):
             try:
-                self._nsxv.add_bgp_neighbours(binding['edge_id'], [nbr])
+                self._nsxv.add_bgp_neighbours(edge_id, [nbr])
             except vcns_exc.VcnsApiException:
-                LOG.error("Failed to add BGP neighbour on '%s'",
-                          binding['edge_id'])
-            else:
-                gw_nbr = gw_bgp_neighbour(binding['bgp_identifier'],
-                                          speaker['local_as'],
-                                          bgp_peer_obj['password'])
-                neighbours.append(gw_nbr)
-                LOG.debug("Succesfully added BGP neighbor '%s' on '%s'",
-                          bgp_peer_obj['peer_ip'], binding['edge_id'])
+                LOG.error("Failed to add BGP neighbour on '%s'", edge_id)
+                return False
+            LOG.debug("Succesfully added BGP neighbor '%s' on '%s'",
+                      bgp_peer_obj['peer_ip'], edge_id)
+            return True
+
+        edge_identifiers = {binding['edge_id']: binding['bgp_identifier']
+                            for binding in bgp_bindings}
+        # list of tenant edge routers to be added/removed as bgp-neighbours
+        # to this peer if it's associated with specific ESG.
+        updated_edges = self._update_edges(list(edge_identifiers),
+                                           _add_neighbour)
+        neighbours = [gw_bgp_neighbour(edge_identifiers[edge_id],
+                                       speaker['local_as'],
+                                       bgp_peer_obj['password'])
+                      for edge_id in updated_edges]
 
         if bgp_peer_obj.get('esg_id'):
             edge_gw = bgp_peer_obj['esg_id']
@@ -371,22 +488,27 @@ class NSXvBgpDriver(object):
         bgp_bindings = nsxv_db.get_nsxv_bgp_speaker_bindings(
             context.session, bgp_speaker_id)
         speaker = self._plugin.get_bgp_speaker(context, bgp_speaker_id)
-        # list of tenant edge routers to be removed as bgp-neighbours to this
-        # peer if it's associated with specific ESG.
-        neighbours = []
-        for binding in bgp_bindings:
+
+        def _remove_neighbour(edge_id):
             try:
-                self._nsxv.remove_bgp_neighbours(binding['edge_id'], [nbr])
+                self._nsxv.remove_bgp_neighbours(edge_id, [nbr])
             except vcns_exc.VcnsApiException:
-                LOG.error("Failed to remove BGP neighbour on '%s'",
-                          binding['edge_id'])
-            else:
-                gw_nbr = gw_bgp_neighbour(binding['bgp_identifier'],
-                                          speaker['local_as'],
-                                          bgp_peer_obj['password'])
-                neighbours.append(gw_nbr)
-                LOG.debug("Succesfully removed BGP neighbor '%s' on '%s'",
-                          bgp_peer_obj['peer_ip'], binding['edge_id'])
+                LOG.error("Failed to remove BGP neighbour on '%s'", edge_id)
+                return False
+            LOG.debug("Succesfully removed BGP neighbor '%s' on '%s'",
+                      bgp_peer_obj['peer_ip'], edge_id)
+            return True
+
+        edge_identifiers = {binding['edge_id']: binding['bgp_identifier']
+                            for binding in bgp_bindings}
+        # list of tenant edge routers to be added/removed as bgp-neighbours
+        # to this peer if it's associated with specific ESG.
+        updated_edges = self._update_edges(list(edge_identifiers),
+                                           _remove_neighbour)
+        neighbours = [gw_bgp_neighbour(edge_identifiers[edge_id],
+                                       speaker['local_as'],
+                                       bgp_peer_obj['password'])
+                      for edge_id in updated_edges]
 
         if bgp_peer_obj.get('esg_id'):
             edge_gw = bgp_peer_obj['esg_id']
@@ -439,24 +561,36 @@ class NSXvBgpDriver(object):
         bgp_peers = self._plugin.get_bgp_peers_by_bgp_speaker(
             context, bgp_speaker_id)
         local_as = speaker['local_as']
-        peers = []
-        for edge_id, edge_router_config in edge_router_dict.items():
-            router_ids = edge_router_config['no_snat_routers']
+        edge_subnets = self._query_edges_tenant_subnets(context,
+                                                        edge_router_dict)
+
+        def _configure_edge(edge_id):
+            edge_router_config = edge_router_dict[edge_id]
             advertise_static_routes = (
                 edge_router_config['advertise_static_routes'])
-            subnets = self._query_tenant_subnets(context, router_ids)
             # router_id here is in IP address format and is required for
             # the BGP configuration.
             bgp_identifier = edge_router_config['bgp_identifier']
             try:
-                self._start_bgp_on_edge(context, edge_id, speaker,
-                                        bgp_peers, bgp_identifier, subnets,
-                                        advertise_static_routes)
+                self._configure_bgp_on_edge(
+                    edge_id, speaker, bgp_peers, bgp_identifier,
+                    edge_subnets[edge_id], advertise_static_routes)
             except vcns_exc.VcnsApiException:
                 LOG.error("Failed to configure BGP speaker %s on edge '%s'.",
                           bgp_speaker_id, edge_id)
-            else:
-                peers.append(bgp_identifier)
+                return False
+            return True
+
+        configured_edges = self._update_edges(list(edge_router_dict),
+                                              _configure_edge)
+        # The DB bindings are created only after all the backend calls are
+        # done, as the DB session should not be shared between the threads
+        peers = []
+        for edge_id in configured_edges:
+            bgp_identifier = edge_router_dict[edge_id]['bgp_identifier']
+            nsxv_db.add_nsxv_bgp_speaker_binding(context.session, edge_id,
+                                                 speaker['id'], bgp_identifier)
+            peers.append(bgp_identifier)
 
         for edge_gw, password in [(peer['esg_id'], peer['password'])
                                   for peer in bgp_peers if peer.get('esg_id')]:
@@ -468,8 +602,9 @@ class NSXvBgpDriver(object):
                 LOG.error("Failed to add BGP neighbour on GW Edge '%s'",
                           edge_gw)
 
-    def _start_bgp_on_edge(self, context, edge_id, speaker, bgp_peers,
-                           bgp_identifier, subnets, advertise_static_routes):
+    def _configure_bgp_on_edge(self, edge_id, speaker, bgp_peers,
+                               bgp_identifier, subnets,
+                               advertise_static_routes):
         enabled_state = speaker['advertise_tenant_networks']
         local_as = speaker['local_as']
         prefixes, redis_rules = self._get_prefixes_and_redistribution_rules(
@@ -486,25 +621,36 @@ class NSXvBgpDriver(object):
             with excutils.save_and_reraise_exception():
                 LOG.error("Failed to configure BGP speaker '%s' on edge '%s'.",
                           speaker['id'], edge_id)
-        else:
-            nsxv_db.add_nsxv_bgp_speaker_binding(context.session, edge_id,
-                                                 speaker['id'], bgp_identifier)
+
+    def _start_bgp_on_edge(self, context, edge_id, speaker, bgp_peers,
+                           bgp_identifier, subnets, advertise_static_routes):
+        self._configure_bgp_on_edge(edge_id, speaker, bgp_peers,
+                                    bgp_identifier, subnets,
+                                    advertise_static_routes)
+        nsxv_db.add_nsxv_bgp_speaker_binding(context.session, edge_id,
+                                             speaker['id'], bgp_identifier)
 
     def _stop_bgp_on_edges(self, context, bgp_bindings, speaker_id):
         peers_to_remove = []
         speaker = self._plugin.get_bgp_speaker(context, speaker_id)
         local_as = speaker['local_as']
-        for bgp_binding in bgp_bindings:
-            edge_id = bgp_binding['edge_id']
+
+        def _delete_edge_config(edge_id):
             try:
                 self._nsxv.delete_bgp_speaker_config(edge_id)
             except vcns_exc.VcnsApiException:
                 LOG.error("Failed to delete BGP speaker '%s' config on edge "
                           "'%s'.", speaker_id, edge_id)
-            else:
-                nsxv_db.delete_nsxv_bgp_speaker_binding(context.session,
-                                                        edge_id)
-                peers_to_remove.append(bgp_binding['bgp_identifier'])
+                return False
+            return True
+
+        edge_identifiers = {bgp_binding['edge_id']:
+                            bgp_binding['bgp_identifier']
+                            for bgp_binding in bgp_bindings}
+        for edge_id in self._update_edges(list(edge_identifiers),
+                                          _delete_edge_config):
+            nsxv_db.delete_nsxv_bgp_speaker_binding(context.session, edge_id)
+            peers_to_remove.append(edge_identifiers[edge_id])
 
         # We should also remove all bgp neighbours on gw-edges which
         # corresponds with tenant routers that are associated with this bgp
@@ -16,6 +16,8 @@
 
 import xml.etree.ElementTree as et
 
+import eventlet
+from eventlet import event
 from networking_sfc.extensions import flowclassifier
 from networking_sfc.services.flowclassifier.common import exceptions as exc
 from networking_sfc.services.flowclassifier.drivers import base as fc_driver
@@ -33,22 +35,48 @@ from vmware_nsx.common import config  # noqa
 from vmware_nsx.common import exceptions as nsx_exc
 from vmware_nsx.common import locking
 from vmware_nsx.common import nsxv_constants
+from vmware_nsx.plugins.nsx_v.vshield.common import (
+    exceptions as vcns_exc)
 from vmware_nsx.plugins.nsx_v.vshield import vcns as nsxv_api
 from vmware_nsx.plugins.nsx_v.vshield import vcns_driver
+from vmware_nsx.plugins.nsx_v.vshield import xml_codec
 from vmware_nsx.services.flowclassifier.nsx_v import utils as fc_utils
 
 LOG = logging.getLogger(__name__)
 
 REDIRECT_FW_SECTION_NAME = 'OS Flow Classifier Rules'
 
+# The flow classifier changes of the redirect rules
+CREATE = 'create'
+UPDATE = 'update'
+DELETE = 'delete'
+
+
+class _RuleChange(object):
+    def __init__(self, action, flow_classifier):
+        self.action = action
+        self.flow_classifier = flow_classifier
+        # Set when the change could not be applied to the section
+        self.error = None
+
+
+class _PendingChanges(object):
+    def __init__(self):
+        self.changes = []
+        self.done = event.Event()
+
 
 class NsxvFlowClassifierDriver(fc_driver.FlowClassifierDriverBase):
     """FlowClassifier Driver For NSX-V."""
 
     _redirect_section_id = None
+    # The backend redirect rule id of each flow classifier
+    _rule_ids = None
+    _pending = None
 
     def initialize(self):
         self._nsxv = vcns_driver.VcnsDriver(None)
+        self._batch_window = cfg.CONF.nsxv.service_insertion_batch_window
         self.init_profile_id()
         self.init_security_group()
         self.init_security_group_in_profile()
@@ -188,12 +216,9 @@ class NsxvFlowClassifierDriver(fc_driver.FlowClassifierDriverBase):
             xml_section = section_resp[1]
             return et.fromstring(xml_section)
 
-    def update_redirect_section_in_backed(self, section):
+    def update_redirect_section_in_backed(self, xml_section, h=None):
         section_uri = self.get_redirect_fw_section_uri()
-        self._nsxv.vcns.update_section(
-            section_uri,
-            et.tostring(section, encoding="us-ascii"),
-            None)
+        return self._nsxv.vcns.update_section(section_uri, xml_section, h)
 
     def _rule_ip_type(self, flow_classifier):
         if flow_classifier.get('ethertype') == 'IPv6':
@@ -219,8 +244,47 @@ class NsxvFlowClassifierDriver(fc_driver.FlowClassifierDriverBase):
         return (flow_classifier.get('name')[:200] + '-' +
                 flow_classifier.get('id'))
 
-    def _is_the_same_rule(self, rule, flow_classifier_id):
-        return rule.find('name').text.endswith(flow_classifier_id)
+    def _get_rule_flow_classifier_id(self, rule):
+        # The rule name ends with the flow classifier uuid
+        name = rule.find('name')
+        if name is not None and name.text:
+            return name.text[-36:]
+
+    def _load_rule_ids(self, xml_section):
+        self._rule_ids = dict(
+            (self._get_rule_flow_classifier_id(rule), rule.attrib.get('id'))
+            for rule in xml_codec.iter_elements(xml_section, 'rule'))
+
+    def _get_rule_id(self, flow_classifier_id, refresh=False):
+        """Return the backend redirect rule id of a flow classifier
+
+        The rules created by other servers are found by reading the section
+        again.
+        """
+        if (refresh or self._rule_ids is None or
+                flow_classifier_id not in self._rule_ids):
+            h, c = self._nsxv.vcns.get_section(
+                self.get_redirect_fw_section_uri())
+            self._load_rule_ids(c)
+        return self._rule_ids.get(flow_classifier_id)
+
+    def _build_redirect_rule(self, flow_classifier):
+        redirect_rule = et.Element('rule')
+        self.init_redirect_fw_rule(redirect_rule, flow_classifier)
+        return redirect_rule
+
+    def _retry_on_stale_section(self, func, *args):
+        # Concurrent changes of the section by other servers change its ETag
+        max_attempts = cfg.CONF.nsxv.retries
+        for attempt in range(1, max_attempts + 1):
+            try:
+                return func(*args)
+            except vcns_exc.VcnsApiException as e:
+                if (e.status != nsxv_api.HTTP_PRECONDITION_FAILED or
+                        attempt == max_attempts):
+                    raise
+                LOG.debug("Redirect section was changed concurrently, "
+                          "retrying (attempt %s)", attempt)
 
     def init_redirect_fw_rule(self, redirect_rule, flow_classifier):
         et.SubElement(redirect_rule, 'name').text = self._rule_name(
@@ -279,65 +343,180 @@ class NsxvFlowClassifierDriver(fc_driver.FlowClassifierDriverBase):
     def _loc_fw_section(self):
         return locking.LockManager.get_lock('redirect-fw-section')
 
+    def _create_redirect_rule(self, flow_classifier):
+        section_uri = self.get_redirect_fw_section_uri()
+        h, c = self._retry_on_stale_section(
+            self._nsxv.vcns.add_rule_to_section, section_uri,
+            et.tostring(self._build_redirect_rule(flow_classifier),
+                        encoding="us-ascii"))
+        rule_id = xml_codec.get_root_attrib(c).get('id') if c else None
+        if self._rule_ids is not None and rule_id:
+            self._rule_ids[flow_classifier['id']] = rule_id
+
+    def _update_redirect_rule(self, flow_classifier):
+        section_uri = self.get_redirect_fw_section_uri()
+        # The flowclassifier plugin currently supports updating only
+        # name or description, so the rule is rebuilt from the classifier
+        request = et.tostring(self._build_redirect_rule(flow_classifier),
+                              encoding="us-ascii")
+        for refresh in (False, True):
+            rule_id = self._get_rule_id(flow_classifier['id'],
+                                        refresh=refresh)
+            if not rule_id:
+                break
+            try:
+                self._retry_on_stale_section(
+                    self._nsxv.vcns.update_rule_in_section, section_uri,
+                    rule_id, request)
+                return
+            except vcns_exc.ResourceNotFound:
+                # The rule was deleted or replaced by another server
+                LOG.debug("Redirect rule %s not found", rule_id)
+        msg = _("Failed to find redirect rule %s "
+                "on backed") % flow_classifier['id']
+        raise exc.FlowClassifierException(message=msg)
+
+    def _delete_redirect_rule(self, flow_classifier_id):
+        section_uri = self.get_redirect_fw_section_uri()
+        rule_id = self._get_rule_id(flow_classifier_id)
+        if not rule_id:
+            LOG.error("Failed to delete redirect rule %s: "
+                      "Could not find rule on backed",
+                      flow_classifier_id)
+            # should not fail the deletion
+            return
+        try:
+            self._retry_on_stale_section(
+                self._nsxv.vcns.remove_rule_from_section, section_uri,
+                rule_id)
+        except vcns_exc.ResourceNotFound:
+            LOG.info("Redirect rule %s was already deleted",
+                     flow_classifier_id)
+        self._rule_ids.pop(flow_classifier_id, None)
+
+    def _apply_changes_to_section(self, changes):
+        """Apply a batch of classifier changes with one section update
+
+        Only the rules of the changed classifiers are parsed, and the rest of
+        the section payload is sent back as is.
+        """
+        h, c = self._nsxv.vcns.get_section(self.get_redirect_fw_section_uri())
+        data = xml_codec.to_bytes(c)
+        fc_ids = set(change.flow_classifier['id'] for change in changes)
+        spans = {}
+        rules = {}
+        section_span = None
+        for span in xml_codec.iter_spans(data, ('rule',), with_root=True):
+            if span.depth == 0:
+                section_span = span
+                continue
+            rule_data = data[span.start:span.end]
+            if any(fc_id.encode('utf-8') in rule_data for fc_id in fc_ids):
+                rule = xml_codec.get_element(data, span)
+                fc_id = self._get_rule_flow_classifier_id(rule)
+                if fc_id in fc_ids:
+                    spans[fc_id] = span
+                    rules[fc_id] = rule
+        new_rules = []
+        for change in changes:
+            change.error = None
+            fc = change.flow_classifier
+            rule = rules.get(fc['id'])
+            if change.action == CREATE:
+                rule = rules[fc['id']] = self._build_redirect_rule(fc)
+                new_rules.append(fc['id'])
+            elif rule is None:
+                if change.action == UPDATE:
+                    change.error = exc.FlowClassifierException(
+                        message=_("Failed to find redirect rule %s "
+                                  "on backed") % fc['id'])
+                else:
+                    LOG.error("Failed to delete redirect rule %s: "
+                              "Could not find rule on backed", fc['id'])
+            elif change.action == UPDATE:
+                rule.find('name').text = self._rule_name(fc)
+                notes = rule.find('notes')
+                if notes is None:
+                    notes = et.SubElement(rule, 'notes')
+                notes.text = fc.get('description') or ''
+            else:
+                del rules[fc['id']]
+
+        section_changes = []
+        for fc_id, span in spans.items():
+            if fc_id in rules:
+                section_changes.append(xml_codec.replace(
+                    span, et.tostring(rules[fc_id], encoding="us-ascii")))
+            else:
+                section_changes.append(xml_codec.remove(span))
+        appended = [et.tostring(rules[fc_id], encoding="us-ascii")
+                    for fc_id in new_rules
+                    if fc_id in rules and fc_id not in spans]
+        if appended:
+            section_changes.append(
+                xml_codec.append(section_span, b''.join(appended)))
+        h, c = self.update_redirect_section_in_backed(
+            xml_codec.splice(c, section_changes), h)
+        if c:
+            self._load_rule_ids(c)
+        else:
+            self._rule_ids = None
+
+    def _flush_changes(self):
+        # Changes received from now on will be applied by the next flush
+        pending = self._pending
+        self._pending = None
+        LOG.debug("Updating the redirect section for %s flow classifier "
+                  "changes", len(pending.changes))
+        try:
+            with self._loc_fw_section():
+                self._retry_on_stale_section(self._apply_changes_to_section,
+                                             pending.changes)
+        except Exception as e:
+            pending.done.send_exception(e)
+        else:
+            pending.done.send()
+
+    def _change_redirect_rule(self, action, flow_classifier):
+        if not self._batch_window:
+            with self._loc_fw_section():
+                if action == CREATE:
+                    self._create_redirect_rule(flow_classifier)
+                elif action == UPDATE:
+                    self._update_redirect_rule(flow_classifier)
+                else:
+                    self._delete_redirect_rule(flow_classifier['id'])
+            return
+
+        # Fold the changes received within the batching window into a
+        # single update of the redirect section
+        change = _RuleChange(action, flow_classifier)
+        if not self._pending:
+            self._pending = _PendingChanges()
+            eventlet.spawn_after(self._batch_window, self._flush_changes)
+        pending = self._pending
+        pending.changes.append(change)
+        pending.done.wait()
+        if change.error:
+            raise change.error
+
     @log_helpers.log_method_call
     def create_flow_classifier(self, context):
         """Create a redirect rule at the backend
         """
-        flow_classifier = context.current
-        with self._loc_fw_section():
-            section = self.get_redirect_fw_section_from_backend()
-            new_rule = et.SubElement(section, 'rule')
-            self.init_redirect_fw_rule(new_rule, flow_classifier)
-            self.update_redirect_section_in_backed(section)
+        self._change_redirect_rule(CREATE, context.current)
 
     @log_helpers.log_method_call
     def update_flow_classifier(self, context):
         """Update the backend redirect rule
         """
-        flow_classifier = context.current
-
-        with self._loc_fw_section():
-            section = self.get_redirect_fw_section_from_backend()
-            redirect_rule = None
-            for rule in section.iter('rule'):
-                if self._is_the_same_rule(rule, flow_classifier['id']):
-                    redirect_rule = rule
-                    break
-
-            if redirect_rule is None:
-                msg = _("Failed to find redirect rule %s "
-                        "on backed") % flow_classifier['id']
-                raise exc.FlowClassifierException(message=msg)
-
-            # The flowclassifier plugin currently supports updating only
-            # name or description
-            name = redirect_rule.find('name')
-            name.text = self._rule_name(flow_classifier)
-            notes = redirect_rule.find('notes')
-            notes.text = flow_classifier.get('description') or ''
-            self.update_redirect_section_in_backed(section)
+        self._change_redirect_rule(UPDATE, context.current)
 
     @log_helpers.log_method_call
     def delete_flow_classifier(self, context):
         """Delete the backend redirect rule
         """
-        flow_classifier_id = context.current['id']
-        with self._loc_fw_section():
-            section = self.get_redirect_fw_section_from_backend()
-            redirect_rule = None
-            for rule in section.iter('rule'):
-                if self._is_the_same_rule(rule, flow_classifier_id):
-                    redirect_rule = rule
-                    section.remove(redirect_rule)
-                    break
-
-            if redirect_rule is None:
-                LOG.error("Failed to delete redirect rule %s: "
-                          "Could not find rule on backed",
-                          flow_classifier_id)
-                # should not fail the deletion
-            else:
-                self.update_redirect_section_in_backed(section)
+        self._change_redirect_rule(DELETE, context.current)
 
     @log_helpers.log_method_call
     def create_flow_classifier_precommit(self, context):
@@ -62,7 +62,7 @@ class EdgeMemberManagerFromDict(base_mgr.EdgeLoadbalancerBaseManager):
     @log_helpers.log_method_call
     def __init__(self, vcns_driver):
         super(EdgeMemberManagerFromDict, self).__init__(vcns_driver)
-        self._fw_section_id = None
+        self._fw_section_ids = {}
 
     def _get_pool_lb_id(self, member):
         if not member.get('pool'):
@@ -84,10 +84,12 @@ class EdgeMemberManagerFromDict(base_mgr.EdgeLoadbalancerBaseManager):
             member_ips.remove(address)
         return member_ips
 
-    def _get_lbaas_fw_section_id(self):
-        if not self._fw_section_id:
-            self._fw_section_id = lb_common.get_lbaas_fw_section_id(self.vcns)
-        return self._fw_section_id
+    def _get_lbaas_fw_section_id(self, pool_id):
+        shard = lb_common.get_lbaas_fw_section_shard(pool_id)
+        if shard not in self._fw_section_ids:
+            self._fw_section_ids[shard] = lb_common.get_lbaas_fw_section_id(
+                self.vcns, shard)
+        return self._fw_section_ids[shard]
 
     def create(self, context, member, completor):
         lb_id = self._get_pool_lb_id(member)
@@ -137,7 +139,7 @@ class EdgeMemberManagerFromDict(base_mgr.EdgeLoadbalancerBaseManager):
                     lb_common.update_pool_fw_rule(
                         self.vcns, member['pool_id'],
                         edge_id,
-                        self._get_lbaas_fw_section_id(),
+                        self._get_lbaas_fw_section_id(member['pool_id']),
                         member_ips)
 
             except nsxv_exc.VcnsApiException:
@@ -262,7 +264,7 @@ class EdgeMemberManagerFromDict(base_mgr.EdgeLoadbalancerBaseManager):
                     lb_common.update_pool_fw_rule(
                         self.vcns, member['pool_id'],
                         edge_id,
-                        self._get_lbaas_fw_section_id(),
+                        self._get_lbaas_fw_section_id(member['pool_id']),
                         member_ips)
 
                 completor(success=True)
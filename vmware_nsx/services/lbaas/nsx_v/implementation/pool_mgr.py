@@ -35,7 +35,7 @@ class EdgePoolManagerFromDict(base_mgr.EdgeLoadbalancerBaseManager):
     @log_helpers.log_method_call
     def __init__(self, vcns_driver):
         super(EdgePoolManagerFromDict, self).__init__(vcns_driver)
-        self._fw_section_id = None
+        self._fw_section_ids = {}
         self.pool_transparency = (
                 cfg.CONF.nsxv.use_routers_as_lbaas_platform and
                 cfg.CONF.nsxv.loadbalancer_pool_transparency)
@@ -210,10 +210,9 @@ class EdgePoolManagerFromDict(base_mgr.EdgeLoadbalancerBaseManager):
                 context, self.core_plugin, lb_binding['edge_id'])
 
             if old_lb:
-                lb_common.update_pool_fw_rule(self.vcns, pool['id'],
-                                              edge_id,
-                                              self._get_lbaas_fw_section_id(),
-                                              [])
+                lb_common.update_pool_fw_rule(
+                    self.vcns, pool['id'], edge_id,
+                    self._get_lbaas_fw_section_id(pool['id']), [])
 
         except nsxv_exc.VcnsApiException:
             completor(success=False)
@@ -222,7 +221,9 @@ class EdgePoolManagerFromDict(base_mgr.EdgeLoadbalancerBaseManager):
     def delete_cascade(self, context, pool, completor):
         self.delete(context, pool, completor)
 
-    def _get_lbaas_fw_section_id(self):
-        if not self._fw_section_id:
-            self._fw_section_id = lb_common.get_lbaas_fw_section_id(self.vcns)
-        return self._fw_section_id
+    def _get_lbaas_fw_section_id(self, pool_id):
+        shard = lb_common.get_lbaas_fw_section_shard(pool_id)
+        if shard not in self._fw_section_ids:
+            self._fw_section_ids[shard] = lb_common.get_lbaas_fw_section_id(
+                self.vcns, shard)
+        return self._fw_section_ids[shard]
@@ -13,25 +13,30 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
 import xml.etree.ElementTree as et
 
 import netaddr
 
 from neutron_lib import constants
 from neutron_lib import exceptions as n_exc
+from oslo_config import cfg
 from oslo_log import log as logging
 
 from vmware_nsx._i18n import _
 from vmware_nsx.common import locking
 from vmware_nsx.db import nsxv_db
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
 from vmware_nsx.plugins.nsx_v.vshield import edge_utils
 from vmware_nsx.plugins.nsx_v.vshield import vcns as nsxv_api
+from vmware_nsx.plugins.nsx_v.vshield import xml_codec
 
 LOG = logging.getLogger(__name__)
 
 MEMBER_ID_PFX = 'member-'
 RESOURCE_ID_PFX = 'lbaas-'
 LBAAS_FW_SECTION_NAME = 'LBaaS FW Rules'
+LBAAS_FW_SECTION_LOCK = 'lbaas-fw-section'
 LBAAS_DEVICE_OWNER = constants.DEVICE_OWNER_NEUTRON_PREFIX + 'LB'
 
 
@@ -273,9 +278,20 @@ def extract_resource_id(location_uri):
     return uri_elements[-1]
 
 
+def _invalidate_firewall_fingerprint(edge_id):
+    edge_fingerprints.invalidate(None, edge_id,
+                                 service=edge_fingerprints.FIREWALL)
+
+
 def set_lb_firewall_default_rule(vcns, edge_id, action):
+    # The fingerprint is invalidated again once the rule is written, in case
+    # a concurrent update of the whole firewall recorded it meanwhile
+    _invalidate_firewall_fingerprint(edge_id)
     with locking.LockManager.get_lock(edge_id):
-        vcns.update_firewall_default_policy(edge_id, {'action': action})
+        try:
+            vcns.update_firewall_default_policy(edge_id, {'action': action})
+        finally:
+            _invalidate_firewall_fingerprint(edge_id)
 
 
 def add_vip_fw_rule(vcns, edge_id, vip_id, ip_address):
@@ -286,16 +302,24 @@ def add_vip_fw_rule(vcns, edge_id, vip_id, ip_address):
              'enabled': True,
              'name': vip_id}]}
 
+    _invalidate_firewall_fingerprint(edge_id)
     with locking.LockManager.get_lock(edge_id):
-        h = vcns.add_firewall_rule(edge_id, fw_rule)[0]
+        try:
+            h = vcns.add_firewall_rule(edge_id, fw_rule)[0]
+        finally:
+            _invalidate_firewall_fingerprint(edge_id)
     fw_rule_id = extract_resource_id(h['location'])
 
     return fw_rule_id
 
 
 def del_vip_fw_rule(vcns, edge_id, vip_fw_rule_id):
+    _invalidate_firewall_fingerprint(edge_id)
     with locking.LockManager.get_lock(edge_id):
-        vcns.delete_firewall_rule(edge_id, vip_fw_rule_id)
+        try:
+            vcns.delete_firewall_rule(edge_id, vip_fw_rule_id)
+        finally:
+            _invalidate_firewall_fingerprint(edge_id)
 
 
 def get_edge_ip_addresses(vcns, edge_id):
@@ -317,63 +341,148 @@ def get_edge_ip_addresses(vcns, edge_id):
     return edge_ips
 
 
+def get_lbaas_fw_section_shard(pool_id, shards=None):
+    """Return the index of the LBaaS FW section holding the pool rule
+
+    The pools rules are spread across the sections by a hash of the pool id,
+    which is stable across neutron servers.
+    """
+    if shards is None:
+        shards = cfg.CONF.nsxv.lbaas_fw_section_shards
+    if shards <= 1:
+        return 0
+    digest = hashlib.sha1(pool_id.encode('utf-8')).hexdigest()
+    return int(digest, 16) % shards
+
+
+def get_lbaas_fw_section_name(shard):
+    # The first section keeps the name of the single section layout, so
+    # existing rules do not need to move unless sharding is enabled
+    if not shard:
+        return LBAAS_FW_SECTION_NAME
+    return '%s %s' % (LBAAS_FW_SECTION_NAME, shard)
+
+
+def get_lbaas_fw_section_shard_by_name(section_name):
+    """Return the section index for a LBaaS FW section name, or None"""
+    if section_name == LBAAS_FW_SECTION_NAME:
+        return 0
+    prefix, _sep, shard = section_name.rpartition(' ')
+    if prefix == LBAAS_FW_SECTION_NAME and shard.isdigit():
+        return int(shard)
+
+
+def get_lbaas_fw_section_lock(shard):
+    if not shard:
+        return LBAAS_FW_SECTION_LOCK
+    return '%s-%s' % (LBAAS_FW_SECTION_LOCK, shard)
+
+
+def get_lbaas_fw_section_uri(section_id):
+    return '%s/%s/%s' % (nsxv_api.FIREWALL_PREFIX, 'layer3sections',
+                         section_id)
+
+
+def _get_pool_fw_rule(pool_id, edge_ips, member_ips):
+    pool_rule = et.Element('rule')
+    et.SubElement(pool_rule, 'name').text = pool_id
+    et.SubElement(pool_rule, 'action').text = 'allow'
+
+    sources = et.SubElement(pool_rule, 'sources')
+    sources.attrib['excluded'] = 'false'
+    for edge_ip in edge_ips:
+        source = et.SubElement(sources, 'source')
+        et.SubElement(source, 'type').text = 'Ipv4Address'
+        et.SubElement(source, 'value').text = edge_ip
+
+    destinations = et.SubElement(pool_rule, 'destinations')
+    destinations.attrib['excluded'] = 'false'
+    for member_ip in member_ips:
+        destination = et.SubElement(destinations, 'destination')
+        et.SubElement(destination, 'type').text = 'Ipv4Address'
+        et.SubElement(destination, 'value').text = member_ip
+    return pool_rule
+
+
+def get_pool_fw_rule_id(vcns, section_uri, pool_id):
+    """Return the section headers and the id of the pool rule, or None
+
+    The pool rule is looked up without parsing the rules of other pools.
+    """
+    h, xml_section = vcns.get_section(section_uri)
+    data = xml_codec.to_bytes(xml_section)
+    for span in xml_codec.iter_spans(data, 'rule'):
+        if (pool_id.encode('utf-8') in data[span.start:span.end] and
+                xml_codec.get_element(data, span).findtext(
+                    'name') == pool_id):
+            return h, span.attrib['id']
+    return h, None
+
+
+def _remove_previous_pool_fw_rule(vcns, pool_id, shard):
+    """Remove the pool rule from its section of the previous layout
+
+    Only done while the rules are moved to the sections of a new number of
+    sections, as configured by lbaas_fw_section_previous_shards.
+    """
+    previous_shards = cfg.CONF.nsxv.lbaas_fw_section_previous_shards
+    if not previous_shards:
+        return
+    previous_shard = get_lbaas_fw_section_shard(pool_id,
+                                                shards=previous_shards)
+    if previous_shard == shard:
+        return
+    with locking.LockManager.get_lock(
+            get_lbaas_fw_section_lock(previous_shard)):
+        section_id = vcns.get_section_id(
+            get_lbaas_fw_section_name(previous_shard))
+        if not section_id:
+            return
+        section_uri = get_lbaas_fw_section_uri(section_id)
+        h, rule_id = get_pool_fw_rule_id(vcns, section_uri, pool_id)
+        if rule_id:
+            vcns.remove_rule_from_section(section_uri, rule_id, h)
+
+
 def update_pool_fw_rule(vcns, pool_id, edge_id, section_id, member_ips):
+    """Create, update or delete the pool rule in its LBaaS FW section
+
+    Only the pool rule is sent to the backend, and only the pool section is
+    locked.
+    """
     edge_ips = get_edge_ip_addresses(vcns, edge_id)
+    shard = get_lbaas_fw_section_shard(pool_id)
 
-    with locking.LockManager.get_lock('lbaas-fw-section'):
-        section_uri = '%s/%s/%s' % (nsxv_api.FIREWALL_PREFIX,
-                                    'layer3sections',
-                                    section_id)
-        xml_section = vcns.get_section(section_uri)[1]
-        section = et.fromstring(xml_section)
-        pool_rule = None
-        for rule in section.iter('rule'):
-            if rule.find('name').text == pool_id:
-                pool_rule = rule
-                sources = pool_rule.find('sources')
-                if sources:
-                    pool_rule.remove(sources)
-
-                destinations = pool_rule.find('destinations')
-                if destinations:
-                    pool_rule.remove(destinations)
-                break
-
-        if not pool_rule and member_ips:
-            pool_rule = et.SubElement(section, 'rule')
-            et.SubElement(pool_rule, 'name').text = pool_id
-            et.SubElement(pool_rule, 'action').text = 'allow'
+    with locking.LockManager.get_lock(get_lbaas_fw_section_lock(shard)):
+        section_uri = get_lbaas_fw_section_uri(section_id)
+        h, rule_id = get_pool_fw_rule_id(vcns, section_uri, pool_id)
 
         if member_ips:
-            sources = et.SubElement(pool_rule, 'sources')
-            sources.attrib['excluded'] = 'false'
-            for edge_ip in edge_ips:
-                source = et.SubElement(sources, 'source')
-                et.SubElement(source, 'type').text = 'Ipv4Address'
-                et.SubElement(source, 'value').text = edge_ip
-
-            destinations = et.SubElement(pool_rule, 'destinations')
-            destinations.attrib['excluded'] = 'false'
-            for member_ip in member_ips:
-                destination = et.SubElement(destinations, 'destination')
-                et.SubElement(destination, 'type').text = 'Ipv4Address'
-                et.SubElement(destination, 'value').text = member_ip
-        elif pool_rule:
-            section.remove(pool_rule)
-
-        vcns.update_section(section_uri,
-                            et.tostring(section, encoding="us-ascii"),
-                            None)
-
-
-def get_lbaas_fw_section_id(vcns):
+            request = et.tostring(
+                _get_pool_fw_rule(pool_id, edge_ips, member_ips),
+                encoding="us-ascii")
+            if rule_id:
+                vcns.update_rule_in_section(section_uri, rule_id, request, h)
+            else:
+                vcns.add_rule_to_section(section_uri, request, h)
+        elif rule_id:
+            vcns.remove_rule_from_section(section_uri, rule_id, h)
+
+    if not rule_id:
+        # Not nested in the pool section lock, as another pool may move its
+        # rule the other way
+        _remove_previous_pool_fw_rule(vcns, pool_id, shard)
+
+
+def get_lbaas_fw_section_id(vcns, shard=0):
     # Avoid concurrent creation of section by multiple neutron
     # instances
-    with locking.LockManager.get_lock('lbaas-fw-section'):
-        fw_section_id = vcns.get_section_id(LBAAS_FW_SECTION_NAME)
+    section_name = get_lbaas_fw_section_name(shard)
+    with locking.LockManager.get_lock(get_lbaas_fw_section_lock(shard)):
+        fw_section_id = vcns.get_section_id(section_name)
         if not fw_section_id:
             section = et.Element('section')
-            section.attrib['name'] = LBAAS_FW_SECTION_NAME
+            section.attrib['name'] = section_name
             sect = vcns.create_section('ip', et.tostring(section))[1]
             fw_section_id = et.fromstring(sect).attrib['id']
 
@@ -12,6 +12,7 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import atexit
 import copy
 import socket
 import time
@@ -32,6 +33,7 @@ from oslo_messaging.rpc import dispatcher
 
 from vmware_nsx.services.lbaas import lb_const
 from vmware_nsx.services.lbaas.octavia import constants
+from vmware_nsx.services.lbaas.octavia import status_aggregator
 
 LOG = logging.getLogger(__name__)
 STATUS_CHECKER_COUNT = 10
@@ -74,7 +76,11 @@ class NSXOctaviaListener(object):
         self.endpoints = [NSXOctaviaListenerEndpoint(
             client=self.client, loadbalancer=loadbalancer, listener=listener,
             pool=pool, member=member, healthmonitor=healthmonitor,
-            l7policy=l7policy, l7rule=l7rule)]
+            l7policy=l7policy, l7rule=l7rule,
+            status_window=cfg.CONF.octavia_status_coalesce_window)]
+        # Do not lose the coalesced statuses on shutdown
+        for endpoint in self.endpoints:
+            atexit.register(endpoint.flush_statuses)
         access_policy = dispatcher.DefaultRPCAccessPolicy
         self.octavia_server = messaging.get_rpc_server(
             transport, target, self.endpoints, executor='eventlet',
@@ -87,9 +93,11 @@ class NSXOctaviaListenerEndpoint(object):
 
     def __init__(self, client=None, loadbalancer=None, listener=None,
                  pool=None, member=None, healthmonitor=None, l7policy=None,
-                 l7rule=None):
+                 l7rule=None, status_window=0):
 
         self.client = client
+        self.status_aggregator = status_aggregator.OctaviaStatusAggregator(
+            self._cast_loadbalancer_status, status_window)
         self.loadbalancer = loadbalancer
         self.listener = listener
         self.pool = pool
@@ -297,11 +305,17 @@ class NSXOctaviaListenerEndpoint(object):
 
             LOG.debug("Octavia transaction completed with statuses %s",
                       status_dict)
-            kw = {'status': status_dict}
-            self.client.cast({}, 'update_loadbalancer_status', **kw)
+            self.status_aggregator.update(status_dict)
 
         return completor_func
 
+    def _cast_loadbalancer_status(self, status_dict):
+        kw = {'status': status_dict}
+        self.client.cast({}, 'update_loadbalancer_status', **kw)
+
+    def flush_statuses(self):
+        self.status_aggregator.flush_all()
+
     def update_listener_statistics(self, statistics):
         kw = {'statistics': statistics}
         self.client.cast({}, 'update_listener_statistics', **kw)
@@ -0,0 +1,94 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+import eventlet
+from oslo_log import log as logging
+
+from vmware_nsx.services.lbaas.octavia import constants
+
+LOG = logging.getLogger(__name__)
+
+
+class _PendingStatus(object):
+    def __init__(self):
+        # The latest status of each object, by object type and id
+        self.statuses = collections.OrderedDict()
+        self.updates = 0
+        self.timer = None
+
+    def merge(self, status_dict):
+        for obj_type, objects in status_dict.items():
+            type_statuses = self.statuses.setdefault(
+                obj_type, collections.OrderedDict())
+            for obj in objects:
+                type_statuses[obj['id']] = obj
+        self.updates += 1
+
+    def get_status_dict(self):
+        return dict((obj_type, list(objects.values()))
+                    for obj_type, objects in self.statuses.items())
+
+
+def _has_error(status_dict):
+    return any(obj.get(constants.PROVISIONING_STATUS) == constants.ERROR
+               for objects in status_dict.values() for obj in objects)
+
+
+class OctaviaStatusAggregator(object):
+    """Coalesce the Octavia status updates
+
+    The status dicts received within the coalescing window are merged,
+    keeping the latest status of each object, and sent to Octavia by a
+    single call to cast_func, whatever loadbalancers they belong to.
+    Error statuses are sent immediately, together with the pending statuses.
+    """
+
+    def __init__(self, cast_func, window):
+        self._cast_func = cast_func
+        self._window = window
+        self._pending = None
+
+    def update(self, status_dict):
+        if not self._window:
+            self._cast_func(status_dict)
+            return
+
+        if not self._pending:
+            self._pending = _PendingStatus()
+        self._pending.merge(status_dict)
+        if _has_error(status_dict):
+            self._flush()
+        elif not self._pending.timer:
+            self._pending.timer = eventlet.spawn_after(
+                self._window, self._flush)
+
+    def _flush(self):
+        pending, self._pending = self._pending, None
+        if not pending:
+            return
+        if pending.timer:
+            pending.timer.cancel()
+        LOG.debug("Sending the loadbalancer statuses of %s updates",
+                  pending.updates)
+        try:
+            self._cast_func(pending.get_status_dict())
+        except Exception as e:
+            LOG.error("Failed to send the loadbalancer statuses: %s", e)
+
+    def flush_all(self):
+        """Send all the pending statuses, used on shutdown"""
+        self._flush()
@@ -14,16 +14,22 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import eventlet
 from neutron_lib import constants
 from neutron_lib.db import constants as db_constants
 from neutron_lib.services.qos import base
 from neutron_lib.services.qos import constants as qos_consts
 from oslo_log import log as logging
 
+from vmware_nsx._i18n import _
+from vmware_nsx.common import exceptions as nsx_exc
 from vmware_nsx.extensions import projectpluginmap
+from vmware_nsx.services.qos.nsx_v import utils as qos_utils
 
 LOG = logging.getLogger(__name__)
 DRIVER = None
+# Maximal number of concurrent port groups reconfigurations on the vCenter
+UPDATE_POOL_SIZE = 10
 SUPPORTED_RULES = {
     qos_consts.RULE_TYPE_BANDWIDTH_LIMIT: {
         qos_consts.MAX_KBPS: {
@@ -73,10 +79,51 @@ class NSXvQosDriver(base.DriverBase):
     def update_policy(self, context, policy):
         # get all the bound networks of this policy
         networks = policy.get_bound_networks()
-        for net_id in networks:
-            # update the new bw limitations for this network
-            self.core_plugin._update_qos_on_backend_network(
-                context, net_id, policy.id)
+        if not networks:
+            return
+
+        # Translate the QoS rule data into Nsx values once for all the
+        # networks
+        qos_data = qos_utils.NsxVQosRule(
+            context=context, qos_policy_id=policy.id)
+
+        # Read the networks port groups from the DB before updating them
+        # concurrently
+        port_groups = [self.core_plugin._get_qos_backend_port_groups(
+            context, net_id) for net_id in networks]
+
+        def _update_network(net_id, net_port_groups):
+            try:
+                self.core_plugin._update_qos_on_backend_port_groups(
+                    net_id, net_port_groups, qos_data)
+            except Exception as e:
+                return e
+
+        pool = eventlet.GreenPool(min(UPDATE_POOL_SIZE, len(networks)))
+        failed = []
+        for index, (net_id, error) in enumerate(zip(
+                networks, pool.imap(_update_network, networks,
+                                    port_groups)), 1):
+            if error:
+                LOG.error("Failed to update QoS policy %(policy)s on "
+                          "network %(net)s: %(err)s",
+                          {'policy': policy.id, 'net': net_id, 'err': error})
+                failed.append(net_id)
+            else:
+                LOG.debug("Updated QoS policy %(policy)s on network "
+                          "%(net)s (%(index)s/%(num)s)",
+                          {'policy': policy.id, 'net': net_id,
+                           'index': index, 'num': len(networks)})
+
+        LOG.info("Updated QoS policy %(policy)s on %(num)s networks, "
+                 "%(failed)s failed",
+                 {'policy': policy.id, 'num': len(networks),
+                  'failed': len(failed)})
+        if failed:
+            error = (_("Failed to update QoS policy %(policy)s on networks "
+                       "%(nets)s") % {'policy': policy.id,
+                                      'nets': ', '.join(failed)})
+            raise nsx_exc.NsxPluginException(err_msg=error)
 
     def delete_policy(self, context, policy):
         pass
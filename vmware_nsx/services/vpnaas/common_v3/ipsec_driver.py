@@ -30,6 +30,8 @@ from vmware_nsx.services.vpnaas.common_v3 import ipsec_utils
 
 LOG = logging.getLogger(__name__)
 IPSEC = 'ipsec'
+# Maximal number of concurrent session status requests
+STATUS_POOL_SIZE = 10
 
 
 class RouterWithSNAT(nexception.BadRequest):
@@ -128,6 +130,28 @@ class NSXcommonIPsecVpnDriver(service_drivers.VpnDriver):
         status_list = [vpn_status]
         self.service_plugin.update_status_by_agent(context, status_list)
 
+    def _get_routers_connection_ids(self, context, router_ids=None):
+        """Return a dictionary of router id: ids of its VPN connections
+
+        If no routers are given, all the routers with VPN services are used.
+        """
+        filters = {'router_id': router_ids} if router_ids else None
+        services = self.vpn_plugin.get_vpnservices(
+            context.elevated(), filters=filters, fields=['id', 'router_id'])
+        if not services:
+            return {}
+        service_routers = dict((srv['id'], srv['router_id'])
+                               for srv in services)
+        filters = {'vpnservice_id': list(service_routers.keys())}
+        connections = self.vpn_plugin.get_ipsec_site_connections(
+            context.elevated(), filters=filters,
+            fields=['id', 'vpnservice_id'])
+        router_connections = {}
+        for conn in connections:
+            router_id = service_routers[conn['vpnservice_id']]
+            router_connections.setdefault(router_id, []).append(conn['id'])
+        return router_connections
+
     def _check_subnets_overlap_with_all_conns(self, context, subnets):
         # find all vpn services with connections
         filters = {'status': [constants.ACTIVE, constants.DOWN]}
@@ -312,7 +312,7 @@ class IPsecCommonValidator(vpn_validator.VpnReferenceValidator):
                                                      vpnservice_id)
         return vpnservice['external_v4_ip']
 
-    def _validate_t0_ha_mode(self, tier0_uuid):
+    def _validate_t0_ha_mode(self, context, tier0_uuid):
         pass
 
     def _validate_router(self, context, router_id):
@@ -321,7 +321,7 @@ class IPsecCommonValidator(vpn_validator.VpnReferenceValidator):
         router_db = self._core_plugin._get_router(context, router_id)
         tier0_uuid = self._core_plugin._get_tier0_uuid_by_router(context,
             router_db)
-        self._validate_t0_ha_mode(tier0_uuid)
+        self._validate_t0_ha_mode(context, tier0_uuid)
 
     def _support_endpoint_groups(self):
         """Can be implemented by each plugin"""
@@ -13,21 +13,54 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from neutron.api import extensions as neutron_extensions
+from neutron import worker as neutron_worker
+from neutron_lib import context as n_context
+from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import timeutils
 
 from neutron_vpnaas.services.vpn import plugin
 
+import vmware_nsx
+from vmware_nsx.db import db as nsx_db
+from vmware_nsx.extensions import vpnstatusrefresh
+
 LOG = logging.getLogger(__name__)
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
 
 
 class NsxVPNPlugin(plugin.VPNDriverPlugin):
     """NSX plugin for VPNaaS.
 
-    This plugin overrides get connection/s calls to issue a status update
-    before them, and make sure the connections status is up to date
+    The connections status is refreshed from the NSX by a periodic worker,
+    and get connection/s calls return the stored status.
+    If the stored status is not fresh, or the periodic refresh is disabled,
+    this plugin overrides get connection/s calls to issue a status update
+    before them, and make sure the connections status is up to date.
+    The connections also return the time their status was refreshed.
     """
+    supported_extension_aliases = (
+        plugin.VPNDriverPlugin.supported_extension_aliases +
+        [vpnstatusrefresh.ALIAS])
+
+    def __init__(self):
+        neutron_extensions.append_api_extensions_path(
+            [vmware_nsx.NSX_EXT_PATH])
+        super(NsxVPNPlugin, self).__init__()
+
+    def get_workers(self):
+        interval = cfg.CONF.vpn_status_refresh_interval
+        if interval <= 0:
+            return []
+        return [neutron_worker.PeriodicWorker(
+            self._refresh_all_connections_status, interval, interval)]
+
+    def _get_driver(self):
+        return self.drivers[self.default_provider]
+
     def _update_nsx_connection_status(self, context, ipsec_site_conn_id):
-        driver = self.drivers[self.default_provider]
+        driver = self._get_driver()
         if hasattr(driver, 'get_ipsec_site_connection_status'):
             status = driver.get_ipsec_site_connection_status(
                 context, ipsec_site_conn_id)
@@ -35,31 +68,113 @@ class NsxVPNPlugin(plugin.VPNDriverPlugin):
                 self._update_connection_status(context, ipsec_site_conn_id,
                                                status, False)
 
+    def _update_changed_connections_status(self, context, statuses):
+        """Update the DB status only of connections with a new status"""
+        connections = super(NsxVPNPlugin, self).get_ipsec_site_connections(
+            context, fields=['id', 'status'])
+        changed = 0
+        for connection in connections:
+            status = statuses.get(connection['id'])
+            if status and status != connection['status']:
+                self._update_connection_status(context, connection['id'],
+                                               status, False)
+                changed += 1
+        return changed
+
+    def _refresh_all_connections_status(self):
+        """Periodic task updating the status of all the connections"""
+        context = n_context.get_admin_context()
+        driver = self._get_driver()
+        if not hasattr(driver, 'get_ipsec_site_connections_status'):
+            return
+        try:
+            statuses = driver.get_ipsec_site_connections_status(context)
+            changed = self._update_changed_connections_status(
+                context, statuses)
+            nsx_db.set_nsx_vpn_status_refresh_time(
+                context.session, self.default_provider, timeutils.utcnow())
+        except Exception as e:
+            LOG.error("Failed to refresh the VPN connections status: %s", e)
+            return
+        LOG.debug("Refreshed the status of %(num)s VPN connections, "
+                  "%(changed)s changed",
+                  {'num': len(statuses), 'changed': changed})
+
+    def _get_fresh_status_refresh_time(self, context):
+        """Return the time of the periodic status refresh if still fresh
+
+        The status is considered fresh if the periodic refresh did not miss
+        more than a single interval.
+        """
+        interval = cfg.CONF.vpn_status_refresh_interval
+        if interval <= 0:
+            return
+        refreshed_at = nsx_db.get_nsx_vpn_status_refresh_time(
+            context.session, self.default_provider)
+        if not refreshed_at:
+            return
+        age = (timeutils.utcnow() - refreshed_at).total_seconds()
+        if age < 2 * interval:
+            LOG.debug("Using VPN connections status refreshed %s seconds "
+                      "ago", int(age))
+            return refreshed_at
+
+    def _is_connections_status_fresh(self, context):
+        """Return True if the stored connections status can be used"""
+        return self._get_fresh_status_refresh_time(context) is not None
+
+    def _get_status_refresh_time(self, context, fields, refresh_func):
+        """Return the time the status to return was refreshed
+
+        The status is refreshed by refresh_func if the stored one is not
+        fresh. None is returned if the status is not requested.
+        """
+        if (fields and 'status' not in fields and
+                vpnstatusrefresh.STATUS_REFRESHED_AT not in fields):
+            return
+        refreshed_at = self._get_fresh_status_refresh_time(context)
+        if not refreshed_at:
+            refresh_func()
+            refreshed_at = timeutils.utcnow()
+        return refreshed_at.strftime(TIME_FORMAT)
+
+    @staticmethod
+    def _extend_status_refresh_time(connection, fields, refreshed_at):
+        if not fields or vpnstatusrefresh.STATUS_REFRESHED_AT in fields:
+            connection[vpnstatusrefresh.STATUS_REFRESHED_AT] = refreshed_at
+        return connection
+
     def update_all_connection_status(self, context):
         connections = super(NsxVPNPlugin, self).get_ipsec_site_connections(
-            context)
+            context, fields=['id'])
         if not connections:
             return
-        # TODO(asarfaty): This will not scale well. Should use a bulk action
-        # instead for the NSX api
         for connection in connections:
             self._update_nsx_connection_status(context, connection['id'])
 
     def get_ipsec_site_connection(self, context,
                                   ipsec_site_conn_id, fields=None):
-        # update connection status
-        if not fields or 'status' in fields:
-            self._update_nsx_connection_status(context, ipsec_site_conn_id)
+        # update connection status if needed
+        refreshed_at = self._get_status_refresh_time(
+            context, fields,
+            lambda: self._update_nsx_connection_status(
+                context, ipsec_site_conn_id))
 
         # call super
-        return super(NsxVPNPlugin, self).get_ipsec_site_connection(
+        connection = super(NsxVPNPlugin, self).get_ipsec_site_connection(
             context, ipsec_site_conn_id, fields=fields)
+        return self._extend_status_refresh_time(
+            connection, fields, refreshed_at)
 
     def get_ipsec_site_connections(self, context, filters=None, fields=None):
-        # update connection status
-        if not fields or 'status' in fields:
-            self.update_all_connection_status(context)
+        # update connections status if needed
+        refreshed_at = self._get_status_refresh_time(
+            context, fields,
+            lambda: self.update_all_connection_status(context))
 
         # call super
-        return super(NsxVPNPlugin, self).get_ipsec_site_connections(
+        connections = super(NsxVPNPlugin, self).get_ipsec_site_connections(
             context, filters=filters, fields=fields)
+        return [self._extend_status_refresh_time(
+                    connection, fields, refreshed_at)
+                for connection in connections]
@@ -107,6 +107,15 @@ class NSXIPsecVpnDriver(service_drivers.VpnDriver):
             return driver.get_ipsec_site_connection_status(
                 context, ipsec_site_conn_id)
 
+    def get_ipsec_site_connections_status(self, context, router_ids=None):
+        # Currently only NSX-T supports it. In the future we will need to
+        # decide on the driver by the tenant
+        driver = self.drivers.get(projectpluginmap.NsxPlugins.NSX_T)
+        if driver and hasattr(driver, 'get_ipsec_site_connections_status'):
+            return driver.get_ipsec_site_connections_status(
+                context, router_ids=router_ids)
+        return {}
+
     def validate_router_gw_info(self, context, router_id, gw_info):
         # Currently only NSX-T supports it. In the future we will need to
         # decide on the driver by the tenant
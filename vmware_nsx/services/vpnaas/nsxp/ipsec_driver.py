@@ -13,6 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
+import eventlet
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import excutils
@@ -41,6 +44,10 @@ class NSXpIPsecVpnDriver(common_driver.NSXcommonIPsecVpnDriver):
         self._nsxpolicy = self._core_plugin.nsxpolicy
         self._nsx_vpn = self._nsxpolicy.ipsec_vpn
 
+        # Cache of the last NSX status of each connection:
+        # {connection id: (neutron status, refresh timestamp)}
+        self._status_cache = {}
+
     def _get_service_local_cidr_group(self, context, vpnservice, cidrs):
         """Create/Override the group for the local cidrs of a vpnservice
         used for the edge firewall rules allowing the vpn traffic.
@@ -446,7 +453,76 @@ class NSXpIPsecVpnDriver(common_driver.NSXcommonIPsecVpnDriver):
             psk=connection['psk'],
             **args)
 
+    def _translate_session_status(self, status_result):
+        if status_result and status_result.get('results'):
+            status = status_result['results'][0].get('runtime_status', '')
+            # NSX statuses are UP, DOWN, DEGRADE
+            # VPNaaS connection status should be ACTIVE or DOWN
+            if status == 'UP':
+                return 'ACTIVE'
+            if status == 'DOWN' or status == 'DEGRADED':
+                return 'DOWN'
+
+    def _get_session_status(self, router_id, session_id):
+        try:
+            return self._translate_session_status(
+                self._nsx_vpn.session.get_status(
+                    router_id, router_id, session_id))
+        except nsx_lib_exc.ResourceNotFound:
+            LOG.debug("Status for VPN session %s was not found", session_id)
+        except nsx_lib_exc.ManagerError as e:
+            LOG.warning("Failed to get status for VPN session %s: %s",
+                        session_id, e)
+
+    def _refresh_router_sessions_status(self, router_id, connection_ids):
+        """Get the NSX status of all the sessions of a tier1 router
+
+        The backend session list is read once, and only existing sessions
+        are queried for their status, concurrently.
+        Results are saved in the status cache and returned as a dictionary.
+        """
+        try:
+            nsx_sessions = self._nsx_vpn.session.list(router_id, router_id)
+        except nsx_lib_exc.ResourceNotFound:
+            nsx_sessions = []
+        except nsx_lib_exc.ManagerError as e:
+            LOG.warning("Failed to list VPN sessions of router %s: %s",
+                        router_id, e)
+            return {}
+        nsx_session_ids = set(sess['id'] for sess in nsx_sessions)
+        session_ids = [conn_id for conn_id in connection_ids
+                       if conn_id in nsx_session_ids]
+
+        pool = eventlet.GreenPool(common_driver.STATUS_POOL_SIZE)
+        statuses = dict(zip(
+            session_ids,
+            pool.imap(lambda sess_id: self._get_session_status(
+                router_id, sess_id), session_ids)))
+
+        now = time.time()
+        for conn_id in connection_ids:
+            status = statuses.get(conn_id)
+            self._status_cache[conn_id] = (status, now)
+        return statuses
+
+    def _get_cached_status(self, ipsec_site_conn_id):
+        """Return a tuple of (found, status) from the status cache"""
+        cached = self._status_cache.get(ipsec_site_conn_id)
+        if cached:
+            status, timestamp = cached
+            if (time.time() - timestamp <
+                cfg.CONF.nsx_p.vpn_status_cache_interval):
+                return True, status
+        return False, None
+
+    def _invalidate_cached_status(self, ipsec_site_conn_id):
+        self._status_cache.pop(ipsec_site_conn_id, None)
+
     def get_ipsec_site_connection_status(self, context, ipsec_site_conn_id):
+        found, status = self._get_cached_status(ipsec_site_conn_id)
+        if found:
+            return status
+
         # find out the router-id of this connection
         conn = self.vpn_plugin._get_ipsec_site_connection(
             context, ipsec_site_conn_id)
@@ -454,21 +530,30 @@ class NSXpIPsecVpnDriver(common_driver.NSXcommonIPsecVpnDriver):
         vpnservice = self.service_plugin._get_vpnservice(
             context, vpnservice_id)
         router_id = vpnservice['router_id']
-        # Get the NSX detailed status
-        try:
-            status_result = self._nsx_vpn.session.get_status(
-                router_id, router_id, ipsec_site_conn_id)
-            if status_result and 'results' in status_result:
-                status = status_result['results'][0].get('runtime_status', '')
-                # NSX statuses are UP, DOWN, DEGRADE
-                # VPNaaS connection status should be ACTIVE or DOWN
-                if status == 'UP':
-                    return 'ACTIVE'
-                if status == 'DOWN' or status == 'DEGRADED':
-                    return 'DOWN'
-        except nsx_lib_exc.ResourceNotFound:
-            LOG.debug("Status for VPN session %s was not found",
-                      ipsec_site_conn_id)
+
+        # Refresh the status of all the sessions of this router together, as
+        # the other connections are likely to be queried right after
+        connection_ids = self._get_routers_connection_ids(
+            context, router_ids=[router_id]).get(router_id, [])
+        if ipsec_site_conn_id not in connection_ids:
+            connection_ids.append(ipsec_site_conn_id)
+        statuses = self._refresh_router_sessions_status(
+            router_id, connection_ids)
+        return statuses.get(ipsec_site_conn_id)
+
+    def get_ipsec_site_connections_status(self, context, router_ids=None):
+        """Return the NSX status of all the connections of the given routers
+
+        If no routers are given, all the routers with VPN services are used.
+        Return a dictionary of connection id: neutron status
+        """
+        router_connections = self._get_routers_connection_ids(
+            context, router_ids=router_ids)
+        statuses = {}
+        for router_id, connection_ids in router_connections.items():
+            statuses.update(self._refresh_router_sessions_status(
+                router_id, connection_ids))
+        return statuses
 
     def _delete_session(self, vpnservice, session_id):
         router_id = vpnservice['router_id']
@@ -552,6 +637,7 @@ class NSXpIPsecVpnDriver(common_driver.NSXcommonIPsecVpnDriver):
             context, vpnservice_id)
 
         self._delete_session(vpnservice, ipsec_site_conn['id'])
+        self._invalidate_cached_status(ipsec_site_conn['id'])
         self._delete_dpd_profile(ipsec_site_conn['id'])
         self._delete_ipsec_profile(ipsec_site_conn['ipsecpolicy_id'])
         self._delete_ike_profile(ipsec_site_conn['ikepolicy_id'])
@@ -593,6 +679,7 @@ class NSXpIPsecVpnDriver(common_driver.NSXcommonIPsecVpnDriver):
         try:
             self._update_session(ipsec_site_conn, vpnservice, rules,
                                  enabled=connection_enabled)
+            self._invalidate_cached_status(ipsec_site_conn['id'])
         except nsx_lib_exc.ManagerError as e:
             self._update_status(context, vpnservice_id,
                                 ipsec_site_conn['id'],
@@ -697,6 +784,7 @@ class NSXpIPsecVpnDriver(common_driver.NSXcommonIPsecVpnDriver):
                                       conn['admin_state_up'])
                 self._update_session(conn, vpnservice,
                                      enabled=connection_enabled)
+                self._invalidate_cached_status(conn['id'])
 
     def delete_vpnservice(self, context, vpnservice):
         if self._should_delete_nsx_service(context, vpnservice):
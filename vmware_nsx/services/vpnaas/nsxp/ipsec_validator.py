@@ -17,6 +17,7 @@ from oslo_log import log as logging
 
 from vmware_nsx._i18n import _
 from vmware_nsx.common import exceptions as nsx_exc
+from vmware_nsx.plugins.common_v3 import topology_cache
 from vmware_nsx.services.vpnaas.common_v3 import ipsec_utils
 from vmware_nsx.services.vpnaas.common_v3 import ipsec_validator
 
@@ -37,10 +38,21 @@ class IPsecNsxPValidator(ipsec_validator.IPsecCommonValidator):
     def pfs_map(self):
         return ipsec_utils.PFS_MAP_P
 
-    def _validate_t0_ha_mode(self, tier0_uuid):
+    def _get_t0_ha_mode(self, tier0_uuid):
         tier0_router = self.nsxpolicy.tier0.get(tier0_uuid)
-        if (not tier0_router or
-            tier0_router.get('ha_mode') != 'ACTIVE_STANDBY'):
+        if tier0_router:
+            return tier0_router.get('ha_mode')
+
+    def _validate_t0_ha_mode(self, context, tier0_uuid):
+        ha_mode = topology_cache.get_attribute(
+            context, tier0_uuid, topology_cache.HA_MODE,
+            lambda: self._get_t0_ha_mode(tier0_uuid))
+        if ha_mode != 'ACTIVE_STANDBY':
+            # The HA mode may have been fixed since it was cached
+            ha_mode = topology_cache.get_attribute(
+                context, tier0_uuid, topology_cache.HA_MODE,
+                lambda: self._get_t0_ha_mode(tier0_uuid), refresh=True)
+        if ha_mode != 'ACTIVE_STANDBY':
             msg = _("The router GW should be connected to a TIER-0 router "
                     "with ACTIVE_STANDBY HA mode")
             raise nsx_exc.NsxVpnValidationError(details=msg)
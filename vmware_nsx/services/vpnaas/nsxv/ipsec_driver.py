@@ -14,6 +14,7 @@
 #    under the License.
 
 import netaddr
+from neutron_lib import constants
 from neutron_lib.plugins import directory
 from neutron_vpnaas.services.vpn import service_drivers
 from oslo_log import log as logging
@@ -154,6 +155,68 @@ class NSXvIPsecVpnDriver(service_drivers.VpnDriver):
         status_list.append(vpn_status)
         self.service_plugin.update_status_by_agent(context, status_list)
 
+    def _get_edge_sites_status(self, edge_id):
+        """Return a dictionary of (peer id, peer ip): status of edge sites"""
+        try:
+            stats = self._vcns.get_ipsec_statistics(edge_id)[1]
+        except vcns_exc.VcnsApiException as e:
+            LOG.warning("Failed to get IPsec statistics of edge %s: %s",
+                        edge_id, e)
+            return {}
+        statuses = {}
+        for site_stats in (stats or {}).get('siteStatistics') or []:
+            ike_status = site_stats.get('ikeStatus') or {}
+            tunnels_up = all(
+                tunnel.get('tunnelStatus') == 'UP'
+                for tunnel in site_stats.get('tunnelStats') or [])
+            if ike_status.get('channelStatus') == 'UP' and tunnels_up:
+                status = constants.ACTIVE
+            else:
+                status = constants.DOWN
+            statuses[(ike_status.get('peerId'),
+                      ike_status.get('peerIpAddress'))] = status
+        return statuses
+
+    def get_ipsec_site_connections_status(self, context, router_ids=None):
+        """Return the NSX status of all the connections of the given routers
+
+        The statistics of each edge are read once for all its connections.
+        If no routers are given, all the routers with VPN services are used.
+        Return a dictionary of connection id: neutron status
+        """
+        filters = {'router_id': router_ids} if router_ids else None
+        services = self.service_plugin.get_vpnservices(
+            context.elevated(), filters=filters, fields=['id'])
+        if not services:
+            return {}
+        filters = {'vpnservice_id': [srv['id'] for srv in services]}
+        connections = self.service_plugin.get_ipsec_site_connections(
+            context.elevated(), filters=filters,
+            fields=['id', 'vpnservice_id', 'peer_id', 'peer_address'])
+        service_edges = {}
+        edge_connections = {}
+        for conn in connections:
+            vpnservice_id = conn['vpnservice_id']
+            if vpnservice_id not in service_edges:
+                try:
+                    service_edges[vpnservice_id] = self._get_router_edge_id(
+                        context, vpnservice_id)[1]
+                except nsxv_exc.NsxPluginException:
+                    service_edges[vpnservice_id] = None
+            edge_id = service_edges[vpnservice_id]
+            if edge_id:
+                edge_connections.setdefault(edge_id, []).append(conn)
+
+        statuses = {}
+        for edge_id, edge_conns in edge_connections.items():
+            sites_status = self._get_edge_sites_status(edge_id)
+            for conn in edge_conns:
+                status = sites_status.get(
+                    (conn['peer_id'], conn['peer_address']))
+                if status:
+                    statuses[conn['id']] = status
+        return statuses
+
     def create_ipsec_site_connection(self, context, ipsec_site_connection):
         LOG.debug('Creating ipsec site connection %(conn_info)s.',
                   {"conn_info": ipsec_site_connection})
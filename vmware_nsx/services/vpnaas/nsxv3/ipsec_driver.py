@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import eventlet
 import netaddr
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -406,15 +407,8 @@ class NSXv3IPsecVpnDriver(common_driver.NSXcommonIPsecVpnDriver):
             policy_rules=rules,
             enabled=enabled)
 
-    def get_ipsec_site_connection_status(self, context, ipsec_site_conn_id):
-        mapping = db.get_nsx_vpn_connection_mapping(
-            context.session, ipsec_site_conn_id)
-        if not mapping or not mapping['session_id']:
-            LOG.info("Couldn't find NSX session for VPN connection %s",
-                     ipsec_site_conn_id)
-            return
-
-        status_result = self._nsx_vpn.session.get_status(mapping['session_id'])
+    def _get_session_status(self, session_id):
+        status_result = self._nsx_vpn.session.get_status(session_id)
         if status_result and 'session_status' in status_result:
             status = status_result['session_status']
             # NSX statuses are UP, DOWN, DEGRADE
@@ -424,6 +418,46 @@ class NSXv3IPsecVpnDriver(common_driver.NSXcommonIPsecVpnDriver):
             if status == 'DOWN' or status == 'DEGRADED':
                 return 'DOWN'
 
+    def get_ipsec_site_connection_status(self, context, ipsec_site_conn_id):
+        mapping = db.get_nsx_vpn_connection_mapping(
+            context.session, ipsec_site_conn_id)
+        if not mapping or not mapping['session_id']:
+            LOG.info("Couldn't find NSX session for VPN connection %s",
+                     ipsec_site_conn_id)
+            return
+
+        return self._get_session_status(mapping['session_id'])
+
+    def get_ipsec_site_connections_status(self, context, router_ids=None):
+        """Return the NSX status of all the connections of the given routers
+
+        If no routers are given, all the routers with VPN services are used.
+        Return a dictionary of connection id: neutron status
+        """
+        connection_ids = []
+        for router_conn_ids in self._get_routers_connection_ids(
+                context, router_ids=router_ids).values():
+            connection_ids.extend(router_conn_ids)
+        if not connection_ids:
+            return {}
+        sessions = dict(
+            (mapping['neutron_id'], mapping['session_id'])
+            for mapping in db.get_nsx_vpn_connection_mappings(
+                context.session, connection_ids)
+            if mapping['session_id'])
+
+        def _get_status(conn_id):
+            try:
+                return self._get_session_status(sessions[conn_id])
+            except nsx_lib_exc.ManagerError as e:
+                LOG.warning("Failed to get status for VPN connection %s: %s",
+                            conn_id, e)
+
+        session_conn_ids = list(sessions.keys())
+        pool = eventlet.GreenPool(common_driver.STATUS_POOL_SIZE)
+        return dict(zip(session_conn_ids,
+                        pool.imap(_get_status, session_conn_ids)))
+
     def _delete_session(self, session_id):
         self._nsx_vpn.session.delete(session_id)
 
@@ -0,0 +1,88 @@
+# Copyright 2026 VMware, Inc.  All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+from oslo_log import log as logging
+
+from vmware_nsx.shell.admin.plugins.common import formatters
+
+LOG = logging.getLogger(__name__)
+
+# Maximal number of concurrent backend calls of an audit
+FETCH_POOL_SIZE = 10
+# Log the progress of a long operation every this many resources
+PROGRESS_INTERVAL = 50
+
+
+def index_by(resources, key_func):
+    """Return a dictionary of the resources by their key"""
+    return dict((key_func(resource), resource) for resource in resources)
+
+
+def group_by(resources, key_func):
+    """Return a dictionary of the lists of resources with the same key"""
+    groups = {}
+    for resource in resources:
+        groups.setdefault(key_func(resource), []).append(resource)
+    return groups
+
+
+def fetch_concurrently(fetch_func, keys, pool_size=FETCH_POOL_SIZE):
+    """Call fetch_func for each of the keys concurrently
+
+    Return a dictionary of the results by key
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    pool = eventlet.GreenPool(min(pool_size, len(keys)))
+    return dict(zip(keys, pool.imap(fetch_func, keys)))
+
+
+def run_concurrently(func, keys, description, pool_size=FETCH_POOL_SIZE):
+    """Call func for each of the keys concurrently, and log the progress
+
+    Return a dictionary of the results by key. The exception raised by func
+    for a key is logged, and returned as its result.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+
+    def _call(key):
+        try:
+            return func(key)
+        except Exception as e:
+            LOG.error("%(desc)s of %(key)s failed: %(err)s",
+                      {'desc': description, 'key': key, 'err': e})
+            return e
+
+    results = {}
+    pool = eventlet.GreenPool(min(pool_size, len(keys)))
+    for index, (key, result) in enumerate(
+            zip(keys, pool.imap(_call, keys)), 1):
+        results[key] = result
+        if not index % PROGRESS_INTERVAL or index == len(keys):
+            LOG.info("%(desc)s progress: %(index)s/%(num)s",
+                     {'desc': description, 'index': index,
+                      'num': len(keys)})
+    return results
+
+
+def report(resource_name, findings, attrs):
+    """Log the audit findings
+
+    As a table, or as json if the --fmt json option was used
+    """
+    LOG.info(formatters.output_formatter(resource_name, findings, attrs))
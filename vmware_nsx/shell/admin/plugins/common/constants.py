@@ -39,6 +39,7 @@ ORPHANED_NETWORKS = 'orphaned-networks'
 ORPHANED_ROUTERS = 'orphaned-routers'
 SYSTEM = 'system'
 LOADBALANCERS = 'loadbalancers'
+LOCKS = 'locks'
 
 # NSXV3 only Resource Constants
 PORTS = 'ports'
@@ -0,0 +1,67 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_log import log as logging
+
+from vmware_nsx.common import locking
+from vmware_nsx.shell.admin.plugins.common import constants
+from vmware_nsx.shell.admin.plugins.common import formatters
+from vmware_nsx.shell.admin.plugins.common import utils as admin_utils
+
+LOG = logging.getLogger(__name__)
+
+# Statistics of workers which did not save them for a while are ignored
+LOCK_STATS_MAX_AGE = 10 * locking.LOCK_STATS_SAVE_INTERVAL
+SORT_KEYS = ('acquired', 'contended', 'wait_total', 'hold_total')
+
+
+@admin_utils.output_header
+@admin_utils.unpack_payload
+def show_lock_stats(resource, event, trigger, **kwargs):
+    """Show the locks usage statistics of the running neutron workers
+
+    Lock names are shown with the resource ids masked by '*'.
+    Use --property sort=<acquired|contended|wait_total|hold_total>
+    to choose the sort order (default: wait_total)
+    """
+    sort_key = 'wait_total'
+    if kwargs.get('property'):
+        properties = admin_utils.parse_multi_keyval_opt(kwargs['property'])
+        sort_key = properties.get('sort', sort_key)
+    if sort_key not in SORT_KEYS:
+        LOG.error("Invalid sort key %(key)s. Supported keys: %(keys)s",
+                  {'key': sort_key, 'keys': ', '.join(SORT_KEYS)})
+        return
+
+    lock_stats = locking.get_all_workers_lock_stats(
+        max_age=LOCK_STATS_MAX_AGE)
+    locks = []
+    for name, stats in lock_stats.items():
+        acquired = stats['acquired']
+        locks.append({
+            'name': name,
+            'acquired': acquired,
+            'contended': stats['contended'],
+            'wait_total': round(stats['wait_total'], 3),
+            'wait_avg': round(stats['wait_total'] / acquired, 3),
+            'wait_max': round(stats['wait_max'], 3),
+            'hold_total': round(stats['hold_total'], 3),
+            'hold_avg': round(stats['hold_total'] / acquired, 3),
+            'hold_max': round(stats['hold_max'], 3)})
+    locks.sort(key=lambda lock: lock[sort_key], reverse=True)
+    LOG.info(formatters.output_formatter(
+        constants.LOCKS, locks,
+        ['name', 'acquired', 'contended', 'wait_total', 'wait_avg',
+         'wait_max', 'hold_total', 'hold_avg', 'hold_max']))
@@ -13,14 +13,21 @@
 #    under the License.
 
 from neutron.db import securitygroups_db
+from neutron_lib.callbacks import registry
 from neutron_lib import context
+from oslo_log import log as logging
 
+from vmware_nsx.extensions import providersecuritygroup as provider_sg
+from vmware_nsx.extensions import secgroup_rule_local_ip_prefix as sg_prefix
 from vmware_nsx.shell.admin.plugins.common import constants
 from vmware_nsx.shell.admin.plugins.common import utils as admin_utils
 from vmware_nsx.shell.admin.plugins.nsxp.resources import utils as p_utils
+from vmware_nsx.shell import resources as shell
 
+from vmware_nsxlib.v3 import exceptions as nsx_lib_exc
 from vmware_nsxlib.v3.policy import constants as policy_constants
 
+LOG = logging.getLogger(__name__)
 neutron_client = securitygroups_db.SecurityGroupDbMixin()
 
 
@@ -51,3 +58,76 @@ def list_security_groups(resource, event, trigger, **kwargs):
                      mappings,
                      attrs=['Project', 'Name', 'ID', 'NSX Group', 'NSX Map'])
     return bool(mappings)
+
+
+@admin_utils.output_header
+@admin_utils.unpack_payload
+def migrate_ip_prefix_groups(resource, event, trigger, **kwargs):
+    """Move the rules from dedicated IP prefix groups to shared ones
+
+    Older versions created a remote & local IP prefix group per rule.
+    The rules are updated to use the group shared by all the rules with the
+    same IP prefix, and the dedicated groups are deleted.
+    """
+    ctx = context.get_admin_context()
+    domain_id = policy_constants.DEFAULT_DOMAIN
+    with p_utils.NsxPolicyPluginWrapper() as plugin:
+        rule_groups = []
+        for sg in plugin.get_security_groups(ctx):
+            sg_id = sg['id']
+            rules = [rule for rule in sg['security_group_rules']
+                     if plugin._get_sg_rule_ip_prefixes(rule)]
+            if not rules:
+                continue
+            secgroup_logging = plugin._is_security_group_logged(ctx, sg_id)
+            ip_prefixes = set()
+            entries = []
+            sg_rule_groups = []
+            for rule in rules:
+                ip_prefixes.update(plugin._get_sg_rule_ip_prefixes(rule))
+                entries.append(plugin._create_security_group_backend_rule(
+                    ctx, sg_id, rule, secgroup_logging,
+                    is_provider_sg=sg.get(provider_sg.PROVIDER),
+                    create_related_resource=False))
+                if rule.get('remote_ip_prefix'):
+                    sg_rule_groups.append(
+                        plugin._get_sg_rule_remote_ip_group_id(rule))
+                if rule.get(sg_prefix.LOCAL_IP_PREFIX):
+                    sg_rule_groups.append(
+                        plugin._get_sg_rule_local_ip_group_id(rule))
+
+            def _update_rules():
+                plugin._create_ip_prefix_groups(ip_prefixes)
+                plugin.nsxpolicy.comm_map.patch_entries(
+                    domain_id, sg_id, entries=entries)
+
+            try:
+                plugin._run_under_transaction(_update_rules)
+            except Exception as e:
+                LOG.error("Failed to update the rules of security group "
+                          "%(sg)s: %(e)s", {'sg': sg_id, 'e': e})
+                # Its rules still use the dedicated groups
+                continue
+            rule_groups.extend(sg_rule_groups)
+            LOG.info("Updated %(num)s rules of security group %(sg)s to use "
+                     "shared IP prefix groups",
+                     {'num': len(entries), 'sg': sg_id})
+
+        # Delete the dedicated groups only once no rule uses them
+        deleted = 0
+        for group_id in rule_groups:
+            try:
+                plugin.nsxpolicy.group.delete(domain_id, group_id)
+            except nsx_lib_exc.ResourceNotFound:
+                continue
+            except Exception as e:
+                LOG.error("Failed to delete group %(group)s: %(e)s",
+                          {'group': group_id, 'e': e})
+                continue
+            deleted += 1
+        LOG.info("Deleted %s dedicated IP prefix groups", deleted)
+
+
+registry.subscribe(migrate_ip_prefix_groups,
+                   constants.SECURITY_GROUPS,
+                   shell.Operations.MIGRATE_IP_PREFIX_GROUPS.value)
@@ -15,7 +15,9 @@
 
 from neutron.db import l3_db
 from neutron_lib.callbacks import registry
+from neutron_lib import constants as lib_const
 from neutron_lib import exceptions
+from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import uuidutils
 
@@ -23,7 +25,9 @@ from vmware_nsx.common import locking
 from vmware_nsx.common import nsxv_constants
 from vmware_nsx.db import nsxv_db
 from vmware_nsx.db import nsxv_models
+from vmware_nsx.plugins.nsx_v import availability_zones as nsx_az
 from vmware_nsx.plugins.nsx_v.vshield.common import constants as vcns_const
+from vmware_nsx.plugins.nsx_v.vshield import edge_pool_manager
 from vmware_nsx.plugins.nsx_v.vshield import edge_utils
 from vmware_nsx.shell.admin.plugins.common import constants
 from vmware_nsx.shell.admin.plugins.common import formatters
@@ -82,6 +86,63 @@ def nsx_list_backup_edges(resource, event, trigger, **kwargs):
         ['id', 'name', 'size', 'type', 'availability_zone', 'db_status']))
 
 
+@admin_utils.output_header
+@admin_utils.unpack_payload
+def nsx_status_backup_edge_pools(resource, event, trigger, **kwargs):
+    """Show the backup edge pools usage and refill statistics"""
+    edgeapi = utils.NeutronDbClient()
+    # Ignore statistics of workers which did not report for a while
+    max_age = 10 * max(cfg.CONF.nsxv.backup_edge_pool_check_interval, 60)
+    pool_stats = edge_pool_manager.get_pool_stats(max_age=max_age)
+    like_filters = {'router_id': vcns_const.BACKUP_ROUTER_PREFIX + "%"}
+    backup_bindings = nsxv_db.get_nsxv_router_bindings(
+        edgeapi.context.session,
+        filters={'status': [lib_const.PENDING_CREATE,
+                            lib_const.PENDING_UPDATE,
+                            lib_const.ACTIVE]},
+        like_filters=like_filters)
+    pooled = {}
+    for binding in backup_bindings:
+        key = edge_pool_manager.get_pool_key(
+            binding['availability_zone'], binding['edge_type'],
+            binding['appliance_size'])
+        pooled[key] = pooled.get(key, 0) + 1
+
+    pools = []
+    zones = nsx_az.NsxVAvailabilityZones()
+    for az in zones.list_availability_zones_objects():
+        az_pools = edge_utils.parse_backup_edge_pool_opt_per_az(az)
+        for edge_type, sizes in az_pools.items():
+            for appliance_size, edge_pool_range in sizes.items():
+                key = edge_pool_manager.get_pool_key(
+                    az.name, edge_type, appliance_size)
+                stats = pool_stats.get(key, {})
+                allocations = stats.get('hits', 0) + stats.get('misses', 0)
+                refills = stats.get('refills', 0)
+                pools.append({
+                    'pool': key,
+                    'min': edge_pool_range['minimum_pooled_edges'],
+                    'max': edge_pool_range['maximum_pooled_edges'],
+                    'target': stats.get('target'),
+                    'pooled': pooled.get(key, 0),
+                    'hits': stats.get('hits', 0),
+                    'misses': stats.get('misses', 0),
+                    'hit_rate': ('%d%%' % (100 * stats['hits'] / allocations)
+                                 if allocations else None),
+                    'refills': refills,
+                    'refill_failures': stats.get('refill_failures', 0),
+                    'avg_refill_sec': (
+                        int(stats['refill_latency_total'] / refills)
+                        if refills else None),
+                    'max_refill_sec': int(stats.get('refill_latency_max', 0)),
+                    'recycled': stats.get('recycled', 0)})
+    LOG.info(formatters.output_formatter(
+        constants.BACKUP_EDGES, pools,
+        ['pool', 'min', 'max', 'target', 'pooled', 'hits', 'misses',
+         'hit_rate', 'refills', 'refill_failures', 'avg_refill_sec',
+         'max_refill_sec', 'recycled']))
+
+
 def _delete_backup_from_neutron_db(edge_id, router_id):
     # Remove bindings from Neutron DB
     edgeapi = utils.NeutronDbClient()
@@ -353,6 +414,9 @@ def nsx_fix_name_mismatch(resource, event, trigger, **kwargs):
 registry.subscribe(nsx_list_backup_edges,
                    constants.BACKUP_EDGES,
                    shell.Operations.LIST.value)
+registry.subscribe(nsx_status_backup_edge_pools,
+                   constants.BACKUP_EDGES,
+                   shell.Operations.STATUS.value)
 registry.subscribe(nsx_clean_backup_edge,
                    constants.BACKUP_EDGES,
                    shell.Operations.CLEAN.value)
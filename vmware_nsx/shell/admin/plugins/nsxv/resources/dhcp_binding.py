@@ -13,12 +13,14 @@
 #    under the License.
 
 
+import operator
 import pprint
 
 from neutron_lib import context as n_context
 from oslo_config import cfg
 from oslo_log import log as logging
 
+from vmware_nsx.shell.admin.plugins.common import audit
 from vmware_nsx.shell.admin.plugins.common import constants
 import vmware_nsx.shell.admin.plugins.common.utils as admin_utils
 from vmware_nsx.shell.admin.plugins.nsxv.resources import utils
@@ -32,6 +34,7 @@ from vmware_nsx.db import nsxv_db
 from vmware_nsx.plugins.nsx_v.vshield.common import (
     constants as nsxv_constants)
 from vmware_nsx.plugins.nsx_v.vshield.common import exceptions
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
 from vmware_nsx.plugins.nsx_v.vshield import edge_utils
 from vmware_nsx.plugins.nsx_v.vshield import vcns_driver
 
@@ -122,6 +125,9 @@ def nsx_update_dhcp_edge_binding(resource, event, trigger, **kwargs):
         nsxv_manager = vcns_driver.VcnsDriver(
             edge_utils.NsxVCallbacks(plugin))
         edge_manager = edge_utils.EdgeManager(nsxv_manager, plugin)
+        # Rewrite the configuration even if it did not change
+        edge_fingerprints.invalidate(neutron_db.context, edge_id,
+                                     service=edge_fingerprints.DHCP)
         try:
             edge_manager.update_dhcp_service_config(
                 neutron_db.context, edge_id)
@@ -312,22 +318,30 @@ def nsx_redistribute_dhcp_edges(resource, event, trigger, **kwargs):
         nsxv_manager = vcns_driver.VcnsDriver(
                            edge_utils.NsxVCallbacks(plugin))
         edge_manager = edge_utils.EdgeManager(nsxv_manager, plugin)
+        # Read the DHCP edges bindings and the DHCP subnets once
+        dhcp_edge_bindings = audit.index_by(
+            nsxv_db.get_nsxv_router_bindings(
+                context.session,
+                like_filters={
+                    'router_id': nsxv_constants.DHCP_EDGE_PREFIX + '%'}),
+            operator.itemgetter('router_id'))
+        dhcp_subnets = audit.group_by(
+            plugin.get_subnets(context, filters={'enable_dhcp': [True]}),
+            operator.itemgetter('network_id'))
         # go over all DHCP subnets
         networks = plugin.get_networks(context)
         for network in networks:
             network_id = network['id']
             # Check if the network has a related DHCP edge
             resource_id = (nsxv_constants.DHCP_EDGE_PREFIX + network_id)[:36]
-            dhcp_edge_binding = nsxv_db.get_nsxv_router_binding(
-                context.session, resource_id)
-            if not dhcp_edge_binding:
+            dhcp_edge_binding = dhcp_edge_bindings.get(resource_id)
+            subnets = dhcp_subnets.get(network_id)
+            if not dhcp_edge_binding or not subnets:
                 continue
             LOG.info("Checking network %s", network_id)
             edge_id = dhcp_edge_binding['edge_id']
             availability_zone = plugin.get_network_az_by_net_id(
                 context, network['id'])
-            filters = {'network_id': [network_id], 'enable_dhcp': [True]}
-            subnets = plugin.get_subnets(context, filters=filters)
             for subnet in subnets:
                 (conflict_edge_ids,
                  available_edge_ids) = edge_manager._get_used_edges(
@@ -13,13 +13,114 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import xml.etree.ElementTree as et
+
 from neutron_lib.callbacks import registry
+from oslo_config import cfg
+from oslo_log import log as logging
 
+from vmware_nsx.common import locking
+from vmware_nsx.common import utils as com_utils
+from vmware_nsx.services.lbaas.nsx_v import lbaas_common as lb_common
 from vmware_nsx.shell.admin.plugins.common import constants
 from vmware_nsx.shell.admin.plugins.common import loadbalancers
+from vmware_nsx.shell.admin.plugins.common import utils as admin_utils
+from vmware_nsx.shell.admin.plugins.nsxv.resources import utils
 from vmware_nsx.shell import resources as shell
 
+LOG = logging.getLogger(__name__)
+
+
+def _get_lbaas_fw_sections(vcns):
+    """Return the backend LBaaS FW sections by their index"""
+    h, firewall_config = vcns.get_dfw_config()
+    root = com_utils.normalize_xml(firewall_config)
+    sections = {}
+    for section in root.iter('section'):
+        shard = lb_common.get_lbaas_fw_section_shard_by_name(
+            section.attrib.get('name', ''))
+        if shard is not None:
+            sections[shard] = section
+    return sections
+
+
+def _move_pool_fw_rule(vcns, rule, source_shard, source_uri,
+                       target_shard, target_uri):
+    pool_id = rule.findtext('name')
+    rule_id = rule.attrib.pop('id')
+    section_id = rule.find('sectionId')
+    if section_id is not None:
+        rule.remove(section_id)
+    with locking.LockManager.get_lock(
+            lb_common.get_lbaas_fw_section_lock(target_shard)):
+        # The pool rule may have been recreated in the target section since
+        # the number of sections changed, and is then more recent
+        h, target_rule_id = lb_common.get_pool_fw_rule_id(
+            vcns, target_uri, pool_id)
+        if target_rule_id:
+            LOG.info("Section %(section)s already has the FW rule of pool "
+                     "%(pool)s, removing the old rule",
+                     {'section': target_uri, 'pool': pool_id})
+        else:
+            vcns.add_rule_to_section(
+                target_uri, et.tostring(rule, encoding="us-ascii"), h)
+    with locking.LockManager.get_lock(
+            lb_common.get_lbaas_fw_section_lock(source_shard)):
+        vcns.remove_rule_from_section(source_uri, rule_id)
+
+
+@admin_utils.output_header
+@admin_utils.unpack_payload
+def migrate_lbaas_fw_sections(resource, event, trigger, **kwargs):
+    """Move the LBaaS pools FW rules to the sections of their pools
+
+    To be used after changing the nsxv lbaas_fw_section_shards
+    configuration. Sections beyond the configured number are deleted once
+    all their rules were moved.
+    """
+    vcns = utils.get_nsxv_client()
+    shards = cfg.CONF.nsxv.lbaas_fw_section_shards
+    section_ids = dict((shard, lb_common.get_lbaas_fw_section_id(vcns, shard))
+                       for shard in range(shards))
+    moved = failed = 0
+    for shard, section in sorted(_get_lbaas_fw_sections(vcns).items()):
+        section_uri = lb_common.get_lbaas_fw_section_uri(
+            section.attrib['id'])
+        section_failed = False
+        for rule in section.findall('rule'):
+            pool_id = rule.findtext('name')
+            if not pool_id:
+                continue
+            target_shard = lb_common.get_lbaas_fw_section_shard(pool_id)
+            if target_shard == shard:
+                continue
+            try:
+                _move_pool_fw_rule(
+                    vcns, rule, shard, section_uri, target_shard,
+                    lb_common.get_lbaas_fw_section_uri(
+                        section_ids[target_shard]))
+            except Exception as e:
+                LOG.error("Failed to move the FW rule of pool %(pool)s to "
+                          "section %(section)s: %(err)s",
+                          {'pool': pool_id,
+                           'section': section_ids[target_shard], 'err': e})
+                section_failed = True
+                failed += 1
+            else:
+                moved += 1
+        if shard >= shards and not section_failed:
+            LOG.info("Deleting unused LBaaS FW section %s",
+                     section.attrib['id'])
+            vcns.delete_section(section_uri)
+
+    LOG.info("Moved %(moved)s LBaaS pools FW rules across %(shards)s "
+             "sections, %(failed)s failed",
+             {'moved': moved, 'shards': shards, 'failed': failed})
+
 
 registry.subscribe(loadbalancers.set_loadbalancer_status_error,
                    constants.LOADBALANCERS,
                    shell.Operations.SET_STATUS_ERROR.value)
+registry.subscribe(migrate_lbaas_fw_sections,
+                   constants.LOADBALANCERS,
+                   shell.Operations.MIGRATE_FW_SECTIONS.value)
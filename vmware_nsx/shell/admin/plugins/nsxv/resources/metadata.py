@@ -20,6 +20,7 @@ from neutron.db import models_v2
 from neutron_lib.callbacks import registry
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
 
 from vmware_nsx.common import config
 from vmware_nsx.common import locking
@@ -28,8 +29,10 @@ from vmware_nsx.db import nsxv_db
 from vmware_nsx.plugins.nsx_v import availability_zones as nsx_az
 from vmware_nsx.plugins.nsx_v import md_proxy
 from vmware_nsx.plugins.nsx_v.vshield.common import constants as vcns_constants
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
 from vmware_nsx.plugins.nsx_v.vshield import nsxv_loadbalancer as nsxv_lb
 from vmware_nsx.services.lbaas.nsx_v import lbaas_common as lb_common
+from vmware_nsx.shell.admin.plugins.common import audit
 from vmware_nsx.shell.admin.plugins.common import constants
 from vmware_nsx.shell.admin.plugins.common import formatters
 from vmware_nsx.shell.admin.plugins.common import utils as admin_utils
@@ -66,6 +69,14 @@ NSXV_MD_RULES = [
         'enabled': True,
         'action': 'deny',
         'ruleTag': None}]
+NSXV_MD_RULE_NAMES = [rule['name'] for rule in NSXV_MD_RULES]
+
+# The results of the metadata reconciliation of an edge
+MD_UP_TO_DATE = 'up-to-date'
+MD_UPDATED = 'updated'
+MD_MISSING = 'missing'
+MD_RECREATED = 'recreated'
+MD_FAILED = 'failed'
 
 LOG = logging.getLogger(__name__)
 nsxv = utils.get_nsxv_client()
@@ -79,18 +90,35 @@ def _append_md_fw_rules(fw_rules):
     return fw_rules
 
 
-def _handle_edge_firewall_rules(edge_id):
+def _get_edge_firewall(edge_id):
+    """Return the firewall configuration of an edge, or None on failure"""
     try:
         h, fw_cfg = nsxv.get_firewall(edge_id)
     except Exception as e:
-        fw_cfg = {}
         LOG.error("Failed to retrieve firewall config for edge %(edge)s "
                   "with exception %(e)s", {'edge': edge_id, 'e': e})
-    fw_rules = fw_cfg.get('firewallRules', {}).get('firewallRules', [])
-    md_rule_names = ['MDInterEdgeNet',
-                     'MDServiceIP',
-                     'VSEMDInterEdgeNet',
-                     'VSERule']
+        return None
+    return fw_cfg
+
+
+def _get_firewall_rules(fw_cfg):
+    return fw_cfg.get('firewallRules', {}).get('firewallRules', [])
+
+
+def _handle_edge_firewall_rules(edge_id):
+    fw_cfg = _get_edge_firewall(edge_id)
+    if fw_cfg is None:
+        return False
+    return _update_edge_md_firewall_rules(edge_id, fw_cfg)
+
+
+def _update_edge_md_firewall_rules(edge_id, fw_cfg):
+    """Add the missing metadata rules to the edge firewall
+
+    Returns False if the firewall could not be updated.
+    """
+    fw_rules = _get_firewall_rules(fw_cfg)
+    md_rule_names = list(NSXV_MD_RULE_NAMES)
     new_rules = []
     for rule in fw_rules:
         if rule['name'] in md_rule_names:
@@ -101,6 +129,8 @@ def _handle_edge_firewall_rules(edge_id):
     if md_rule_names:
         new_rules = _append_md_fw_rules(new_rules)
         fw_cfg['firewallRules']['firewallRules'] = new_rules
+        edge_fingerprints.invalidate(None, edge_id,
+                                     service=edge_fingerprints.FIREWALL)
         try:
             nsxv.update_firewall(edge_id, fw_cfg)
             LOG.info('Added missing firewall rules for edge %s', edge_id)
@@ -108,9 +138,15 @@ def _handle_edge_firewall_rules(edge_id):
             LOG.warning("Failed to update firewall config for edge "
                         "%(edge)s with exception %(e)s",
                         {'edge': edge_id, 'e': e})
+            return False
+    return True
 
 
 def _recreate_rtr_metadata_cfg(context, plugin, az_name, edge_id):
+    """Recreate the metadata components of an edge
+
+    Returns False if they could not be recreated.
+    """
     rtr_binding = nsxv_db.get_nsxv_router_binding_by_edge(
         context.session, edge_id)
     md_handler = plugin.metadata_proxy_handler[az_name]
@@ -120,6 +156,7 @@ def _recreate_rtr_metadata_cfg(context, plugin, az_name, edge_id):
                 context, rtr_binding['router_id'])
             LOG.info('Added metadata components for edge %s',
                      edge_id)
+            return True
         except Exception as e:
             LOG.error('Recreation of metadata components for edge '
                       '%(edge)s failed with error %(e)s',
@@ -127,9 +164,14 @@ def _recreate_rtr_metadata_cfg(context, plugin, az_name, edge_id):
     else:
         LOG.error('Could not find a metadata handler for availability zone %s',
                   az_name)
+    return False
 
 
 def _update_md_lb_members(edge_id, edge_internal_ips, lb, pool):
+    """Set the metadata LB pool members of an edge
+
+    Returns False if the load balancer could not be updated.
+    """
     LOG.info('Updating metadata members for edge %s', edge_id)
     pool.members = {}
 
@@ -150,6 +192,8 @@ def _update_md_lb_members(edge_id, edge_internal_ips, lb, pool):
     except Exception as e:
         LOG.error('Updating members for %(edge)s failed with '
                   'error %(e)s', {'edge': edge_id, 'e': e})
+        return False
+    return True
 
 
 def _get_internal_edge_ips(context, az_name):
@@ -195,25 +239,85 @@ def _get_internal_edge_ips(context, az_name):
     return edge_internal_ips, md_rtr_ids
 
 
-def _handle_edge(context, plugin, az_name, edge_id, edge_internal_ips):
+def _get_md_fingerprint(members, rule_names):
+    """Return the fingerprint of the metadata configuration of an edge
+
+    members is the list of the (ip, port) of the metadata LB pool members,
+    and rule_names the names of the edge firewall rules.
+    """
+    fragment = {'members': sorted(set((str(ip), str(port))
+                                      for ip, port in members)),
+                'rules': sorted(set(rule_names) & set(NSXV_MD_RULE_NAMES))}
+    return hashlib.sha1(jsonutils.dumps(
+        fragment, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _get_desired_md_fingerprint(edge_internal_ips):
+    s_port = cfg.CONF.nsxv.nova_metadata_port
+    return _get_md_fingerprint([(ip, s_port) for ip in edge_internal_ips],
+                               NSXV_MD_RULE_NAMES)
+
+
+def _reconcile_edge_md(edge_id, edge_internal_ips, desired_fingerprint):
+    """Update the metadata LB members and firewall rules of a stale edge
+
+    Does not access the DB, so it can run concurrently for several edges.
+    """
     with locking.LockManager.get_lock(edge_id):
         lb = nsxv_lb.NsxvLoadbalancer.get_loadbalancer(nsxv, edge_id)
         virt = lb.virtual_servers.get(md_proxy.METADATA_VSE_NAME)
-        if virt:
-            pool = virt.default_pool
-            curr_member_ips = [member.payload['ipAddress'] for member in
-                               pool.members.values()]
-            if set(curr_member_ips) != set(edge_internal_ips):
-                _update_md_lb_members(edge_id, edge_internal_ips, lb, pool)
-
-        else:
+        if not virt:
             # Interface connectivity and LB definition are done at the same
             # operation. if LB is missing then interface should be missing
             # as well
-            LOG.info('Metadata LB components for edge %s are missing',
-                     edge_id)
-            _recreate_rtr_metadata_cfg(context, plugin, az_name, edge_id)
-    _handle_edge_firewall_rules(edge_id)
+            return MD_MISSING
+
+        pool = virt.default_pool
+        curr_members = [(member.payload['ipAddress'], member.payload['port'])
+                        for member in pool.members.values()]
+        fw_cfg = _get_edge_firewall(edge_id)
+        if fw_cfg is not None and desired_fingerprint == _get_md_fingerprint(
+                curr_members, [rule['name'] for rule in
+                               _get_firewall_rules(fw_cfg)]):
+            return MD_UP_TO_DATE
+
+        # The members are updated even if the firewall could not be read
+        updated = True
+        s_port = cfg.CONF.nsxv.nova_metadata_port
+        if (_get_md_fingerprint(curr_members, []) !=
+                _get_md_fingerprint([(ip, s_port)
+                                     for ip in edge_internal_ips], [])):
+            updated = _update_md_lb_members(
+                edge_id, edge_internal_ips, lb, pool)
+        if (fw_cfg is None or
+                not _update_edge_md_firewall_rules(edge_id, fw_cfg)):
+            updated = False
+    return MD_UPDATED if updated else MD_FAILED
+
+
+def _recreate_edge_md(context, plugin, az_name, edge_id):
+    """Recreate the missing metadata components of an edge
+
+    Returns MD_RECREATED, or MD_FAILED.
+    """
+    LOG.info('Metadata LB components for edge %s are missing',
+             edge_id)
+    with locking.LockManager.get_lock(edge_id):
+        recreated = _recreate_rtr_metadata_cfg(
+            context, plugin, az_name, edge_id)
+    if not _handle_edge_firewall_rules(edge_id):
+        recreated = False
+    return MD_RECREATED if recreated else MD_FAILED
+
+
+def _handle_edge(context, plugin, az_name, edge_id, edge_internal_ips):
+    result = _reconcile_edge_md(
+        edge_id, edge_internal_ips,
+        _get_desired_md_fingerprint(edge_internal_ips))
+    if result == MD_MISSING:
+        result = _recreate_edge_md(context, plugin, az_name, edge_id)
+    LOG.info('Metadata configuration of edge %(edge)s: %(result)s',
+             {'edge': edge_id, 'result': result})
 
 
 @admin_utils.output_header
@@ -333,8 +437,36 @@ def nsx_redo_metadata_cfg_for_az(context, plugin, az_name, check_az=True):
                              not binding['router_id'].startswith(
                                     lb_common.RESOURCE_ID_PFX))]))
 
-    for edge_id in edge_ids:
-        _handle_edge(context, plugin, az_name, edge_id, edge_internal_ips)
+    # Compare the metadata configuration of every edge with the desired one,
+    # and update the stale edges concurrently
+    desired_fingerprint = _get_desired_md_fingerprint(edge_internal_ips)
+    results = audit.run_concurrently(
+        lambda edge_id: _reconcile_edge_md(edge_id, edge_internal_ips,
+                                           desired_fingerprint),
+        edge_ids, 'Metadata reconciliation')
+    results = dict((edge_id, MD_FAILED if isinstance(result, Exception)
+                    else result) for edge_id, result in results.items())
+
+    # Recreating the metadata components accesses the DB, so it is done one
+    # edge at a time
+    for edge_id in sorted(results):
+        if results[edge_id] == MD_MISSING:
+            results[edge_id] = _recreate_edge_md(
+                context, plugin, az_name, edge_id)
+
+    LOG.info("Metadata reconciliation of availability zone %(az)s: "
+             "%(num)s edges, %(up)s up to date, %(updated)s updated, "
+             "%(recreated)s recreated, %(failed)s failed",
+             {'az': az_name, 'num': len(results),
+              'up': list(results.values()).count(MD_UP_TO_DATE),
+              'updated': list(results.values()).count(MD_UPDATED),
+              'recreated': list(results.values()).count(MD_RECREATED),
+              'failed': list(results.values()).count(MD_FAILED)})
+    audit.report('Reconciled edges',
+                 [{'edge_id': edge_id, 'result': result}
+                  for edge_id, result in sorted(results.items())
+                  if result != MD_UP_TO_DATE],
+                 ['edge_id', 'result'])
 
 
 @admin_utils.output_header
@@ -555,7 +555,8 @@ def validate_config_for_migration(resource, event, trigger, **kwargs):
         with utils.NsxVPluginWrapper() as plugin:
             # The migration is supported only for NSX 6.4.9 and above
             nsx_ver = plugin.nsx_v.vcns.get_version()
-            if not c_utils.is_nsxv_version_6_4_9(nsx_ver):
+            if not c_utils.nsxv_supports(nsx_ver,
+                                         nsxv_constants.V2T_MIGRATION):
                 log_error("Migration with NSX-V version %s is not "
                           "supported." % nsx_ver)
 
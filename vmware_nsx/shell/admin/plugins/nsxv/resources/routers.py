@@ -29,6 +29,7 @@ from vmware_nsx.db import nsxv_db
 from vmware_nsx.extensions import routersize
 from vmware_nsx.plugins.nsx_v import availability_zones as nsx_az
 from vmware_nsx.plugins.nsx_v import md_proxy
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
 from vmware_nsx.plugins.nsx_v.vshield import edge_utils
 from vmware_nsx.plugins.nsx_v.vshield import vcns_driver
 
@@ -43,6 +44,7 @@ def delete_old_edge(context, old_edge_id):
     nsxv_db.clean_edge_vnic_binding(context.session, old_edge_id)
     nsxv_db.cleanup_nsxv_edge_firewallrule_binding(context.session,
                                                    old_edge_id)
+    edge_fingerprints.invalidate(context, old_edge_id)
 
     with locking.LockManager.get_lock(old_edge_id):
         # Delete from NSXv backend
@@ -213,6 +215,9 @@ def migrate_distributed_routers_dhcp(resource, event, trigger, **kwargs):
                         route_obj['staticRoutes']['staticRoutes'] = new_routes
 
                         nsxv.update_routes(edge_id, route_obj)
+                        edge_fingerprints.invalidate(
+                            context, edge_id,
+                            service=edge_fingerprints.ROUTES)
 
                         _update_vdr_fw_config(nsxv, edge_id)
                         plr_id = edge_manager.get_plr_by_tlr_id(context,
@@ -230,6 +235,12 @@ def migrate_distributed_routers_dhcp(resource, event, trigger, **kwargs):
 def update_edge_firewalls(resource, event, trigger, **kwargs):
     context = n_context.get_admin_context()
     updated_routers = []
+    # Rewrite the firewalls even if their configuration did not change, to
+    # repair edges which were changed by other means
+    for binding in nsxv_db.get_nsxv_router_bindings(context.session):
+        if binding['edge_id']:
+            edge_fingerprints.invalidate(context, binding['edge_id'],
+                                         service=edge_fingerprints.FIREWALL)
     with utils.NsxVPluginWrapper() as plugin:
         shared_dr = plugin._router_managers.get_tenant_router_driver(
             context, 'shared')
@@ -275,6 +286,8 @@ def _update_vdr_fw_config(nsxv, edge_id):
 
         fw_config['firewallRules']['firewallRules'] = fw_rules
         nsxv.update_firewall(edge_id, fw_config)
+        edge_fingerprints.invalidate(None, edge_id,
+                                     service=edge_fingerprints.FIREWALL)
 
 
 def is_router_conflicting_on_edge(context, driver, router_id):
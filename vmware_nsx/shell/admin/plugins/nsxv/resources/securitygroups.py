@@ -14,10 +14,8 @@
 
 import operator
 import re
-import xml.etree.ElementTree as et
 
 from neutron.db.models import securitygroup as sg_models
-from neutron.db import models_v2
 from neutron.db import securitygroups_db
 from neutron.extensions import securitygroup as ext_sg
 from neutron_lib.callbacks import registry
@@ -25,7 +23,6 @@ from neutron_lib import context as n_context
 from neutron_lib.db import api as db_api
 from oslo_log import log as logging
 
-from vmware_nsx.common import utils as com_utils
 from vmware_nsx.db import db as nsx_db
 from vmware_nsx.db import extended_security_group as extended_secgroup
 from vmware_nsx.db import extended_security_group_rule as extend_sg_rule
@@ -34,6 +31,9 @@ from vmware_nsx.db import nsxv_db
 from vmware_nsx.db import nsxv_models
 from vmware_nsx.extensions import securitygrouplogging as sg_logging
 from vmware_nsx.extensions import securitygrouppolicy as sg_policy
+from vmware_nsx.plugins.nsx_v.vshield import section_directory
+from vmware_nsx.plugins.nsx_v.vshield import xml_codec
+from vmware_nsx.shell.admin.plugins.common import audit
 from vmware_nsx.shell.admin.plugins.common import constants
 from vmware_nsx.shell.admin.plugins.common import formatters
 from vmware_nsx.shell.admin.plugins.common import utils as admin_utils
@@ -123,18 +123,18 @@ class NeutronSecurityGroupDB(
             if sg_mapping:
                 self.context.session.delete(sg_mapping)
 
-    def get_vnics_in_security_group(self, security_group_id):
-        with utils.NsxVPluginWrapper() as plugin:
-            vnics = []
-            query = self.context.session.query(
-                models_v2.Port.id, models_v2.Port.device_id
-            ).join(sg_models.SecurityGroupPortBinding).filter_by(
-                security_group_id=security_group_id).all()
-            for p in query:
-                vnic_index = plugin._get_port_vnic_index(self.context, p.id)
-                vnic_id = plugin._get_port_vnic_id(vnic_index, p.device_id)
-                vnics.append(vnic_id)
-            return vnics
+    def get_vnics_in_security_group(self, plugin, security_group_id):
+        # Read the vnic indexes of all the security group ports at once
+        query = self.context.session.query(
+            nsxv_models.NsxvPortIndexMapping.device_id,
+            nsxv_models.NsxvPortIndexMapping.index
+        ).join(sg_models.SecurityGroupPortBinding,
+               sg_models.SecurityGroupPortBinding.port_id ==
+               nsxv_models.NsxvPortIndexMapping.port_id).filter(
+            sg_models.SecurityGroupPortBinding.security_group_id ==
+            security_group_id).all()
+        return [plugin._get_port_vnic_id(index, device_id)
+                for device_id, index in query]
 
 
 class NsxFirewallAPI(object):
@@ -142,12 +142,11 @@ class NsxFirewallAPI(object):
         self.vcns = utils.get_nsxv_client()
 
     def list_security_groups(self):
-        h, secgroups = self.vcns.list_security_groups()
-        if not secgroups:
+        h, secgroups_xml = self.vcns.list_security_groups()
+        if not secgroups_xml:
             return []
-        root = et.fromstring(secgroups)
         secgroups = []
-        for sg in root.iter('securitygroup'):
+        for sg in xml_codec.iter_elements(secgroups_xml, 'securitygroup'):
             sg_id = sg.find('objectId').text
             # This specific security-group is not relevant to the plugin
             if sg_id == 'securitygroup-1':
@@ -160,9 +159,8 @@ class NsxFirewallAPI(object):
         h, firewall_config = self.vcns.get_dfw_config()
         if not firewall_config:
             return []
-        root = com_utils.normalize_xml(firewall_config)
         sections = []
-        for sec in root.iter('section'):
+        for sec in xml_codec.iter_spans(firewall_config, 'section'):
             sec_id = sec.attrib['id']
             # Don't show NSX default sections, which are not relevant to OS.
             if sec_id in ['1001', '1002', '1003']:
@@ -189,44 +187,43 @@ class NsxFirewallAPI(object):
             LOG.info("No firewall sections were found.")
             return
 
-        root = com_utils.normalize_xml(firewall_config)
-
-        for child in root:
-            if str(child.tag) == 'layer3Sections':
-                # go over the L3 sections and reorder them.
-                # The correct order should be:
-                # 1. OS provider security groups
-                # 2. service composer policies
-                # 3. regular OS security groups
-                sections = list(child.iter('section'))
-                provider_sections = []
-                regular_sections = []
-                policy_sections = []
-
-                for sec in sections:
-                    if sec.attrib.get('managedBy') == 'NSX Service Composer':
-                        policy_sections.append(sec)
-                    else:
-                        if neutron_sg._is_provider_section(
-                            sec.attrib.get('id')):
-                            provider_sections.append(sec)
-                        else:
-                            regular_sections.append(sec)
-                    child.remove(sec)
-
-                if not policy_sections and not provider_sections:
-                    LOG.info("No need to reorder the firewall sections.")
-                    return
-
-                # reorder the sections
-                reordered_sections = (provider_sections +
-                                      policy_sections +
-                                      regular_sections)
-                child.extend(reordered_sections)
-
-                # update the new order of sections in the backend
-                self.vcns.update_dfw_config(et.tostring(root), h)
-                LOG.info("L3 Firewall sections were reordered.")
+        # go over the L3 sections and reorder them.
+        # The correct order should be:
+        # 1. OS provider security groups
+        # 2. service composer policies
+        # 3. regular OS security groups
+        # Only the sections start tags are parsed, and the sections are
+        # moved as is.
+        data = xml_codec.to_bytes(firewall_config)
+        provider_sections = []
+        regular_sections = []
+        policy_sections = []
+        sections = list(xml_codec.iter_spans(
+            data, (section_directory.L3_SECTIONS_TAG, 'section')))
+        for sec in sections:
+            if sec.attrib.get('managedBy') == 'NSX Service Composer':
+                policy_sections.append(sec)
+            else:
+                if neutron_sg._is_provider_section(sec.attrib.get('id')):
+                    provider_sections.append(sec)
+                else:
+                    regular_sections.append(sec)
+
+        if not policy_sections and not provider_sections:
+            LOG.info("No need to reorder the firewall sections.")
+            return
+
+        # reorder the sections
+        reordered_sections = (provider_sections +
+                              policy_sections +
+                              regular_sections)
+        firewall_config = xml_codec.splice(data, [
+            xml_codec.replace(slot, data[sec.start:sec.end])
+            for slot, sec in zip(sections, reordered_sections)])
+
+        # update the new order of sections in the backend
+        self.vcns.update_dfw_config(firewall_config, h)
+        LOG.info("L3 Firewall sections were reordered.")
 
 
 neutron_sg = NeutronSecurityGroupDB()
@@ -358,26 +355,31 @@ def clean_unused_firewall_sections(resource, event, trigger, **kwargs):
 
 
 def _find_orphaned_section_rules():
-    fw_sections = nsxv_firewall.list_fw_sections()
+    fw_sections = audit.index_by(nsxv_firewall.list_fw_sections(),
+                                 operator.itemgetter('id'))
     sg_mappings = neutron_sg.get_security_groups_mappings()
     rules_mappings = neutron_sg.get_security_group_rules_mappings()
-    mapped_rules_ids = [rule['nsx_rule_id'] for rule in rules_mappings]
-    orphaned_rules = []
+    mapped_rules_ids = set(rule['nsx_rule_id'] for rule in rules_mappings)
 
-    for sg_db in sg_mappings:
-        for fw_section in fw_sections:
-            if fw_section['id'] == sg_db.get('section-uri', '').split('/')[-1]:
-                # Neutron section.
-                nsx_rules = nsxv_firewall.list_fw_section_rules(
-                    sg_db.get('section-uri'))
-                for nsx_rule in nsx_rules:
-                    if str(nsx_rule['id']) not in mapped_rules_ids:
-                        orphaned_rules.append(
-                            {'nsx-rule-id': nsx_rule['id'],
-                             'section-uri': sg_db['section-uri'],
-                             'section-id': fw_section['id'],
-                             'security-group-id': sg_db['id'],
-                             'security-group-name': sg_db['name']})
+    # Neutron sections, and their rules read concurrently from the NSX
+    neutron_sections = [
+        sg_db for sg_db in sg_mappings
+        if sg_db.get('section-uri', '').split('/')[-1] in fw_sections]
+    sections_rules = audit.fetch_concurrently(
+        nsxv_firewall.list_fw_section_rules,
+        set(sg_db['section-uri'] for sg_db in neutron_sections))
+
+    orphaned_rules = []
+    for sg_db in neutron_sections:
+        nsx_rules = audit.index_by(sections_rules[sg_db['section-uri']],
+                                   lambda rule: str(rule['id']))
+        for nsx_rule_id in sorted(set(nsx_rules) - mapped_rules_ids):
+            orphaned_rules.append(
+                {'nsx-rule-id': nsx_rules[nsx_rule_id]['id'],
+                 'section-uri': sg_db['section-uri'],
+                 'section-id': sg_db['section-uri'].split('/')[-1],
+                 'security-group-id': sg_db['id'],
+                 'security-group-name': sg_db['name']})
 
     return orphaned_rules
 
@@ -450,7 +452,8 @@ def fix_security_groups(resource, event, trigger, **kwargs):
                      " %s", sg_id)
             nsx_id = nsx_db.get_nsx_security_group_id(context_.session, sg_id,
                                                       moref=False)
-            for vnic_id in neutron_sg.get_vnics_in_security_group(sg_id):
+            for vnic_id in neutron_sg.get_vnics_in_security_group(plugin,
+                                                                  sg_id):
                 plugin._add_member_to_security_group(nsx_id, vnic_id)
 
 
@@ -600,12 +603,10 @@ def update_security_groups_logging(resource, event, trigger, **kwargs):
             # option.
             try:
                 h, c = vcns.get_section(section_uri)
-                section = sg_utils.parse_section(c)
-                section_needs_update = sg_utils.set_rules_logged_option(
-                    section, log_allowed)
-                if section_needs_update:
-                    vcns.update_section(section_uri,
-                                        sg_utils.to_xml_string(section), h)
+                section_xml = sg_utils.update_section_attributes(
+                    c, logged=log_allowed)
+                if section_xml:
+                    vcns.update_section(section_uri, section_xml, h)
             except Exception as exc:
                 LOG.error('Unable to update security group %(sg)s '
                           'section for logging. %(e)s',
@@ -12,7 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import operator
 
+from vmware_nsx.shell.admin.plugins.common import audit
 from vmware_nsx.shell.admin.plugins.common import constants
 from vmware_nsx.shell.admin.plugins.common import formatters
 
@@ -116,20 +118,39 @@ def get_port_vnic_id(plugin, port):
     return plugin._get_port_vnic_id(vnic_idx, device_id)
 
 
-def nsx_list_mismatch_addresses_for_net(context, plugin, network_id,
-                                        policy_id):
-    policy_data = get_spoofguard_policy_data(policy_id)
-    missing = []
-    # Get all neutron compute ports on this network
-    port_filters = {'network_id': [network_id]}
-    neutron_ports = plugin.get_ports(context, filters=port_filters)
-    comp_ports = [port for port in neutron_ports
-                  if port.get('device_owner', '').startswith('compute:')]
+def get_ports_vnic_ids(plugin, context, port_ids=None):
+    """Return the vnic ids of the ports attached to a vnic, by port id
+
+    The vnic indexes of all the ports are read at once, instead of per port.
+    """
+    return dict((port_id, plugin._get_port_vnic_id(index, device_id))
+                for port_id, device_id, index in
+                plugin._get_ports_vnic_indexes(context, port_ids=port_ids))
+
+
+def get_spoofguard_policy_data_by_vnic(policy_id):
+    return audit.index_by(get_spoofguard_policy_data(policy_id),
+                          operator.itemgetter('id'))
 
-    for port in comp_ports:
+
+def _get_mismatch_addresses(network_id, policy_id, ports, policy_data,
+                            vnic_ids):
+    """Compare the compute ports of a network to its spoofguard policy
+
+    policy_data is the spoofguard policy data indexed by vnic id, and
+    vnic_ids are the vnic ids of the ports by port id
+    """
+    missing = []
+    for port in ports:
+        if not port.get('device_owner', '').startswith('compute:'):
+            continue
         if not port['port_security_enabled']:
             # This port is not in spoofguard
             continue
+        vnic_id = vnic_ids.get(port['id'])
+        if not vnic_id:
+            # This port is not attached to a vnic yet
+            continue
         error_data = None
         port_ips = []
         for pair in port.get('allowed_address_pairs'):
@@ -140,26 +161,20 @@ def nsx_list_mismatch_addresses_for_net(context, plugin, network_id,
             continue
         port_ips.sort()
         mac_addr = port['mac_address']
-        vnic_id = get_port_vnic_id(plugin, port)
 
         # look for this port in the spoofguard data
-        found_port = False
-        for spd in policy_data:
-            if spd['id'] == vnic_id:
-                found_port = True
-                actual_ips = spd.get('publishedIpAddress',
-                                     {}).get('ipAddresses', [])
-                actual_ips.sort()
-                if actual_ips != port_ips:
-                    error_data = ('Different IPs (%s/%s)' % (
-                        len(actual_ips), len(port_ips)))
-                elif spd.get('publishedMacAddress') != mac_addr:
-                    error_data = ('Different MAC address (%s/%s)' % (
-                        spd.get('publishedMacAddress'), mac_addr))
-                continue
-
-        if not found_port:
+        spd = policy_data.get(vnic_id)
+        if not spd:
             error_data = 'Port missing from SG policy'
+        else:
+            actual_ips = sorted(spd.get('publishedIpAddress',
+                                        {}).get('ipAddresses', []))
+            if actual_ips != port_ips:
+                error_data = ('Different IPs (%s/%s)' % (
+                    len(actual_ips), len(port_ips)))
+            elif spd.get('publishedMacAddress') != mac_addr:
+                error_data = ('Different MAC address (%s/%s)' % (
+                    spd.get('publishedMacAddress'), mac_addr))
 
         if error_data:
             missing.append({'network': network_id,
@@ -169,6 +184,18 @@ def nsx_list_mismatch_addresses_for_net(context, plugin, network_id,
     return missing
 
 
+def nsx_list_mismatch_addresses_for_net(context, plugin, network_id,
+                                        policy_id):
+    policy_data = get_spoofguard_policy_data_by_vnic(policy_id)
+    # Get all neutron ports on this network
+    port_filters = {'network_id': [network_id]}
+    neutron_ports = plugin.get_ports(context, filters=port_filters)
+    vnic_ids = get_ports_vnic_ids(
+        plugin, context, port_ids=[port['id'] for port in neutron_ports])
+    return _get_mismatch_addresses(network_id, policy_id, neutron_ports,
+                                   policy_data, vnic_ids)
+
+
 @admin_utils.output_header
 @admin_utils.unpack_payload
 def nsx_list_mismatch_addresses(resource, event, trigger, **kwargs):
@@ -197,17 +224,25 @@ def nsx_list_mismatch_addresses(resource, event, trigger, **kwargs):
     else:
         with utils.NsxVPluginWrapper() as plugin:
             missing_data = []
-            # Go over all the networks with spoofguard policies
+            # Go over all the networks with spoofguard policies, reading
+            # all the policies data and ports once
             mappings = get_spoofguard_policy_network_mappings()
+            policies_data = audit.fetch_concurrently(
+                get_spoofguard_policy_data_by_vnic,
+                set(entry['policy_id'] for entry in mappings))
+            ports_by_net = audit.group_by(
+                plugin.get_ports(spgapi.context),
+                operator.itemgetter('network_id'))
+            vnic_ids = get_ports_vnic_ids(plugin, spgapi.context)
             for entry in mappings:
-                missing_data.extend(nsx_list_mismatch_addresses_for_net(
-                    spgapi.context, plugin, entry['network_id'],
-                    entry['policy_id']))
+                missing_data.extend(_get_mismatch_addresses(
+                    entry['network_id'], entry['policy_id'],
+                    ports_by_net.get(entry['network_id'], []),
+                    policies_data[entry['policy_id']], vnic_ids))
 
     if missing_data:
-        LOG.info(formatters.output_formatter(
-            constants.SPOOFGUARD_POLICY, missing_data,
-            ['network', 'policy', 'port', 'data']))
+        audit.report(constants.SPOOFGUARD_POLICY, missing_data,
+                     ['network', 'policy', 'port', 'data'])
     else:
         LOG.info("No mismatches found.")
 
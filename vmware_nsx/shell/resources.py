@@ -88,6 +88,8 @@ class Operations(enum.Enum):
     LIST_RTR_NO_IFACE = 'list-routers-no-interfaces'
     PATCH_RTR_NOGW = 'cutover-fixup-router-nogw'
     RESTORE_RTR_NOGW = 'cutover-restore-router-nogw'
+    MIGRATE_IP_PREFIX_GROUPS = 'migrate-ip-prefix-groups'
+    MIGRATE_FW_SECTIONS = 'migrate-fw-sections'
 
 
 ops = [op.value for op in Operations]
@@ -178,6 +180,8 @@ nsxv3_resources = {
                                          Operations.VALIDATE.value]),
     constants.LOADBALANCERS: Resource(constants.LOADBALANCERS,
                                       [Operations.SET_STATUS_ERROR.value]),
+    constants.LOCKS: Resource(constants.LOCKS,
+                              [Operations.STATUS.value]),
 }
 
 # Add supported NSX-V resources in this dictionary
@@ -195,7 +199,8 @@ nsxv_resources = {
                                       Operations.CLEAN_ALL.value,
                                       Operations.LIST_MISMATCHES.value,
                                       Operations.FIX_MISMATCH.value,
-                                      Operations.NEUTRON_CLEAN.value]),
+                                      Operations.NEUTRON_CLEAN.value,
+                                      Operations.STATUS.value]),
     constants.ORPHANED_EDGES: Resource(constants.ORPHANED_EDGES,
                                        [Operations.LIST.value,
                                         Operations.CLEAN.value]),
@@ -278,7 +283,10 @@ nsxv_resources = {
     constants.PORTS: Resource(constants.PORTS,
                               [Operations.LIST.value]),
     constants.LOADBALANCERS: Resource(constants.LOADBALANCERS,
-                                      [Operations.SET_STATUS_ERROR.value]),
+                                      [Operations.SET_STATUS_ERROR.value,
+                                       Operations.MIGRATE_FW_SECTIONS.value]),
+    constants.LOCKS: Resource(constants.LOCKS,
+                              [Operations.STATUS.value]),
 }
 
 
@@ -290,8 +298,10 @@ nsxtvd_resources = {
 }
 
 nsxp_resources = {
-    constants.SECURITY_GROUPS: Resource(constants.SECURITY_GROUPS,
-                                        [Operations.LIST.value]),
+    constants.SECURITY_GROUPS: Resource(
+        constants.SECURITY_GROUPS,
+        [Operations.LIST.value,
+         Operations.MIGRATE_IP_PREFIX_GROUPS.value]),
     constants.NETWORKS: Resource(constants.NETWORKS,
                                  [Operations.LIST.value,
                                   Operations.NSX_UPDATE_STATE.value,
@@ -326,6 +336,8 @@ nsxp_resources = {
                                          Operations.RESTORE_RTR_NOGW.value]),
     constants.LOADBALANCERS: Resource(constants.LOADBALANCERS,
                                       [Operations.SET_STATUS_ERROR.value]),
+    constants.LOCKS: Resource(constants.LOCKS,
+                              [Operations.STATUS.value]),
 }
 
 nsxv3_resources_names = list(nsxv3_resources.keys())
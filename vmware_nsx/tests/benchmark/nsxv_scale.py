@@ -0,0 +1,464 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""NSX-V scale benchmark
+
+Run the port, router and security group hot paths of the NSX-V plugin
+(EdgeManager, edge_utils and the plugin backend methods) against the NSX-V
+manager simulator, and report the throughput and the number of backend calls
+of each one.
+The neutron DB is replaced by an in-memory fake of the NSX mappings, so that
+the plugin and the backend round trips are measured, not the DB.
+
+    python -m vmware_nsx.tests.benchmark.nsxv_scale --scale 1000 \
+        --latency 5 --workers 10
+"""
+
+import argparse
+import contextlib
+import shutil
+import tempfile
+import time
+from unittest import mock
+import xml.etree.ElementTree as et
+
+import eventlet
+from neutron_lib.api.definitions import allowedaddresspairs as addr_apidef
+from oslo_config import cfg
+from oslo_serialization import jsonutils
+from oslo_utils import uuidutils
+
+from vmware_nsx.common import config  # noqa
+from vmware_nsx.common import utils as c_utils
+from vmware_nsx.extensions import providersecuritygroup as provider_sg
+from vmware_nsx.extensions import securitygrouplogging as sg_logging
+from vmware_nsx.extensions import securitygrouppolicy as sg_policy
+from vmware_nsx.plugins.nsx_v import availability_zones as nsx_az
+from vmware_nsx.plugins.nsx_v import plugin as nsx_v_plugin
+from vmware_nsx.plugins.nsx_v.vshield.common import (
+    constants as vcns_const)
+from vmware_nsx.plugins.nsx_v.vshield import edge_appliance_driver
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
+from vmware_nsx.plugins.nsx_v.vshield import edge_utils
+from vmware_nsx.plugins.nsx_v.vshield import securitygroup_utils
+from vmware_nsx.plugins.nsx_v.vshield import vcns_driver
+from vmware_nsx.tests.unit.nsx_v.vshield import fake_vcns_server
+
+DEFAULT_SCALE = 1000
+DEFAULT_WORKERS = 1
+SCENARIOS = ('routers', 'ports', 'security_groups')
+
+
+def _mac(index):
+    return 'fa:16:3e:%02x:%02x:%02x' % (
+        (index >> 16) & 0xff, (index >> 8) & 0xff, index & 0xff)
+
+
+def _ip(index):
+    return '10.%d.%d.%d' % ((index >> 16) & 0xff, (index >> 8) & 0xff,
+                            index & 0xff)
+
+
+class FakeDb(object):
+    """In-memory replacement of the nsxv_db and nsx_db modules
+
+    Only the mappings read back by the benchmarked code paths are kept.
+    The other DB calls are accepted and ignored.
+    """
+
+    def __init__(self):
+        self.router_bindings = {}
+        self.sg_mappings = {}
+        self.section_mappings = {}
+        self.spoofguard_policies = {}
+        self.fingerprints = {}
+        self._ignored = mock.MagicMock()
+
+    def __getattr__(self, name):
+        return getattr(self._ignored, name)
+
+    # Router & DHCP edge bindings
+
+    def add_nsxv_router_binding(self, session, router_id, vse_id, lswitch_id,
+                                status, **kwargs):
+        binding = dict(router_id=router_id, edge_id=vse_id,
+                       lswitch_id=lswitch_id, status=status, **kwargs)
+        self.router_bindings[router_id] = binding
+        return binding
+
+    def update_nsxv_router_binding(self, session, router_id, **kwargs):
+        self.router_bindings[router_id].update(kwargs)
+
+    def get_nsxv_router_binding(self, session, router_id):
+        return self.router_bindings.get(router_id)
+
+    def get_nsxv_router_bindings(self, session, filters=None,
+                                 like_filters=None):
+        # No backup edges
+        return []
+
+    def get_nsxv_subnet_ext_attributes(self, session, subnet_id):
+        return None
+
+    # Security groups, DFW sections and SpoofGuard policies
+
+    def add_neutron_nsx_security_group_mapping(self, session, neutron_id,
+                                               nsx_id):
+        self.sg_mappings[neutron_id] = nsx_id
+
+    def get_nsx_security_group_id(self, session, neutron_id, moref=False):
+        return self.sg_mappings.get(neutron_id)
+
+    def add_neutron_nsx_section_mapping(self, session, neutron_id,
+                                        section_id):
+        self.section_mappings[neutron_id] = section_id
+
+    def get_nsx_section(self, session, neutron_id):
+        if neutron_id in self.section_mappings:
+            return {'ip_section_id': self.section_mappings[neutron_id]}
+
+    def map_spoofguard_policy_for_network(self, session, network_id,
+                                          policy_id):
+        self.spoofguard_policies[network_id] = policy_id
+
+    def get_spoofguard_policy_id(self, session, network_id):
+        return self.spoofguard_policies.get(network_id)
+
+    # Edge configuration fingerprints
+
+    def get_nsxv_edge_config_fingerprint(self, session, edge_id, service,
+                                         recorded_since=None):
+        return self.fingerprints.get((edge_id, service))
+
+    def set_nsxv_edge_config_fingerprint(self, session, edge_id, service,
+                                         fingerprint):
+        self.fingerprints[(edge_id, service)] = fingerprint
+
+    def delete_nsxv_edge_config_fingerprints(self, session, edge_id,
+                                             service=None):
+        for key in list(self.fingerprints):
+            if key[0] == edge_id and service in (None, key[1]):
+                del self.fingerprints[key]
+
+
+def _override_config(stack, group, **overrides):
+    for name, value in overrides.items():
+        cfg.CONF.set_override(name, value, group=group)
+        stack.callback(cfg.CONF.clear_override, name, group=group)
+
+
+@contextlib.contextmanager
+def plugin_environment(server):
+    """Point the NSX-V plugin code at the simulator, with a fake DB
+
+    Yield the admin context used by the plugin code.
+    """
+    db = FakeDb()
+    context = mock.MagicMock()
+    lock_path = tempfile.mkdtemp()
+    with contextlib.ExitStack() as stack:
+        stack.callback(shutil.rmtree, lock_path, ignore_errors=True)
+        _override_config(stack, 'oslo_concurrency', lock_path=lock_path)
+        _override_config(stack, 'nsxv',
+                         manager_uri=server.address,
+                         user='admin',
+                         password='default',
+                         insecure=True,
+                         datacenter_moid='datacenter-1',
+                         resource_pool_id='resgroup-1',
+                         datastore_id='datastore-1',
+                         external_network='dvportgroup-1',
+                         backup_edge_pool=[])
+        stack.enter_context(mock.patch(
+            'neutron_lib.context.get_admin_context', return_value=context))
+        for module in (edge_appliance_driver, edge_fingerprints, edge_utils,
+                       nsx_v_plugin):
+            stack.enter_context(mock.patch.object(module, 'nsxv_db', db))
+        for module in (edge_utils, nsx_v_plugin):
+            stack.enter_context(mock.patch.object(module, 'nsx_db', db))
+        stack.enter_context(mock.patch.object(nsx_v_plugin, 'db_api'))
+        yield context
+
+
+class NsxvScaleBenchmark(object):
+    """Backend scenarios of the NSX-V plugin hot paths
+
+    Each scenario prepares its shared backend objects, and then runs a
+    single object life cycle step per object, with the requested number of
+    concurrent workers.
+    The plugin is not initialized: only the backend drivers, the
+    EdgeManager and the plugin backend methods are set up. The plugin
+    methods which read the neutron DB are mocked.
+    """
+
+    def __init__(self, server, context, scale=DEFAULT_SCALE,
+                 workers=DEFAULT_WORKERS):
+        self.server = server
+        self.context = context
+        self.scale = scale
+        self.workers = workers
+        self.plugin = self._get_plugin()
+        self.driver = self.plugin.nsx_v
+        self.edge_manager = self.plugin.edge_manager
+        azs = nsx_az.NsxVAvailabilityZones()
+        self.az = azs.get_default_availability_zone()
+
+    def _get_plugin(self):
+        plugin = nsx_v_plugin.NsxVPluginV2.__new__(nsx_v_plugin.NsxVPluginV2)
+        plugin.nsx_v = vcns_driver.VcnsDriver(mock.Mock(plugin=plugin))
+        plugin.nsx_sg_utils = securitygroup_utils.NsxSecurityGroupUtils(
+            plugin.nsx_v.vcns)
+        plugin.edge_manager = edge_utils.EdgeManager(plugin.nsx_v, plugin)
+        plugin._use_nsx_policies = False
+        # Neutron DB accessors
+        subnet = {'enable_dhcp': True,
+                  'gateway_ip': '10.0.0.1',
+                  'dns_nameservers': [],
+                  'host_routes': []}
+        for name, value in (('get_port', None),
+                            ('_get_subnet_object', None),
+                            ('_make_subnet_dict', subnet),
+                            ('is_dhcp_metadata', False),
+                            ('_prevent_non_admin_edit_provider_sg', None),
+                            ('_validate_security_group_rules', None),
+                            ('_is_policy_security_group', False),
+                            ('_is_security_group_logged', False),
+                            ('_is_provider_security_group', False),
+                            ('_check_local_ip_prefix', True)):
+            setattr(plugin, name, mock.Mock(return_value=value))
+        return plugin
+
+    def _run_per_object(self, func):
+        pool = eventlet.GreenPool(self.workers)
+        for _result in pool.imap(func, range(self.scale)):
+            pass
+
+    # Routers: edge allocation, SNAT and default gateway configuration, and
+    # edge status
+
+    def _router(self, index):
+        router_id = uuidutils.generate_uuid()
+        self.edge_manager.create_lrouter(
+            self.context, {'id': router_id, 'name': 'router-%s' % index},
+            availability_zone=self.az)
+        edge_utils.update_nat_rules(
+            self.driver, self.context, router_id,
+            [{'src': '192.168.%d.0/24' % (index % 256),
+              'translated': _ip(index)}], [], az=self.az)
+        edge_utils.update_gateway(self.driver, self.context, router_id,
+                                  '172.24.4.1')
+        self.driver.get_edge_status(
+            edge_utils.get_router_edge_id(self.context, router_id))
+
+    def routers(self):
+        self._run_per_object(self._router)
+        edges = self.driver.vcns.get_edges()
+        assert len(edges) >= self.scale
+
+    # Ports: DHCP static binding, SpoofGuard approval and security group
+    # membership
+
+    def _prepare_ports(self):
+        self._network_id = uuidutils.generate_uuid()
+        self._subnet_id = uuidutils.generate_uuid()
+        self.edge_manager._allocate_dhcp_edge_appliance(
+            self.context,
+            (vcns_const.DHCP_EDGE_PREFIX + self._network_id)[:36],
+            self.az)
+        self._dhcp_edge_id = edge_utils.get_dhcp_edge_id(
+            self.context, self._network_id)
+        self._policy_id = self.plugin._prepare_spoofguard_policy(
+            c_utils.NsxVNetworkTypes.VXLAN, {'id': self._network_id},
+            ['virtualwire-1'])[0]
+        nsx_v_plugin.nsxv_db.map_spoofguard_policy_for_network(
+            self.context.session, self._network_id, self._policy_id)
+        self._port_sg_id = uuidutils.generate_uuid()
+        self.plugin._create_nsx_security_group(
+            self.context, {'id': self._port_sg_id,
+                           'name': 'ports',
+                           'description': ''})
+
+    def _port(self, index):
+        port = {'id': uuidutils.generate_uuid(),
+                'network_id': self._network_id,
+                'device_owner': 'compute:nova',
+                'mac_address': _mac(index),
+                'fixed_ips': [{'subnet_id': self._subnet_id,
+                               'ip_address': _ip(index)}],
+                addr_apidef.ADDRESS_PAIRS: []}
+        vnic_id = '50%08d-0000-0000-0000-000000000000.000' % index
+        self.plugin._create_dhcp_static_binding(self.context, port)
+        self.plugin._update_vnic_assigned_addresses(
+            self.context.session, port, vnic_id)
+        self.plugin._add_security_groups_port_mapping(
+            self.context.session, vnic_id, [self._port_sg_id])
+
+    def ports(self):
+        self._prepare_ports()
+        self._run_per_object(self._port)
+        vcns = self.driver.vcns
+        h, dhcp = vcns.query_dhcp_configuration(self._dhcp_edge_id)
+        assert len(dhcp['staticBindings']['staticBindings']) == self.scale
+        h, data = vcns.get_spoofguard_policy_data(self._policy_id)
+        assert len(data['spoofguardList']) == self.scale
+
+    # Security groups: NSX security group and DFW section creation, and a
+    # section update with a new rule
+
+    def _prepare_security_groups(self):
+        self.plugin.sg_container_id = (
+            self.plugin._create_security_group_container())
+        self.plugin.default_section = self.driver.vcns.get_default_l3_id()
+
+    def _get_rule(self, sg_id, direction, ethertype, protocol=None,
+                  port=None):
+        return {'id': uuidutils.generate_uuid(),
+                'security_group_id': sg_id,
+                'remote_group_id': None,
+                'remote_ip_prefix': None,
+                'direction': direction,
+                'ethertype': ethertype,
+                'protocol': protocol,
+                'port_range_min': port,
+                'port_range_max': port,
+                'tenant_id': 'tenant',
+                'description': ''}
+
+    def _security_group(self, index):
+        sg_id = uuidutils.generate_uuid()
+        self.plugin._process_security_group_create_backend_resources(
+            self.context, {
+                'id': sg_id,
+                'name': 'sg-%s' % index,
+                'description': '',
+                'tenant_id': 'tenant',
+                provider_sg.PROVIDER: False,
+                sg_logging.LOGGING: False,
+                sg_policy.POLICY: None,
+                'security_group_rules': [
+                    self._get_rule(sg_id, 'egress', 'IPv4'),
+                    self._get_rule(sg_id, 'egress', 'IPv6')]})
+        self.plugin.create_security_group_rule_bulk(
+            self.context,
+            {'security_group_rules': [{'security_group_rule': self._get_rule(
+                sg_id, 'ingress', 'IPv4', protocol='tcp', port=22)}]},
+            create_base=False)
+
+    def security_groups(self):
+        self._prepare_security_groups()
+        self._run_per_object(self._security_group)
+        h, c = self.driver.vcns.get_dfw_config()
+        sections = et.fromstring(c).find('layer3Sections')
+        assert len(sections) > self.scale
+
+    def run(self, scenario):
+        """Run a scenario on a clean backend and return its results"""
+        self.server.reset()
+        self.server.reset_counters()
+        start = time.time()
+        getattr(self, scenario)()
+        elapsed = time.time() - start
+        calls = self.server.total_calls
+        return {'scenario': scenario,
+                'objects': self.scale,
+                'workers': self.workers,
+                'seconds': round(elapsed, 3),
+                'objects_per_second': round(self.scale / elapsed, 1),
+                'backend_calls': calls,
+                'calls_per_object': round(float(calls) / self.scale, 2),
+                'calls_by_route': dict(
+                    ('%s %s' % key, count) for key, count in
+                    sorted(self.server.call_counts.items()))}
+
+
+def run_benchmark(scenarios=SCENARIOS, scale=DEFAULT_SCALE,
+                  workers=DEFAULT_WORKERS, latency=0,
+                  page_size=fake_vcns_server.DEFAULT_PAGE_SIZE):
+    """Run the scenarios against a new simulator and return their results"""
+    with fake_vcns_server.FakeVcnsServer(
+            latency=latency, page_size=page_size) as server:
+        with plugin_environment(server) as context:
+            benchmark = NsxvScaleBenchmark(server, context, scale=scale,
+                                           workers=workers)
+            return [benchmark.run(scenario) for scenario in scenarios]
+
+
+def _print_results(results):
+    print("%-16s %8s %8s %10s %12s %10s" % (
+        'scenario', 'objects', 'workers', 'seconds', 'objects/sec',
+        'calls/obj'))
+    for result in results:
+        print("%-16s %8d %8d %10.3f %12.1f %10.2f" % (
+            result['scenario'], result['objects'], result['workers'],
+            result['seconds'], result['objects_per_second'],
+            result['calls_per_object']))
+    for result in results:
+        print("\n%s backend calls (%d):" % (result['scenario'],
+                                            result['backend_calls']))
+        for route, count in result['calls_by_route'].items():
+            print("    %-40s %8d" % (route, count))
+
+
+def _setup_argparse():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the NSX-V backend hot paths against the NSX-V '
+                    'manager simulator')
+    parser.add_argument(
+        "--scenario",
+        action='append',
+        choices=SCENARIOS,
+        help="Scenario to run. May be repeated. Defaults to all of them.")
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=DEFAULT_SCALE,
+        help="Number of objects per scenario (typically 1000 to 10000).")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of concurrent workers issuing the backend calls.")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0,
+        help="Simulated backend latency per call, in milliseconds.")
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=fake_vcns_server.DEFAULT_PAGE_SIZE,
+        help="Page size of the simulated backend edges listing.")
+    parser.add_argument(
+        "--json",
+        action='store_true',
+        help="Print the results as json.")
+    return parser.parse_args()
+
+
+def main():
+    args = _setup_argparse()
+    results = run_benchmark(scenarios=args.scenario or SCENARIOS,
+                            scale=args.scale,
+                            workers=args.workers,
+                            latency=args.latency / 1000.0,
+                            page_size=args.page_size)
+    if args.json:
+        print(jsonutils.dumps(results, indent=2))
+    else:
+        _print_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""NSX-V XML payloads micro benchmark
+
+Compare the whole ElementTree processing of DFW section payloads with the
+streaming XML codec, for the section operations of the NSX-V plugin, and
+report the time and the peak memory of each one.
+
+    python -m vmware_nsx.tests.benchmark.nsxv_xml --rules 1000 \
+        --rules 10000 --rules 50000
+"""
+
+import argparse
+import time
+import tracemalloc
+import xml.etree.ElementTree as et
+
+from oslo_serialization import jsonutils
+
+from vmware_nsx.plugins.nsx_v.vshield import securitygroup_utils
+
+DEFAULT_RULES = (1000, 10000, 50000)
+OPERATIONS = ('parse', 'rename', 'extend')
+
+RULE_TEMPLATE = (
+    '<rule id="%(id)s" disabled="false" logged="false">'
+    '<name>%(name)s</name><action>allow</action>'
+    '<appliedToList><appliedTo><name>sg</name><value>securitygroup-10'
+    '</value><type>SecurityGroup</type><isValid>true</isValid></appliedTo>'
+    '</appliedToList><sectionId>1010</sectionId>'
+    '<sources excluded="false"><source><value>10.0.%(net)s.0/24</value>'
+    '<type>Ipv4Address</type><isValid>true</isValid></source></sources>'
+    '<services><service><isValid>true</isValid><destinationPort>%(port)s'
+    '</destinationPort><protocol>6</protocol><protocolName>TCP'
+    '</protocolName></service></services><direction>inout</direction>'
+    '<packetType>any</packetType></rule>')
+
+
+def _section_payload(rules):
+    return ('<section id="1010" name="SG Section: sg (1010)" '
+            'generationNumber="1" timestamp="1">%s</section>' % ''.join(
+                RULE_TEMPLATE % {'id': 100000 + index,
+                                 'name': 'rule-%s' % index,
+                                 'net': index % 256,
+                                 'port': 1 + index % 65535}
+                for index in range(rules)))
+
+
+class NsxvXmlBenchmark(object):
+    """The section operations, processed as a tree and as a stream"""
+
+    def __init__(self):
+        self.sg_utils = securitygroup_utils.NsxSecurityGroupUtils(None)
+        self.new_rule = self.sg_utils.get_rule_config(
+            ['securitygroup-10'], 'new-rule',
+            source=self.sg_utils.get_container('securitygroup-10'),
+            services=[('6', 22, None, None)])
+
+    # Read the rules ids of a section response
+
+    def parse_tree(self, payload):
+        return [{'nsx_id': rule.attrib.get('id'),
+                 'neutron_id': rule.find('name').text}
+                for rule in et.fromstring(payload).findall('rule')]
+
+    def parse_stream(self, payload):
+        return self.sg_utils.get_rule_id_pair_from_section(payload)
+
+    # Rename a section
+
+    def rename_tree(self, payload):
+        section = et.fromstring(payload)
+        section.attrib['name'] = 'SG Section: renamed (1010)'
+        return et.tostring(section)
+
+    def rename_stream(self, payload):
+        return self.sg_utils.update_section_attributes(
+            payload, name='SG Section: renamed (1010)')
+
+    # Add a rule to a section
+
+    def extend_tree(self, payload):
+        section = et.fromstring(payload)
+        self.sg_utils.fix_existing_section_rules(section)
+        self.sg_utils.extend_section_with_rules(section, [self.new_rule])
+        return et.tostring(section)
+
+    def extend_stream(self, payload):
+        return self.sg_utils.extend_section(payload, [self.new_rule])
+
+    def _measure(self, func, payload):
+        start = time.time()
+        func(payload)
+        elapsed = time.time() - start
+        tracemalloc.start()
+        try:
+            func(payload)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return elapsed, peak
+
+    def run(self, operation, rules):
+        """Run an operation on a section of rules and return its results"""
+        payload = _section_payload(rules).encode('utf-8')
+        tree_seconds, tree_peak = self._measure(
+            getattr(self, '%s_tree' % operation), payload)
+        stream_seconds, stream_peak = self._measure(
+            getattr(self, '%s_stream' % operation), payload)
+        return {'operation': operation,
+                'rules': rules,
+                'payload_kb': len(payload) // 1024,
+                'tree_seconds': round(tree_seconds, 4),
+                'stream_seconds': round(stream_seconds, 4),
+                'tree_peak_kb': tree_peak // 1024,
+                'stream_peak_kb': stream_peak // 1024}
+
+
+def run_benchmark(operations=OPERATIONS, rules=DEFAULT_RULES):
+    """Run the operations for each section size and return their results"""
+    benchmark = NsxvXmlBenchmark()
+    return [benchmark.run(operation, count)
+            for count in rules for operation in operations]
+
+
+def _print_results(results):
+    print("%-10s %8s %10s %10s %10s %12s %12s" % (
+        'operation', 'rules', 'size(KB)', 'tree(s)', 'stream(s)',
+        'tree(KB)', 'stream(KB)'))
+    for result in results:
+        print("%-10s %8d %10d %10.4f %10.4f %12d %12d" % (
+            result['operation'], result['rules'], result['payload_kb'],
+            result['tree_seconds'], result['stream_seconds'],
+            result['tree_peak_kb'], result['stream_peak_kb']))
+
+
+def _setup_argparse():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the NSX-V XML section payloads processing')
+    parser.add_argument(
+        "--operation",
+        action='append',
+        choices=OPERATIONS,
+        help="Operation to run. May be repeated. Defaults to all of them.")
+    parser.add_argument(
+        "--rules",
+        action='append',
+        type=int,
+        help="Number of rules of the section. May be repeated. Defaults to "
+             "%s." % ', '.join(str(count) for count in DEFAULT_RULES))
+    parser.add_argument(
+        "--json",
+        action='store_true',
+        help="Print the results as json.")
+    return parser.parse_args()
+
+
+def main():
+    args = _setup_argparse()
+    results = run_benchmark(operations=args.operation or OPERATIONS,
+                            rules=args.rules or DEFAULT_RULES)
+    if args.json:
+        print(jsonutils.dumps(results, indent=2))
+    else:
+        _print_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+from unittest import mock
+
+import fixtures
+from neutron.tests import base
+
+from vmware_nsx.api_replay import client
+
+NET_ID = 'net-1'
+SUBNET_ID = 'subnet-1'
+ROUTER_ID = 'router-1'
+INTERFACE_PORT = {'id': 'port-1', 'project_id': 'project-1',
+                  'device_owner': 'network:router_interface',
+                  'device_id': ROUTER_ID,
+                  'fixed_ips': [{'subnet_id': SUBNET_ID,
+                                 'ip_address': '10.0.0.1'}]}
+VM_PORT = {'id': 'port-2', 'project_id': 'project-1',
+           'device_owner': 'compute:nova', 'device_id': 'vm-1',
+           'fixed_ips': [{'subnet_id': SUBNET_ID,
+                          'ip_address': '10.0.0.2'}]}
+
+
+class TestApiReplayCheckpoint(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestApiReplayCheckpoint, self).setUp()
+        self.checkpoint_file = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'checkpoint.json')
+
+    def _get_client(self):
+        api_client = client.ApiReplayClient.__new__(client.ApiReplayClient)
+        api_client.dest_neutron = mock.Mock()
+        api_client.dest_neutron.create_network.return_value = {
+            'network': {'id': NET_ID}}
+        api_client.dest_neutron.create_port.side_effect = (
+            lambda body: {'port': dict(body['port'], mac_address='mac',
+                                       id=body['port']['id'])})
+        api_client.ignore_errors = True
+        api_client.n_errors = 0
+        api_client.errors = []
+        api_client.ext_net_map = None
+        api_client.net_vni_map = None
+        api_client.vif_ids_map = None
+        api_client.checkpoint = client.MigrationCheckpoint(
+            self.checkpoint_file)
+        api_client.phase = None
+        mock.patch.object(api_client, 'check_and_apply_tags').start()
+        mock.patch.object(api_client, 'prepare_network',
+                          return_value={}).start()
+        mock.patch.object(api_client, 'prepare_subnet',
+                          return_value={'enable_dhcp': False}).start()
+        mock.patch.object(
+            api_client, 'prepare_port',
+            side_effect=lambda port, **kwargs: {
+                'id': port['id'],
+                'device_owner': port['device_owner'],
+                'device_id': port['device_id'],
+                'fixed_ips': [dict(ip) for ip in port['fixed_ips']]}).start()
+        return api_client
+
+    def _migrate_network(self, api_client, dest_networks=None,
+                         dest_subnets=None, dest_ports=None):
+        network = {'id': NET_ID, 'subnets': [SUBNET_ID]}
+        return api_client._migrate_phase(
+            'networks', api_client._migrate_network, network, 1, 1, {},
+            False, False, [], {}, {SUBNET_ID: {'id': SUBNET_ID}},
+            {NET_ID: [INTERFACE_PORT, VM_PORT]}, dest_networks or {},
+            dest_subnets or {}, dest_ports or {})
+
+    def test_checkpoint_resume(self):
+        checkpoint = client.MigrationCheckpoint(self.checkpoint_file)
+        self.assertFalse(checkpoint.resuming)
+        checkpoint.phase_done('routers', [{}, {ROUTER_ID: None}])
+        checkpoint.network_done(NET_ID)
+
+        checkpoint = client.MigrationCheckpoint(self.checkpoint_file)
+        self.assertTrue(checkpoint.resuming)
+        self.assertTrue(checkpoint.is_phase_done('routers'))
+        self.assertFalse(checkpoint.is_phase_done('networks'))
+        self.assertEqual([{}, {ROUTER_ID: None}],
+                         checkpoint.get_phase_result('routers'))
+        self.assertTrue(checkpoint.is_network_done(NET_ID))
+
+    def test_migrate_phase_skip(self):
+        api_client = self._get_client()
+        migrate_func = mock.Mock(return_value={'qos': True})
+        self.assertEqual({'qos': True},
+                         api_client._migrate_phase('qos', migrate_func))
+
+        api_client = self._get_client()
+        migrate_func.reset_mock()
+        self.assertEqual({'qos': True},
+                         api_client._migrate_phase('qos', migrate_func))
+        migrate_func.assert_not_called()
+
+    def test_migrate_phase_with_failures(self):
+        api_client = self._get_client()
+        api_client._migrate_phase(
+            'rbac', lambda: api_client.add_error("Failed to create rbac"))
+        self.assertEqual(1, api_client.n_errors)
+        self.assertFalse(api_client.checkpoint.is_phase_done('rbac'))
+
+        # The failed phase runs again on resume
+        api_client = self._get_client()
+        self.assertEqual(["Failed to create rbac"],
+                         api_client.checkpoint.get_phase_failures('rbac'))
+        migrate_func = mock.Mock(return_value=None)
+        api_client._migrate_phase('rbac', migrate_func)
+        migrate_func.assert_called_once_with()
+        self.assertTrue(api_client.checkpoint.is_phase_done('rbac'))
+        self.assertEqual([], api_client.checkpoint.get_phase_failures('rbac'))
+
+    def test_resume_network_after_partial_failure(self):
+        api_client = self._get_client()
+        api_client.dest_neutron.create_subnet.return_value = {
+            'subnet': {'id': SUBNET_ID}}
+        api_client.dest_neutron.add_interface_router.side_effect = (
+            Exception("Router is busy"))
+        self._migrate_network(api_client)
+        self.assertEqual(2, api_client.dest_neutron.create_port.call_count)
+        self.assertFalse(api_client.checkpoint.is_network_done(NET_ID))
+        self.assertFalse(api_client.checkpoint.is_phase_done('networks'))
+
+        # On resume the interface port exists, but is not attached to the
+        # router yet
+        api_client = self._get_client()
+        self._migrate_network(
+            api_client,
+            dest_networks={NET_ID: {'id': NET_ID}},
+            dest_subnets={SUBNET_ID: {'id': SUBNET_ID,
+                                      'enable_dhcp': False}},
+            dest_ports={INTERFACE_PORT['id']: {'id': INTERFACE_PORT['id'],
+                                               'device_id': ''},
+                        VM_PORT['id']: VM_PORT})
+        api_client.dest_neutron.create_network.assert_not_called()
+        api_client.dest_neutron.create_port.assert_not_called()
+        api_client.dest_neutron.add_interface_router.assert_called_once_with(
+            ROUTER_ID, {'port_id': INTERFACE_PORT['id']})
+        self.assertTrue(api_client.checkpoint.is_network_done(NET_ID))
+        self.assertTrue(api_client.checkpoint.is_phase_done('networks'))
+
+    def test_resume_attached_interface_port(self):
+        api_client = self._get_client()
+        api_client.checkpoint.resuming = True
+        self._migrate_network(
+            api_client,
+            dest_networks={NET_ID: {'id': NET_ID}},
+            dest_subnets={SUBNET_ID: {'id': SUBNET_ID,
+                                      'enable_dhcp': False}},
+            dest_ports={INTERFACE_PORT['id']: INTERFACE_PORT,
+                        VM_PORT['id']: VM_PORT})
+        api_client.dest_neutron.add_interface_router.assert_not_called()
+        self.assertTrue(api_client.checkpoint.is_network_done(NET_ID))
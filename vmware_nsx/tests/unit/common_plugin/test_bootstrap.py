@@ -0,0 +1,84 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+import fixtures
+from neutron.tests import base
+from oslo_config import cfg
+
+from vmware_nsx.common import bootstrap
+from vmware_nsx.common import config  # noqa
+
+
+class TestBootstrap(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestBootstrap, self).setUp()
+        cache_dir = self.useFixture(fixtures.TempDir()).path
+        cfg.CONF.set_override('bootstrap_cache_dir', cache_dir)
+        cfg.CONF.set_override('bootstrap_cache_ttl', 300)
+
+    def test_run_once_uses_cache(self):
+        func = mock.Mock(return_value={'res': 'value'})
+        result1 = bootstrap.run_once('test', {'conf': 1}, func)
+        result2 = bootstrap.run_once('test', {'conf': 1}, func)
+        func.assert_called_once()
+        self.assertEqual({'res': 'value'}, result1)
+        self.assertEqual(result1, result2)
+
+    def test_run_once_config_changed(self):
+        func = mock.Mock(return_value='value')
+        bootstrap.run_once('test', {'conf': 1}, func)
+        bootstrap.run_once('test', {'conf': 2}, func)
+        self.assertEqual(2, func.call_count)
+
+    def test_run_once_expired(self):
+        func = mock.Mock(return_value='value')
+        bootstrap.run_once('test', {'conf': 1}, func)
+        cfg.CONF.set_override('bootstrap_cache_ttl', -1)
+        bootstrap.run_once('test', {'conf': 1}, func)
+        self.assertEqual(2, func.call_count)
+
+    def test_run_once_disabled(self):
+        cfg.CONF.set_override('bootstrap_cache_ttl', 0)
+        func = mock.Mock(return_value='value')
+        bootstrap.run_once('test', {'conf': 1}, func)
+        bootstrap.run_once('test', {'conf': 1}, func)
+        self.assertEqual(2, func.call_count)
+
+    def test_run_once_failure_not_cached(self):
+        func = mock.Mock(side_effect=[ValueError, 'value'])
+        self.assertRaises(ValueError, bootstrap.run_once, 'test',
+                          {'conf': 1}, func)
+        self.assertEqual('value',
+                         bootstrap.run_once('test', {'conf': 1}, func))
+
+    def test_invalidate(self):
+        func = mock.Mock(return_value='value')
+        bootstrap.run_once('test', {'conf': 1}, func)
+        bootstrap.invalidate('test')
+        bootstrap.run_once('test', {'conf': 1}, func)
+        self.assertEqual(2, func.call_count)
+
+    def test_run_concurrently(self):
+        results = bootstrap.run_concurrently([lambda: 1, lambda: 2])
+        self.assertEqual([1, 2], results)
+
+        def _fail():
+            raise ValueError()
+
+        self.assertRaises(ValueError, bootstrap.run_concurrently,
+                          [lambda: 1, _fail])
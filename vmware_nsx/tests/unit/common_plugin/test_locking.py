@@ -0,0 +1,74 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from neutron.tests import base
+from oslo_concurrency.fixture import lockutils as lock_fixture
+
+from vmware_nsx.common import config  # noqa
+from vmware_nsx.common import locking
+
+
+class TestLockManager(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestLockManager, self).setUp()
+        self.useFixture(lock_fixture.ExternalLockFixture())
+        locking.LockStats.reset()
+        self.addCleanup(locking.LockStats.reset)
+        mock.patch.object(locking.LockStats, 'save').start()
+
+    def test_lock_stats_name(self):
+        self.assertEqual(
+            'lb-router-*',
+            locking.get_lock_stats_name(
+                'lb-router-2b3c4d5e-1111-2222-3333-444455556666'))
+        self.assertEqual('edge-*', locking.get_lock_stats_name('edge-12'))
+        self.assertEqual('nsx-edge-backup-pool',
+                         locking.get_lock_stats_name('nsx-edge-backup-pool'))
+
+    def test_get_lock_stats(self):
+        with locking.LockManager.get_lock('edge-1'):
+            pass
+        with locking.LockManager.get_lock('edge-2'):
+            pass
+        stats = locking.LockStats.get_stats()
+        self.assertEqual(['edge-*'], list(stats.keys()))
+        self.assertEqual(2, stats['edge-*']['acquired'])
+        self.assertEqual(0, stats['edge-*']['contended'])
+
+    def test_get_lock_stats_on_failure(self):
+        def _failure():
+            with locking.LockManager.get_lock('edge-1'):
+                raise ValueError()
+
+        self.assertRaises(ValueError, _failure)
+        self.assertEqual(1,
+                         locking.LockStats.get_stats()['edge-*']['acquired'])
+
+    def test_lock_contention(self):
+        locking.LockStats.start_acquire('edge-*')
+        with locking.LockManager.get_lock('edge-1'):
+            pass
+        self.assertEqual(1,
+                         locking.LockStats.get_stats()['edge-*']['contended'])
+
+    def test_no_stack_trace_without_tracing(self):
+        with mock.patch.object(locking.traceback,
+                               'extract_stack') as extract_stack:
+            with locking.LockManager.get_lock('edge-1'):
+                pass
+            extract_stack.assert_not_called()
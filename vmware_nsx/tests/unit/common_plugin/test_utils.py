@@ -0,0 +1,53 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from neutron.tests import base
+
+from vmware_nsx.common import nsxv_constants
+from vmware_nsx.common import utils
+
+
+class TestVersionCapabilities(base.BaseTestCase):
+
+    def test_version_gates(self):
+        self.assertTrue(utils.is_nsxv_version_6_2('6.2.0'))
+        self.assertFalse(utils.is_nsxv_version_6_3('6.2.8'))
+        self.assertTrue(utils.is_nsx_version_3_0_0('3.0.1.0.0.1234'))
+        self.assertFalse(utils.is_nsx_version_3_1_0('3.0.1'))
+        self.assertTrue(utils.is_nsxv_dhcp_binding_supported('6.2.8'))
+        self.assertFalse(utils.is_nsxv_dhcp_binding_supported('6.3.2'))
+        self.assertTrue(utils.is_nsxv_dhcp_binding_supported('6.3.3'))
+
+    def test_nsxv_supports(self):
+        self.assertFalse(utils.nsxv_supports(
+            '6.2.3', nsxv_constants.NAT_RULES_ALL_VNICS))
+        self.assertTrue(utils.nsxv_supports(
+            '6.2.4', nsxv_constants.NAT_RULES_ALL_VNICS))
+        self.assertTrue(utils.nsxv_supports(
+            '6.4.10', nsxv_constants.V2T_MIGRATION))
+        self.assertFalse(utils.nsxv_supports(
+            '6.1', nsxv_constants.SUPPORTED_VERSION))
+
+    def test_resolved_once_per_version(self):
+        predicate = mock.Mock(side_effect=lambda ver: ver == '2')
+        capabilities = utils.VersionCapabilities({'feature': predicate})
+        for _i in range(3):
+            self.assertFalse(capabilities.supports('1', 'feature'))
+            self.assertTrue(capabilities.supports('2', 'feature'))
+        self.assertEqual([mock.call('1'), mock.call('2')],
+                         predicate.call_args_list)
+        self.assertEqual({'feature': True}, capabilities.get('2'))
@@ -48,9 +48,11 @@ from neutron_lib.objects import registry as obj_reg
 from neutron_lib.plugins import directory
 
 from vmware_nsx.common import utils
+from vmware_nsx.db import db as nsx_db
 from vmware_nsx.extensions import providersecuritygroup as provider_sg
 from vmware_nsx.plugins.common import plugin as com_plugin
 from vmware_nsx.plugins.nsx_p import plugin as nsx_plugin
+from vmware_nsx.plugins.nsx_p import port_queue
 from vmware_nsx.services.lbaas.nsx_p.implementation import loadbalancer_mgr
 from vmware_nsx.services.lbaas.octavia import octavia_listener
 
@@ -744,6 +746,107 @@ class NsxPTestPorts(common_v3.NsxV3TestPorts,
                     port = self.plugin.get_port(self.ctx, port['id'])
                     self.assertEqual(policy_id, port['qos_policy_id'])
 
+    def _get_async_port_data(self, network,
+                             mac_address='00:00:00:00:00:01'):
+        return {'port': {
+                    'network_id': network['network']['id'],
+                    'tenant_id': self._tenant_id,
+                    'name': 'async_port',
+                    'admin_state_up': True,
+                    'device_id': 'fake_device',
+                    'device_owner': 'fake_owner',
+                    'fixed_ips': [],
+                    'mac_address': mac_address}
+                }
+
+    def _mock_spawn(self, side_effect=lambda f, *args: f(*args)):
+        # Program the queued ports immediately by default
+        return mock.patch('vmware_nsx.plugins.nsx_p.port_queue.eventlet.'
+                          'spawn_n', side_effect=side_effect)
+
+    def _mock_port_create(self, **kwargs):
+        return mock.patch("vmware_nsxlib.v3.policy.core_resources."
+                          "NsxPolicySegmentPortApi.create_or_overwrite",
+                          **kwargs)
+
+    def _create_async_port(self, network, mac_address='00:00:00:00:00:01',
+                           **kwargs):
+        cfg.CONF.set_override('async_port_programming', True, 'nsx_p')
+        data = self._get_async_port_data(network, mac_address=mac_address)
+        with self._mock_spawn(), \
+                self._mock_port_create(**kwargs) as port_create:
+            port = self.plugin.create_port(self.ctx, data)
+            port_create.assert_called_once()
+        # The port is committed as DOWN
+        self.assertEqual(constants.PORT_STATUS_DOWN, port['status'])
+        return self.plugin.get_port(self.ctx, port['id'])
+
+    def test_create_port_async_programming(self):
+        with self.network() as network:
+            port = self._create_async_port(network)
+            self.assertEqual(constants.PORT_STATUS_ACTIVE, port['status'])
+            self.assertIsNone(nsx_db.get_nsx_port_realization(
+                self.ctx.session, port['id']))
+
+    def test_create_port_async_programming_failure(self):
+        with self.network() as network:
+            port = self._create_async_port(
+                network, side_effect=nsxlib_exc.ManagerError(details='fail'))
+            self.assertEqual(constants.PORT_STATUS_ERROR, port['status'])
+            entry = nsx_db.get_nsx_port_realization(
+                self.ctx.session, port['id'])
+            self.assertEqual('error', entry.status)
+            self.assertIn('fail', entry.reason)
+
+    def test_replay_queued_ports(self):
+        cfg.CONF.set_override('async_port_programming', True, 'nsx_p')
+        with self.network() as network:
+            # The server stops before programming the first port
+            with self._mock_spawn(side_effect=None):
+                pending = self.plugin.create_port(
+                    self.ctx, self._get_async_port_data(network))
+            self.plugin._ports_queue = port_queue.SegmentPortsQueue(
+                self.plugin._program_queued_port)
+            failed = self._create_async_port(
+                network, mac_address='00:00:00:00:00:02',
+                side_effect=nsxlib_exc.ManagerError(details='fail'))
+
+            # Both the pending and the failed ports are programmed on start
+            with self._mock_spawn(), \
+                    self._mock_port_create() as port_create:
+                self.plugin._replay_queued_ports()
+            self.assertEqual(2, port_create.call_count)
+            for port in (pending, failed):
+                self.assertEqual(
+                    constants.PORT_STATUS_ACTIVE,
+                    self.plugin.get_port(self.ctx, port['id'])['status'])
+                self.assertIsNone(nsx_db.get_nsx_port_realization(
+                    self.ctx.session, port['id']))
+
+    def test_update_port_async_programming_coalesced(self):
+        with self.network() as network:
+            port = self._create_async_port(network)
+            spawned = []
+            with self._mock_spawn(
+                    side_effect=lambda f, *args: spawned.append((f, args))):
+                for name in ('first', 'second'):
+                    self.plugin.update_port(self.ctx, port['id'],
+                                            {'port': {'name': name}})
+            # The second change is queued in the place of the first one
+            self.assertEqual(1, len(spawned))
+            entry = nsx_db.get_nsx_port_realization(
+                self.ctx.session, port['id'])
+            self.assertEqual(('update', 2),
+                             (entry.operation, entry.generation))
+
+            with self._mock_port_create() as port_create:
+                run, args = spawned[0]
+                run(*args)
+            port_create.assert_called_once()
+            self.assertIn('second', port_create.call_args[0][0])
+            self.assertIsNone(nsx_db.get_nsx_port_realization(
+                self.ctx.session, port['id']))
+
     def test_update_port_with_qos(self):
         with self.network() as network:
             data = {'port': {
@@ -1755,6 +1858,60 @@ class NsxPTestSecurityGroup(common_v3.FixExternalNetBaseTest,
                                          remote_ip_prefix):
                 update_policy.assert_called_once()
 
+    def test_sg_rules_share_ip_prefix_group(self):
+        """Verify that rules with the same remote IP use a single group"""
+        remote_ip_prefix = "10.0.0.0/24"
+        prefix_group_id = self.plugin._get_ip_prefix_group_id(
+            remote_ip_prefix)
+        with self.security_group('sg1', 'sg1') as sg:
+            sg_id = sg['security_group']['id']
+            with mock.patch("vmware_nsxlib.v3.policy.core_resources."
+                            "NsxPolicyGroupApi."
+                            "create_or_overwrite_with_conditions"
+                            ) as group_create,\
+                mock.patch("vmware_nsxlib.v3.policy.core_resources."
+                           "NsxPolicyGroupApi.delete") as group_delete,\
+                self.security_group_rule(sg_id, 'ingress', 'tcp', 80, 80,
+                                         remote_ip_prefix) as rule1,\
+                self.security_group_rule(sg_id, 'ingress', 'tcp', 22, 22,
+                                         remote_ip_prefix) as rule2:
+                created_groups = set(
+                    call[1]['group_id']
+                    for call in group_create.call_args_list)
+                self.assertEqual(set([prefix_group_id]), created_groups)
+
+                # The group is still used by the other rule
+                self._delete('security-group-rules',
+                             rule2['security_group_rule']['id'])
+                self.assertNotIn(
+                    mock.call(pol_const.DEFAULT_DOMAIN, prefix_group_id),
+                    group_delete.call_args_list)
+
+                self._delete('security-group-rules',
+                             rule1['security_group_rule']['id'])
+                group_delete.assert_any_call(pol_const.DEFAULT_DOMAIN,
+                                             prefix_group_id)
+
+    def test_sg_rule_create_failure_deletes_ip_prefix_group(self):
+        remote_ip_prefix = "10.0.0.0/24"
+        prefix_group_id = self.plugin._get_ip_prefix_group_id(
+            remote_ip_prefix)
+        with self.security_group('sg1', 'sg1') as sg:
+            sg_id = sg['security_group']['id']
+            rule = self._build_security_group_rule(
+                sg_id, 'ingress', 'tcp', 80, 80, remote_ip_prefix)
+            with mock.patch("vmware_nsxlib.v3.policy.core_resources."
+                            "NsxPolicyCommunicationMapApi.patch_entries",
+                            side_effect=nsxlib_exc.ManagerError(
+                                details='fail')),\
+                mock.patch("vmware_nsxlib.v3.policy.core_resources."
+                           "NsxPolicyGroupApi.delete") as group_delete:
+                res = self._create_security_group_rule(self.fmt, rule)
+                self.assertEqual(exc.HTTPInternalServerError.code,
+                                 res.status_int)
+                group_delete.assert_called_once_with(
+                    pol_const.DEFAULT_DOMAIN, prefix_group_id)
+
     def test_create_security_group_rule_with_remote_group(self):
         with self.security_group() as sg1, self.security_group() as sg2:
             security_group_id = sg1['security_group']['id']
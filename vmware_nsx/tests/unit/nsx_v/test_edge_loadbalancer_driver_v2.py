@@ -14,6 +14,7 @@
 #    under the License.
 
 from unittest import mock
+import xml.etree.ElementTree as et
 
 from oslo_config import cfg
 
@@ -33,6 +34,8 @@ from vmware_nsx.services.lbaas.nsx_v.implementation import member_mgr
 from vmware_nsx.services.lbaas.nsx_v.implementation import pool_mgr
 from vmware_nsx.services.lbaas.nsx_v import lbaas_common as lb_common
 from vmware_nsx.services.lbaas.octavia import octavia_listener
+from vmware_nsx.shell.admin.plugins.nsxv.resources import (
+    loadbalancers as lb_resources)
 from vmware_nsx.tests.unit.services.lbaas import lb_data_models as lb_models
 from vmware_nsx.tests.unit.services.lbaas import lb_translators
 
@@ -1132,3 +1135,135 @@ class TestEdgeLbaasV2L7Rule(BaseTestEdgeLbaasV2):
 
             self.assertTrue(self.last_completor_called)
             self.assertTrue(self.last_completor_succees)
+
+
+class TestEdgeLbaasV2PoolFwRule(base.BaseTestCase):
+    def setUp(self):
+        super(TestEdgeLbaasV2PoolFwRule, self).setUp()
+        self.vcns = mock.Mock()
+        self.vcns.get_interfaces.return_value = (None, {'vnics': [
+            {'type': 'internal',
+             'addressGroups': {'addressGroups': [
+                 {'primaryAddress': '10.0.0.1'}]}}]})
+        self.section_uri = lb_common.get_lbaas_fw_section_uri(POOL_FW_SECT)
+        self.header = {'etag': '"5"'}
+        self.sections = {}
+        self.vcns.get_section.side_effect = lambda uri: (
+            self.header, self.sections[uri.split('/')[-1]])
+        self.section_names = {}
+        self.vcns.get_section_id.side_effect = self.section_names.get
+
+    def _set_section_rules(self, rules, section_id=POOL_FW_SECT, shard=0):
+        self.section_names[lb_common.get_lbaas_fw_section_name(
+            shard)] = section_id
+        self.sections[section_id] = (
+            '<section id="%s" name="%s">%s</section>' % (
+                section_id, lb_common.get_lbaas_fw_section_name(shard),
+                ''.join('<rule id="%s"><name>%s</name></rule>' % rule
+                        for rule in rules)))
+
+    def test_get_lbaas_fw_section_shard(self):
+        self.assertEqual(0, lb_common.get_lbaas_fw_section_shard(POOL_ID))
+        cfg.CONF.set_override('lbaas_fw_section_shards', 8, group='nsxv')
+        shards = set(lb_common.get_lbaas_fw_section_shard('pool-%s' % i)
+                     for i in range(100))
+        self.assertEqual(set(range(8)), shards)
+        self.assertEqual(lb_common.get_lbaas_fw_section_shard(POOL_ID),
+                         lb_common.get_lbaas_fw_section_shard(POOL_ID))
+        for shard in range(8):
+            self.assertEqual(shard,
+                             lb_common.get_lbaas_fw_section_shard_by_name(
+                                 lb_common.get_lbaas_fw_section_name(shard)))
+
+    def test_update_pool_fw_rule_add(self):
+        self._set_section_rules([('1', 'other-pool')])
+        lb_common.update_pool_fw_rule(self.vcns, POOL_ID, LB_EDGE_ID,
+                                      POOL_FW_SECT, [MEMBER_ADDRESS])
+        self.vcns.add_rule_to_section.assert_called_once_with(
+            self.section_uri, mock.ANY, self.header)
+        self.assertIn(MEMBER_ADDRESS.encode(),
+                      self.vcns.add_rule_to_section.call_args[0][1])
+        self.vcns.update_section.assert_not_called()
+
+    def test_update_pool_fw_rule_update(self):
+        self._set_section_rules([('1', 'other-pool'), ('2', POOL_ID)])
+        lb_common.update_pool_fw_rule(self.vcns, POOL_ID, LB_EDGE_ID,
+                                      POOL_FW_SECT, [MEMBER_ADDRESS])
+        self.vcns.update_rule_in_section.assert_called_once_with(
+            self.section_uri, '2', mock.ANY, self.header)
+        self.vcns.add_rule_to_section.assert_not_called()
+
+    def test_update_pool_fw_rule_delete(self):
+        self._set_section_rules([('1', 'other-pool'), ('2', POOL_ID)])
+        lb_common.update_pool_fw_rule(self.vcns, POOL_ID, LB_EDGE_ID,
+                                      POOL_FW_SECT, [])
+        self.vcns.remove_rule_from_section.assert_called_once_with(
+            self.section_uri, '2', self.header)
+
+    def _set_shards_changed(self):
+        # The pool rule is in its section of a previous number of sections,
+        # chosen so the pool moves from another section to the first one
+        previous_shards = next(
+            shards for shards in range(2, 10)
+            if lb_common.get_lbaas_fw_section_shard(POOL_ID, shards=shards))
+        cfg.CONF.set_override('lbaas_fw_section_previous_shards',
+                              previous_shards, group='nsxv')
+        self._set_section_rules([('1', 'other-pool')])
+        self._set_section_rules(
+            [('2', POOL_ID)], section_id='10002',
+            shard=lb_common.get_lbaas_fw_section_shard(
+                POOL_ID, shards=previous_shards))
+        return lb_common.get_lbaas_fw_section_uri('10002')
+
+    def test_update_pool_fw_rule_shards_changed(self):
+        old_section_uri = self._set_shards_changed()
+        lb_common.update_pool_fw_rule(self.vcns, POOL_ID, LB_EDGE_ID,
+                                      POOL_FW_SECT, [MEMBER_ADDRESS])
+        self.vcns.add_rule_to_section.assert_called_once_with(
+            self.section_uri, mock.ANY, self.header)
+        self.vcns.remove_rule_from_section.assert_called_once_with(
+            old_section_uri, '2', self.header)
+
+    def test_delete_pool_fw_rule_shards_changed(self):
+        old_section_uri = self._set_shards_changed()
+        lb_common.update_pool_fw_rule(self.vcns, POOL_ID, LB_EDGE_ID,
+                                      POOL_FW_SECT, [])
+        self.vcns.add_rule_to_section.assert_not_called()
+        self.vcns.remove_rule_from_section.assert_called_once_with(
+            old_section_uri, '2', self.header)
+
+    def test_update_pool_fw_rule_shards_unchanged(self):
+        # Other sections are not looked up unless a move is in progress
+        self._set_shards_changed()
+        cfg.CONF.set_override('lbaas_fw_section_previous_shards', 0,
+                              group='nsxv')
+        lb_common.update_pool_fw_rule(self.vcns, POOL_ID, LB_EDGE_ID,
+                                      POOL_FW_SECT, [MEMBER_ADDRESS])
+        self.vcns.add_rule_to_section.assert_called_once()
+        self.vcns.get_section_id.assert_not_called()
+        self.vcns.remove_rule_from_section.assert_not_called()
+
+    def test_migrate_pool_fw_rule_already_moved(self):
+        old_section_uri = self._set_shards_changed()
+        rule = et.fromstring(
+            '<rule id="2"><name>%s</name><sectionId>10002</sectionId>'
+            '</rule>' % POOL_ID)
+        self._set_section_rules([('3', POOL_ID)])
+        lb_resources._move_pool_fw_rule(self.vcns, rule, 1, old_section_uri,
+                                        0, self.section_uri)
+        self.vcns.add_rule_to_section.assert_not_called()
+        self.vcns.remove_rule_from_section.assert_called_once_with(
+            old_section_uri, '2')
+
+    def test_migrate_pool_fw_rule(self):
+        old_section_uri = self._set_shards_changed()
+        rule = et.fromstring(
+            '<rule id="2"><name>%s</name><sectionId>10002</sectionId>'
+            '</rule>' % POOL_ID)
+        lb_resources._move_pool_fw_rule(self.vcns, rule, 1, old_section_uri,
+                                        0, self.section_uri)
+        self.vcns.add_rule_to_section.assert_called_once_with(
+            self.section_uri, b'<rule><name>%s</name></rule>' %
+            POOL_ID.encode(), self.header)
+        self.vcns.remove_rule_from_section.assert_called_once_with(
+            old_section_uri, '2')
@@ -92,3 +92,22 @@ class NsxvLoadbalancerTestCase(base.BaseTestCase):
                 self.OUT_OBJ_JSON,
                 format='json',
                 encode=False)
+
+    def test_submit_unchanged_edge_loadbalancer(self):
+        h = None
+        v = jsonutils.loads(self.EDGE_OBJ_JSON)
+
+        with mock.patch.object(self._vcns, 'do_request',
+                               return_value=(h, v)) as mock_do_request:
+            lb = nsxv_loadbalancer.NsxvLoadbalancer.get_loadbalancer(
+                self._vcns, self.EDGE_1)
+            mock_do_request.reset_mock()
+            # Nothing changed since the configuration was read
+            lb.submit_to_backend(self._vcns, self.EDGE_1)
+            mock_do_request.assert_not_called()
+
+            lb.virtual_servers['MdSrv'].default_pool.del_member('Member-1')
+            lb.submit_to_backend(self._vcns, self.EDGE_1)
+            self.assertEqual(1, mock_do_request.call_count)
+            lb.submit_to_backend(self._vcns, self.EDGE_1)
+            self.assertEqual(1, mock_do_request.call_count)
@@ -796,6 +796,11 @@ class FakeVcns(object):
         response = self.fake_ipsecvpn_dict[edge_id]
         return self.return_helper(header, response)
 
+    def get_ipsec_statistics(self, edge_id):
+        header = {'status': 200}
+        response = {'siteStatistics': []}
+        return self.return_helper(header, response)
+
     def enable_service_loadbalancer(self, edge_id, config):
         header = {'status': 204}
         response = ""
@@ -1056,7 +1061,32 @@ class FakeVcns(object):
         headers = {'status': 200}
         return (headers, response)
 
-    def remove_rule_from_section(self, section_uri, rule_id):
+    def add_rule_to_section(self, section_uri, request, h=None):
+        section_id = self._get_section_id_from_uri(section_uri)
+        if section_id not in self._sections:
+            return self._section_not_found(section_id)
+        rule = ET.fromstring(request)
+        rule_id = str(self._sections['rule_ids'])
+        rule.attrib['id'] = rule_id
+        self._sections['rule_ids'] += 1
+        response = ET.tostring(rule)
+        self._sections[section_id]['rules'][rule_id] = response
+        return ({'status': 201}, response)
+
+    def update_rule_in_section(self, section_uri, rule_id, request, h=None):
+        section_id = self._get_section_id_from_uri(section_uri)
+        if section_id not in self._sections:
+            return self._section_not_found(section_id)
+        section = self._sections[section_id]
+        if rule_id not in section['rules']:
+            return self._unknown_error()
+        rule = ET.fromstring(request)
+        rule.attrib['id'] = rule_id
+        response = ET.tostring(rule)
+        section['rules'][rule_id] = response
+        return ({'status': 200}, response)
+
+    def remove_rule_from_section(self, section_uri, rule_id, h=None):
         section_id = self._get_section_id_from_uri(section_uri)
         if section_id not in self._sections:
             headers, response = self._section_not_found(section_id)
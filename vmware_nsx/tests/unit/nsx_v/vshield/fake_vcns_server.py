@@ -0,0 +1,734 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-process HTTP simulator of the NSX-V manager REST API
+
+Unlike FakeVcns, which replaces the Vcns client methods, this simulator
+serves the NSX-V REST API over a real local HTTP socket, so the unchanged
+VcnsApiHelper and Vcns clients can be pointed at it.
+It covers the manager version, the edges (including paging,
+NAT/routing/firewall configuration, vnics and DHCP static bindings), the
+distributed firewall sections, the security groups and the SpoofGuard
+policies.
+Latency, the edges page size and errors can be configured, and the backend
+calls are counted per route.
+"""
+
+import collections
+import itertools
+import re
+import socketserver
+import threading
+import time
+from urllib import parse
+import xml.etree.ElementTree as et
+
+from http import server as http_server
+from oslo_log import log as logging
+from oslo_serialization import jsonutils
+
+from vmware_nsx.plugins.nsx_v.vshield.common import constants as vcns_const
+
+LOG = logging.getLogger(__name__)
+
+EDGES_PREFIX = '/api/4.0/edges'
+FIREWALL_PREFIX = '/api/4.0/firewall/globalroot-0/config'
+SECURITYGROUP_PREFIX = '/api/2.0/services/securitygroup'
+SPOOFGUARD_PREFIX = '/api/4.0/services/spoofguard'
+VSM_CONFIG_URI = '/api/2.0/services/vsmconfig'
+
+NSX_VERSION = '6.4.6'
+
+DEFAULT_PAGE_SIZE = 256
+
+# DFW section types as used in the URIs and in the full configuration
+SECTION_TYPES = collections.OrderedDict([
+    ('layer3redirectsections', 'layer3RedirectSections'),
+    ('layer3sections', 'layer3Sections'),
+    ('layer2sections', 'layer2Sections')])
+DEFAULT_L3_SECTION_ID = '1003'
+DEFAULT_L2_SECTION_ID = '1001'
+
+
+class _Server(socketserver.ThreadingMixIn, http_server.HTTPServer):
+    # http.server.ThreadingHTTPServer is not available before python 3.7
+    daemon_threads = True
+
+
+class InjectedError(object):
+    """An error returned instead of the response of matching requests"""
+
+    def __init__(self, method, uri_regex, status, error_code, count):
+        self.method = method
+        self.uri_regex = re.compile(uri_regex)
+        self.status = status
+        self.error_code = error_code
+        self.count = count
+
+    def match(self, method, uri):
+        return ((self.method is None or self.method == method) and
+                self.uri_regex.search(uri) is not None)
+
+
+class FakeVcnsServer(object):
+    """NSX-V manager simulator listening on a local HTTP port
+
+    Usage:
+        with FakeVcnsServer(latency=0.005) as server:
+            client = vcns.Vcns(server.address, 'user', 'pass', None, True)
+            ...
+            server.call_counts
+    """
+
+    def __init__(self, latency=0, page_size=DEFAULT_PAGE_SIZE,
+                 host='127.0.0.1', port=0):
+        self.latency = latency
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1004)
+        self._errors = []
+        self._routes = self._get_routes()
+        self.call_counts = collections.Counter()
+        self.reset()
+        self._httpd = _Server((host, port), self._get_handler_class())
+        self._thread = None
+
+    # Server life cycle
+
+    @property
+    def address(self):
+        host, port = self._httpd.server_address[:2]
+        return 'http://%s:%s' % (host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    # Simulation control
+
+    def reset(self):
+        """Drop all the backend objects, and restore the default sections"""
+        with self._lock:
+            self._edges = collections.OrderedDict()
+            self._security_groups = collections.OrderedDict()
+            self._spoofguard_policies = collections.OrderedDict()
+            self._sections = {}
+            self._section_order = dict(
+                (sec_type, []) for sec_type in SECTION_TYPES)
+            self._dfw_generation = 1
+            for sec_type, sec_id, name in (
+                    ('layer3sections', DEFAULT_L3_SECTION_ID,
+                     'Default Section Layer3'),
+                    ('layer2sections', DEFAULT_L2_SECTION_ID,
+                     'Default Section Layer2')):
+                section = et.Element('section', id=sec_id, name=name)
+                et.SubElement(section, 'rule', id=self._new_id()).append(
+                    _text_element('action', 'allow'))
+                self._add_section(sec_type, section)
+
+    def reset_counters(self):
+        self.call_counts.clear()
+
+    @property
+    def total_calls(self):
+        return sum(self.call_counts.values())
+
+    def inject_error(self, uri_regex, method=None, status=500,
+                     error_code=None, count=1):
+        """Fail the next count requests matching the method and uri regex"""
+        with self._lock:
+            self._errors.append(InjectedError(
+                method, uri_regex, status, error_code, count))
+
+    def clear_errors(self):
+        with self._lock:
+            self._errors = []
+
+    def _count_call(self, method, route, uri):
+        """Count the call, and return the error injected for it if any"""
+        with self._lock:
+            self.call_counts[(method, route)] += 1
+            for error in self._errors:
+                if error.match(method, uri):
+                    error.count -= 1
+                    if error.count <= 0:
+                        self._errors.remove(error)
+                    return error
+
+    # Request dispatching
+
+    def _get_handler_class(self):
+        simulator = self
+
+        class Handler(http_server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, headers, content = simulator.dispatch(
+                    self.command, self.path, self.headers,
+                    body.decode('utf-8'))
+                content = content.encode('utf-8')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                LOG.debug(format, *args)
+
+        return Handler
+
+    def _get_routes(self):
+        routes = [
+            ('GET', r'%s' % VSM_CONFIG_URI, self._get_vsm_config),
+            ('POST', r'%s' % EDGES_PREFIX, self._create_edge),
+            ('GET', r'%s' % EDGES_PREFIX, self._list_edges),
+            ('GET', r'%s/(?P<edge_id>edge-\d+)' % EDGES_PREFIX,
+             self._get_edge),
+            ('PUT', r'%s/(?P<edge_id>edge-\d+)' % EDGES_PREFIX,
+             self._update_edge),
+            ('DELETE', r'%s/(?P<edge_id>edge-\d+)' % EDGES_PREFIX,
+             self._delete_edge),
+            ('GET', r'%s/(?P<edge_id>edge-\d+)/status' % EDGES_PREFIX,
+             self._get_edge_status),
+            ('GET', r'%s/(?P<edge_id>edge-\d+)/vnics' % EDGES_PREFIX,
+             self._list_vnics),
+            ('GET', r'%s/(?P<edge_id>edge-\d+)/vnics/(?P<index>\d+)' %
+             EDGES_PREFIX, self._get_vnic),
+            ('PUT', r'%s/(?P<edge_id>edge-\d+)/vnics/(?P<index>\d+)' %
+             EDGES_PREFIX, self._update_vnic),
+            ('DELETE', r'%s/(?P<edge_id>edge-\d+)/vnics/(?P<index>\d+)' %
+             EDGES_PREFIX, self._delete_vnic),
+            ('POST', r'%s/(?P<edge_id>edge-\d+)/dhcp/config/bindings' %
+             EDGES_PREFIX, self._create_dhcp_binding),
+            ('GET', r'%s/(?P<edge_id>edge-\d+)/dhcp/config/bindings/'
+             r'(?P<binding_id>[^/]+)' % EDGES_PREFIX,
+             self._get_dhcp_binding),
+            ('DELETE', r'%s/(?P<edge_id>edge-\d+)/dhcp/config/bindings/'
+             r'(?P<binding_id>[^/]+)' % EDGES_PREFIX,
+             self._delete_dhcp_binding),
+            ('GET', r'%s/(?P<edge_id>edge-\d+)/dhcp/config' % EDGES_PREFIX,
+             self._get_dhcp_config),
+            ('PUT', r'%s/(?P<edge_id>edge-\d+)/dhcp/config' % EDGES_PREFIX,
+             self._update_dhcp_config),
+            # NAT, routing, firewall, load balancer and other edge features
+            ('GET', r'%s/(?P<edge_id>edge-\d+)/(?P<feature>[a-z]+/config.*)'
+             % EDGES_PREFIX, self._get_edge_feature),
+            ('PUT', r'%s/(?P<edge_id>edge-\d+)/(?P<feature>[a-z]+/config.*)'
+             % EDGES_PREFIX, self._update_edge_feature),
+            ('GET', r'%s' % FIREWALL_PREFIX, self._get_dfw_config),
+            ('POST', r'%s/(?P<sec_type>[a-z0-9]+sections)' % FIREWALL_PREFIX,
+             self._create_section),
+            ('GET', r'%s/(?P<sec_type>[a-z0-9]+sections)/(?P<sec_id>\d+)' %
+             FIREWALL_PREFIX, self._get_section),
+            ('PUT', r'%s/(?P<sec_type>[a-z0-9]+sections)/(?P<sec_id>\d+)' %
+             FIREWALL_PREFIX, self._update_section),
+            ('DELETE', r'%s/(?P<sec_type>[a-z0-9]+sections)/(?P<sec_id>\d+)'
+             % FIREWALL_PREFIX, self._delete_section),
+            ('POST', r'%s/(?P<sec_type>[a-z0-9]+sections)/(?P<sec_id>\d+)/'
+             r'rules' % FIREWALL_PREFIX, self._create_section_rule),
+            ('PUT', r'%s/(?P<sec_type>[a-z0-9]+sections)/(?P<sec_id>\d+)/'
+             r'rules/(?P<rule_id>\d+)' % FIREWALL_PREFIX,
+             self._update_section_rule),
+            ('DELETE', r'%s/(?P<sec_type>[a-z0-9]+sections)/(?P<sec_id>\d+)/'
+             r'rules/(?P<rule_id>\d+)' % FIREWALL_PREFIX,
+             self._delete_section_rule),
+            ('POST', r'%s/globalroot-0' % SECURITYGROUP_PREFIX,
+             self._create_security_group),
+            ('GET', r'%s/scope/globalroot-0' % SECURITYGROUP_PREFIX,
+             self._list_security_groups),
+            ('GET', r'%s/(?P<sg_id>securitygroup-\d+)' % SECURITYGROUP_PREFIX,
+             self._get_security_group),
+            ('PUT', r'%s/(?P<sg_id>securitygroup-\d+)' % SECURITYGROUP_PREFIX,
+             self._update_security_group),
+            ('DELETE', r'%s/(?P<sg_id>securitygroup-\d+)' %
+             SECURITYGROUP_PREFIX, self._delete_security_group),
+            ('PUT', r'%s/(?P<sg_id>securitygroup-\d+)/members/'
+             r'(?P<member_id>[^/]+)' % SECURITYGROUP_PREFIX,
+             self._add_security_group_member),
+            ('DELETE', r'%s/(?P<sg_id>securitygroup-\d+)/members/'
+             r'(?P<member_id>[^/]+)' % SECURITYGROUP_PREFIX,
+             self._remove_security_group_member),
+            ('POST', r'%s/policies/?' % SPOOFGUARD_PREFIX,
+             self._create_spoofguard_policy),
+            ('GET', r'%s/policies/?' % SPOOFGUARD_PREFIX,
+             self._list_spoofguard_policies),
+            ('GET', r'%s/policies/(?P<policy_id>[^/]+)' % SPOOFGUARD_PREFIX,
+             self._get_spoofguard_policy),
+            ('PUT', r'%s/policies/(?P<policy_id>[^/]+)' % SPOOFGUARD_PREFIX,
+             self._update_spoofguard_policy),
+            ('DELETE', r'%s/policies/(?P<policy_id>[^/]+)' %
+             SPOOFGUARD_PREFIX, self._delete_spoofguard_policy),
+            ('POST', r'%s/(?P<policy_id>spoofguardpolicy-\d+)' %
+             SPOOFGUARD_PREFIX, self._spoofguard_action),
+            ('GET', r'%s/(?P<policy_id>spoofguardpolicy-\d+)' %
+             SPOOFGUARD_PREFIX, self._get_spoofguard_policy_data),
+        ]
+        return [(method, re.compile('^%s$' % regex), handler)
+                for method, regex, handler in routes]
+
+    def dispatch(self, method, uri, headers, body):
+        """Return the status, headers and content of the response"""
+        if self.latency:
+            time.sleep(self.latency)
+        path, _sep, query = uri.partition('?')
+        query = dict(parse.parse_qsl(query))
+        fmt = 'xml' if 'xml' in (headers.get('Accept') or '') else 'json'
+        for route_method, regex, handler in self._routes:
+            match = regex.match(path)
+            if route_method == method and match:
+                break
+        else:
+            return self._error(fmt, 404, None, 'No route for %s %s' % (
+                method, path))
+        error = self._count_call(method, handler.__name__.lstrip('_'), uri)
+        if error:
+            return self._error(fmt, error.status, error.error_code,
+                               'Injected error')
+        try:
+            with self._lock:
+                status, resp_headers, content = handler(
+                    fmt, query, headers, body, **match.groupdict())
+        except KeyError as e:
+            return self._error(fmt, 404, None, 'Not found: %s' % e)
+        if isinstance(content, dict):
+            content = jsonutils.dumps(content)
+        elif isinstance(content, et.Element):
+            content = et.tostring(content, encoding='unicode')
+        resp_headers.setdefault('Content-Type', 'application/%s' % fmt)
+        return status, resp_headers, content or ''
+
+    def _error(self, fmt, status, error_code, details):
+        if fmt == 'xml':
+            error = et.Element('error')
+            error.append(_text_element('details', details))
+            if error_code:
+                error.append(_text_element('errorCode', str(error_code)))
+            content = et.tostring(error, encoding='unicode')
+        else:
+            content = {'details': details}
+            if error_code:
+                content['errorCode'] = error_code
+            content = jsonutils.dumps(content)
+        return status, {'Content-Type': 'application/%s' % fmt}, content
+
+    def _new_id(self):
+        return str(next(self._ids))
+
+    # Manager
+
+    def _get_vsm_config(self, fmt, query, headers, body):
+        return 200, {}, {'version': NSX_VERSION}
+
+    # Edges
+
+    def _create_edge(self, fmt, query, headers, body):
+        if query.get('lockUpdatesOnEdge'):
+            return 204, {}, None
+        edge = jsonutils.loads(body)
+        edge_id = 'edge-%s' % self._new_id()
+        edge.update({'id': edge_id,
+                     'edgeStatus': 'GREEN',
+                     'edgeType': edge.get('type', 'gatewayServices'),
+                     'features': {}})
+        vnics = edge.get('vnics', {}).get('vnics', [])
+        edge['vnics'] = dict((str(vnic['index']), vnic) for vnic in vnics)
+        edge['dhcp'] = {'staticBindings': collections.OrderedDict()}
+        self._edges[edge_id] = edge
+        return 201, {'Location': '%s/%s' % (EDGES_PREFIX, edge_id)}, None
+
+    def _edge_summary(self, edge):
+        return dict((key, edge.get(key)) for key in (
+            'id', 'name', 'edgeStatus', 'edgeType', 'datacenterMoid',
+            'appliancesSummary'))
+
+    def _list_edges(self, fmt, query, headers, body):
+        start = int(query.get('startIndex', 0))
+        edges = list(self._edges.values())
+        page = edges[start:start + self.page_size]
+        return 200, {}, {'edgePage': {
+            'data': [self._edge_summary(edge) for edge in page],
+            'pagingInfo': {'pageSize': self.page_size,
+                           'startIndex': start,
+                           'totalCount': len(edges)}}}
+
+    def _get_edge(self, fmt, query, headers, body, edge_id):
+        edge = dict(self._edges[edge_id])
+        edge['vnics'] = {'vnics': list(edge['vnics'].values())}
+        del edge['dhcp']
+        del edge['features']
+        return 200, {}, edge
+
+    def _update_edge(self, fmt, query, headers, body, edge_id):
+        edge = self._edges[edge_id]
+        update = jsonutils.loads(body)
+        vnics = update.pop('vnics', {}).get('vnics')
+        edge.update(update)
+        if vnics is not None:
+            edge['vnics'] = dict((str(vnic['index']), vnic)
+                                 for vnic in vnics)
+        return 204, {}, None
+
+    def _delete_edge(self, fmt, query, headers, body, edge_id):
+        del self._edges[edge_id]
+        return 204, {}, None
+
+    def _get_edge_status(self, fmt, query, headers, body, edge_id):
+        return 200, {}, {'edgeStatus': self._edges[edge_id]['edgeStatus']}
+
+    def _list_vnics(self, fmt, query, headers, body, edge_id):
+        return 200, {}, {
+            'vnics': list(self._edges[edge_id]['vnics'].values())}
+
+    def _get_vnic(self, fmt, query, headers, body, edge_id, index):
+        return 200, {}, self._edges[edge_id]['vnics'][index]
+
+    def _update_vnic(self, fmt, query, headers, body, edge_id, index):
+        self._edges[edge_id]['vnics'][index] = jsonutils.loads(body)
+        return 204, {}, None
+
+    def _delete_vnic(self, fmt, query, headers, body, edge_id, index):
+        self._edges[edge_id]['vnics'].pop(index, None)
+        return 204, {}, None
+
+    def _create_dhcp_binding(self, fmt, query, headers, body, edge_id):
+        bindings = self._edges[edge_id]['dhcp']['staticBindings']
+        binding = jsonutils.loads(body)
+        for existing in bindings.values():
+            if existing.get('macAddress') == binding.get('macAddress'):
+                return self._error(fmt, 400,
+                                   vcns_const.NSX_ERROR_DHCP_DUPLICATE_MAC,
+                                   'Duplicate MAC address')
+        binding['bindingId'] = 'binding-%s' % self._new_id()
+        bindings[binding['bindingId']] = binding
+        return 201, {'Location': '%s/%s/dhcp/config/bindings/%s' % (
+            EDGES_PREFIX, edge_id, binding['bindingId'])}, None
+
+    def _get_dhcp_binding(self, fmt, query, headers, body, edge_id,
+                          binding_id):
+        return 200, {}, (
+            self._edges[edge_id]['dhcp']['staticBindings'][binding_id])
+
+    def _delete_dhcp_binding(self, fmt, query, headers, body, edge_id,
+                             binding_id):
+        del self._edges[edge_id]['dhcp']['staticBindings'][binding_id]
+        return 204, {}, None
+
+    def _get_dhcp_config(self, fmt, query, headers, body, edge_id):
+        dhcp = dict(self._edges[edge_id]['dhcp'])
+        dhcp['staticBindings'] = {
+            'staticBindings': list(dhcp['staticBindings'].values())}
+        return 200, {}, dhcp
+
+    def _update_dhcp_config(self, fmt, query, headers, body, edge_id):
+        dhcp = jsonutils.loads(body)
+        bindings = collections.OrderedDict()
+        for binding in dhcp.get('staticBindings', {}).get(
+                'staticBindings', []):
+            binding.setdefault('bindingId', 'binding-%s' % self._new_id())
+            bindings[binding['bindingId']] = binding
+        dhcp['staticBindings'] = bindings
+        self._edges[edge_id]['dhcp'] = dhcp
+        return 204, {}, None
+
+    def _get_edge_feature(self, fmt, query, headers, body, edge_id,
+                          feature):
+        return 200, {}, self._edges[edge_id]['features'].get(feature, {})
+
+    def _update_edge_feature(self, fmt, query, headers, body, edge_id,
+                             feature):
+        self._edges[edge_id]['features'][feature] = jsonutils.loads(body)
+        return 204, {}, None
+
+    # Distributed firewall
+
+    def _add_section(self, sec_type, section, position=None):
+        self._dfw_generation += 1
+        section.set('generationNumber', str(self._dfw_generation))
+        for rule in section.iter('rule'):
+            if not rule.get('id'):
+                rule.set('id', self._new_id())
+        self._sections[section.get('id')] = (sec_type, section)
+        order = self._section_order[sec_type]
+        if section.get('id') not in order:
+            order.insert(len(order) if position is None else position,
+                         section.get('id'))
+
+    def _get_section_obj(self, sec_type, sec_id):
+        section_type, section = self._sections[sec_id]
+        if section_type != sec_type:
+            raise KeyError(sec_id)
+        return section
+
+    def _section_headers(self, sec_type, section):
+        return {'ETag': '"%s"' % section.get('generationNumber'),
+                'Location': '%s/%s/%s' % (FIREWALL_PREFIX, sec_type,
+                                          section.get('id'))}
+
+    def _section_content(self, fmt, section):
+        if fmt == 'xml':
+            return section
+        return {'id': section.get('id'),
+                'name': section.get('name'),
+                'generationNumber': section.get('generationNumber'),
+                'rules': [{'id': rule.get('id'),
+                           'name': rule.findtext('name'),
+                           'action': rule.findtext('action')}
+                          for rule in section.findall('rule')]}
+
+    def _check_etag(self, fmt, headers, etag):
+        if_match = headers.get('If-Match')
+        if if_match and if_match.replace('"', '') != etag:
+            return self._error(fmt, 412, None, 'Stale generation number')
+
+    def _get_dfw_config(self, fmt, query, headers, body):
+        config = et.Element('firewallConfiguration')
+        config.append(_text_element('contextId', 'globalroot-0'))
+        for sec_type, tag in SECTION_TYPES.items():
+            sections = et.SubElement(config, tag)
+            for sec_id in self._section_order[sec_type]:
+                sections.append(self._sections[sec_id][1])
+        return 200, {'ETag': '"%s"' % self._dfw_generation}, config
+
+    def _create_section(self, fmt, query, headers, body, sec_type):
+        section = et.fromstring(body)
+        section.set('id', self._new_id())
+        order = self._section_order[sec_type]
+        position = None
+        if query.get('operation') == 'insert_top':
+            position = 0
+        elif query.get('operation') == 'insert_before':
+            anchor = query.get('anchorId')
+            position = order.index(anchor) if anchor in order else None
+        self._add_section(sec_type, section, position)
+        return (201, self._section_headers(sec_type, section),
+                self._section_content(fmt, section))
+
+    def _get_section(self, fmt, query, headers, body, sec_type, sec_id):
+        section = self._get_section_obj(sec_type, sec_id)
+        return (200, self._section_headers(sec_type, section),
+                self._section_content(fmt, section))
+
+    def _update_section(self, fmt, query, headers, body, sec_type, sec_id):
+        section = self._get_section_obj(sec_type, sec_id)
+        error = self._check_etag(fmt, headers,
+                                 section.get('generationNumber'))
+        if error:
+            return error
+        section = et.fromstring(body)
+        section.set('id', sec_id)
+        self._add_section(sec_type, section)
+        return (200, self._section_headers(sec_type, section),
+                self._section_content(fmt, section))
+
+    def _delete_section(self, fmt, query, headers, body, sec_type, sec_id):
+        self._get_section_obj(sec_type, sec_id)
+        del self._sections[sec_id]
+        self._section_order[sec_type].remove(sec_id)
+        self._dfw_generation += 1
+        return 204, {}, None
+
+    def _create_section_rule(self, fmt, query, headers, body, sec_type,
+                             sec_id):
+        section = self._get_section_obj(sec_type, sec_id)
+        error = self._check_etag(fmt, headers,
+                                 section.get('generationNumber'))
+        if error:
+            return error
+        rule = et.fromstring(body)
+        rule.set('id', self._new_id())
+        section.append(rule)
+        self._add_section(sec_type, section)
+        return 201, self._section_headers(sec_type, section), rule
+
+    def _update_section_rule(self, fmt, query, headers, body, sec_type,
+                             sec_id, rule_id):
+        section = self._get_section_obj(sec_type, sec_id)
+        error = self._check_etag(fmt, headers,
+                                 section.get('generationNumber'))
+        if error:
+            return error
+        for rule in section.findall('rule'):
+            if rule.get('id') == rule_id:
+                new_rule = et.fromstring(body)
+                new_rule.set('id', rule_id)
+                position = list(section).index(rule)
+                section.remove(rule)
+                section.insert(position, new_rule)
+                self._add_section(sec_type, section)
+                return 200, self._section_headers(sec_type, section), new_rule
+        return self._rule_not_found(fmt, rule_id)
+
+    def _delete_section_rule(self, fmt, query, headers, body, sec_type,
+                             sec_id, rule_id):
+        section = self._get_section_obj(sec_type, sec_id)
+        error = self._check_etag(fmt, headers,
+                                 section.get('generationNumber'))
+        if error:
+            return error
+        for rule in section.findall('rule'):
+            if rule.get('id') == rule_id:
+                section.remove(rule)
+                self._add_section(sec_type, section)
+                return 204, {}, None
+        return self._rule_not_found(fmt, rule_id)
+
+    def _rule_not_found(self, fmt, rule_id):
+        # The NSX error code of a missing rule
+        return self._error(fmt, 404, 100046, 'Rule %s not found' % rule_id)
+
+    # Security groups
+
+    def _security_group_element(self, sg_id):
+        sg = self._security_groups[sg_id]
+        element = et.Element('securitygroup')
+        element.append(_text_element('objectId', sg_id))
+        element.append(_text_element('name', sg['name']))
+        element.append(_text_element('description', sg['description']))
+        for member_id in sg['members']:
+            member = et.SubElement(element, 'member')
+            member.append(_text_element('objectId', member_id))
+        return element
+
+    def _create_security_group(self, fmt, query, headers, body):
+        element = et.fromstring(body)
+        sg_id = 'securitygroup-%s' % self._new_id()
+        self._security_groups[sg_id] = {
+            'name': element.findtext('name'),
+            'description': element.findtext('description'),
+            'members': collections.OrderedDict()}
+        return 201, {'Location': '%s/%s' % (SECURITYGROUP_PREFIX, sg_id)}, (
+            sg_id)
+
+    def _list_security_groups(self, fmt, query, headers, body):
+        sg_list = et.Element('list')
+        for sg_id in self._security_groups:
+            sg_list.append(self._security_group_element(sg_id))
+        return 200, {}, sg_list
+
+    def _get_security_group(self, fmt, query, headers, body, sg_id):
+        return 200, {}, self._security_group_element(sg_id)
+
+    def _update_security_group(self, fmt, query, headers, body, sg_id):
+        element = et.fromstring(body)
+        self._security_groups[sg_id].update({
+            'name': element.findtext('name'),
+            'description': element.findtext('description')})
+        return 200, {}, None
+
+    def _delete_security_group(self, fmt, query, headers, body, sg_id):
+        del self._security_groups[sg_id]
+        return 204, {}, None
+
+    def _add_security_group_member(self, fmt, query, headers, body, sg_id,
+                                   member_id):
+        self._security_groups[sg_id]['members'][member_id] = True
+        return 200, {}, None
+
+    def _remove_security_group_member(self, fmt, query, headers, body,
+                                      sg_id, member_id):
+        self._security_groups[sg_id]['members'].pop(member_id, None)
+        return 204, {}, None
+
+    # SpoofGuard
+
+    def _parse_spoofguard_policy(self, body):
+        element = et.fromstring(body)
+        return {'name': element.findtext('name'),
+                'operationMode': element.findtext('operationMode'),
+                'allowLocalIPs': element.findtext('allowLocalIPs'),
+                'enforcementPoints': [
+                    {'id': ep.findtext('id'), 'type': ep.findtext('type')}
+                    for ep in element.iter('enforcementPoint')]}
+
+    def _create_spoofguard_policy(self, fmt, query, headers, body):
+        policy = self._parse_spoofguard_policy(body)
+        policy['policyId'] = 'spoofguardpolicy-%s' % self._new_id()
+        policy['entries'] = collections.OrderedDict()
+        self._spoofguard_policies[policy['policyId']] = policy
+        return 201, {}, policy['policyId']
+
+    def _policy_content(self, policy):
+        return dict((key, value) for key, value in policy.items()
+                    if key != 'entries')
+
+    def _list_spoofguard_policies(self, fmt, query, headers, body):
+        return 200, {}, {'policies': [
+            self._policy_content(policy)
+            for policy in self._spoofguard_policies.values()]}
+
+    def _get_spoofguard_policy(self, fmt, query, headers, body, policy_id):
+        return 200, {}, self._policy_content(
+            self._spoofguard_policies[policy_id])
+
+    def _update_spoofguard_policy(self, fmt, query, headers, body,
+                                  policy_id):
+        self._spoofguard_policies[policy_id].update(
+            self._parse_spoofguard_policy(body))
+        return 200, {}, None
+
+    def _delete_spoofguard_policy(self, fmt, query, headers, body,
+                                  policy_id):
+        del self._spoofguard_policies[policy_id]
+        return 204, {}, None
+
+    def _spoofguard_action(self, fmt, query, headers, body, policy_id):
+        policy = self._spoofguard_policies[policy_id]
+        if query.get('action') == 'approve':
+            for entry in et.fromstring(body).iter('spoofguard'):
+                addresses = [ip.text for ip in entry.findall(
+                    'approvedIpAddress/ipAddress')]
+                policy['entries'][entry.findtext('id')] = {
+                    'id': entry.findtext('id'),
+                    'vnicUuid': entry.findtext('vnicUuid'),
+                    'approvedIpAddress': {'ipAddresses': addresses},
+                    'approvedMacAddress': entry.findtext(
+                        'approvedMacAddress'),
+                    'publishedIpAddress': {'ipAddresses': addresses},
+                    'publishedMacAddress': entry.findtext(
+                        'publishedMacAddress')}
+        return 200, {}, None
+
+    def _get_spoofguard_policy_data(self, fmt, query, headers, body,
+                                    policy_id):
+        return 200, {}, {'spoofguardList': list(
+            self._spoofguard_policies[policy_id]['entries'].values())}
+
+
+def _text_element(tag, text):
+    element = et.Element(tag)
+    element.text = text
+    return element
@@ -0,0 +1,102 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from neutron.tests.unit import testlib_api
+from neutron_lib import context
+
+from vmware_nsx.db import nsxv_db
+from vmware_nsx.plugins.nsx_v.vshield.common import (
+    exceptions as vcns_exc)
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
+from vmware_nsx.plugins.nsx_v.vshield import edge_firewall_driver
+from vmware_nsx.tests.unit.nsx_v.vshield import fake_vcns
+
+EDGE_ID = 'edge-1'
+
+
+class EdgeFirewallDriverTestCase(testlib_api.SqlTestCase):
+
+    def setUp(self):
+        super(EdgeFirewallDriverTestCase, self).setUp()
+        self.ctx = context.get_admin_context()
+        self.driver = edge_firewall_driver.EdgeFirewallDriver()
+        self.driver.vcns = fake_vcns.FakeVcns()
+
+    def _get_firewall(self, rule_ids):
+        return {'firewall_rule_list': [
+            {'id': rule_id, 'action': 'allow',
+             'destination_ip_address': '10.0.0.%s' % index}
+            for index, rule_id in enumerate(rule_ids)]}
+
+    def _get_bindings(self):
+        return dict(
+            (binding.rule_id, binding.rule_vse_id)
+            for binding in self.ctx.session.query(
+                nsxv_db.nsxv_models.NsxvEdgeFirewallRuleBinding).filter_by(
+                edge_id=EDGE_ID))
+
+    def test_update_firewall_bindings(self):
+        self.driver.update_firewall(
+            EDGE_ID, self._get_firewall(['rule1', 'rule2']), self.ctx)
+        self.assertEqual({'rule1': '10', 'rule2': '20'},
+                         self._get_bindings())
+
+        self.driver.update_firewall(
+            EDGE_ID, self._get_firewall(['rule3', 'rule2']), self.ctx)
+        self.assertEqual({'rule3': '10', 'rule2': '20'},
+                         self._get_bindings())
+
+    def test_update_firewall_unchanged(self):
+        firewall = self._get_firewall(['rule1'])
+        with mock.patch.object(self.driver.vcns, 'update_firewall',
+                               wraps=self.driver.vcns.update_firewall) as upd:
+            self.driver.update_firewall(EDGE_ID, firewall, self.ctx)
+            self.driver.update_firewall(EDGE_ID, firewall, self.ctx)
+            self.assertEqual(1, upd.call_count)
+
+            # A change of the rule ids requires new bindings
+            self.driver.update_firewall(
+                EDGE_ID, self._get_firewall(['rule2']), self.ctx)
+            self.assertEqual(2, upd.call_count)
+        self.assertEqual({'rule2': '10'}, self._get_bindings())
+
+    def test_update_firewall_without_rule_ids(self):
+        firewall = {'firewall_rule_list': [{'action': 'allow'}]}
+        with mock.patch.object(self.driver.vcns, 'get_firewall') as get_fw:
+            self.driver.update_firewall(EDGE_ID, firewall, self.ctx)
+            get_fw.assert_not_called()
+        self.assertEqual({}, self._get_bindings())
+
+    def test_update_firewall_failure_invalidates(self):
+        firewall = self._get_firewall(['rule1'])
+        self.driver.update_firewall(EDGE_ID, firewall, self.ctx)
+        with mock.patch.object(self.driver.vcns, 'update_firewall',
+                               side_effect=vcns_exc.VcnsApiException(
+                                   status=500, header={}, uri='fake',
+                                   response='')):
+            self.assertRaises(vcns_exc.VcnsApiException,
+                              self.driver.update_firewall,
+                              EDGE_ID, self._get_firewall(['rule2']),
+                              self.ctx)
+        self.assertIsNone(nsxv_db.get_nsxv_edge_config_fingerprint(
+            self.ctx.session, EDGE_ID, edge_fingerprints.FIREWALL))
+
+        # The previous configuration should be applied again
+        with mock.patch.object(self.driver.vcns, 'update_firewall',
+                               wraps=self.driver.vcns.update_firewall) as upd:
+            self.driver.update_firewall(EDGE_ID, firewall, self.ctx)
+            upd.assert_called_once()
@@ -0,0 +1,89 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+import eventlet
+from neutron.tests import base
+from oslo_config import cfg
+
+from vmware_nsx.plugins.nsx_v.drivers import exclusive_router_driver
+from vmware_nsx.plugins.nsx_v.vshield import edge_update_coalescer
+
+
+class EdgeUpdateCoalescerTestCase(base.BaseTestCase):
+
+    def test_update_without_window(self):
+        flush = mock.Mock()
+        coalescer = edge_update_coalescer.EdgeUpdateCoalescer(flush, 0)
+        coalescer.update('router1', [edge_update_coalescer.NAT])
+        flush.assert_called_once_with('router1', {edge_update_coalescer.NAT})
+
+    def test_update_coalesced(self):
+        flush = mock.Mock()
+        coalescer = edge_update_coalescer.EdgeUpdateCoalescer(flush, 0.01)
+        pool = eventlet.GreenPool()
+        pool.spawn(coalescer.update, 'router1', [edge_update_coalescer.NAT])
+        pool.spawn(coalescer.update, 'router1',
+                   [edge_update_coalescer.FIREWALL])
+        pool.spawn(coalescer.update, 'router2')
+        pool.waitall()
+        self.assertEqual(2, flush.call_count)
+        flush.assert_has_calls([
+            mock.call('router1', {edge_update_coalescer.NAT,
+                                  edge_update_coalescer.FIREWALL}),
+            mock.call('router2', set(edge_update_coalescer.ALL_PARTS))],
+            any_order=True)
+
+    def test_update_failure(self):
+        flush = mock.Mock(side_effect=ValueError)
+        coalescer = edge_update_coalescer.EdgeUpdateCoalescer(flush, 0.01)
+        pool = eventlet.GreenPool()
+        threads = [pool.spawn(coalescer.update, 'router1') for i in range(2)]
+        for thread in threads:
+            self.assertRaises(ValueError, thread.wait)
+        flush.assert_called_once()
+        # The next update is flushed again
+        flush.side_effect = None
+        coalescer.update('router1')
+        self.assertEqual(2, flush.call_count)
+
+
+class ExclusiveRouterEdgeUpdateTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(ExclusiveRouterEdgeUpdateTestCase, self).setUp()
+        cfg.CONF.set_override('edge_update_coalescing_window', 0,
+                              group='nsxv')
+        self.plugin = mock.Mock()
+        self.driver = exclusive_router_driver.RouterExclusiveDriver(
+            self.plugin)
+        mock.patch.object(self.driver, '_get_router_edge_id',
+                          return_value='edge-1').start()
+        mock.patch('vmware_nsx.common.locking.LockManager.get_lock').start()
+
+    def test_update_edge_router_parts(self):
+        self.driver._update_edge_router(
+            mock.Mock(), 'router1',
+            parts=(edge_update_coalescer.NAT, edge_update_coalescer.FIREWALL))
+        self.plugin._update_external_interface.assert_not_called()
+        self.plugin._update_nat_rules.assert_called_once()
+        self.plugin._update_subnets_and_dnat_firewall.assert_called_once()
+
+    def test_update_edge_router_all_parts(self):
+        self.driver._update_edge_router(mock.Mock(), 'router1')
+        self.plugin._update_external_interface.assert_called_once()
+        self.plugin._update_nat_rules.assert_called_once()
+        self.plugin._update_subnets_and_dnat_firewall.assert_called_once()
@@ -149,6 +149,78 @@ class EdgeDHCPManagerTestCase(EdgeUtilsTestCaseMixin):
             # a new DHCP edge is created.
             self.assertIsNone(selected_edge_id)
 
+    def _update_dhcp_service_config(self, bindings):
+        with mock.patch.object(self.edge_manager, 'create_static_binding',
+                               return_value=bindings), \
+                mock.patch.object(edge_utils, 'get_dhcp_binding_mappings',
+                                  return_value={}):
+            self.edge_manager.update_dhcp_service_config(self.ctx, 'edge-1')
+
+    def _set_dhcp_ports(self):
+        plugin = self.nsxv_manager.callbacks.plugin
+        plugin.get_subnets.return_value = [
+            {'id': 'subnet-1', 'network_id': 'net-1'}]
+        plugin.get_ports.return_value = [{'device_owner': 'compute:nova'}]
+
+    def test_update_dhcp_service_config_unchanged(self):
+        self._set_dhcp_ports()
+        reconfigure = self.nsxv_manager.vcns.reconfigure_dhcp_service
+        bindings = [{'macAddress': 'fa:16:3e:00:00:01'}]
+        for i in range(2):
+            self._update_dhcp_service_config(bindings)
+        reconfigure.assert_called_once()
+
+        # A changed configuration is written
+        self._update_dhcp_service_config(
+            bindings + [{'macAddress': 'fa:16:3e:00:00:02'}])
+        self.assertEqual(2, reconfigure.call_count)
+
+    def test_update_dhcp_service_config_failure(self):
+        self._set_dhcp_ports()
+        reconfigure = self.nsxv_manager.vcns.reconfigure_dhcp_service
+        bindings = [{'macAddress': 'fa:16:3e:00:00:01'}]
+        self._update_dhcp_service_config(bindings)
+        reconfigure.side_effect = nsx_exc.NsxPluginException(err_msg='fail')
+        self.assertRaises(nsx_exc.NsxPluginException,
+                          self._update_dhcp_service_config, [])
+
+        # The previous configuration is written again after the failure
+        reconfigure.reset_mock()
+        reconfigure.side_effect = None
+        self._update_dhcp_service_config(bindings)
+        reconfigure.assert_called_once()
+
+    def test_dhcp_bindings_change_invalidates_dhcp_config(self):
+        self._set_dhcp_ports()
+        reconfigure = self.nsxv_manager.vcns.reconfigure_dhcp_service
+        bindings = [{'macAddress': 'fa:16:3e:00:00:01'}]
+        self.edge_manager.plugin = mock.Mock()
+        self._update_dhcp_service_config(bindings)
+        with mock.patch.object(edge_utils, 'get_dhcp_edge_id',
+                               return_value='edge-1'), \
+                mock.patch.object(self.edge_manager, '_create_dhcp_binding',
+                                  return_value='binding-1'):
+            self.edge_manager.create_dhcp_bindings(
+                self.ctx, 'port-1', 'net-1', bindings)
+        # The bindings were changed one at a time, so the whole
+        # configuration is written again
+        self._update_dhcp_service_config(bindings)
+        self.assertEqual(2, reconfigure.call_count)
+
+        nsxv_db.create_edge_dhcp_static_binding(
+            self.ctx.session, 'edge-1', 'fa:16:3e:00:00:01', 'binding-1')
+        with mock.patch.object(edge_utils, 'get_dhcp_edge_id',
+                               return_value='edge-1'), \
+                mock.patch.object(edge_utils,
+                                  'get_dhcp_binding_for_binding_id',
+                                  return_value={'hostname': 'port-1'}):
+            self.edge_manager.delete_dhcp_binding(
+                self.ctx, 'port-1', 'net-1', 'fa:16:3e:00:00:01')
+        self.nsxv_manager.vcns.delete_dhcp_binding.assert_called_once_with(
+            'edge-1', 'binding-1')
+        self._update_dhcp_service_config(bindings)
+        self.assertEqual(3, reconfigure.call_count)
+
 
 class EdgeUtilsTestCase(EdgeUtilsTestCaseMixin):
 
@@ -770,6 +842,45 @@ class EdgeManagerTestCase(EdgeUtilsTestCaseMixin):
             self.edge_manager._free_edge_appliance(
                 self.ctx, 'fake_id')
 
+    def test_allocate_edge_appliance_records_pool_stats(self):
+        self.edge_manager.edge_pool_dicts = self.default_edge_pool_dicts
+        pool_edges = self._create_edge_pools(
+            1, 0, 0, 0, 0, size=nsxv_constants.COMPACT)
+        self._populate_vcns_router_binding(pool_edges)
+        pool_key = '%s:%s:%s' % (DEFAULT_AZ, nsxv_constants.SERVICE_EDGE,
+                                 nsxv_constants.COMPACT)
+        with mock.patch.object(self.edge_manager.pool_manager,
+                               'record_allocation') as record:
+            self.edge_manager._allocate_edge_appliance(
+                self.ctx, 'fake_id', 'fake_name',
+                appliance_size=nsxv_constants.COMPACT,
+                availability_zone=self.az)
+            record.assert_called_once_with(pool_key, True)
+
+    def test_pool_manager_check_pools(self):
+        self.edge_manager.edge_pool_dicts = self.default_edge_pool_dicts
+        large_key = '%s:%s:%s' % (DEFAULT_AZ, nsxv_constants.SERVICE_EDGE,
+                                  nsxv_constants.LARGE)
+        pool_manager = self.edge_manager.pool_manager
+        with mock.patch.object(pool_manager, '_get_consumption',
+                               return_value={large_key: 5}),\
+            mock.patch.object(self.edge_manager,
+                              '_clean_all_error_edge_bindings'),\
+            mock.patch.object(self.edge_manager, '_check_backup_edge_pool',
+                              return_value=-1) as check_pool:
+            pool_manager.check_pools()
+            # The large pool is pre-warmed up to its maximum, and the idle
+            # compact pool is recycled down to its minimum
+            check_pool.assert_has_calls([
+                mock.call(3, 3, appliance_size=nsxv_constants.LARGE,
+                          edge_type=nsxv_constants.SERVICE_EDGE,
+                          availability_zone=mock.ANY),
+                mock.call(1, 1, appliance_size=nsxv_constants.COMPACT,
+                          edge_type=nsxv_constants.SERVICE_EDGE,
+                          availability_zone=mock.ANY)], any_order=True)
+        self.assertEqual(3, pool_manager.get_target(large_key, 1))
+        self.assertEqual(1, pool_manager._stats[large_key]['recycled'])
+
 
 class VdrTransitNetUtilDefaultTestCase(EdgeUtilsTestCaseMixin):
     EXPECTED_NETMASK = '255.255.255.240'
@@ -0,0 +1,132 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from neutron.tests import base
+
+from vmware_nsx.common import config  # noqa
+from vmware_nsx.plugins.nsx_v.vshield.common import (
+    exceptions as vcns_exc)
+from vmware_nsx.plugins.nsx_v.vshield import vcns
+from vmware_nsx.tests.benchmark import nsxv_scale
+from vmware_nsx.tests.unit.nsx_v.vshield import fake_vcns_server
+
+
+class FakeVcnsServerTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(FakeVcnsServerTestCase, self).setUp()
+        self.server = fake_vcns_server.FakeVcnsServer(page_size=2).start()
+        self.addCleanup(self.server.stop)
+        self.vcns = vcns.Vcns(self.server.address, 'admin', 'default',
+                              None, True)
+
+    def _deploy_edge(self, name):
+        h, c = self.vcns.deploy_edge({'name': name,
+                                      'type': 'gatewayServices'})
+        return h['location'].split('/')[-1]
+
+    def test_get_edges_paging(self):
+        edge_ids = [self._deploy_edge('edge%s' % i) for i in range(5)]
+        self.server.reset_counters()
+        self.assertEqual(edge_ids,
+                         [edge['id'] for edge in self.vcns.get_edges()])
+        self.assertEqual({('GET', 'list_edges'): 3},
+                         dict(self.server.call_counts))
+
+    def test_get_version(self):
+        self.assertEqual(fake_vcns_server.NSX_VERSION,
+                         self.vcns.get_version())
+
+    def test_update_section_generation(self):
+        h, c = self.vcns.create_section(
+            'ip', '<section name="sec1"><rule><name>rule1</name></rule>'
+                  '</section>')
+        section_uri = h['location']
+        self.vcns.update_section(section_uri, '<section name="sec1"/>', h)
+        # The etag of the creation is stale now
+        self.assertRaises(vcns_exc.VcnsApiException,
+                          self.vcns.update_section,
+                          section_uri, '<section name="sec1"/>', h)
+        self.assertEqual([], self.vcns.get_section_rules(section_uri))
+
+    def test_injected_error(self):
+        edge_id = self._deploy_edge('edge1')
+        self.server.inject_error(edge_id + '$', method='GET', status=503)
+        self.assertRaises(vcns_exc.ServiceUnavailable,
+                          self.vcns.get_edge, edge_id)
+        self.assertEqual(edge_id, self.vcns.get_edge(edge_id)[1]['id'])
+
+    def test_dhcp_binding_duplicate_mac(self):
+        edge_id = self._deploy_edge('edge1')
+        binding = {'macAddress': 'fa:16:3e:00:00:01',
+                   'ipAddress': '10.0.0.2'}
+        self.vcns.create_dhcp_binding(edge_id, binding)
+        self.assertRaises(vcns_exc.RequestBad,
+                          self.vcns.create_dhcp_binding, edge_id, binding)
+        h, dhcp = self.vcns.query_dhcp_configuration(edge_id)
+        self.assertEqual(1, len(dhcp['staticBindings']['staticBindings']))
+
+    def test_benchmark_scenarios(self):
+        results = nsxv_scale.run_benchmark(scale=3, workers=2)
+        self.assertEqual(list(nsxv_scale.SCENARIOS),
+                         [result['scenario'] for result in results])
+        for result in results:
+            self.assertEqual(3, result['objects'])
+            self.assertGreaterEqual(result['backend_calls'], 3)
+
+    def test_section_directory(self):
+        h, c = self.vcns.create_section(
+            'ip', '<section name="sec1"><rule><name>rule1</name></rule>'
+                  '</section>')
+        section_uri = h['location']
+        self.server.reset_counters()
+        # The section and its ETag are known from the creation
+        self.assertEqual(section_uri.split('/')[-1],
+                         self.vcns.get_section_id('sec1'))
+        self.vcns.update_section(section_uri, '<section name="sec1"/>', None)
+        self.vcns.add_rule_to_section(section_uri,
+                                      '<rule><name>rule2</name></rule>')
+        self.assertEqual({('PUT', 'update_section'): 1,
+                          ('POST', 'create_section_rule'): 1},
+                         dict(self.server.call_counts))
+
+        # The configuration is read once for the default section and the
+        # unknown names
+        self.server.reset_counters()
+        self.assertEqual(fake_vcns_server.DEFAULT_L3_SECTION_ID,
+                         self.vcns.get_default_l3_id())
+        self.assertIsNone(self.vcns.get_section_id('sec2'))
+        self.assertEqual(fake_vcns_server.DEFAULT_L3_SECTION_ID,
+                         self.vcns.get_default_l3_id())
+        self.assertEqual({('GET', 'get_dfw_config'): 2},
+                         dict(self.server.call_counts))
+
+    def test_section_directory_stale_etag(self):
+        h, c = self.vcns.create_section('ip', '<section name="sec1"/>')
+        section_uri = h['location']
+        # Another client changes the section
+        other_vcns = vcns.Vcns(self.server.address, 'admin', 'default',
+                               None, True)
+        other_vcns.add_rule_to_section(section_uri,
+                                       '<rule><name>rule1</name></rule>')
+        self.server.reset_counters()
+        self.vcns.add_rule_to_section(section_uri,
+                                      '<rule><name>rule2</name></rule>')
+        self.assertEqual({('POST', 'create_section_rule'): 2,
+                          ('GET', 'get_section'): 1},
+                         dict(self.server.call_counts))
+        self.assertEqual(['rule1', 'rule2'],
+                         [rule['name'] for rule in
+                          self.vcns.get_section_rules(section_uri)])
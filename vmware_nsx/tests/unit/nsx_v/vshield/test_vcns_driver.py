@@ -24,7 +24,9 @@ from vmware_nsx.common import exceptions as nsxv_exc
 from vmware_nsx.plugins.nsx_v import availability_zones as nsx_az
 from vmware_nsx.plugins.nsx_v.vshield.common import (
     constants as vcns_const)
+from vmware_nsx.plugins.nsx_v.vshield.common import exceptions
 from vmware_nsx.plugins.nsx_v.vshield import edge_appliance_driver as e_drv
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
 from vmware_nsx.plugins.nsx_v.vshield.tasks import (
     constants as ts_const)
 from vmware_nsx.plugins.nsx_v.vshield.tasks import tasks as ts
@@ -319,6 +321,17 @@ class VcnsDriverTestCase(base.BaseTestCase):
         self.ctx = neutron_context.get_admin_context()
         self.temp_e_drv_nsxv_db = e_drv.nsxv_db
         e_drv.nsxv_db = mock.MagicMock()
+        self.fingerprints = {}
+        fingerprints_db = mock.patch.object(edge_fingerprints,
+                                            'nsxv_db').start()
+        fingerprints_db.get_nsxv_edge_config_fingerprint.side_effect = (
+            lambda session, edge_id, service, recorded_since=None:
+            self.fingerprints.get((edge_id, service)))
+        fingerprints_db.set_nsxv_edge_config_fingerprint.side_effect = (
+            lambda session, edge_id, service, fingerprint:
+            self.fingerprints.update({(edge_id, service): fingerprint}))
+        fingerprints_db.delete_nsxv_edge_config_fingerprints.side_effect = (
+            self._delete_fingerprints)
         self.config_parse(args=['--config-file', VCNS_CONFIG_FILE])
 
         self.fc = fake_vcns.FakeVcns()
@@ -334,6 +347,11 @@ class VcnsDriverTestCase(base.BaseTestCase):
         self.edge_id = None
         self.result = None
 
+    def _delete_fingerprints(self, session, edge_id, service=None):
+        for key in list(self.fingerprints):
+            if key[0] == edge_id and service in (None, key[1]):
+                del self.fingerprints[key]
+
     def tearDown(self):
         e_drv.nsxv_db = self.temp_e_drv_nsxv_db
         self.vcns_driver.task_manager.stop()
@@ -504,6 +522,53 @@ class VcnsDriverTestCase(base.BaseTestCase):
         self.natEquals(rules[6], snats[2])
         self.assertNotIn('vnic', rules[6])
 
+    def test_update_nat_rules_unchanged(self):
+        self._deploy_edge()
+        snats = [{'src': '192.168.1.0/24', 'translated': '10.0.0.1'}]
+        update_nat = self.vcns_driver.vcns.update_nat_config
+        update_nat.reset_mock()
+        for i in range(2):
+            self.assertTrue(self.vcns_driver.update_nat_rules(
+                self.edge_id, snats, []))
+        self.assertEqual(1, update_nat.call_count)
+
+        # A changed configuration is written
+        snats.append({'src': '192.168.2.0/24', 'translated': '10.0.0.2'})
+        self.assertTrue(self.vcns_driver.update_nat_rules(
+            self.edge_id, snats, []))
+        self.assertEqual(2, update_nat.call_count)
+
+    def test_update_nat_rules_no_fingerprint_ttl(self):
+        cfg.CONF.set_override('edge_config_fingerprint_ttl', 0, 'nsxv')
+        self._deploy_edge()
+        snats = [{'src': '192.168.1.0/24', 'translated': '10.0.0.1'}]
+        update_nat = self.vcns_driver.vcns.update_nat_config
+        update_nat.reset_mock()
+        for i in range(2):
+            self.assertTrue(self.vcns_driver.update_nat_rules(
+                self.edge_id, snats, []))
+        self.assertEqual(2, update_nat.call_count)
+
+    def test_update_nat_rules_failure(self):
+        self._deploy_edge()
+        snats = [{'src': '192.168.1.0/24', 'translated': '10.0.0.1'}]
+        other_snats = [{'src': '192.168.2.0/24', 'translated': '10.0.0.2'}]
+        update_nat = self.vcns_driver.vcns.update_nat_config
+        self.assertTrue(self.vcns_driver.update_nat_rules(
+            self.edge_id, snats, []))
+        update_nat.side_effect = exceptions.VcnsApiException(
+            status=500, header={}, uri='nat', response='error')
+        self.assertFalse(self.vcns_driver.update_nat_rules(
+            self.edge_id, other_snats, []))
+
+        # The configuration of the edge is unknown after the failure, so the
+        # previous configuration is written again
+        update_nat.reset_mock()
+        update_nat.side_effect = self.fc.update_nat_config
+        self.assertTrue(self.vcns_driver.update_nat_rules(
+            self.edge_id, snats, []))
+        self.assertEqual(1, update_nat.call_count)
+
     def snat_for_dnat(self, dnat):
         return {
             'src': dnat['translated'],
@@ -535,6 +600,27 @@ class VcnsDriverTestCase(base.BaseTestCase):
             self.edge_id, '10.0.0.1', routes)
         self.assertTrue(result)
 
+    def test_update_routes_failure(self):
+        self._deploy_edge()
+        routes = [{'cidr': '192.168.1.0/24', 'nexthop': '169.254.2.1'}]
+        update_routes = self.vcns_driver.vcns.update_routes
+        update_routes.reset_mock()
+        self.assertTrue(self.vcns_driver.update_routes(
+            self.edge_id, '10.0.0.1', routes))
+        self.assertTrue(self.vcns_driver.update_routes(
+            self.edge_id, '10.0.0.1', routes))
+        self.assertEqual(1, update_routes.call_count)
+
+        update_routes.side_effect = exceptions.VcnsApiException(
+            status=500, header={}, uri='routes', response='error')
+        self.assertFalse(self.vcns_driver.update_routes(
+            self.edge_id, '10.0.0.2', routes))
+        update_routes.reset_mock()
+        update_routes.side_effect = self.fc.update_routes
+        self.assertTrue(self.vcns_driver.update_routes(
+            self.edge_id, '10.0.0.1', routes))
+        self.assertEqual(1, update_routes.call_count)
+
     def test_update_interface(self):
         self._deploy_edge()
         self.vcns_driver.update_interface(
@@ -0,0 +1,132 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import xml.etree.ElementTree as et
+
+from neutron.tests import base
+
+from vmware_nsx.plugins.nsx_v.vshield.common import VcnsApiClient
+from vmware_nsx.plugins.nsx_v.vshield import securitygroup_utils
+from vmware_nsx.plugins.nsx_v.vshield import xml_codec
+from vmware_nsx.tests.benchmark import nsxv_xml
+
+SECTION = ('<?xml version="1.0" encoding="UTF-8"?>'
+           '<section id="1010" name="sec&amp;1">'
+           '<rule id="1" logged="true"><name>rule1</name>'
+           '<services><service><subProtocolName>echo-request'
+           '</subProtocolName><icmpCode>0</icmpCode></service></services>'
+           '</rule>'
+           '<rule id="2" logged="false" notes="a > b"><name>rule2</name>'
+           '</rule>'
+           '<rule id="3"/>'
+           '</section>')
+
+
+class XmlCodecTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(XmlCodecTestCase, self).setUp()
+        self.sg_utils = securitygroup_utils.NsxSecurityGroupUtils(None)
+
+    def _assert_same_xml(self, expected, actual):
+        self.assertEqual(et.tostring(et.fromstring(expected)),
+                         et.tostring(et.fromstring(actual)))
+
+    def test_iter_spans(self):
+        data = SECTION.encode('utf-8')
+        spans = list(xml_codec.iter_spans(data, ('rule',), with_root=True))
+        self.assertEqual(['1', '2', '3', '1010'],
+                         [span.attrib['id'] for span in spans])
+        self.assertEqual(b'<rule id="3"/>',
+                         data[spans[2].start:spans[2].end])
+        self.assertTrue(spans[2].empty)
+        self.assertEqual(data.index(b'<section'), spans[3].start)
+        self.assertEqual(len(data), spans[3].end)
+        self.assertEqual(
+            ['rule1', 'rule2', None],
+            [rule.findtext('name') for rule in
+             xml_codec.iter_elements(SECTION, 'rule')])
+
+    def test_get_root_attrib(self):
+        self.assertEqual({'id': '1010', 'name': 'sec&1'},
+                         xml_codec.get_root_attrib(SECTION))
+        self.assertEqual({}, xml_codec.get_root_attrib(SECTION, tag='rule'))
+        self.assertEqual({}, xml_codec.get_root_attrib(''))
+        self.assertRaises(et.ParseError, xml_codec.get_root_attrib, '<a')
+
+    def test_splice_keeps_payload_type(self):
+        root = xml_codec.get_root_span(SECTION)
+        changes = [xml_codec.set_attrib(root, {'id': '1010', 'name': 'x'}),
+                   xml_codec.append(root, b'<rule id="4"/>')]
+        self.assertIsInstance(xml_codec.splice(SECTION, changes), str)
+        self.assertIsInstance(
+            xml_codec.splice(SECTION.encode('utf-8'), changes), bytes)
+        self._assert_same_xml(
+            SECTION.replace('sec&amp;1', 'x').replace(
+                '</section>', '<rule id="4"/></section>'),
+            xml_codec.splice(SECTION, changes))
+
+    def test_append_to_empty_element(self):
+        section = '<section id="1" name="a"/>'
+        self.assertEqual(
+            '<section id="1" name="a"><rule/></section>',
+            xml_codec.splice(section, [xml_codec.append(
+                xml_codec.get_root_span(section), '<rule/>')]))
+
+    def test_get_rule_id_pair_from_section(self):
+        self.assertEqual(
+            [{'nsx_id': '1', 'neutron_id': 'rule1'},
+             {'nsx_id': '2', 'neutron_id': 'rule2'}],
+            self.sg_utils.get_rule_id_pair_from_section(
+                SECTION.replace('<rule id="3"/>', '')))
+
+    def test_update_section_attributes(self):
+        self.assertIsNone(self.sg_utils.update_section_attributes(
+            SECTION, name='sec&1'))
+        section_xml = self.sg_utils.update_section_attributes(
+            SECTION, name='sec2', logged=True)
+        expected = et.fromstring(SECTION)
+        expected.attrib['name'] = 'sec2'
+        for rule in expected.findall('rule'):
+            rule.attrib['logged'] = 'true'
+        self._assert_same_xml(et.tostring(expected), section_xml)
+
+    def test_extend_section(self):
+        new_rule = self.sg_utils.get_rule_config(['sg-1'], 'rule4')
+        section_xml = self.sg_utils.extend_section(SECTION, [new_rule])
+        expected = et.fromstring(SECTION)
+        self.sg_utils.fix_existing_section_rules(expected)
+        self.sg_utils.extend_section_with_rules(expected, [new_rule])
+        self._assert_same_xml(et.tostring(expected), section_xml)
+        self.assertNotIn('icmpCode', section_xml)
+
+    def test_xmldumps(self):
+        self.assertEqual(
+            '<firewall enabled="true"><rules><rule id="1"><name>a</name>'
+            '</rule><rule id="2"><name>b</name></rule></rules>'
+            '<version>2</version></firewall>',
+            VcnsApiClient.xmldumps(
+                {'firewall': {'_enabled': 'true',
+                              'rules': {'__rules': [
+                                  {'rule': {'_id': 1, 'name': 'a'}},
+                                  {'rule': {'_id': 2, 'name': 'b'}}]},
+                              '@version': {'version': 2}}}))
+
+    def test_benchmark(self):
+        results = nsxv_xml.run_benchmark(rules=(10,))
+        self.assertEqual(list(nsxv_xml.OPERATIONS),
+                         [result['operation'] for result in results])
+        for result in results:
+            self.assertEqual(10, result['rules'])
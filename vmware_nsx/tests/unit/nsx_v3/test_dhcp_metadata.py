@@ -31,6 +31,7 @@ from vmware_nsx.common import exceptions as nsx_exc
 from vmware_nsx.common import utils
 from vmware_nsx.db import db as nsx_db
 from vmware_nsx.extensions import advancedserviceproviders as as_providers
+from vmware_nsx.plugins.common_v3 import plugin as common_plugin
 from vmware_nsx.plugins.nsx_v3 import availability_zones as nsx_az
 from vmware_nsx.tests.unit.nsx_v3 import test_plugin
 from vmware_nsxlib.v3 import core_resources
@@ -800,6 +801,58 @@ class NsxNativeDhcpTestCase(test_plugin.NsxV3PluginTestCaseMixin):
                         context.get_admin_context(), port['port']['id'], data)
                     update_dhcp_binding.assert_not_called()
 
+    def test_dhcp_binding_with_update_subnet_host_routes(self):
+        # Test if the DHCP bindings of all the compute ports are rewritten in
+        # the background when the subnet host routes are changed.
+        host_route = {'destination': '20.0.0.0/24', 'nexthop': '10.0.0.10'}
+        with mock.patch.object(nsx_resources.LogicalDhcpServer,
+                               'update_binding') as update_dhcp_binding,\
+            mock.patch.object(common_plugin.eventlet, 'spawn_n',
+                              side_effect=lambda func, *args: func(*args)):
+            with self.subnet(cidr='10.0.0.0/24', enable_dhcp=True) as subnet:
+                device_owner = constants.DEVICE_OWNER_COMPUTE_PREFIX + 'None'
+                extra_dhcp_opts = [{'opt_name': 'interface-mtu',
+                                    'opt_value': '9000'}]
+                with self.port(subnet=subnet, device_owner=device_owner,
+                               device_id=uuidutils.generate_uuid()) as port1,\
+                    self.port(subnet=subnet, device_owner=device_owner,
+                              device_id=uuidutils.generate_uuid(),
+                              extra_dhcp_opts=extra_dhcp_opts,
+                              arg_list=('extra_dhcp_opts',)) as port2:
+                    data = {'subnet': {'host_routes': [host_route]}}
+                    self.plugin.update_subnet(context.get_admin_context(),
+                                              subnet['subnet']['id'], data)
+                    calls = {}
+                    for port in (port1['port'], port2['port']):
+                        dhcp_binding = nsx_db.get_nsx_dhcp_bindings(
+                            context.get_admin_context().session,
+                            port['id'])[0]
+                        ip = port['fixed_ips'][0]['ip_address']
+                        options = {'option121': {'static_routes': [
+                            {'network': '%s' %
+                             cfg.CONF.nsx_v3.native_metadata_route,
+                             'next_hop': '0.0.0.0'},
+                            {'network': '%s' %
+                             cfg.CONF.nsx_v3.native_metadata_route,
+                             'next_hop': ip},
+                            {'network': subnet['subnet']['cidr'],
+                             'next_hop': '0.0.0.0'},
+                            {'network': '20.0.0.0/24',
+                             'next_hop': '10.0.0.10'},
+                            {'network': '0.0.0.0/0',
+                             'next_hop': subnet['subnet']['gateway_ip']}]}}
+                        if port['id'] == port2['port']['id']:
+                            options['others'] = [{'code': 26,
+                                                  'values': ['9000']}]
+                        calls[dhcp_binding['nsx_binding_id']] = mock.call(
+                            dhcp_binding['nsx_service_id'],
+                            dhcp_binding['nsx_binding_id'],
+                            mac_address=port['mac_address'],
+                            ip_address=ip, options=options)
+                    update_dhcp_binding.assert_has_calls(
+                        list(calls.values()), any_order=True)
+                    self.assertEqual(2, update_dhcp_binding.call_count)
+
     def test_create_network_with_bad_az_hint(self):
         p = directory.get_plugin()
         ctx = context.get_admin_context()
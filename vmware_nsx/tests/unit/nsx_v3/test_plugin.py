@@ -2931,6 +2931,55 @@ class TestL3NatTestCase(L3NatTest,
     def test_router_address_scope_gw_change(self):
         self._test_router_address_scope_change(change_gw=True)
 
+    def test_recalculate_snat_rules_for_router(self):
+        """Test that the router nat rules are read once, and only the
+        difference is applied
+        """
+        plugin = directory.get_plugin()
+        router = {'id': 'rtr1',
+                  'external_gateway_info': {
+                      'network_id': 'ext-net',
+                      'external_fixed_ips': [{'ip_address': '1.1.1.1'}]}}
+        subnets = [{'id': 'sub1', 'cidr': '10.0.1.0/24',
+                    'subnetpool_id': 'pool1'},
+                   {'id': 'sub2', 'cidr': '10.0.2.0/24',
+                    'subnetpool_id': 'pool2'},
+                   {'id': 'sub3', 'cidr': '10.0.3.0/24',
+                    'subnetpool_id': 'pool2'}]
+        nat_rules = [
+            # Not required anymore since the subnet is on the GW scope
+            {'id': 'rule1', 'action': 'SNAT',
+             'translated_network': '1.1.1.1',
+             'match_source_network': '10.0.1.0/24'},
+            # Required, and should be kept
+            {'id': 'rule2', 'action': 'SNAT',
+             'translated_network': '1.1.1.1',
+             'match_source_network': '10.0.2.0/24'},
+            # Not related to those subnets
+            {'id': 'rule3', 'action': 'SNAT',
+             'translated_network': '1.1.1.1',
+             'match_source_network': '10.0.4.0/24'}]
+        scopes = {'pool1': 'scope1', 'pool2': 'scope2'}
+        with mock.patch.object(nsx_db, 'get_nsx_router_id',
+                               return_value='nsx-rtr'),\
+            mock.patch.object(plugin, '_get_network_address_scope',
+                              return_value='scope1'),\
+            mock.patch.object(plugin, '_get_subnetpool_address_scope',
+                              side_effect=lambda ctx, pool: scopes[pool]),\
+            mock.patch.object(plugin.nsxlib.logical_router, 'list_nat_rules',
+                              return_value={'results': nat_rules}
+                              ) as list_rules,\
+            mock.patch.object(plugin.nsxlib.logical_router,
+                              'delete_nat_rule') as delete_rule,\
+            self._mock_add_snat_rule() as add_rule:
+            plugin.recalculate_snat_rules_for_router(
+                context.get_admin_context(), router, subnets)
+            list_rules.assert_called_once_with('nsx-rtr')
+            delete_rule.assert_called_once_with('nsx-rtr', 'rule1')
+            add_rule.assert_called_once_with(
+                'nsx-rtr', '1.1.1.1', source_net='10.0.3.0/24',
+                bypass_firewall=False)
+
     def _test_3leg_router_address_scope_change(self, change_gw=False,
                                                change_2gw=False):
         """Test address scope change scenarios with router that covers
@@ -305,3 +305,27 @@ class TestNSXvBgpPlugin(test_plugin.NsxVPluginV2TestCase,
                                   self.context,
                                   speaker['id'],
                                   {'bgp_peer_id': 'aaa'})
+
+    def test_query_tenant_subnets_bulk(self):
+        int_ports = [{'device_id': 'rtr-1',
+                      'fixed_ips': [{'subnet_id': 'sub-1'}]},
+                     {'device_id': 'rtr-2',
+                      'fixed_ips': [{'subnet_id': 'sub-2'}]}]
+        subnets = [{'id': 'sub-1', 'cidr': '10.0.1.0/24'},
+                   {'id': 'sub-2', 'cidr': '10.0.2.0/24'}]
+        with mock.patch.object(self.plugin, 'get_ports',
+                               return_value=int_ports) as get_ports,\
+            mock.patch.object(self.plugin, 'get_subnets',
+                              return_value=subnets) as get_subnets:
+            result = self.nsxv_driver._query_tenant_subnets(
+                self.context, ['rtr-1', 'rtr-2'])
+            # All the routers are handled with a single query per resource
+            get_ports.assert_called_once()
+            get_subnets.assert_called_once()
+            self.assertEqual(subnets, result)
+
+    def test_update_edges(self):
+        edge_ids = ['edge-1', 'edge-2', 'edge-3']
+        result = self.nsxv_driver._update_edges(
+            edge_ids, lambda edge_id: edge_id != 'edge-2')
+        self.assertEqual(['edge-1', 'edge-3'], result)
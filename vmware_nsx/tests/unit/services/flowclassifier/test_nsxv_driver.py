@@ -13,7 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 from unittest import mock
+import xml.etree.ElementTree as et
 
+import eventlet
 from oslo_config import cfg
 from oslo_utils import importutils
 
@@ -225,47 +227,64 @@ class TestNsxvFlowClassifierDriver(
             rule.find('services').find('service').find('protocolName').text)
         self.assertTrue(rule.find('name').text.startswith(self._fc_name))
 
+    def _get_fc_context(self, fc):
+        return fc_ctx.FlowClassifierContext(
+            self.flowclassifier_plugin, self.ctx, fc['flow_classifier'])
+
     def test_create_flow_classifier(self):
         with self.flow_classifier(flow_classifier=self._fc) as fc:
-            fc_context = fc_ctx.FlowClassifierContext(
-                self.flowclassifier_plugin, self.ctx,
-                fc['flow_classifier']
-            )
+            fc_context = self._get_fc_context(fc)
             with mock.patch.object(
-                self.driver,
-                'update_redirect_section_in_backed') as mock_update_section:
+                self.fc2, 'add_rule_to_section',
+                side_effect=self.fc2.add_rule_to_section) as mock_add_rule:
                 self.driver.create_flow_classifier(fc_context)
-                self.assertTrue(mock_update_section.called)
-                section = mock_update_section.call_args[0][0]
-                self._validate_rule_structure(section.find('rule'))
+                self.assertTrue(mock_add_rule.called)
+                rule = et.fromstring(mock_add_rule.call_args[0][1])
+                self._validate_rule_structure(rule)
 
     def test_update_flow_classifier(self):
         with self.flow_classifier(flow_classifier=self._fc) as fc:
-            fc_context = fc_ctx.FlowClassifierContext(
-                self.flowclassifier_plugin, self.ctx,
-                fc['flow_classifier']
-            )
+            fc_context = self._get_fc_context(fc)
             self.driver.create_flow_classifier(fc_context)
             with mock.patch.object(
-                self.driver,
-                'update_redirect_section_in_backed') as mock_update_section:
+                self.fc2, 'update_rule_in_section',
+                side_effect=self.fc2.update_rule_in_section
+            ) as mock_update_rule:
                 self.driver.update_flow_classifier(fc_context)
-                self.assertTrue(mock_update_section.called)
-                section = mock_update_section.call_args[0][0]
-                self._validate_rule_structure(section.find('rule'))
+                self.assertTrue(mock_update_rule.called)
+                rule = et.fromstring(mock_update_rule.call_args[0][2])
+                self._validate_rule_structure(rule)
 
     def test_delete_flow_classifier(self):
         with self.flow_classifier(flow_classifier=self._fc) as fc:
-            fc_context = fc_ctx.FlowClassifierContext(
-                self.flowclassifier_plugin, self.ctx,
-                fc['flow_classifier']
-            )
+            fc_context = self._get_fc_context(fc)
             self.driver.create_flow_classifier(fc_context)
             with mock.patch.object(
-                self.driver,
-                'update_redirect_section_in_backed') as mock_update_section:
+                self.fc2, 'remove_rule_from_section',
+                side_effect=self.fc2.remove_rule_from_section
+            ) as mock_remove_rule:
                 self.driver.delete_flow_classifier(fc_context)
-                self.assertTrue(mock_update_section.called)
-                section = mock_update_section.call_args[0][0]
+                self.assertTrue(mock_remove_rule.called)
                 # make sure the rule is not there
+                section = self.driver.get_redirect_fw_section_from_backend()
                 self.assertIsNone(section.find('rule'))
+
+    def test_create_flow_classifiers_batch(self):
+        self.driver._batch_window = 0.01
+        fc2_data = dict(self._fc, name='test2',
+                        source_ip_prefix='10.20.0.0/24')
+        with self.flow_classifier(flow_classifier=self._fc) as fc1,\
+            self.flow_classifier(flow_classifier=fc2_data) as fc2:
+            with mock.patch.object(
+                self.driver, 'update_redirect_section_in_backed',
+                side_effect=self.driver.update_redirect_section_in_backed
+            ) as mock_update_section:
+                pool = eventlet.GreenPool()
+                for fc in (fc1, fc2):
+                    pool.spawn(self.driver.create_flow_classifier,
+                               self._get_fc_context(fc))
+                pool.waitall()
+                # Both rules were added by a single section update
+                mock_update_section.assert_called_once()
+                section = et.fromstring(mock_update_section.call_args[0][0])
+                self.assertEqual(2, len(section.findall('rule')))
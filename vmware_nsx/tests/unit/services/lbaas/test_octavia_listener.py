@@ -20,6 +20,7 @@ from neutron_lib import exceptions
 from oslo_utils import uuidutils
 
 from vmware_nsx.services.lbaas.octavia import octavia_listener
+from vmware_nsx.services.lbaas.octavia import status_aggregator
 
 
 class DummyOctaviaResource(object):
@@ -394,3 +395,55 @@ class TestNsxOctaviaListener(testtools.TestCase):
                 {'operating_status': 'ONLINE',
                  'provisioning_status': 'ACTIVE',
                  'id': mock.ANY}]})
+
+
+class TestOctaviaStatusAggregator(testtools.TestCase):
+    """Test the coalescing of the Octavia statuses"""
+    def setUp(self):
+        super(TestOctaviaStatusAggregator, self).setUp()
+        self.cast = mock.Mock()
+        self.aggregator = status_aggregator.OctaviaStatusAggregator(
+            self.cast, 10)
+
+    def _status(self, lb_id, member_id, prov_status='ACTIVE'):
+        return {'loadbalancers': [{'id': lb_id,
+                                   'provisioning_status': prov_status,
+                                   'operating_status': 'ONLINE'}],
+                'members': [{'id': member_id,
+                             'provisioning_status': prov_status,
+                             'operating_status': 'ONLINE'}]}
+
+    def test_update_without_window(self):
+        aggregator = status_aggregator.OctaviaStatusAggregator(self.cast, 0)
+        aggregator.update(self._status('lb1', 'member1'))
+        self.cast.assert_called_once_with(self._status('lb1', 'member1'))
+
+    def test_update_coalesced(self):
+        self.aggregator.update(self._status('lb1', 'member1'))
+        self.aggregator.update(self._status('lb1', 'member2'))
+        self.aggregator.update(self._status('lb1', 'member1', 'DELETED'))
+        self.aggregator.update(self._status('lb2', 'member3'))
+        self.cast.assert_not_called()
+
+        # The statuses of all the loadbalancers are sent together
+        self.aggregator.flush_all()
+        self.cast.assert_called_once()
+        status = self.cast.call_args[0][0]
+        self.assertEqual(
+            [('member1', 'DELETED'), ('member2', 'ACTIVE'),
+             ('member3', 'ACTIVE')],
+            sorted((member['id'], member['provisioning_status'])
+                   for member in status['members']))
+        self.assertEqual(['lb1', 'lb2'],
+                         sorted(lb['id'] for lb in status['loadbalancers']))
+
+    def test_update_error_flushed(self):
+        self.aggregator.update(self._status('lb1', 'member1'))
+        self.aggregator.update(self._status('lb2', 'member2', 'ERROR'))
+        self.cast.assert_called_once()
+        self.assertEqual(
+            ['member1', 'member2'],
+            [member['id'] for member in
+             self.cast.call_args[0][0]['members']])
+        self.aggregator.flush_all()
+        self.cast.assert_called_once()
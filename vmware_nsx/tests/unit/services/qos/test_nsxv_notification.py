@@ -24,6 +24,7 @@ from neutron_lib.services.qos import constants as qos_consts
 from oslo_config import cfg
 from oslo_utils import uuidutils
 
+from vmware_nsx.common import exceptions as nsx_exc
 from vmware_nsx.dvs import dvs
 from vmware_nsx.dvs import dvs_utils
 from vmware_nsx.services.qos.common import utils as qos_com_utils
@@ -338,3 +339,33 @@ class TestQosNsxVNotification(test_plugin.NsxVPluginV2TestCase,
         is deleted
         """
         self._test_dscp_rule_action_notification('delete')
+
+    def test_update_policy_multiple_networks(self):
+        """Test that the policy is translated once, and all the networks
+        are updated even if one of them fails
+        """
+        net_ids = ['net1', 'net2', 'net3']
+
+        def _update_port_groups(dvs_id, net_id, moref, spec_func, qos_data):
+            if net_id == 'net2':
+                raise nsx_exc.DvsNotFound(dvs=dvs_id)
+
+        with mock.patch.object(self.policy, 'get_bound_networks',
+                               return_value=net_ids),\
+            mock.patch.object(qos_utils, 'NsxVQosRule') as translate_mock,\
+            mock.patch.object(self._core_plugin,
+                              '_get_qos_backend_port_groups',
+                              side_effect=lambda ctx, net_id: [
+                                  ('dvs-1', 'moref-%s' % net_id)]),\
+            mock.patch.object(dvs.DvsManager, 'update_port_groups_config',
+                              side_effect=_update_port_groups
+                              ) as dvs_update_mock:
+            self.assertRaises(nsx_exc.NsxPluginException,
+                              qos_driver.DRIVER.update_policy,
+                              self.ctxt, self.policy)
+            translate_mock.assert_called_once_with(
+                context=self.ctxt, qos_policy_id=self.policy.id)
+            self.assertEqual(
+                sorted(net_ids),
+                sorted(call[0][1] for call in
+                       dvs_update_mock.call_args_list))
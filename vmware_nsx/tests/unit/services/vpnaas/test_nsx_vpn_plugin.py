@@ -0,0 +1,138 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+from unittest import mock
+
+from neutron.tests import base
+from neutron import worker as neutron_worker
+from neutron_lib import context
+from neutron_vpnaas.services.vpn import plugin as vpn_plugin
+from oslo_config import cfg
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+
+from vmware_nsx.common import config  # noqa
+from vmware_nsx.extensions import vpnstatusrefresh
+from vmware_nsx.services.vpnaas import nsx_plugin
+
+_uuid = uuidutils.generate_uuid
+
+DB_PATH = 'vmware_nsx.db.db'
+CONN1_ID = _uuid()
+CONN2_ID = _uuid()
+CONNECTIONS = [{'id': CONN1_ID, 'status': 'ACTIVE'},
+               {'id': CONN2_ID, 'status': 'ACTIVE'}]
+
+
+class TestNsxVPNPlugin(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestNsxVPNPlugin, self).setUp()
+        self.context = context.get_admin_context()
+        # The service providers are not needed by the status handling
+        self.plugin = nsx_plugin.NsxVPNPlugin.__new__(
+            nsx_plugin.NsxVPNPlugin)
+        self.driver = mock.Mock()
+        self.plugin.drivers = {'vmware': self.driver}
+        self.plugin.default_provider = 'vmware'
+        mock.patch.object(vpn_plugin.VPNDriverPlugin,
+                          'get_ipsec_site_connections',
+                          return_value=[dict(conn)
+                                        for conn in CONNECTIONS]).start()
+        mock.patch.object(vpn_plugin.VPNDriverPlugin,
+                          'get_ipsec_site_connection',
+                          return_value=dict(CONNECTIONS[0])).start()
+        self.update_status = mock.patch.object(
+            self.plugin, '_update_connection_status').start()
+
+    def _mock_refresh_time(self, age):
+        return mock.patch(
+            '%s.get_nsx_vpn_status_refresh_time' % DB_PATH,
+            return_value=timeutils.utcnow() - datetime.timedelta(
+                seconds=age))
+
+    def test_get_workers(self):
+        cfg.CONF.set_override('vpn_status_refresh_interval', 0)
+        self.assertEqual([], self.plugin.get_workers())
+        cfg.CONF.set_override('vpn_status_refresh_interval', 30)
+        workers = self.plugin.get_workers()
+        self.assertEqual(1, len(workers))
+        self.assertIsInstance(workers[0], neutron_worker.PeriodicWorker)
+
+    def test_refresh_all_connections_status(self):
+        self.driver.get_ipsec_site_connections_status.return_value = {
+            CONN1_ID: 'ACTIVE', CONN2_ID: 'DOWN'}
+        with mock.patch('%s.set_nsx_vpn_status_refresh_time' %
+                        DB_PATH) as set_time:
+            self.plugin._refresh_all_connections_status()
+            set_time.assert_called_once()
+        # Only the changed status is written
+        self.update_status.assert_called_once_with(
+            mock.ANY, CONN2_ID, 'DOWN', False)
+
+    def test_refresh_all_connections_status_failure(self):
+        self.driver.get_ipsec_site_connections_status.side_effect = (
+            ValueError)
+        with mock.patch('%s.set_nsx_vpn_status_refresh_time' %
+                        DB_PATH) as set_time:
+            self.plugin._refresh_all_connections_status()
+            set_time.assert_not_called()
+        self.update_status.assert_not_called()
+
+    def test_get_connections_fresh_status(self):
+        with self._mock_refresh_time(10):
+            self.assertTrue(
+                self.plugin._is_connections_status_fresh(self.context))
+            connections = self.plugin.get_ipsec_site_connections(
+                self.context)
+        self.driver.get_ipsec_site_connection_status.assert_not_called()
+        self.assertEqual(2, len(connections))
+        for connection in connections:
+            self.assertIsNotNone(
+                connection[vpnstatusrefresh.STATUS_REFRESHED_AT])
+
+    def test_get_connections_stale_status(self):
+        self.driver.get_ipsec_site_connection_status.return_value = 'DOWN'
+        with self._mock_refresh_time(1000):
+            self.assertFalse(
+                self.plugin._is_connections_status_fresh(self.context))
+            connections = self.plugin.get_ipsec_site_connections(
+                self.context)
+        # The status is refreshed per connection before answering
+        self.assertEqual(
+            2, self.driver.get_ipsec_site_connection_status.call_count)
+        self.assertEqual(2, self.update_status.call_count)
+        self.assertIsNotNone(
+            connections[0][vpnstatusrefresh.STATUS_REFRESHED_AT])
+
+    def test_get_connection_without_refresh_interval(self):
+        cfg.CONF.set_override('vpn_status_refresh_interval', 0)
+        self.driver.get_ipsec_site_connection_status.return_value = 'DOWN'
+        with self._mock_refresh_time(0):
+            self.assertFalse(
+                self.plugin._is_connections_status_fresh(self.context))
+            connection = self.plugin.get_ipsec_site_connection(
+                self.context, CONN1_ID)
+        self.update_status.assert_called_once_with(
+            self.context, CONN1_ID, 'DOWN', False)
+        self.assertIn(vpnstatusrefresh.STATUS_REFRESHED_AT, connection)
+
+    def test_get_connection_without_status(self):
+        with self._mock_refresh_time(1000):
+            connection = self.plugin.get_ipsec_site_connection(
+                self.context, CONN1_ID, fields=['id'])
+        self.driver.get_ipsec_site_connection_status.assert_not_called()
+        self.assertNotIn(vpnstatusrefresh.STATUS_REFRESHED_AT, connection)
@@ -758,3 +758,58 @@ class TestVpnaasDriver(test_plugin.NsxPPluginTestCaseMixin):
                     self.driver.delete_vpnservice(
                         self.context, FAKE_VPNSERVICE)
                     delete_service.assert_called_once()
+
+    def test_get_ipsec_site_connection_status(self):
+        conn_db = mock.Mock(vpnservice_id=FAKE_VPNSERVICE_ID)
+        other_conn_id = _uuid()
+        nsx_sessions = [{'id': FAKE_IPSEC_CONNECTION_ID},
+                        {'id': other_conn_id}]
+        nsx_status = {'results': [{'runtime_status': 'UP'}]}
+        with mock.patch.object(self.service_plugin,
+                               '_get_ipsec_site_connection',
+                               return_value=conn_db),\
+            mock.patch.object(self.service_plugin, '_get_vpnservice',
+                              return_value=FAKE_VPNSERVICE),\
+            mock.patch.object(self.service_plugin, 'get_vpnservices',
+                              return_value=[FAKE_VPNSERVICE]),\
+            mock.patch.object(self.service_plugin,
+                              'get_ipsec_site_connections',
+                              return_value=[{'id': FAKE_IPSEC_CONNECTION_ID},
+                                            {'id': other_conn_id}]),\
+            mock.patch.object(self.policy_vpn.session, 'list',
+                              return_value=nsx_sessions) as list_sessions,\
+            mock.patch.object(self.policy_vpn.session, 'get_status',
+                              return_value=nsx_status) as get_status:
+            status = self.driver.get_ipsec_site_connection_status(
+                self.context, FAKE_IPSEC_CONNECTION_ID)
+            self.assertEqual('ACTIVE', status)
+            list_sessions.assert_called_once_with(FAKE_ROUTER_ID,
+                                                  FAKE_ROUTER_ID)
+            self.assertEqual(2, get_status.call_count)
+
+            # The other connection of the router is served from the cache
+            status = self.driver.get_ipsec_site_connection_status(
+                self.context, other_conn_id)
+            self.assertEqual('ACTIVE', status)
+            list_sessions.assert_called_once()
+            self.assertEqual(2, get_status.call_count)
+
+    def test_get_ipsec_site_connections_status(self):
+        nsx_sessions = [{'id': FAKE_IPSEC_CONNECTION_ID}]
+        nsx_status = {'results': [{'runtime_status': 'DEGRADED'}]}
+        conn = {'id': FAKE_IPSEC_CONNECTION_ID,
+                'vpnservice_id': FAKE_VPNSERVICE_ID}
+        with mock.patch.object(self.service_plugin, 'get_vpnservices',
+                               return_value=[FAKE_VPNSERVICE]),\
+            mock.patch.object(self.service_plugin,
+                              'get_ipsec_site_connections',
+                              return_value=[conn]),\
+            mock.patch.object(self.policy_vpn.session, 'list',
+                              return_value=nsx_sessions),\
+            mock.patch.object(self.policy_vpn.session, 'get_status',
+                              return_value=nsx_status) as get_status:
+            statuses = self.driver.get_ipsec_site_connections_status(
+                self.context)
+            self.assertEqual({FAKE_IPSEC_CONNECTION_ID: 'DOWN'}, statuses)
+            get_status.assert_called_once_with(
+                FAKE_ROUTER_ID, FAKE_ROUTER_ID, FAKE_IPSEC_CONNECTION_ID)
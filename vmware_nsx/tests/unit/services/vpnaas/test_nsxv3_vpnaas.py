@@ -282,6 +282,19 @@ class TestDriverValidation(base.BaseTestCase):
                               return_value=db_router):
             self.validator.validate_vpnservice(self.context, self.vpn_service)
 
+    def test_vpn_service_validation_cached_ha_mode(self):
+        db_router = l3_models.Router()
+        db_router.enable_snat = False
+        nsx_router = {'high_availability_mode': 'ACTIVE_STANDBY'}
+        with mock.patch.object(self.validator.nsxlib.logical_router, 'get',
+                               return_value=nsx_router) as get_router,\
+            mock.patch.object(self.validator._core_plugin, '_get_router',
+                              return_value=db_router):
+            self.validator.validate_vpnservice(self.context, self.vpn_service)
+            self.validator.validate_vpnservice(self.context, self.vpn_service)
+            # The HA mode of the Tier0 router is read from the DB cache
+            get_router.assert_called_once()
+
     def _test_conn_validation(self, conn_params=None, success=True,
                               connections=None, service_subnets=None,
                               router_subnets=None):
@@ -725,3 +738,30 @@ class TestVpnaasDriver(test_plugin.NsxV3PluginTestCaseMixin):
                     self.driver.delete_vpnservice(
                         self.context, FAKE_VPNSERVICE)
                     delete_service.assert_called_once()
+
+    def test_get_ipsec_site_connections_status(self):
+        conn_up = {'id': _uuid(), 'vpnservice_id': FAKE_VPNSERVICE_ID}
+        conn_down = {'id': _uuid(), 'vpnservice_id': FAKE_VPNSERVICE_ID}
+        conn_no_session = {'id': _uuid(), 'vpnservice_id': FAKE_VPNSERVICE_ID}
+        mappings = [{'neutron_id': conn_up['id'], 'session_id': 'session1'},
+                    {'neutron_id': conn_down['id'], 'session_id': 'session2'}]
+        sessions_status = {'session1': {'session_status': 'UP'},
+                           'session2': {'session_status': 'DEGRADED'}}
+        with mock.patch.object(self.service_plugin, 'get_vpnservices',
+                               return_value=[FAKE_VPNSERVICE]),\
+            mock.patch.object(self.service_plugin,
+                              'get_ipsec_site_connections',
+                              return_value=[conn_up, conn_down,
+                                            conn_no_session]),\
+            mock.patch("vmware_nsx.db.db.get_nsx_vpn_connection_mappings",
+                       return_value=mappings) as get_mappings,\
+            mock.patch.object(self.nsxlib_vpn.session, 'get_status',
+                              side_effect=sessions_status.get):
+            statuses = self.driver.get_ipsec_site_connections_status(
+                self.context)
+            self.assertEqual({conn_up['id']: 'ACTIVE',
+                              conn_down['id']: 'DOWN'}, statuses)
+            # The session mappings are read in a single query
+            get_mappings.assert_called_once_with(
+                self.context.session,
+                [conn_up['id'], conn_down['id'], conn_no_session['id']])
@@ -333,3 +333,32 @@ class TestVpnaasDriver(test_plugin.NsxVPluginV2TestCase):
             self.assertRaises(nsxv_exc.NsxPluginException,
                               self.driver.create_vpnservice,
                               self.context, vpnservice)
+
+    def test_get_ipsec_site_connections_status(self):
+        conn_up = {'id': _uuid(), 'vpnservice_id': FAKE_VPNSERVICE_ID,
+                   'peer_id': '192.168.1.1', 'peer_address': '192.168.1.1'}
+        conn_down = {'id': _uuid(), 'vpnservice_id': FAKE_VPNSERVICE_ID,
+                     'peer_id': '192.168.2.1', 'peer_address': '192.168.2.1'}
+        stats = {'siteStatistics': [
+            {'ikeStatus': {'channelStatus': 'UP',
+                           'peerId': '192.168.1.1',
+                           'peerIpAddress': '192.168.1.1'},
+             'tunnelStats': [{'tunnelStatus': 'UP'}]},
+            {'ikeStatus': {'channelStatus': 'UP',
+                           'peerId': '192.168.2.1',
+                           'peerIpAddress': '192.168.2.1'},
+             'tunnelStats': [{'tunnelStatus': 'DOWN'}]}]}
+        with mock.patch.object(self.service_plugin, 'get_vpnservices',
+                               return_value=[{'id': FAKE_VPNSERVICE_ID}]),\
+            mock.patch.object(self.service_plugin,
+                              'get_ipsec_site_connections',
+                              return_value=[conn_up, conn_down]),\
+            mock.patch.object(self.driver, '_get_router_edge_id',
+                              return_value=(FAKE_ROUTER_ID, FAKE_EDGE_ID)),\
+            mock.patch.object(self.driver._vcns, 'get_ipsec_statistics',
+                              return_value=({}, stats)) as get_stats:
+            statuses = self.driver.get_ipsec_site_connections_status(
+                self.context)
+            self.assertEqual({conn_up['id']: 'ACTIVE',
+                              conn_down['id']: 'DOWN'}, statuses)
+            get_stats.assert_called_once_with(FAKE_EDGE_ID)
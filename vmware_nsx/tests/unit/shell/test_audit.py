@@ -0,0 +1,158 @@
+# Copyright 2026 VMware, Inc.
+# All Rights Reserved
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from neutron.tests import base
+from oslo_config import cfg
+from oslo_serialization import jsonutils
+
+from vmware_nsx.common import config  # noqa
+from vmware_nsx.common import locking
+from vmware_nsx.plugins.nsx_v import md_proxy
+from vmware_nsx.plugins.nsx_v.vshield import edge_fingerprints
+from vmware_nsx.plugins.nsx_v.vshield import nsxv_loadbalancer as nsxv_lb
+from vmware_nsx.shell.admin.plugins.common import audit
+from vmware_nsx.shell.admin.plugins.nsxv.resources import metadata
+from vmware_nsx.shell.admin.plugins.nsxv.resources import spoofguard_policy
+from vmware_nsx.shell import resources
+
+POLICY_ID = 'spoofguardpolicy-1'
+NET_ID = 'net-1'
+EDGE_ID = 'edge-1'
+MD_IPS = ['169.254.128.2', '169.254.128.3']
+
+
+def _port(port_id, ips, mac='fa:16:3e:00:00:01', owner='compute:nova'):
+    return {'id': port_id, 'device_owner': owner,
+            'port_security_enabled': True, 'mac_address': mac,
+            'allowed_address_pairs': [],
+            'fixed_ips': [{'ip_address': ip} for ip in ips]}
+
+
+def _policy_data(vnic_id, ips, mac='fa:16:3e:00:00:01'):
+    return {'id': vnic_id, 'publishedMacAddress': mac,
+            'publishedIpAddress': {'ipAddresses': ips}}
+
+
+class TestNsxvAudit(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestNsxvAudit, self).setUp()
+        cfg.CONF.register_opts([opt for opt in resources.cli_opts
+                                if opt.name == 'fmt'])
+        self.plugin = mock.Mock()
+        self.plugin._get_port_vnic_id.side_effect = (
+            lambda index, device_id: '%s.%03d' % (device_id, index))
+
+    def test_get_ports_vnic_ids(self):
+        self.plugin._get_ports_vnic_indexes.return_value = [
+            ('port-1', 'vm-1', 0), ('port-2', 'vm-1', 1)]
+        self.assertEqual(
+            {'port-1': 'vm-1.000', 'port-2': 'vm-1.001'},
+            spoofguard_policy.get_ports_vnic_ids(self.plugin, mock.Mock()))
+        # The vnic indexes are read once for all the ports
+        self.plugin._get_ports_vnic_indexes.assert_called_once()
+
+    def test_mismatch_addresses_report(self):
+        cfg.CONF.set_override('fmt', 'json')
+        ports = [_port('port-1', ['10.0.0.1']),
+                 _port('port-2', ['10.0.0.2', '10.0.0.3']),
+                 _port('port-3', ['10.0.0.4']),
+                 _port('port-4', ['10.0.0.5']),
+                 _port('port-5', ['10.0.0.6'], owner='network:dhcp')]
+        vnic_ids = {'port-1': 'vm-1.000', 'port-2': 'vm-2.000',
+                    'port-3': 'vm-3.000', 'port-5': 'dhcp.000'}
+        policy_data = audit.index_by(
+            [_policy_data('vm-1.000', ['10.0.0.1']),
+             _policy_data('vm-2.000', ['10.0.0.2'])],
+            lambda data: data['id'])
+        findings = spoofguard_policy._get_mismatch_addresses(
+            NET_ID, POLICY_ID, ports, policy_data, vnic_ids)
+
+        with mock.patch.object(audit.LOG, 'info') as log_info:
+            audit.report('Spoofguard Policy', findings,
+                         ['network', 'policy', 'port', 'data'])
+        self.assertEqual(
+            {'Spoofguard Policy': [
+                {'network': NET_ID, 'policy': POLICY_ID, 'port': 'port-2',
+                 'data': 'Different IPs (1/2)'},
+                {'network': NET_ID, 'policy': POLICY_ID, 'port': 'port-3',
+                 'data': 'Port missing from SG policy'}]},
+            jsonutils.loads(log_info.call_args[0][0]))
+
+
+class TestNsxvMetadataReconcile(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestNsxvMetadataReconcile, self).setUp()
+        mock.patch.object(locking.LockManager, 'get_lock').start()
+        mock.patch.object(edge_fingerprints, 'invalidate').start()
+        self.plugin = mock.Mock()
+        self.nsxv = mock.patch.object(metadata, 'nsxv').start()
+        self.nsxv.get_firewall.return_value = (
+            {}, {'firewallRules': {'firewallRules': []}})
+        self.pool = mock.Mock(members={})
+        self.lb = mock.Mock(virtual_servers={
+            md_proxy.METADATA_VSE_NAME: mock.Mock(default_pool=self.pool)})
+        mock.patch.object(nsxv_lb.NsxvLoadbalancer, 'get_loadbalancer',
+                          return_value=self.lb).start()
+
+    def _reconcile(self):
+        return metadata._reconcile_edge_md(
+            EDGE_ID, MD_IPS, metadata._get_desired_md_fingerprint(MD_IPS))
+
+    def test_reconcile_edge_md(self):
+        self.assertEqual(metadata.MD_UPDATED, self._reconcile())
+        self.lb.submit_to_backend.assert_called_once_with(self.nsxv,
+                                                          EDGE_ID)
+        self.nsxv.update_firewall.assert_called_once()
+
+    def test_reconcile_edge_md_members_failure(self):
+        self.lb.submit_to_backend.side_effect = Exception
+        self.assertEqual(metadata.MD_FAILED, self._reconcile())
+        # The firewall rules are still added
+        self.nsxv.update_firewall.assert_called_once()
+
+    def test_reconcile_edge_md_firewall_failure(self):
+        self.nsxv.update_firewall.side_effect = Exception
+        self.assertEqual(metadata.MD_FAILED, self._reconcile())
+
+    def test_reconcile_edge_md_firewall_read_failure(self):
+        self.nsxv.get_firewall.side_effect = Exception
+        self.assertEqual(metadata.MD_FAILED, self._reconcile())
+        # The members are still updated
+        self.lb.submit_to_backend.assert_called_once()
+        self.nsxv.update_firewall.assert_not_called()
+
+    def test_recreate_edge_md(self):
+        with mock.patch.object(metadata, '_recreate_rtr_metadata_cfg',
+                               return_value=True), \
+                mock.patch.object(metadata, '_handle_edge_firewall_rules',
+                                  return_value=True):
+            self.assertEqual(
+                metadata.MD_RECREATED,
+                metadata._recreate_edge_md(mock.Mock(), self.plugin,
+                                           'default', EDGE_ID))
+
+    def test_recreate_edge_md_failure(self):
+        with mock.patch.object(metadata, '_recreate_rtr_metadata_cfg',
+                               return_value=False), \
+                mock.patch.object(metadata, '_handle_edge_firewall_rules',
+                                  return_value=True):
+            self.assertEqual(
+                metadata.MD_FAILED,
+                metadata._recreate_edge_md(mock.Mock(), self.plugin,
+                                           'default', EDGE_ID))
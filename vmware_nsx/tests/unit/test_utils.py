@@ -32,6 +32,7 @@ def override_nsx_ini_test():
     cfg.CONF.set_override("dvs_id", "fake_dvs_id", group="nsxv")
     cfg.CONF.set_override("cluster_moid", "fake_cluster_moid", group="nsxv")
     cfg.CONF.set_override("external_network", "fake_net", group="nsxv")
+    cfg.CONF.set_override("backup_edge_pool_check_interval", 0, group="nsxv")
 
 
 def override_nsx_ini_full_test():